@@ -0,0 +1,114 @@
+"""pytest fixtures: the app on a throwaway database, and for the escrow benchmarks the
+in-process fake chain or a local substrate-contracts-node.
+
+The node fixtures skip unless `substrate-contracts-node` is on PATH and the
+contract has been built (`cargo contract build --release`).
+"""
+import asyncio
+import shutil
+import socket
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+
+from benchmarks.escrow_fixtures import escrow_metadata
+from benchmarks.fake_chain import FakeChain
+from src.core.depends.db import get_async_session, get_read_session
+from src.main import app
+from src.services.contract_artifacts import DEFAULT_CONTRACT, default_search_dirs
+from src.services.contract_codec import ContractCodec
+
+NODE_BINARY = "substrate-contracts-node"
+NODE_START_TIMEOUT = 60.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def api_sessions(tmp_path) -> Iterator[sessionmaker]:
+    """Serve `src.main.app` from a SQLite file in `tmp_path`; yields its session factory.
+
+    Requests go through `httpx.ASGITransport(app=app)`. Connections are not
+    pooled, so each test's `asyncio.run` gets its own.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}", poolclass=NullPool)
+
+    async def create_tables():
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_tables())
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    async def session_override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = session_override
+    app.dependency_overrides[get_read_session] = session_override
+    try:
+        yield session_factory
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def fake_chain() -> FakeChain:
+    """A fresh fake instant-seal chain running the synthetic escrow ABI."""
+    return FakeChain(ContractCodec(escrow_metadata()))
+
+
+@pytest.fixture(scope="session")
+def contract_artifacts_dir() -> Path:
+    """Directory of a real funding_escrow build."""
+    for directory in default_search_dirs():
+        if (directory / f"{DEFAULT_CONTRACT}.wasm").exists() and (directory / f"{DEFAULT_CONTRACT}.json").exists():
+            return directory
+    pytest.skip("funding_escrow is not built (cargo contract build --release)")
+
+
+@pytest.fixture(scope="session")
+def contracts_node() -> Iterator[str]:
+    """Boot `substrate-contracts-node --dev` (instant seal, throwaway state) and yield its websocket URL."""
+    binary = shutil.which(NODE_BINARY)
+    if binary is None:
+        pytest.skip(f"{NODE_BINARY} is not installed")
+    port = _free_port()
+    process = subprocess.Popen(
+        [binary, "--dev", "--tmp", f"--rpc-port={port}"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + NODE_START_TIMEOUT
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    pytest.fail(f"{NODE_BINARY} did not start on port {port}")
+                time.sleep(0.2)
+        yield f"ws://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+@pytest.fixture(params=["fake", "node"])
+def chain_backend(request) -> dict:
+    """`rpc_url` and `artifacts_dir` for `escrow_env`: the fake chain, then a local node when available."""
+    if request.param == "fake":
+        return {"rpc_url": None, "artifacts_dir": None}
+    artifacts_dir: Optional[Path] = request.getfixturevalue("contract_artifacts_dir")
+    return {"rpc_url": request.getfixturevalue("contracts_node"), "artifacts_dir": artifacts_dir}
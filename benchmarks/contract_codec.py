@@ -0,0 +1,99 @@
+"""Benchmark: contract call encoding and result/event decoding, codec vs ContractMetadata.
+
+Compares the precompiled `ContractCodec` with the `substrateinterface` path
+(`ContractMetadata.generate_message_data` plus decoding through the return
+type string), both offline, on the calls the escrow services make:
+`get_milestone_status` encoding, `get_escrow_status` result decoding and
+`FundsReleased` event decoding. Uses synthetic metadata matching the contract
+unless `--metadata` points at a built `funding_escrow.json`.
+
+Usage:
+    python -m benchmarks.contract_codec --iterations 20000
+"""
+import argparse
+import copy
+import json
+import time
+from typing import Callable
+
+from scalecodec.base import RuntimeConfigurationObject, ScaleBytes
+from scalecodec.type_registry import load_type_registry_preset
+from substrateinterface.contracts import ContractEvent, ContractMetadata
+
+from benchmarks.escrow_fixtures import ALICE, load_metadata
+from src.services.contract_codec import ContractCodec, _OfflineRuntime
+
+
+def _rate(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def run(metadata_path: str, iterations: int) -> dict:
+    metadata = load_metadata(metadata_path)
+
+    start = time.perf_counter()
+    codec = ContractCodec(metadata)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    runtime_config = RuntimeConfigurationObject(ss58_format=42, implements_scale_info=True)
+    runtime_config.update_type_registry(load_type_registry_preset("core"))
+    start = time.perf_counter()
+    legacy = ContractMetadata(copy.deepcopy(metadata), _OfflineRuntime(runtime_config))
+    legacy_build_ms = (time.perf_counter() - start) * 1000
+
+    read_args = {"project_owner": ALICE, "milestone_index": 2}
+    status = codec.messages["get_escrow_status"].returns
+    status_bytes = bytes(status(data=None, runtime_config=codec.runtime_config).encode({"Ok": (10**13, 25 * 10**11, False, False)}).data)
+    event = codec.events[1]
+    event_bytes = bytes([event.event_id]) + b"".join(
+        bytes(decoder(data=None, runtime_config=codec.runtime_config).encode(value).data)
+        for (_, decoder), value in zip(event.args, (ALICE, 2, 25 * 10**11))
+    )
+    assert codec.encode_call("get_milestone_status", read_args) == bytes(
+        legacy.generate_message_data("get_milestone_status", read_args).data
+    )
+
+    def legacy_encode():
+        return legacy.generate_message_data(name="get_milestone_status", args=read_args).to_hex()
+
+    def legacy_decode():
+        obj = runtime_config.create_scale_object(legacy.get_return_type_string_for_message("get_escrow_status"))
+        return obj.decode(ScaleBytes(status_bytes))
+
+    def legacy_event():
+        obj = ContractEvent(data=ScaleBytes(event_bytes), runtime_config=runtime_config, contract_metadata=legacy)
+        return obj.decode()
+
+    cases = {
+        "encode_call": (legacy_encode, lambda: codec.encode_call("get_milestone_status", read_args)),
+        "decode_result": (legacy_decode, lambda: codec.decode_result("get_escrow_status", status_bytes)),
+        "decode_event": (legacy_event, lambda: codec.decode_event(event_bytes)),
+    }
+    results = {"metadata": metadata_path or "synthetic", "iterations": iterations, "codec_build_ms": round(build_ms, 1),
+               "contract_metadata_build_ms": round(legacy_build_ms, 1),
+               "calls_per_second": {}}
+    for name, (baseline_fn, codec_fn) in cases.items():
+        baseline = _rate(baseline_fn, iterations)
+        compiled = _rate(codec_fn, iterations)
+        results["calls_per_second"][name] = {
+            "contract_metadata": round(baseline),
+            "codec": round(compiled),
+            "speedup": round(compiled / baseline, 2),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--metadata", help="path to a built funding_escrow.json (default: synthetic metadata)")
+    parser.add_argument("--iterations", type=int, default=20000, help="calls per measurement")
+    args = parser.parse_args()
+    print(json.dumps(run(args.metadata, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Benchmark: escrow deployment and milestone release throughput against a dev chain.
+
+Runs the real `EscrowJobRunner`, `MilestoneReleaseService` and deploy-escrow
+route over a SQLite database, against either the in-process `FakeChain`
+(default; synthetic artifacts, optional per-RPC `--latency`) or a node given
+by `--rpc-url`, e.g. a local `substrate-contracts-node --dev` with artifacts
+from `cargo contract build` (`--artifacts-dir`). Reports:
+
+- deploys/s: `--projects` deployment jobs queued at once, run to a terminal state
+- releases/s: every milestone of the deployed escrows released in one batch,
+  tracked until finalized
+- end-to-end latency of `POST /escrow/deploy-escrow` until the job succeeds,
+  one request at a time (`--e2e` requests)
+
+Results are printed as JSON and appended, with the git revision and a
+timestamp, to `--output` (JSON lines) when given.
+
+Usage:
+    python -m benchmarks.escrow_throughput --projects 50 --workers 4
+    python -m benchmarks.escrow_throughput --rpc-url ws://127.0.0.1:9944 \\
+        --artifacts-dir smart-contract/funding-escrow/target/ink --output benchmarks/results/escrow_throughput.jsonl
+"""
+import argparse
+import asyncio
+import functools
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+import httpx
+from loguru import logger
+from pydantic import SecretStr
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+from substrateinterface import SubstrateInterface
+
+from benchmarks.escrow_fixtures import write_artifacts
+from benchmarks.fake_chain import FakeChain, FakeSubstrate
+from src.core.timing import instrument_engine
+from src.models.escrow_job import ESCROW_JOB_SUCCEEDED, ESCROW_JOB_TERMINAL, EscrowDeploymentJob
+from src.models.milestone import Milestone
+from src.models.milestone_release import RELEASE_FINALIZED, RELEASE_PENDING, MilestoneRelease, MilestoneReleaseItem
+from src.models.sponsor import SponsoredProject
+from src.services.contract_artifacts import ContractArtifactRegistry
+from src.services.contract_codec import ContractCodecRegistry
+from src.services.escrow_jobs import EscrowJobRunner, EscrowJobService
+from src.services.escrow_plan import DEFAULT_MILESTONE_COUNT
+from src.services.escrow_state import EscrowStateReader
+from src.services.milestone_release import MilestoneReleaseService
+from src.services.nonces import NonceManager
+from src.services.substrate_pool import SubstratePool
+from src.settings.substrate import SubstrateSettings
+
+FAKE_RPC_URL = "fake://dev"
+
+
+@dataclass
+class EscrowBenchEnv:
+    """The escrow services wired to one chain and one throwaway database."""
+
+    pool: SubstratePool
+    reader: EscrowStateReader
+    runner: EscrowJobRunner
+    releases: MilestoneReleaseService
+    session_factory: Callable[[], AsyncSession]
+    chain: Optional[FakeChain] = None
+
+
+@asynccontextmanager
+async def escrow_env(
+    workdir: Path,
+    rpc_url: Optional[str] = None,
+    artifacts_dir: Optional[Path] = None,
+    pool_size: int = 4,
+    workers: int = 4,
+    latency: float = 0.0,
+    signer_uri: str = "//Alice",
+    database_url: Optional[str] = None,
+    arkiv_client_factory: Callable[[], Any] = lambda: None,
+) -> AsyncIterator[EscrowBenchEnv]:
+    """Start the pool, job runner and release service against the fake chain (or `rpc_url`).
+
+    The database is a SQLite file in `workdir` unless `database_url` is given.
+    Without an `arkiv_client_factory`, projects must not have an Arkiv entity.
+    """
+    if rpc_url is not None and artifacts_dir is None:
+        raise ValueError("A real node needs real contract artifacts (artifacts_dir)")
+    artifacts = ContractArtifactRegistry(search_dirs=[artifacts_dir or write_artifacts(workdir / "artifacts")])
+    codecs = ContractCodecRegistry()
+    chain = None
+    factory: Callable[..., SubstrateInterface] = SubstrateInterface
+    if rpc_url is None:
+        chain = FakeChain(codecs.get(artifacts.get()), latency=latency)
+        factory = functools.partial(FakeSubstrate, chain)
+
+    engine = create_async_engine(database_url or f"sqlite+aiosqlite:///{workdir / 'bench.db'}")
+    # Same query spans as the app's engines (Server-Timing `db`)
+    instrument_engine(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    pool = SubstratePool(url=rpc_url or FAKE_RPC_URL, size=pool_size, factory=factory)
+    reader = EscrowStateReader(pool=pool, artifacts=artifacts, codecs=codecs)
+    # Local nonces are per chain, so every environment starts its own counters
+    nonces = NonceManager()
+    runner = EscrowJobRunner(
+        workers=workers, pool=pool, reader=reader, nonces=nonces, session_factory=session_factory,
+        arkiv_client_factory=arkiv_client_factory,
+    )
+    releases = MilestoneReleaseService(
+        pool=pool, reader=reader, session_factory=session_factory, arkiv_client_factory=arkiv_client_factory,
+        nonces=nonces,
+    )
+    previous_signer = SubstrateSettings.SIGNER_URI
+    SubstrateSettings.SIGNER_URI = SecretStr(signer_uri)
+    await pool.start()
+    await runner.start()
+    try:
+        if not await pool.wait_ready():
+            raise RuntimeError(f"No connection to {pool.url}")
+        yield EscrowBenchEnv(pool, reader, runner, releases, session_factory, chain)
+    finally:
+        await runner.close()
+        await pool.close()
+        await engine.dispose()
+        SubstrateSettings.SIGNER_URI = previous_signer
+
+
+async def create_projects(env: EscrowBenchEnv, count: int, milestones: int = DEFAULT_MILESTONE_COUNT) -> List[int]:
+    """Insert `count` approved projects with `milestones` milestones each; returns their ids."""
+    async with env.session_factory() as session:
+        start = await session.scalar(select(func.count(SponsoredProject.id)))
+        projects = [
+            SponsoredProject(
+                project_id=f"bench-{start + i}", name=f"Bench project {start + i}", repo="https://example.com/repo",
+                ai_score=0.9, status="approved", contract_address="", chain="rococo", budget=1000.0,
+            )
+            for i in range(count)
+        ]
+        session.add_all(projects)
+        session.add_all(
+            Milestone(project_id=project.project_id, name=f"Milestone {index + 1}", amount=250.0)
+            for project in projects
+            for index in range(milestones)
+        )
+        await session.commit()
+        return [project.id for project in projects]
+
+
+async def _wait_jobs(env: EscrowBenchEnv, job_ids: List[int], timeout: float, interval: float = 0.05) -> List[str]:
+    deadline = time.perf_counter() + timeout
+    while True:
+        async with env.session_factory() as session:
+            stmt = select(EscrowDeploymentJob.status).where(EscrowDeploymentJob.id.in_(job_ids))
+            statuses = (await session.execute(stmt)).scalars().all()
+        if all(status in ESCROW_JOB_TERMINAL for status in statuses) or time.perf_counter() > deadline:
+            return statuses
+        await asyncio.sleep(interval)
+
+
+async def bench_deploys(env: EscrowBenchEnv, project_ids: List[int], timeout: float) -> dict:
+    """Queue one deployment job per project at once and run them all to a terminal state."""
+    start = time.perf_counter()
+    job_ids = []
+    async with env.session_factory() as session:
+        for project_id in project_ids:
+            job = await EscrowJobService.create(project_id, session)
+            job_ids.append(job.id)
+    for job_id in job_ids:
+        env.runner.enqueue(job_id)
+    statuses = await _wait_jobs(env, job_ids, timeout)
+    elapsed = time.perf_counter() - start
+    async with env.session_factory() as session:
+        stmt = select(func.sum(EscrowDeploymentJob.attempts)).where(EscrowDeploymentJob.id.in_(job_ids))
+        attempts = await session.scalar(stmt)
+    succeeded = statuses.count(ESCROW_JOB_SUCCEEDED)
+    return {
+        "jobs": len(job_ids),
+        "succeeded": succeeded,
+        "attempts": attempts,
+        "seconds": round(elapsed, 3),
+        "deploys_per_s": round(succeeded / elapsed, 2),
+    }
+
+
+async def bench_releases(env: EscrowBenchEnv, project_ids: List[int], milestones: int, timeout: float) -> dict:
+    """Release every milestone of the given escrows in one batch and track it until finalized."""
+    items = [
+        MilestoneReleaseItem(project_id=project_id, milestone_index=index)
+        for project_id in project_ids
+        for index in range(milestones)
+    ]
+    start = time.perf_counter()
+    async with env.session_factory() as session:
+        batch_id, _ = await env.releases.submit(items, session)
+    submitted = time.perf_counter() - start
+    deadline = start + timeout
+    while time.perf_counter() < deadline:
+        async with env.session_factory() as session:
+            await env.releases.track_once(session)
+            stmt = select(func.count(MilestoneRelease.id)).where(
+                MilestoneRelease.batch_id == batch_id, MilestoneRelease.status.in_(RELEASE_PENDING)
+            )
+            if not await session.scalar(stmt):
+                break
+    elapsed = time.perf_counter() - start
+    async with env.session_factory() as session:
+        releases = await MilestoneReleaseService.list_batch(batch_id, session)
+    finalized = sum(release.status == RELEASE_FINALIZED for release in releases)
+    return {
+        "releases": len(items),
+        "finalized": finalized,
+        "submit_seconds": round(submitted, 3),
+        "seconds": round(elapsed, 3),
+        "releases_per_s": round(finalized / elapsed, 2),
+    }
+
+
+async def bench_e2e(env: EscrowBenchEnv, project_ids: List[int], timeout: float, poll_interval: float = 0.01) -> dict:
+    """POST deploy-escrow and poll the job until it is terminal, one project at a time."""
+    from src.core.depends.db import get_async_session
+    from src.core.depends.escrow_jobs import get_escrow_job_runner
+    from src.core.depends.rate_limit import get_rate_limiter
+    from src.core.rate_limit import RateLimiter
+    from src.main import app
+
+    async def session_override():
+        async with env.session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = session_override
+    app.dependency_overrides[get_escrow_job_runner] = lambda: env.runner
+    # One client deploying every project back to back; the per-client deploy limit is not under test
+    app.dependency_overrides[get_rate_limiter] = lambda: RateLimiter(enabled=False)
+    latencies = []
+    failed = 0
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for project_id in project_ids:
+                start = time.perf_counter()
+                response = await client.post("/api/v1/arkiv/escrow/deploy-escrow", params={"project_id": project_id})
+                response.raise_for_status()
+                status_url = response.json()["status_url"]
+                while time.perf_counter() - start < timeout:
+                    job = (await client.get(status_url)).json()
+                    if job["status"] in ESCROW_JOB_TERMINAL:
+                        break
+                    await asyncio.sleep(poll_interval)
+                if job["status"] == ESCROW_JOB_SUCCEEDED:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    failed += 1
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        app.dependency_overrides.pop(get_escrow_job_runner, None)
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(project_ids),
+        "failed": failed,
+        "p50_ms": round(statistics.median(ordered), 2) if ordered else None,
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2) if ordered else None,
+        "max_ms": round(ordered[-1], 2) if ordered else None,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_async(
+    workdir: Path,
+    projects: int,
+    e2e: int,
+    workers: int,
+    pool_size: int,
+    latency: float = 0.0,
+    rpc_url: Optional[str] = None,
+    artifacts_dir: Optional[Path] = None,
+    timeout: float = 300.0,
+) -> dict:
+    async with escrow_env(workdir, rpc_url, artifacts_dir, pool_size, workers, latency) as env:
+        project_ids = await create_projects(env, projects)
+        deploys = await bench_deploys(env, project_ids, timeout)
+        releases = await bench_releases(env, project_ids, DEFAULT_MILESTONE_COUNT, timeout)
+        e2e_latency = await bench_e2e(env, await create_projects(env, e2e), timeout)
+        blocks = env.chain.head().number if env.chain else None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "chain": rpc_url or FAKE_RPC_URL,
+        "params": {"projects": projects, "e2e": e2e, "workers": workers, "pool_size": pool_size, "latency_s": latency},
+        "deploy": deploys,
+        "release": releases,
+        "e2e": e2e_latency,
+        "blocks": blocks,
+    }
+
+
+def run(projects: int, e2e: int, workers: int, pool_size: int, latency: float = 0.0,
+        rpc_url: Optional[str] = None, artifacts_dir: Optional[Path] = None, timeout: float = 300.0) -> dict:
+    with tempfile.TemporaryDirectory(prefix="escrow-bench-") as workdir:
+        return asyncio.run(
+            run_async(Path(workdir), projects, e2e, workers, pool_size, latency, rpc_url, artifacts_dir, timeout)
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=50, help="Escrows deployed concurrently, then released")
+    parser.add_argument("--e2e", type=int, default=20, help="Sequential deploy-escrow requests for latency")
+    parser.add_argument("--workers", type=int, default=SubstrateSettings.JOB_WORKERS)
+    parser.add_argument("--pool-size", type=int, default=SubstrateSettings.POOL_SIZE)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every fake-chain RPC")
+    parser.add_argument("--rpc-url", help="Use this node instead of the fake chain (e.g. ws://127.0.0.1:9944)")
+    parser.add_argument("--artifacts-dir", type=Path, help="Directory with a funding_escrow.wasm/.json build")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", type=Path, help="Append the result to this JSON lines file")
+    args = parser.parse_args()
+
+    # Job and pool logging would dominate the output
+    logger.remove()
+    logger.add(lambda message: print(message, end=""), level="ERROR")
+    result = run(args.projects, args.e2e, args.workers, args.pool_size, args.latency, args.rpc_url,
+                 args.artifacts_dir, args.timeout)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "a") as f:
+            f.write(json.dumps(result) + "\n")
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""In-process stand-in for the Arkiv client, for benchmarks.
+
+Implements the part of `client.arkiv` that `ArkivService` uses (entity
+create/get/update, batches and paged queries) over a dict. Every RPC-backed
+call blocks for `latency` seconds, like the synchronous web3 client does, so
+benchmarks see the same event-loop blocking as with a real node.
+"""
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class FakeEntity:
+    entity_key: str
+    payload: bytes
+    content_type: str
+    attributes: Dict[str, Any]
+
+
+@dataclass
+class FakeReceipt:
+    tx_hash: str = field(default_factory=lambda: "0x" + uuid.uuid4().hex * 2)
+
+
+@dataclass
+class FakeQueryResult:
+    entities: List[FakeEntity]
+
+
+class FakeBatch:
+    def __init__(self, module: "FakeArkivModule"):
+        self._module = module
+        self._updates: List[Dict[str, Any]] = []
+
+    def update_entity(self, **kwargs: Any) -> None:
+        self._updates.append(kwargs)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._updates
+
+    @property
+    def operation_count(self) -> int:
+        return len(self._updates)
+
+    def execute(self) -> FakeReceipt:
+        self._module._rpc()
+        with self._module._lock:
+            for update in self._updates:
+                self._module._put(**update)
+        return FakeReceipt()
+
+
+class FakeArkivModule:
+    """`client.arkiv` of the fake client."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._entities: Dict[str, FakeEntity] = {}
+        self._lock = threading.Lock()
+
+    def _rpc(self) -> None:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _put(self, entity_key: str, payload: bytes, content_type: str, attributes: Any) -> None:
+        self._entities[entity_key] = FakeEntity(entity_key, payload, content_type, dict(attributes or {}))
+
+    def create_entity(self, payload: bytes, content_type: str, attributes: Any) -> Tuple[str, FakeReceipt]:
+        self._rpc()
+        entity_key = "0x" + uuid.uuid4().hex * 2
+        with self._lock:
+            self._put(entity_key, payload, content_type, attributes)
+        return entity_key, FakeReceipt()
+
+    def get_entity(self, entity_key: str) -> Optional[FakeEntity]:
+        self._rpc()
+        with self._lock:
+            return self._entities.get(entity_key)
+
+    def update_entity(self, entity_key: str, payload: bytes, content_type: str, attributes: Any) -> FakeReceipt:
+        self._rpc()
+        with self._lock:
+            if entity_key not in self._entities:
+                raise KeyError(f"Entity {entity_key} not found")
+            self._put(entity_key, payload, content_type, attributes)
+        return FakeReceipt()
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+    def query_entities_page(self, query: str, options: Any = None) -> FakeQueryResult:
+        # Only the queries ArkivService issues: type = '...' [AND status = '...']
+        self._rpc()
+        with self._lock:
+            entities = list(self._entities.values())
+        wanted_status = query.split("status = '")[1].rstrip("'") if "status = '" in query else None
+        if wanted_status is not None:
+            entities = [e for e in entities if json.loads(e.payload).get("status") == wanted_status]
+        return FakeQueryResult(entities)
+
+
+class _FakeEth:
+    default_account = "0x" + "00" * 20
+
+
+class FakeArkiv:
+    """Drop-in for `arkiv.Arkiv` as used by the services (`client.arkiv`, `client.eth`)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.arkiv = FakeArkivModule(latency)
+        self.eth = _FakeEth()
+
+    def is_connected(self) -> bool:
+        return True
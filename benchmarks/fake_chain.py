@@ -0,0 +1,451 @@
+"""Deterministic in-process stand-in for a substrate-contracts-node running the funding-escrow contract.
+
+`FakeChain` holds the chain state and `FakeSubstrate` exposes the subset of
+`SubstrateInterface` the escrow services call, so the deployment and release
+pipelines run unchanged against it (pass `FakeSubstrate` as the pool factory).
+It behaves like `substrate-contracts-node --dev` (instant seal):
+
+- every submitted extrinsic is sealed in its own block, which is final at once
+- nonces are checked per signer: stale ones are rejected as by the node, and
+  future ones wait until the gap is filled
+- `Utility.batch_all` is atomic and a contract message returning `Err`
+  reverts, failing the extrinsic with `ExtrinsicFailed`
+- the escrow messages follow `smart-contract/funding-escrow/lib.rs`; events are
+  SCALE-encoded with the contract codec, so they decode like real ones
+- block and extrinsic hashes are blake2b digests of their inputs, and contract
+  addresses are derived like pallet-contracts does, so a run is reproducible
+
+Dry-runs (`ContractsApi_call`, `ContractsApi_instantiate`) and storage
+queries use the latest state whatever block is asked for. `latency` adds a
+sleep to every RPC, to model a remote node.
+"""
+import copy
+import threading
+import time
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
+
+from scalecodec.base import ScaleBytes
+from substrateinterface import Keypair
+from substrateinterface.base import ExtrinsicReceipt
+from substrateinterface.exceptions import StorageFunctionNotFound, SubstrateRequestException
+
+from src.services.contract_codec import ContractCodec
+
+GAS_REQUIRED = {"ref_time": 1_500_000_000, "proof_size": 65_536}
+DISPATCH_INFO = {"weight": {"ref_time": 2_000_000_000, "proof_size": 70_000}, "class": "Normal", "pays_fee": "Yes"}
+
+
+def _digest(*parts: Any) -> bytes:
+    return blake2b(repr(parts).encode(), digest_size=32).digest()
+
+
+class _Value:
+    """Minimal scale-object look-alike: `.value`, `.value_object`, indexing and `in` like scalecodec types."""
+
+    def __init__(self, value: Any, value_object: Any = None):
+        self.value = value
+        self.value_object = value if value_object is None else value_object
+
+    def __getitem__(self, key):
+        return self.value_object[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.value
+
+
+class _ExecResult(_Value):
+    """Result of the `ContractsApi_call` and `ContractsApi_instantiate` runtime APIs."""
+
+    def __init__(self, result: _Value):
+        super().__init__(
+            {"gas_required": GAS_REQUIRED, "result": result.value},
+            {"gas_required": _Value(GAS_REQUIRED), "result": result},
+        )
+
+
+def _failed(error: str) -> _ExecResult:
+    """A dry-run that could not execute (`Err(DispatchError)`)."""
+    value = {"Err": {"Module": {"index": 8, "error": error}}}
+    return _ExecResult(_Value(value, ("Err", _Value(value["Err"]))))
+
+
+class _EventRecord(_Value):
+    def __init__(self, extrinsic_idx: int, module_id: str, event_id: str, attributes: Dict[str, Any],
+                 data: Optional[bytes] = None):
+        fields = dict(attributes)
+        if data is not None:
+            fields["data"] = _Value("0x" + data.hex(), data)
+        event = {"module_id": module_id, "event_id": event_id, "attributes": attributes}
+        super().__init__(
+            {"phase": "ApplyExtrinsic", "extrinsic_idx": extrinsic_idx, "event": event, "topics": [], **event},
+            {"event": _Value(event, (module_id, _Value(event, (event_id, _Value(attributes, fields)))))},
+        )
+        self.extrinsic_idx = extrinsic_idx
+
+
+class _Extrinsic:
+    def __init__(self, signer: str, nonce: int, call: Dict[str, Any]):
+        self.signer = signer
+        self.nonce = nonce
+        self.call = call
+        self.extrinsic_hash = _digest("extrinsic", signer, nonce, call)
+
+
+class _DispatchError(Exception):
+    pass
+
+
+def _reverted(result: Any) -> bool:
+    """True for `Err(LangError)` and `Ok(Err(EscrowError))` message results."""
+    if not isinstance(result, dict):
+        return False
+    return "Err" in result or (isinstance(result.get("Ok"), dict) and "Err" in result["Ok"])
+
+
+class _Block:
+    def __init__(self, number: int, parent_hash: str, extrinsics: List[_Extrinsic]):
+        self.number = number
+        self.hash = "0x" + _digest("block", number, parent_hash, [e.extrinsic_hash for e in extrinsics]).hex()
+        self.extrinsics = extrinsics
+        self.events: List[_EventRecord] = []
+
+
+class FakeChain:
+    """Shared, thread-safe state of a fake instant-seal contracts chain."""
+
+    def __init__(self, codec: ContractCodec, latency: float = 0.0):
+        self.codec = codec
+        self.latency = latency
+        # RPC round trips served (a JSON-RPC batch counts once)
+        self.requests = 0
+        self.blocks: List[_Block] = [_Block(0, "0x" + bytes(32).hex(), [])]
+        self._by_hash: Dict[str, _Block] = {self.blocks[0].hash: self.blocks[0]}
+        self.nonces: Dict[str, int] = {}
+        self.codes: Dict[str, bytes] = {}
+        self.contracts: Dict[str, Dict[str, Any]] = {}
+        self._future: Dict[Tuple[str, int], _Extrinsic] = {}
+        self._messages = {message.selector: message for message in codec.messages.values()}
+        self._lock = threading.Condition()
+
+    # ------------------------------------------------------------------ reads
+
+    def block(self, number: Optional[int] = None, block_hash: Optional[str] = None) -> _Block:
+        with self._lock:
+            if block_hash is not None:
+                return self._by_hash[block_hash]
+            return self.blocks[-1 if number is None else number]
+
+    def head(self) -> _Block:
+        return self.block()
+
+    # ----------------------------------------------------------------- submit
+
+    def submit(self, extrinsic: _Extrinsic, wait_for_inclusion: bool, timeout: float = 30.0) -> Optional[_Block]:
+        """Seal `extrinsic` in a new block, or park it until the nonces before it arrive."""
+        with self._lock:
+            expected = self.nonces.get(extrinsic.signer, 0)
+            if extrinsic.nonce < expected:
+                raise SubstrateRequestException(
+                    {"code": 1010, "message": "Invalid Transaction", "data": "Transaction is outdated"}
+                )
+            self._future[(extrinsic.signer, extrinsic.nonce)] = extrinsic
+            # Seal every ready extrinsic of this signer, in nonce order
+            while (extrinsic.signer, self.nonces.get(extrinsic.signer, 0)) in self._future:
+                ready = self._future.pop((extrinsic.signer, self.nonces.get(extrinsic.signer, 0)))
+                self.nonces[ready.signer] = ready.nonce + 1
+                self._seal(ready)
+            self._lock.notify_all()
+            if not wait_for_inclusion:
+                return None
+            deadline = time.monotonic() + timeout
+            while (extrinsic.signer, extrinsic.nonce) in self._future:
+                if not self._lock.wait(deadline - time.monotonic()):
+                    raise TimeoutError(f"Extrinsic with nonce {extrinsic.nonce} was never included")
+            return self.find(extrinsic.extrinsic_hash)
+
+    def find(self, extrinsic_hash: bytes) -> Optional[_Block]:
+        for block in reversed(self.blocks):
+            if any(e.extrinsic_hash == extrinsic_hash for e in block.extrinsics):
+                return block
+        return None
+
+    def _seal(self, extrinsic: _Extrinsic) -> None:
+        block = _Block(len(self.blocks), self.blocks[-1].hash, [extrinsic])
+        events: List[Tuple[str, str, Dict[str, Any], Optional[bytes]]] = []
+        overlay: Dict[str, Any] = {}
+        try:
+            self._dispatch(extrinsic.call, extrinsic.signer, overlay, events)
+        except _DispatchError as e:
+            events = [("System", "ExtrinsicFailed", {"dispatch_error": {"Other": str(e)}, "dispatch_info": DISPATCH_INFO}, None)]
+        else:
+            for key, value in overlay.items():
+                kind, name = key
+                (self.codes if kind == "code" else self.contracts)[name] = value
+            events.append(("System", "ExtrinsicSuccess", {"dispatch_info": DISPATCH_INFO}, None))
+        block.events = [_EventRecord(0, module, event, attributes, data) for module, event, attributes, data in events]
+        self.blocks.append(block)
+        self._by_hash[block.hash] = block
+
+    # --------------------------------------------------------------- dispatch
+
+    def _contract(self, address: str, overlay: Dict[str, Any]) -> Dict[str, Any]:
+        key = ("contract", address)
+        if key not in overlay:
+            if address not in self.contracts:
+                raise _DispatchError("ContractNotFound")
+            overlay[key] = copy.deepcopy(self.contracts[address])
+        return overlay[key]
+
+    def _dispatch(self, call: Dict[str, Any], signer: str, overlay: Dict[str, Any], events: list) -> None:
+        module, function, params = call["call_module"], call["call_function"], call["call_args"]
+        if (module, function) == ("Utility", "batch_all"):
+            for inner in params["calls"]:
+                self._dispatch(inner, signer, overlay, events)
+        elif (module, function) == ("Contracts", "upload_code"):
+            code = bytes.fromhex(params["code"][2:])
+            overlay[("code", "0x" + blake2b(code, digest_size=32).hexdigest())] = code
+        elif (module, function) == ("Contracts", "instantiate"):
+            if params["code_hash"] not in self.codes and ("code", params["code_hash"]) not in overlay:
+                raise _DispatchError("CodeNotFound")
+            data = bytes.fromhex(params["data"][2:])
+            if data[:4] != self.codec.constructors["new"].selector:
+                raise _DispatchError("ContractTrapped")
+            address = self.codec.contract_address(signer, params["code_hash"], data, params["salt"])
+            if address in self.contracts or ("contract", address) in overlay:
+                raise _DispatchError("DuplicateContract")
+            overlay[("contract", address)] = {"admin": signer, "balance": params["value"], "escrows": {}, "project_count": 0}
+            events.append(("Contracts", "Instantiated", {"deployer": signer, "contract": address}, None))
+        elif (module, function) == ("Contracts", "call"):
+            state = self._contract(params["dest"], overlay)
+            result, emitted = self._execute(state, signer, params["value"], bytes.fromhex(params["data"][2:]))
+            if _reverted(result):
+                raise _DispatchError(f"ContractReverted: {result}")
+            for data in emitted:
+                events.append(("Contracts", "ContractEmitted", {"contract": params["dest"]}, data))
+        else:
+            raise _DispatchError(f"{module}.{function} is not supported by the fake chain")
+
+    def _event(self, label: str, values: Tuple[Any, ...]) -> bytes:
+        event = next(e for e in self.codec.events.values() if e.label == label)
+        data = bytearray([event.event_id])
+        for (_, decoder), value in zip(event.args, values):
+            data += decoder(data=None, runtime_config=self.codec.runtime_config).encode(value).data
+        return bytes(data)
+
+    def _execute(self, state: Dict[str, Any], caller: str, value: int, data: bytes) -> Tuple[Any, List[bytes]]:
+        """Run one escrow message on `state` (mutated in place); returns the message result and emitted events."""
+        message = self._messages.get(data[:4])
+        if message is None:
+            return {"Err": "CouldNotReadInput"}, []
+        payload = ScaleBytes(data[4:])
+        args = [decoder(data=payload, runtime_config=self.codec.runtime_config).decode(check_remaining=False)
+                for _, decoder in message.args]
+        state["balance"] += value
+        escrows = state["escrows"]
+        emitted: List[bytes] = []
+
+        def fail(error: str):
+            return {"Ok": {"Err": error}}, []
+
+        if message.label == "create_escrow":
+            owner, count = args
+            if value == 0:
+                return fail("InsufficientFunds")
+            if owner in escrows:
+                return fail("EscrowAlreadyExists")
+            if count == 0:
+                return fail("InvalidMilestoneCount")
+            escrows[owner] = {"admin": caller, "total": value, "released": 0, "remaining": value, "count": count,
+                              "cancelled": False, "completed": False, "milestones": {}}
+            state["project_count"] += 1
+            emitted.append(self._event("EscrowCreated", (owner, value, count)))
+        elif message.label == "add_milestone":
+            owner, index, percentage = args
+            escrow = escrows.get(owner)
+            if escrow is None:
+                return fail("EscrowNotFound")
+            if index >= escrow["count"]:
+                return fail("InvalidMilestoneIndex")
+            if index in escrow["milestones"]:
+                return fail("MilestoneAlreadyExists")
+            escrow["milestones"][index] = [escrow["total"] // 100 * percentage, False]
+        elif message.label == "release_milestone":
+            owner, index = args
+            escrow = escrows.get(owner)
+            if escrow and escrow["cancelled"]:
+                return fail("EscrowCancelled")
+            if escrow and escrow["completed"]:
+                return fail("EscrowCompleted")
+            if escrow and index >= escrow["count"]:
+                return fail("InvalidMilestoneIndex")
+            milestone = escrow["milestones"].get(index) if escrow else None
+            if milestone is None:
+                return fail("MilestoneNotFound")
+            if milestone[1]:
+                return fail("MilestoneAlreadyReleased")
+            if state["balance"] < milestone[0]:
+                return fail("TransferFailed")
+            state["balance"] -= milestone[0]
+            milestone[1] = True
+            escrow["released"] += milestone[0]
+            escrow["remaining"] = max(0, escrow["remaining"] - milestone[0])
+            emitted.append(self._event("FundsReleased", (owner, index, milestone[0])))
+        elif message.label == "cancel_escrow":
+            (owner,) = args
+            escrow = escrows.get(owner)
+            if escrow is None:
+                return fail("EscrowNotFound")
+            if caller != escrow["admin"]:
+                return fail("Unauthorized")
+            if escrow["cancelled"] or escrow["completed"]:
+                return fail("CannotCancelEscrow")
+            if escrow["remaining"] > state["balance"]:
+                return fail("TransferFailed")
+            state["balance"] -= escrow["remaining"]
+            escrow["cancelled"] = True
+            emitted.append(self._event("EscrowCancelled", (owner, escrow["remaining"])))
+        elif message.label == "get_escrow_status":
+            escrow = escrows.get(args[0])
+            return {"Ok": escrow and (escrow["total"], escrow["released"], escrow["cancelled"], escrow["completed"])}, []
+        elif message.label == "get_milestone_status":
+            milestone = escrows.get(args[0], {}).get("milestones", {}).get(args[1])
+            return {"Ok": tuple(milestone) if milestone else None}, []
+        elif message.label == "get_project_count":
+            return state["project_count"], []
+        return {"Ok": {"Ok": ()}}, emitted
+
+    def dry_run(self, params: Dict[str, Any]) -> _ExecResult:
+        """`ContractsApi_call`: execute on a copy of the latest state and return the encoded result."""
+        with self._lock:
+            if params["dest"] not in self.contracts:
+                return _failed("ContractNotFound")
+            state = copy.deepcopy(self.contracts[params["dest"]])
+        data = bytes.fromhex(params["input_data"][2:])
+        result, _ = self._execute(state, params["origin"], params["value"], data)
+        message = self._messages[data[:4]]
+        encoded = bytes(message.returns(data=None, runtime_config=self.codec.runtime_config).encode(result).data)
+        # A message returning Err reverts; the dry-run still succeeds, flagged REVERT
+        flags = 1 if _reverted(result) else 0
+        ok = {"flags": flags, "data": "0x" + encoded.hex()}
+        return _ExecResult(_Value({"Ok": ok}, ("Ok", _Value(ok, {"flags": flags, "data": _Value(ok["data"], encoded)}))))
+
+
+    def dry_run_instantiate(self, params: Dict[str, Any]) -> _ExecResult:
+        """`ContractsApi_instantiate` of uploaded code: the address the contract would get."""
+        code_hash = params["code"]["Existing"]
+        data = bytes.fromhex(params["data"][2:])
+        with self._lock:
+            if code_hash not in self.codes:
+                return _failed("CodeNotFound")
+            if data[:4] != self.codec.constructors["new"].selector:
+                return _failed("ContractTrapped")
+            address = self.codec.contract_address(params["origin"], code_hash, data, params["salt"])
+            if address in self.contracts:
+                return _failed("DuplicateContract")
+        ok = {"result": {"flags": 0, "data": "0x"}, "account_id": address}
+        return _ExecResult(_Value({"Ok": ok}, ("Ok", _Value(ok))))
+
+
+class FakeSubstrate:
+    """The `SubstrateInterface` methods used by the escrow services, served by a `FakeChain`.
+
+    Use `functools.partial(FakeSubstrate, chain)` as the `SubstratePool` factory.
+    """
+
+    def __init__(self, chain: FakeChain, url: str = "fake://", cache_region: Any = None, **kwargs):
+        self.chain = chain
+        self.url = url
+
+    def _rpc(self) -> None:
+        self.chain.requests += 1
+        if self.chain.latency:
+            time.sleep(self.chain.latency)
+
+    def init_runtime(self, *args, **kwargs) -> None:
+        self._rpc()
+
+    def close(self) -> None:
+        pass
+
+    def implements_scaleinfo(self) -> bool:
+        return True
+
+    def rpc_request(self, method: str, params: list, *args, **kwargs) -> Dict[str, Any]:
+        self._rpc()
+        if method == "system_health":
+            return {"result": {"peers": 0, "isSyncing": False, "shouldHavePeers": False}}
+        raise NotImplementedError(f"{method} is not supported by the fake chain")
+
+    def get_block_hash(self, block_id: Optional[int] = None) -> str:
+        self._rpc()
+        return self.chain.block(number=block_id).hash
+
+    def get_chain_head(self) -> str:
+        self._rpc()
+        return self.chain.head().hash
+
+    def get_chain_finalised_head(self) -> str:
+        # Instant seal: every block is final
+        return self.get_chain_head()
+
+    def get_block_number(self, block_hash: Optional[str]) -> int:
+        self._rpc()
+        return self.chain.block(block_hash=block_hash).number if block_hash else self.chain.head().number
+
+    def get_block(self, block_hash: Optional[str] = None, block_number: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        self._rpc()
+        block = self.chain.block(number=block_number, block_hash=block_hash)
+        return {"header": {"hash": block.hash, "number": block.number}, "extrinsics": list(block.extrinsics)}
+
+    def get_events(self, block_hash: Optional[str] = None) -> List[_EventRecord]:
+        self._rpc()
+        return list(self.chain.block(block_hash=block_hash).events)
+
+    def query(self, module: str, storage_function: str, params: Optional[list] = None, block_hash: Optional[str] = None):
+        self._rpc()
+        if (module, storage_function) == ("Contracts", "PristineCode"):
+            code = self.chain.codes.get(params[0])
+            return _Value(None if code is None else "0x" + code.hex())
+        if (module, storage_function) == ("Contracts", "ContractInfoOf"):
+            contract = self.chain.contracts.get(params[0])
+            return _Value(None if contract is None else {"code_hash": None, "deposit_account": params[0]})
+        raise StorageFunctionNotFound(f'Storage function "{module}.{storage_function}" not found')
+
+    def get_account_nonce(self, account_address: str) -> int:
+        self._rpc()
+        return self.chain.nonces.get(account_address, 0)
+
+    def compose_call(self, call_module: str, call_function: str, call_params: Optional[dict] = None, **kwargs) -> dict:
+        return {"call_module": call_module, "call_function": call_function, "call_args": call_params or {}}
+
+    def create_signed_extrinsic(self, call: dict, keypair: Keypair, nonce: Optional[int] = None, **kwargs) -> _Extrinsic:
+        if nonce is None:
+            nonce = self.get_account_nonce(keypair.ss58_address)
+        return _Extrinsic(keypair.ss58_address, nonce, call)
+
+    def submit_extrinsic(self, extrinsic: _Extrinsic, wait_for_inclusion: bool = False,
+                         wait_for_finalization: bool = False) -> ExtrinsicReceipt:
+        self._rpc()
+        block = self.chain.submit(extrinsic, wait_for_inclusion or wait_for_finalization)
+        return ExtrinsicReceipt(
+            substrate=self,
+            extrinsic_hash="0x" + extrinsic.extrinsic_hash.hex(),
+            block_hash=block.hash if block else None,
+            finalized=bool(block) and wait_for_finalization,
+        )
+
+    def runtime_call(self, api: str, method: str, params: Optional[dict] = None, block_hash: Optional[str] = None):
+        self._rpc()
+        if (api, method) == ("ContractsApi", "call"):
+            return self.chain.dry_run(params)
+        if (api, method) == ("ContractsApi", "instantiate"):
+            return self.chain.dry_run_instantiate(params)
+        raise NotImplementedError(f"{api}_{method} is not supported by the fake chain")
+
+    def runtime_call_batch(self, api: str, method: str, params: List[dict], block_hash: Optional[str] = None) -> list:
+        """`SubstrateConnection.runtime_call_batch`: every call in one round trip."""
+        self._rpc()
+        if (api, method) != ("ContractsApi", "call"):
+            raise NotImplementedError(f"{api}_{method} batches are not supported by the fake chain")
+        return [self.chain.dry_run(call_params) for call_params in params]
@@ -0,0 +1,85 @@
+"""A local HTTP server speaking the Gemini `generateContent` API, for benchmarks.
+
+Both `google-genai` (`AIService`) and `ChatGoogleGenerativeAI`
+(`LangChainService`) are pointed at it through `GEMINI_BASE_URL`. Requests
+go over real HTTP, with `latency` seconds of simulated generation time.
+Evaluation prompts get a valid evaluation JSON back; any other prompt gets a
+short canned answer. Usage metadata is filled in so token accounting is
+exercised too.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+EVALUATION = {"ai_score": 82, "decision": "approve", "rationale": "Clear scope, realistic budget and milestones."}
+ANSWER = "The project is on track: the escrow is funded and the next milestone is in review."
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def create_app(latency: float = 0.0) -> Starlette:
+    stats = {"requests": 0}
+
+    async def generate(request: Request) -> JSONResponse:
+        # Path is /{version}/models/{model}:{method}
+        model, _, method = request.path_params["target"].partition(":")
+        if method != "generateContent":
+            return JSONResponse({"error": {"code": 404, "message": f"Unsupported method {method}"}}, status_code=404)
+        body = await request.json()
+        prompt = " ".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        stats["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        text = json.dumps(EVALUATION) if "ai_score" in prompt else ANSWER
+        prompt_tokens = max(1, len(prompt) // 4)
+        output_tokens = max(1, len(text) // 4)
+        return JSONResponse({
+            "candidates": [
+                {"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}
+            ],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": prompt_tokens + output_tokens,
+            },
+            "modelVersion": model,
+        })
+
+    app = Starlette(routes=[Route("/{version}/models/{target}", generate, methods=["POST"])])
+    app.state.stats = stats
+    return app
+
+
+@contextmanager
+def fake_gemini(latency: float = 0.0) -> Iterator[str]:
+    """Serve the fake Gemini API on a local port in a background thread; yields its base URL."""
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(latency), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-gemini", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Fake Gemini server did not start")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
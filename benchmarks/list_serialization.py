@@ -0,0 +1,93 @@
+"""Benchmark: list endpoint throughput with and without the fast JSON path.
+
+Seeds an in-memory SQLite database with N projects and sponsored projects,
+then drives the list endpoints in-process (httpx ASGI transport) with the
+default response_model path and with `HTTP_FAST_LIST_SERIALIZATION` enabled.
+The response cache is disabled so every request serializes.
+
+Usage:
+    python -m benchmarks.list_serialization --rows 1000 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from src.core.depends.db import get_async_session, get_read_session
+from src.core.http_cache import response_cache
+from src.main import app
+from src.models import Project, SponsoredProject
+from src.settings.http import HTTPSettings
+
+ENDPOINTS = ["/api/v1/arkiv/projects", "/api/v1/arkiv/sponsored"]
+
+
+async def _seed(session_factory, rows: int) -> None:
+    async with session_factory() as session:
+        for i in range(rows):
+            session.add(Project(project_id=f"proj_{i}", name=f"Project {i}", repo=f"https://git.example/{i}",
+                                description="x" * 200, budget=1000.0 + i))
+            session.add(SponsoredProject(project_id=f"proj_{i}", name=f"Project {i}", repo=f"https://git.example/{i}",
+                                         ai_score=50 + i % 50, status="approved", contract_address="0x" + "ab" * 20,
+                                         chain="asset_hub", budget=1000.0 + i, description="x" * 200))
+        await session.commit()
+
+
+async def _measure(client: httpx.AsyncClient, path: str, rows: int, requests: int) -> float:
+    # Warm up once and sanity check the page size
+    response = await client.get(path, params={"limit": rows})
+    assert response.status_code == 200 and len(response.json()) == rows, response.text[:200]
+    start = time.perf_counter()
+    for _ in range(requests):
+        await client.get(path, params={"limit": rows})
+    return requests / (time.perf_counter() - start)
+
+
+async def run(rows: int, requests: int) -> dict:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    await _seed(session_factory, rows)
+
+    async def _session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = _session
+    app.dependency_overrides[get_read_session] = _session
+    response_cache.enabled = False
+
+    results = {"rows": rows, "requests": requests, "endpoints": {}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ENDPOINTS:
+            HTTPSettings.FAST_LIST_SERIALIZATION = False
+            baseline = await _measure(client, path, rows, requests)
+            HTTPSettings.FAST_LIST_SERIALIZATION = True
+            fast = await _measure(client, path, rows, requests)
+            results["endpoints"][path] = {
+                "baseline_rps": round(baseline, 1),
+                "fast_rps": round(fast, 1),
+                "speedup": round(fast / baseline, 2),
+            }
+    app.dependency_overrides.clear()
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="rows per page")
+    parser.add_argument("--requests", type=int, default=100, help="requests per measurement")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
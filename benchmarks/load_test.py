@@ -0,0 +1,385 @@
+"""Load test: drive the FastAPI app through realistic project journeys against local stand-ins.
+
+The app runs in-process (httpx ASGI transport) with every external
+dependency replaced:
+
+- database: a SQLite file, or `--database-url` (e.g. a local Postgres,
+  `postgresql+asyncpg://...`)
+- Arkiv: the in-process `FakeArkiv` client (`--arkiv-latency` per RPC)
+- Gemini: the `fake_gemini` HTTP server, reached over real HTTP by both
+  the google-genai and LangChain clients (`--gemini-latency` per call)
+- Substrate: the `FakeChain` behind the real pool, job runner and codecs
+  (`--chain-latency` per RPC)
+- the evaluation system prompt, which is not checked in
+  (`AIService.PROMPT_PATH`), with a short stand-in
+
+Every virtual user comes from the same address, so the per-client rate
+limits are off unless `--rate-limits` is given.
+
+`--users` virtual users run `--journeys` journeys in total. Each journey runs
+these steps in order; `--scenarios` selects a subset:
+
+    create (POST /projects), evaluate (POST /evaluate), sponsor (POST /sponsor),
+    approve (PUT /sponsored/{id}), deploy (POST /escrow/deploy-escrow),
+    list (GET /projects, GET /sponsored), ai_query (POST /ai/query-project)
+
+Steps that need an earlier one (e.g. deploy needs sponsor) are skipped when it
+is not selected or failed. Queued deployment jobs are then run to completion.
+
+Reports, per endpoint: requests, errors, throughput, p50/p95/p99/mean/max
+latency and the mean Server-Timing breakdown (db/arkiv/llm/substrate), as
+JSON. With `--output`, the result plus git revision and timestamp is appended
+to a JSON lines file.
+
+With `--loop-budget-ms`, the loop watchdog (`src.core.loop_watchdog`) runs
+during the journeys and every callback that blocked the event loop longer
+than the budget is reported under `loop_blocks` by route, with the stack of
+the worst one; the command then exits non-zero.
+
+Usage:
+    python -m benchmarks.load_test --users 20 --journeys 200
+    python -m benchmarks.load_test --users 50 --duration 60 --gemini-latency 0.8 --arkiv-latency 0.2 \\
+        --output benchmarks/results/load_test.jsonl
+"""
+import argparse
+import asyncio
+import json
+import math
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+import httpx
+from loguru import logger
+from pydantic import SecretStr
+
+from benchmarks.escrow_throughput import _git_revision, _wait_jobs, escrow_env
+from benchmarks.fake_arkiv import FakeArkiv
+from benchmarks.fake_gemini import fake_gemini
+from src.core.depends.arkiv import get_arkiv_client
+from src.core.depends.db import get_async_session, get_read_session
+from src.core.depends.escrow_jobs import get_escrow_job_runner
+from src.core.depends.rate_limit import get_rate_limiter
+from src.core.loop_watchdog import LoopBlock, LoopWatchdog
+from src.core.rate_limit import RateLimiter
+from src.main import app
+from src.models.escrow_job import ESCROW_JOB_SUCCEEDED
+from src.services.ai import AIService
+from src.services.langchain_service import LangChainService
+from src.settings.gemini import GeminiSettings
+from src.settings.substrate import SubstrateSettings
+
+SCENARIOS = ("create", "evaluate", "sponsor", "approve", "deploy", "list", "ai_query")
+PAGE_SIZE = 50
+EVALUATION_PROMPT = "You are a grants reviewer. Score the project from 0 to 100 and decide approve, borderline or reject."
+
+
+def percentile(ordered: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return None
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """`db;dur=1.2;desc="3x", total;dur=4.5` -> {"db": 1.2, "total": 4.5}"""
+    timings: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        name, *params = entry.strip().split(";")
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur" and name:
+                timings[name] = float(value)
+    return timings
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    dependency_ms: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+
+    def summary(self, seconds: float) -> dict:
+        ordered = sorted(self.latencies_ms)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items(), key=lambda item: str(item[0]))},
+            "rps": round(count / seconds, 2) if seconds else None,
+            "p50_ms": _round(percentile(ordered, 0.50)),
+            "p95_ms": _round(percentile(ordered, 0.95)),
+            "p99_ms": _round(percentile(ordered, 0.99)),
+            "mean_ms": _round(sum(ordered) / count if count else None),
+            "max_ms": _round(ordered[-1] if ordered else None),
+            "server_timing_mean_ms": {
+                name: round(total / count, 2) for name, total in sorted(self.dependency_ms.items())
+            } if count else {},
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def summarize_blocks(blocks: Sequence[LoopBlock]) -> Dict[str, dict]:
+    """Loop blocks by route: count, worst duration and the stack of the worst one."""
+    by_route: Dict[str, List[LoopBlock]] = defaultdict(list)
+    for block in blocks:
+        by_route[block.route].append(block)
+    summary = {}
+    for route, route_blocks in sorted(by_route.items()):
+        worst = max(route_blocks, key=lambda block: block.seconds)
+        summary[route] = {"count": len(route_blocks), "max_ms": _round(worst.seconds * 1000), "stack": worst.stack}
+    return summary
+
+
+class Recorder:
+    """Times requests per endpoint label and collects their Server-Timing breakdown."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    async def request(self, label: str, method: str, url: str, expect: int = 200, **kwargs) -> Optional[httpx.Response]:
+        stats = self.endpoints[label]
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as e:
+            stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+            stats.errors += 1
+            stats.statuses[type(e).__name__] += 1
+            return None
+        stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+        stats.statuses[response.status_code] += 1
+        for name, duration in parse_server_timing(response.headers.get("server-timing")).items():
+            stats.dependency_ms[name] += duration
+        if response.status_code != expect:
+            stats.errors += 1
+            return None
+        return response
+
+
+async def journey(recorder: Recorder, key: str, scenarios: Sequence[str], job_ids: List[int]) -> None:
+    """One project's life: create, evaluate, sponsor, approve, deploy, then browse and ask the AI."""
+    project = {
+        "project_id": key,
+        "name": f"Load test project {key}",
+        "repo": f"https://git.example/{key}",
+        "description": "A decentralized grants dashboard with milestone-based funding. " * 4,
+        "budget": 1000.0,
+    }
+    project_id = sponsored_id = None
+    evaluation = {"ai_score": 80.0, "decision": "approve"}
+
+    if "create" in scenarios:
+        response = await recorder.request("POST /projects", "POST", "/api/v1/arkiv/projects", expect=201, json=project)
+        project_id = response.json()["id"] if response is not None else None
+    if "evaluate" in scenarios and project_id is not None:
+        response = await recorder.request(
+            "POST /evaluate", "POST", "/api/v1/arkiv/evaluate", params={"project_id": project_id}
+        )
+        if response is not None:
+            evaluation = response.json()
+    if "sponsor" in scenarios:
+        response = await recorder.request("POST /sponsor", "POST", "/api/v1/arkiv/sponsor", json={
+            "project": {**project, "milestones": []},
+            "ai_score": evaluation["ai_score"],
+            "decision": evaluation["decision"],
+            "contract_address": "",
+        }, headers={"Idempotency-Key": f"{key}-sponsor"})
+        sponsored_id = response.json()["id"] if response is not None else None
+    if "approve" in scenarios and sponsored_id is not None:
+        approved = await recorder.request(
+            "PUT /sponsored/{id}", "PUT", f"/api/v1/arkiv/sponsored/{sponsored_id}", json={"status": "approved"}
+        )
+        if "deploy" in scenarios and approved is not None:
+            response = await recorder.request(
+                "POST /escrow/deploy-escrow", "POST", "/api/v1/arkiv/escrow/deploy-escrow", expect=202,
+                params={"project_id": sponsored_id}, headers={"Idempotency-Key": f"{key}-deploy"},
+            )
+            if response is not None:
+                job_ids.append(response.json()["job_id"])
+    if "list" in scenarios:
+        await recorder.request("GET /projects", "GET", "/api/v1/arkiv/projects", params={"limit": PAGE_SIZE})
+        await recorder.request("GET /sponsored", "GET", "/api/v1/arkiv/sponsored", params={"limit": PAGE_SIZE})
+    if "ai_query" in scenarios and sponsored_id is not None:
+        await recorder.request(
+            "POST /ai/query-project", "POST", "/api/v1/ai/query-project",
+            params={"project_id": sponsored_id, "question": "What is the funding status of this project?"},
+        )
+
+
+@asynccontextmanager
+async def load_env(
+    workdir: Path,
+    database_url: Optional[str] = None,
+    gemini_latency: float = 0.0,
+    arkiv_latency: float = 0.0,
+    chain_latency: float = 0.0,
+    workers: int = 4,
+    pool_size: int = 4,
+    rate_limits: bool = False,
+) -> AsyncIterator[tuple]:
+    """The app wired to the stand-ins; yields (client, escrow env, fake Arkiv)."""
+    arkiv = FakeArkiv(latency=arkiv_latency)
+    previous_gemini = (GeminiSettings.API_KEY, GeminiSettings.BASE_URL)
+    previous_prompt = AIService.PROMPT_PATH
+    AIService.PROMPT_PATH = workdir / "evaluation.md"
+    AIService.PROMPT_PATH.write_text(EVALUATION_PROMPT, encoding="utf-8")
+    with fake_gemini(latency=gemini_latency) as gemini_url:
+        GeminiSettings.API_KEY, GeminiSettings.BASE_URL = SecretStr("load-test"), gemini_url
+        LangChainService._instance = None
+        async with escrow_env(
+            workdir, workers=workers, pool_size=pool_size, latency=chain_latency,
+            database_url=database_url, arkiv_client_factory=lambda: arkiv,
+        ) as env:
+            async def session_override():
+                async with env.session_factory() as session:
+                    yield session
+
+            app.dependency_overrides[get_async_session] = session_override
+            app.dependency_overrides[get_read_session] = session_override
+            app.dependency_overrides[get_arkiv_client] = lambda: arkiv
+            app.dependency_overrides[get_escrow_job_runner] = lambda: env.runner
+            limiter = RateLimiter(enabled=rate_limits)
+            app.dependency_overrides[get_rate_limiter] = lambda: limiter
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+                    yield client, env, arkiv
+            finally:
+                app.dependency_overrides.clear()
+                GeminiSettings.API_KEY, GeminiSettings.BASE_URL = previous_gemini
+                LangChainService._instance = None
+                AIService.PROMPT_PATH = previous_prompt
+
+
+async def run_async(
+    workdir: Path,
+    users: int,
+    journeys: int,
+    duration: Optional[float] = None,
+    scenarios: Sequence[str] = SCENARIOS,
+    database_url: Optional[str] = None,
+    gemini_latency: float = 0.0,
+    arkiv_latency: float = 0.0,
+    chain_latency: float = 0.0,
+    workers: int = 4,
+    pool_size: int = 4,
+    timeout: float = 300.0,
+    loop_budget: Optional[float] = None,
+    rate_limits: bool = False,
+) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    watchdog = LoopWatchdog(threshold=loop_budget) if loop_budget else None
+    async with load_env(
+        workdir, database_url, gemini_latency, arkiv_latency, chain_latency, workers, pool_size, rate_limits
+    ) as (client, env, arkiv):
+        if watchdog is not None:
+            await watchdog.start()
+        recorder = Recorder(client)
+        job_ids: List[int] = []
+        started = 0
+        completed = 0
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+
+        async def user() -> None:
+            nonlocal started, completed
+            while (started < journeys) if deadline is None else (time.perf_counter() < deadline):
+                started += 1
+                await journey(recorder, f"load-{run_id}-{started}", scenarios, job_ids)
+                completed += 1
+
+        try:
+            await asyncio.gather(*(user() for _ in range(users)))
+        finally:
+            if watchdog is not None:
+                await watchdog.close()
+        elapsed = time.perf_counter() - start
+
+        deploy_jobs = None
+        if job_ids:
+            drain_start = time.perf_counter()
+            statuses = await _wait_jobs(env, job_ids, timeout)
+            deploy_jobs = {
+                "queued": len(job_ids),
+                "succeeded": statuses.count(ESCROW_JOB_SUCCEEDED),
+                "drain_seconds": round(time.perf_counter() - drain_start, 3),
+            }
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "params": {
+            "users": users, "journeys": journeys, "duration_s": duration, "scenarios": list(scenarios),
+            "database": "postgres" if database_url and database_url.startswith("postgres") else "sqlite",
+            "gemini_latency_s": gemini_latency, "arkiv_latency_s": arkiv_latency, "chain_latency_s": chain_latency,
+            "workers": workers, "pool_size": pool_size, "loop_budget_s": loop_budget,
+            "rate_limits": rate_limits,
+        },
+        "journeys": {"completed": completed, "seconds": round(elapsed, 3), "per_s": round(completed / elapsed, 2)},
+        "endpoints": {label: stats.summary(elapsed) for label, stats in recorder.endpoints.items()},
+        "deploy_jobs": deploy_jobs,
+        "loop_blocks": summarize_blocks(watchdog.blocks) if watchdog is not None else None,
+        "stand_ins": {"arkiv_calls": arkiv.arkiv.calls, "chain_blocks": env.chain.head().number if env.chain else None},
+    }
+
+
+def run(users: int, journeys: int, **kwargs) -> dict:
+    with tempfile.TemporaryDirectory(prefix="load-test-") as workdir:
+        return asyncio.run(run_async(Path(workdir), users, journeys, **kwargs))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--journeys", type=int, default=100, help="Journeys in total (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a journey count")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--database-url", help="Async database URL (default: a throwaway SQLite file)")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="Seconds per fake Gemini call")
+    parser.add_argument("--arkiv-latency", type=float, default=0.0, help="Seconds per fake Arkiv RPC")
+    parser.add_argument("--chain-latency", type=float, default=0.0, help="Seconds per fake Substrate RPC")
+    parser.add_argument("--workers", type=int, default=SubstrateSettings.JOB_WORKERS, help="Escrow job workers")
+    parser.add_argument("--pool-size", type=int, default=SubstrateSettings.POOL_SIZE)
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for queued deployments")
+    parser.add_argument("--loop-budget-ms", type=float, help="Fail when a callback blocks the event loop longer than this")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the per-client rate limits and concurrency caps on")
+    parser.add_argument("--output", type=Path, help="Append the result to this JSON lines file")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # Request and job logging would dominate the output
+    logger.remove()
+    logger.add(lambda message: print(message, end=""), level="ERROR")
+    result = run(
+        args.users, args.journeys, duration=args.duration, scenarios=scenarios, database_url=args.database_url,
+        gemini_latency=args.gemini_latency, arkiv_latency=args.arkiv_latency, chain_latency=args.chain_latency,
+        workers=args.workers, pool_size=args.pool_size, timeout=args.timeout,
+        loop_budget=args.loop_budget_ms / 1000 if args.loop_budget_ms else None, rate_limits=args.rate_limits,
+    )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "a") as f:
+            f.write(json.dumps(result) + "\n")
+    print(json.dumps(result, indent=2))
+    if result["loop_blocks"]:
+        raise SystemExit(f"Event loop blocked beyond the budget in: {', '.join(result['loop_blocks'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Contract artifact registry: lookups by name and code hash, and reloads when a build changes the files."""
+from hashlib import blake2b
+
+import pytest
+
+from benchmarks.escrow_fixtures import write_artifacts
+from src.services.contract_artifacts import DEFAULT_CONTRACT, ContractArtifactRegistry
+
+
+def test_artifact_is_loaded_once_and_found_by_name_and_code_hash(tmp_path):
+    directory = write_artifacts(tmp_path / "artifacts")
+    wasm = (directory / "funding_escrow.wasm").read_bytes()
+    registry = ContractArtifactRegistry(search_dirs=[tmp_path / "missing", directory], check_interval=60)
+
+    artifact = registry.get()
+
+    assert artifact.name == DEFAULT_CONTRACT
+    assert artifact.wasm == wasm
+    assert artifact.code_hash == "0x" + blake2b(wasm, digest_size=32).hexdigest()
+    assert artifact.metadata["spec"]["messages"]
+    assert registry.get() is artifact
+    assert registry.by_code_hash(artifact.code_hash) is artifact
+    assert registry.by_code_hash("0x" + "00" * 32) is None
+
+
+def test_missing_artifacts_list_the_directories_tried(tmp_path):
+    registry = ContractArtifactRegistry(search_dirs=[tmp_path])
+
+    with pytest.raises(FileNotFoundError, match=str(tmp_path)):
+        registry.get("no_such_contract")
+
+
+def test_rebuilt_wasm_is_reloaded_and_the_old_hash_evicted(tmp_path):
+    directory = write_artifacts(tmp_path / "artifacts")
+    registry = ContractArtifactRegistry(search_dirs=[directory], check_interval=0)
+    old = registry.get()
+
+    # Same file, different contents and size: what `cargo contract build` leaves behind
+    (directory / "funding_escrow.wasm").write_bytes(old.wasm + b"\x01")
+    new = registry.get()
+
+    assert new is not old
+    assert new.wasm == old.wasm + b"\x01"
+    assert new.code_hash != old.code_hash
+    assert registry.by_code_hash(new.code_hash) is new
+    assert registry.by_code_hash(old.code_hash) is None
+
+
+def test_files_are_not_rechecked_within_the_check_interval(tmp_path):
+    directory = write_artifacts(tmp_path / "artifacts")
+    registry = ContractArtifactRegistry(search_dirs=[directory], check_interval=60)
+    artifact = registry.get()
+
+    (directory / "funding_escrow.wasm").write_bytes(artifact.wasm + b"\x01")
+
+    assert registry.get() is artifact
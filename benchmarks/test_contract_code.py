@@ -0,0 +1,82 @@
+"""Escrow code upload against the fake chain: uploaded once per chain, found in the table or in chain storage."""
+import asyncio
+
+from sqlmodel import select
+from substrateinterface import Keypair
+
+from benchmarks.escrow_throughput import escrow_env
+from src.models.contract_code import UploadedContractCode
+from src.services.rococo_deployer import RococoDeployer
+
+ALICE = Keypair.create_from_uri("//Alice")
+
+
+def _uploads(chain):
+    return [
+        extrinsic for block in chain.blocks for extrinsic in block.extrinsics
+        if extrinsic.call["call_function"] == "upload_code"
+    ]
+
+
+async def _ensure(env, with_session: bool = True) -> dict:
+    deployer = RococoDeployer(pool=env.pool, artifacts=env.reader.artifacts, reader=env.reader, nonces=env.runner.nonces)
+    async with deployer.borrow():
+        if not with_session:
+            return await deployer.ensure_code_uploaded(ALICE)
+        async with env.session_factory() as session:
+            return await deployer.ensure_code_uploaded(ALICE, session)
+
+
+async def _records(env):
+    async with env.session_factory() as session:
+        return (await session.execute(select(UploadedContractCode))).scalars().all()
+
+
+def test_code_is_uploaded_once_then_found_in_the_table(tmp_path):
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=1, workers=1) as env:
+            first = await _ensure(env)
+            requests = env.chain.requests
+            second = await _ensure(env)
+            # Only the genesis hash is read: the table answers without a storage query
+            return first, second, env.chain.requests - requests, _uploads(env.chain), await _records(env)
+
+    first, second, second_requests, uploads, records = asyncio.run(scenario())
+
+    assert first["uploaded"] and not second["uploaded"]
+    assert first["code_hash"] == second["code_hash"]
+    assert len(uploads) == 1
+    assert second_requests == 1
+    (record,) = records
+    assert record.code_hash == first["code_hash"] and record.tx_hash is not None
+
+
+def test_code_already_on_chain_is_recorded_without_uploading(tmp_path):
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=1, workers=1) as env:
+            # Uploaded by another process that kept no record here
+            await _ensure(env, with_session=False)
+            assert await _records(env) == []
+            result = await _ensure(env)
+            return result, _uploads(env.chain), await _records(env)
+
+    result, uploads, records = asyncio.run(scenario())
+
+    assert not result["uploaded"]
+    assert len(uploads) == 1
+    (record,) = records
+    assert record.code_hash == result["code_hash"] and record.tx_hash is None
+
+
+def test_concurrent_callers_upload_the_code_once(tmp_path):
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=4, workers=1, latency=0.01) as env:
+            results = await asyncio.gather(*(_ensure(env) for _ in range(4)))
+            return results, _uploads(env.chain), await _records(env)
+
+    results, uploads, records = asyncio.run(scenario())
+
+    assert len(uploads) == 1
+    assert sum(result["uploaded"] for result in results) == 1
+    assert len({result["code_hash"] for result in results}) == 1
+    assert len(records) == 1
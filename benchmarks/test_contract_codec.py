@@ -0,0 +1,119 @@
+"""Precompiled contract codec: the same bytes and values as the metadata-driven `ContractMetadata` path."""
+import copy
+
+import pytest
+from scalecodec.base import RuntimeConfigurationObject, ScaleBytes
+from scalecodec.type_registry import load_type_registry_preset
+from substrateinterface.contracts import ContractEvent, ContractMetadata
+
+from benchmarks.escrow_fixtures import ALICE, escrow_metadata
+from src.services.contract_codec import ContractCodec, _OfflineRuntime
+
+BOB = "5FHneW46xGXgs5mUiveU4sbTyGBzmstUspZC92UhjJM694ty"
+
+CALLS = {
+    "create_escrow": {"project_owner": ALICE, "milestone_count": 4},
+    "add_milestone": {"project_owner": BOB, "milestone_index": 3, "release_percentage": 25},
+    "release_milestone": {"project_owner": ALICE, "milestone_index": 2**32 - 1},
+    "cancel_escrow": {"project_owner": BOB},
+    "get_escrow_status": {"project_owner": ALICE},
+    "get_milestone_status": {"project_owner": ALICE, "milestone_index": 0},
+    "get_project_count": {},
+}
+
+RESULTS = {
+    "create_escrow": [{"Ok": {"Ok": ()}}, {"Ok": {"Err": "EscrowAlreadyExists"}}, {"Err": "CouldNotReadInput"}],
+    "get_escrow_status": [{"Ok": (10**13, 25 * 10**11, False, True)}, {"Ok": None}],
+    "get_milestone_status": [{"Ok": (2**128 - 1, True)}, {"Ok": None}],
+    "get_project_count": [0, 7],
+}
+
+EVENTS = {
+    "EscrowCreated": {"project_owner": ALICE, "total_amount": 10**13, "milestone_count": 4},
+    "FundsReleased": {"project_owner": BOB, "milestone_index": 2, "amount": 25 * 10**11},
+    "EscrowCancelled": {"project_owner": ALICE, "remaining_amount": 0},
+}
+
+
+@pytest.fixture(scope="module")
+def codec() -> ContractCodec:
+    return ContractCodec(escrow_metadata())
+
+
+@pytest.fixture(scope="module")
+def legacy():
+    runtime_config = RuntimeConfigurationObject(ss58_format=42, implements_scale_info=True)
+    runtime_config.update_type_registry(load_type_registry_preset("core"))
+    return ContractMetadata(copy.deepcopy(escrow_metadata()), _OfflineRuntime(runtime_config)), runtime_config
+
+
+def test_every_message_is_compiled(codec):
+    assert set(codec.messages) == set(CALLS)
+    assert {event.label for event in codec.events.values()} == set(EVENTS)
+
+
+@pytest.mark.parametrize("name", sorted(CALLS))
+def test_call_encoding_matches_contract_metadata(codec, legacy, name):
+    metadata, _ = legacy
+
+    assert codec.encode_call(name, CALLS[name]) == bytes(metadata.generate_message_data(name, CALLS[name]).data)
+
+
+def test_constructor_encoding_matches_contract_metadata(codec, legacy):
+    metadata, _ = legacy
+
+    assert codec.encode_constructor("new") == bytes(metadata.generate_constructor_data("new", {}).data)
+
+
+@pytest.mark.parametrize("name", sorted(CALLS))
+def test_encoded_arguments_decode_back(codec, legacy, name):
+    metadata, runtime_config = legacy
+    payload = ScaleBytes(codec.encode_call(name, CALLS[name])[4:])
+    spec = next(message for message in metadata.metadata_dict["spec"]["messages"] if message["label"] == name)
+
+    decoded = {
+        arg["label"]: runtime_config.create_scale_object(
+            metadata.get_type_string_for_metadata_type(arg["type"]["type"]), data=payload
+        ).decode(check_remaining=False)
+        for arg in spec["args"]
+    }
+
+    assert decoded == CALLS[name]
+    assert payload.offset == payload.length
+
+
+@pytest.mark.parametrize("name, value", [(name, value) for name, values in RESULTS.items() for value in values])
+def test_result_decoding_matches_contract_metadata(codec, legacy, name, value):
+    metadata, runtime_config = legacy
+    type_string = metadata.get_return_type_string_for_message(name)
+    data = bytes(runtime_config.create_scale_object(type_string).encode(value).data)
+
+    assert codec.decode_result(name, data) == runtime_config.create_scale_object(type_string).decode(ScaleBytes(data))
+    assert codec.decode_result(name, data) == value
+
+
+@pytest.mark.parametrize("label", sorted(EVENTS))
+def test_event_decoding_matches_contract_metadata(codec, legacy, label):
+    metadata, runtime_config = legacy
+    event_id, spec = next(
+        (index, event) for index, event in enumerate(metadata.metadata_dict["spec"]["events"]) if event["label"] == label
+    )
+    data = bytes([event_id]) + b"".join(
+        bytes(runtime_config.create_scale_object(
+            metadata.get_type_string_for_metadata_type(arg["type"]["type"])
+        ).encode(EVENTS[label][arg["label"]]).data)
+        for arg in spec["args"]
+    )
+    reference = ContractEvent(data=ScaleBytes(data), runtime_config=runtime_config, contract_metadata=metadata).decode()
+
+    name, args = codec.decode_event(data)
+
+    assert name == reference["name"] == label
+    assert args == {arg["label"]: arg["value"] for arg in reference["args"]} == EVENTS[label]
+
+
+def test_unknown_message_and_missing_argument_are_rejected(codec):
+    with pytest.raises(ValueError, match="not found"):
+        codec.encode_call("withdraw_everything")
+    with pytest.raises(ValueError, match="milestone_index"):
+        codec.encode_call("release_milestone", {"project_owner": ALICE})
@@ -0,0 +1,96 @@
+"""Debug routes behind the admin token, and the sampling profiler behind /debug/profile."""
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from pydantic import SecretStr
+
+from src.core import profiler
+from src.core.profiler import ProfilerBusyError, collapsed, sample_stacks
+from src.main import app
+from src.settings.debug import DebugSettings
+
+ADMIN = {"X-Admin-Token": "admin"}
+
+
+def _get(path: str, headers: dict = None, **params) -> httpx.Response:
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, headers=headers or {}, params=params)
+
+    return asyncio.run(request())
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(DebugSettings, "ADMIN_TOKEN", SecretStr("admin"))
+
+
+@pytest.mark.parametrize("path", ["/debug/profile", "/debug/tasks"])
+def test_debug_routes_are_hidden_without_a_configured_token(monkeypatch, path):
+    monkeypatch.setattr(DebugSettings, "ADMIN_TOKEN", None)
+
+    assert _get(path, ADMIN).status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/debug/profile", "/debug/tasks"])
+def test_debug_routes_need_the_admin_token(admin_token, path):
+    assert _get(path).status_code == 401
+    assert _get(path, {"X-Admin-Token": "wrong"}).status_code == 401
+
+
+def test_profile_returns_collapsed_stacks(admin_token):
+    response = _get("/debug/profile", ADMIN, seconds=0.2, interval_ms=5)
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert sum(counts) == int(response.headers["X-Profile-Samples"]) > 0
+    assert counts == sorted(counts, reverse=True)
+    # The event loop thread is sampled under the task it was running
+    assert any(line.startswith("thread:MainThread;task:") for line in lines)
+
+
+def test_profile_is_bounded_and_exclusive(admin_token, monkeypatch):
+    monkeypatch.setattr(DebugSettings, "PROFILE_MAX_SECONDS", 1.0)
+    assert _get("/debug/profile", ADMIN, seconds=2).status_code == 400
+
+    with profiler._profile_lock:
+        assert _get("/debug/profile", ADMIN, seconds=0.1).status_code == 409
+
+
+def test_tasks_lists_the_running_task(admin_token):
+    response = _get("/debug/tasks", ADMIN)
+
+    assert response.status_code == 200
+    assert response.text.splitlines()[0] == "1 tasks"
+    # The only task is the test client's request, which is awaiting the response
+    assert ": _get.<locals>.request" in response.text
+
+
+def test_sample_stacks_sees_a_busy_thread():
+    stop = threading.Event()
+
+    def spin_in_worker():
+        while not stop.is_set():
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=spin_in_worker, name="busy-worker")
+    thread.start()
+    try:
+        counts = sample_stacks(0.1, 0.005)
+    finally:
+        stop.set()
+        thread.join()
+
+    busy = {stack: count for stack, count in counts.items() if stack.startswith("thread:busy-worker;")}
+    assert busy and all("spin_in_worker" in stack for stack in busy)
+    assert collapsed({"a;b": 1, "a;c": 3}) == "a;c 3\na;b 1\n"
+
+
+def test_sample_stacks_refuses_a_second_profile():
+    with profiler._profile_lock, pytest.raises(ProfilerBusyError):
+        sample_stacks(0.1, 0.01)
@@ -0,0 +1,105 @@
+"""Escrow event follower against the fake chain: materialized statuses, cursor, and idempotent replays."""
+import asyncio
+
+from sqlalchemy import func, update
+from sqlmodel import select
+from substrateinterface import Keypair
+
+from benchmarks.escrow_throughput import bench_deploys, bench_releases, create_projects, escrow_env
+from src.models.escrow_event import (
+    ESCROW_CANCELLED,
+    ESCROW_CREATED,
+    ESCROW_STATUS_ACTIVE,
+    ESCROW_STATUS_CANCELLED,
+    ESCROW_STATUS_COMPLETED,
+    FUNDS_RELEASED,
+    ChainCursor,
+    EscrowEvent,
+)
+from src.models.milestone import Milestone
+from src.models.sponsor import SponsoredProject
+from src.services.escrow_events import CURSOR_NAME, EscrowEventFollower
+from src.services.escrow_plan import DEFAULT_MILESTONE_COUNT
+from src.services.escrow_state import escrow_contract, escrow_owner
+
+
+async def _cancel(env, project: SponsoredProject) -> None:
+    """Send `cancel_escrow` for `project` as the deployer."""
+    codec = env.reader.codec()
+    async with env.pool.connection() as substrate:
+        call = substrate.compose_call("Contracts", "call", {
+            "dest": escrow_contract(project), "value": 0, "gas_limit": None, "storage_deposit_limit": None,
+            "data": "0x" + codec.encode_call("cancel_escrow", {"project_owner": escrow_owner(project)}).hex(),
+        })
+        extrinsic = substrate.create_signed_extrinsic(call=call, keypair=Keypair.create_from_uri("//Alice"))
+        substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+
+
+async def _follow_to_head(follower: EscrowEventFollower, env) -> None:
+    while True:
+        async with env.session_factory() as session:
+            await follower.follow_once(session)
+            cursor = await session.scalar(select(ChainCursor).where(ChainCursor.name == CURSOR_NAME))
+        if cursor.block_number >= env.chain.head().number:
+            return
+
+
+async def _snapshot(env):
+    async with env.session_factory() as session:
+        statuses = (await session.execute(select(SponsoredProject.id, SponsoredProject.escrow_status))).all()
+        released = (await session.execute(select(Milestone.project_id, Milestone.released).order_by(Milestone.id))).all()
+        events = (await session.execute(
+            select(EscrowEvent.name, EscrowEvent.sponsored_project_id, EscrowEvent.milestone_index)
+            .order_by(EscrowEvent.block_number, EscrowEvent.event_index)
+        )).all()
+        cursor = await session.scalar(select(ChainCursor.block_number).where(ChainCursor.name == CURSOR_NAME))
+    return dict(statuses), released, events, cursor
+
+
+def test_follower_materializes_events_and_replays_idempotently(tmp_path):
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=2, workers=2) as env:
+            completed, active, cancelled = await create_projects(env, 3)
+            assert (await bench_deploys(env, [completed, active, cancelled], timeout=30))["succeeded"] == 3
+            assert (await bench_releases(env, [completed], DEFAULT_MILESTONE_COUNT, timeout=30))["finalized"] == (
+                DEFAULT_MILESTONE_COUNT
+            )
+            async with env.session_factory() as session:
+                project = await session.get(SponsoredProject, cancelled)
+                # Only the follower may set released flags in this test
+                await session.execute(update(Milestone).values(released=False))
+                await session.commit()
+            await _cancel(env, project)
+
+            follower = EscrowEventFollower(
+                pool=env.pool, reader=env.reader, start_block=0, session_factory=env.session_factory
+            )
+            await _follow_to_head(follower, env)
+            first = await _snapshot(env)
+
+            # Replay every block, as after a crash before the cursor was committed
+            async with env.session_factory() as session:
+                await session.execute(update(ChainCursor).values(block_number=-1))
+                await session.commit()
+            await _follow_to_head(follower, env)
+            async with env.session_factory() as session:
+                event_count = await session.scalar(select(func.count(EscrowEvent.id)))
+            return completed, active, cancelled, env.chain.head().number, first, await _snapshot(env), event_count
+
+    completed, active, cancelled, head, first, replayed, event_count = asyncio.run(scenario())
+
+    statuses, released, events, cursor = first
+    assert statuses == {
+        completed: ESCROW_STATUS_COMPLETED, active: ESCROW_STATUS_ACTIVE, cancelled: ESCROW_STATUS_CANCELLED
+    }
+    assert [flag for project_id, flag in released if project_id == "bench-0"] == [True] * DEFAULT_MILESTONE_COUNT
+    assert not any(flag for project_id, flag in released if project_id != "bench-0")
+    assert [name for name, _, _ in events].count(ESCROW_CREATED) == 3
+    assert sorted(index for name, project_id, index in events if name == FUNDS_RELEASED) == list(
+        range(DEFAULT_MILESTONE_COUNT)
+    )
+    assert (ESCROW_CANCELLED, cancelled, None) in events
+    assert cursor == head
+
+    assert replayed == first
+    assert event_count == len(events)
@@ -0,0 +1,90 @@
+"""Escrow deployment jobs against the fake chain: crash-resume of a job interrupted between steps."""
+import asyncio
+
+import pytest
+
+from benchmarks.escrow_throughput import _wait_jobs, create_projects, escrow_env
+from src.models.escrow_job import ESCROW_JOB_SUCCEEDED
+from src.services.escrow_jobs import EscrowJobService
+from src.services.escrow_plan import DEFAULT_MILESTONE_COUNT
+from src.services.rococo_deployer import RococoDeployer
+
+
+def _submitted(chain, call_function):
+    return [
+        extrinsic for block in chain.blocks for extrinsic in block.extrinsics
+        if extrinsic.call["call_function"] == call_function
+    ]
+
+
+@pytest.mark.parametrize("lost_step", ["instantiated", "escrow_created"])
+def test_job_resumes_after_crash_before_checkpoint(tmp_path, lost_step):
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=1, workers=1) as env:
+            # The step's extrinsic is included, then the worker dies before recording it
+            checkpoint = env.runner._checkpoint
+            crashed = []
+
+            async def crash_once(job, session, step, **values):
+                if step == lost_step and not crashed:
+                    crashed.append(step)
+                    raise RuntimeError(f"crash before checkpoint {step}")
+                await checkpoint(job, session, step, **values)
+
+            env.runner._checkpoint = crash_once
+            (project_id,) = await create_projects(env, 1)
+            async with env.session_factory() as session:
+                job = await EscrowJobService.create(project_id, session)
+            env.runner.enqueue(job.id)
+            assert await _wait_jobs(env, [job.id], timeout=30) == [ESCROW_JOB_SUCCEEDED]
+            async with env.session_factory() as session:
+                job = await EscrowJobService.get_by_id(job.id, session)
+            return env.chain, job, crashed
+
+    chain, job, crashed = asyncio.run(scenario())
+
+    assert crashed == [lost_step]
+    assert job.attempts == 2
+    # The retry adopted the contract and escrow of the first attempt instead of submitting them again
+    assert len(_submitted(chain, "instantiate")) == 1
+    assert len(_submitted(chain, "call")) == 1
+    assert len(_submitted(chain, "batch_all")) == 1
+    assert list(chain.contracts) == [job.contract_address]
+    (escrow,) = chain.contracts[job.contract_address]["escrows"].values()
+    assert len(escrow["milestones"]) == DEFAULT_MILESTONE_COUNT
+
+
+def test_job_adds_missing_milestones_to_funded_escrow(tmp_path, monkeypatch):
+    add_milestones = RococoDeployer._add_milestones
+    failed = []
+
+    def fail_once(self, keypair, nonce, contract_address, milestones):
+        # The escrow is funded, then adding its milestones fails once
+        if not failed:
+            failed.append(len(milestones))
+            raise RuntimeError("add_milestone batch failed")
+        return add_milestones(self, keypair, nonce, contract_address, milestones)
+
+    monkeypatch.setattr(RococoDeployer, "_add_milestones", fail_once)
+
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=1, workers=1) as env:
+            (project_id,) = await create_projects(env, 1)
+            async with env.session_factory() as session:
+                job = await EscrowJobService.create(project_id, session)
+            env.runner.enqueue(job.id)
+            assert await _wait_jobs(env, [job.id], timeout=30) == [ESCROW_JOB_SUCCEEDED]
+            async with env.session_factory() as session:
+                job = await EscrowJobService.get_by_id(job.id, session)
+            return env.chain, job
+
+    chain, job = asyncio.run(scenario())
+
+    assert failed == [DEFAULT_MILESTONE_COUNT]
+    assert job.attempts == 2
+    # The retry adopted the funded escrow and only added the milestones
+    assert len(_submitted(chain, "call")) == 1
+    (batch,) = _submitted(chain, "batch_all")
+    assert len(batch.call["call_args"]["calls"]) == DEFAULT_MILESTONE_COUNT
+    (escrow,) = chain.contracts[job.contract_address]["escrows"].values()
+    assert len(escrow["milestones"]) == DEFAULT_MILESTONE_COUNT
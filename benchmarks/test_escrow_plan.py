@@ -0,0 +1,66 @@
+"""Escrow plans: integer percentages summing to 100 and exact planck amounts."""
+import pytest
+
+from src.models.milestone import Milestone
+from src.services.escrow_plan import (
+    DEFAULT_MILESTONE_COUNT,
+    MAX_MILESTONES,
+    largest_remainder,
+    plan_escrow,
+    to_planck,
+)
+
+
+def _milestones(*amounts):
+    return [
+        Milestone(id=index + 1, project_id="p", name=f"m{index}", amount=amount) for index, amount in enumerate(amounts)
+    ]
+
+
+def test_largest_remainder_gives_leftover_to_largest_remainders():
+    assert largest_remainder([1, 1, 1]) == [34, 33, 33]
+    assert largest_remainder([1, 2, 2]) == [20, 40, 40]
+    assert largest_remainder([10, 1, 1]) == [84, 8, 8]
+    assert largest_remainder([0, 0]) == [50, 50]
+    assert largest_remainder([]) == []
+
+
+def test_to_planck_avoids_float_error():
+    assert to_planck(0.3) == 300_000_000_000
+    assert to_planck(1.1) == 1_100_000_000_000
+
+
+def test_plan_splits_by_milestone_amounts():
+    plan = plan_escrow(10.0, _milestones(1.0, 1.0, 1.0))
+
+    assert plan.percentages == [34, 33, 33]
+    assert plan.deposit == 10 * 10**12
+    assert plan.amounts == [plan.deposit // 100 * p for p in plan.percentages]
+    assert sum(plan.amounts) == plan.deposit
+    assert plan.milestone_ids == [1, 2, 3]
+
+
+def test_plan_rounds_deposit_down_to_whole_percent_units():
+    # 1_234_567_890_012 planck: the last 12 are not a whole hundredth of the deposit
+    plan = plan_escrow(1.234567890012, _milestones(3.0, 1.0))
+
+    assert plan.deposit == 1_234_567_890_000
+    assert plan.deposit % 100 == 0
+    assert plan.percentages == [75, 25]
+    assert sum(plan.amounts) == plan.deposit
+
+
+def test_plan_without_milestones_splits_evenly():
+    plan = plan_escrow(4.0, [])
+
+    assert plan.milestone_count == DEFAULT_MILESTONE_COUNT
+    assert plan.percentages == [25] * DEFAULT_MILESTONE_COUNT
+    assert plan.milestone_ids == [None] * DEFAULT_MILESTONE_COUNT
+
+
+def test_plan_accepts_up_to_max_milestones():
+    plan = plan_escrow(1.0, _milestones(*[1.0] * MAX_MILESTONES))
+
+    assert plan.percentages == [1] * MAX_MILESTONES
+    with pytest.raises(ValueError, match="at most 100 milestones"):
+        plan_escrow(1.0, _milestones(*[1.0] * (MAX_MILESTONES + 1)))
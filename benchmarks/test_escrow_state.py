@@ -0,0 +1,99 @@
+"""Batched escrow state reads: one JSON-RPC batch per `batch_size` reads, cached per block."""
+import asyncio
+import json
+
+from sqlmodel import select
+
+from benchmarks.escrow_throughput import bench_deploys, create_projects, escrow_env
+from src.models.sponsor import SponsoredProject
+from src.services.escrow_plan import DEFAULT_MILESTONE_COUNT
+from src.services.escrow_state import EscrowTarget, escrow_owner
+from src.services.substrate_pool import SubstrateConnection
+
+
+def test_read_sends_dry_runs_in_batches(tmp_path):
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=2, workers=2) as env:
+            project_ids = await create_projects(env, 3)
+            assert (await bench_deploys(env, project_ids, timeout=30))["succeeded"] == 3
+            async with env.session_factory() as session:
+                projects = (await session.execute(select(SponsoredProject))).scalars().all()
+            targets = [
+                EscrowTarget(project.id, project.polkadot_smart_contract, escrow_owner(project)) for project in projects
+            ]
+            env.reader.batch_size = 4
+            requests = env.chain.requests
+            states = await env.reader.read(targets)
+            first_read = env.chain.requests - requests
+            requests = env.chain.requests
+            cached = await env.reader.read(targets)
+            return states, cached, first_read, env.chain.requests - requests
+
+    states, cached, first_read, second_read = asyncio.run(scenario())
+
+    assert all(state.exists and not state.error for state in states)
+    assert [len(state.milestones) for state in states] == [DEFAULT_MILESTONE_COUNT] * 3
+    # Chain head, then 15 reads (3 escrows + 12 milestones) in batches of 4
+    assert first_read == 1 + 4
+    # Same block: only the chain head is fetched again
+    assert second_read == 1
+    assert cached == states
+
+
+class _BatchWebsocket:
+    """Answers single requests with a chain name and batches out of order, failing method "bad"."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(json.loads(message))
+
+    def recv(self):
+        request = self.sent[-1]
+        if isinstance(request, dict):
+            return json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "Development"})
+        return json.dumps([
+            {"jsonrpc": "2.0", "id": r["id"], "error": {"code": -32000, "message": "boom"}} if r["method"] == "bad"
+            else {"jsonrpc": "2.0", "id": r["id"], "result": r["params"][0]}
+            for r in reversed(request)
+        ])
+
+
+def test_rpc_batch_matches_responses_by_id():
+    websocket = _BatchWebsocket()
+    connection = SubstrateConnection(websocket=websocket)
+
+    results = connection.rpc_batch([("echo", [1]), ("bad", [2]), ("echo", [3])])
+
+    assert isinstance(websocket.sent[-1], list) and len(websocket.sent[-1]) == 3
+    assert results[0] == 1 and results[2] == 3
+    assert "boom" in str(results[1])
+
+
+class _BatchResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def test_rpc_batch_over_http(monkeypatch):
+    posted = []
+
+    def post(url, data, headers):
+        posted.append((url, json.loads(data)))
+        return _BatchResponse([{"jsonrpc": "2.0", "id": r["id"], "result": r["params"][0]} for r in posted[-1][1]])
+
+    monkeypatch.setattr("src.services.substrate_pool.requests.post", post)
+    connection = SubstrateConnection(url="http://127.0.0.1:9933", auto_discover=False)
+
+    results = connection.rpc_batch([("echo", [1]), ("echo", [2])])
+
+    assert results == [1, 2]
+    assert len(posted) == 1 and posted[0][0] == "http://127.0.0.1:9933"
+    assert [r["method"] for r in posted[0][1]] == ["echo", "echo"]
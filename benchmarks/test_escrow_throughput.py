@@ -0,0 +1,52 @@
+"""Small-scale run of the escrow throughput benchmark, so the harness keeps working end to end."""
+import asyncio
+
+from substrateinterface import Keypair
+
+from benchmarks.escrow_fixtures import ALICE
+from benchmarks.escrow_throughput import run_async
+from benchmarks.fake_chain import FakeSubstrate
+from src.services.escrow_plan import DEFAULT_MILESTONE_COUNT
+
+
+def test_escrow_throughput(chain_backend, tmp_path):
+    result = asyncio.run(run_async(tmp_path, projects=4, e2e=2, workers=2, pool_size=2, **chain_backend))
+
+    assert result["deploy"]["succeeded"] == 4
+    assert result["deploy"]["attempts"] == 4
+    assert result["release"]["finalized"] == 4 * DEFAULT_MILESTONE_COUNT
+    assert result["e2e"]["failed"] == 0
+
+
+def test_fake_chain_reverts_failed_batch(fake_chain):
+    substrate = FakeSubstrate(fake_chain)
+    keypair = Keypair.create_from_uri("//Alice")
+    codec = fake_chain.codec
+
+    def submit(call):
+        extrinsic = substrate.create_signed_extrinsic(call=call, keypair=keypair)
+        return substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+
+    wasm = b"\0asm\x01\0\0\0"
+    assert submit(substrate.compose_call("Contracts", "upload_code", {"code": "0x" + wasm.hex()})).is_success
+    code_hash = next(iter(fake_chain.codes))
+    instantiate = substrate.compose_call("Contracts", "instantiate", {
+        "value": 0, "code_hash": code_hash, "data": "0x" + codec.encode_constructor("new").hex(), "salt": "0x00",
+    })
+    receipt = submit(instantiate)
+    contract = next(e.value["attributes"]["contract"] for e in receipt.triggered_events
+                    if e.value["event_id"] == "Instantiated")
+
+    def message(name, args, value=0):
+        return substrate.compose_call("Contracts", "call", {
+            "dest": contract, "value": value, "data": "0x" + codec.encode_call(name, args).hex(),
+        })
+
+    # The second add_milestone is out of range, so the whole batch (including create_escrow) reverts
+    batch = substrate.compose_call("Utility", "batch_all", {"calls": [
+        message("create_escrow", {"project_owner": ALICE, "milestone_count": 1}, value=1000),
+        message("add_milestone", {"project_owner": ALICE, "milestone_index": 0, "release_percentage": 100}),
+        message("add_milestone", {"project_owner": ALICE, "milestone_index": 1, "release_percentage": 100}),
+    ]})
+    assert not submit(batch).is_success
+    assert fake_chain.contracts[contract]["escrows"] == {}
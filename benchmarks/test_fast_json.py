@@ -0,0 +1,89 @@
+"""The orjson list path returns the same JSON as the default `response_model` path."""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from pydantic import TypeAdapter
+
+from src.core import fast_json
+from src.core.http_cache import response_cache
+from src.main import app
+from src.models import Milestone, Project, SponsoredProject
+from src.settings.http import HTTPSettings
+
+ENDPOINTS = [
+    "/api/v1/arkiv/projects",
+    "/api/v1/arkiv/milestones",
+    "/api/v1/arkiv/milestones/by-project/p-1",
+    "/api/v1/arkiv/sponsored",
+    "/api/v1/arkiv/sponsored?q=grid&sort=-budget",
+]
+
+
+@pytest.fixture(autouse=True)
+def response_cache_disabled(monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", False)
+
+
+def _seed(session_factory):
+    # Whole and fractional seconds, None columns, non-ASCII text, whole and fractional floats
+    stamps = [datetime(2026, 3, 1, 12, 0, 0), datetime(2026, 3, 2, 8, 30, 15, 123456)]
+
+    async def seed():
+        async with session_factory() as session:
+            for i, stamp in enumerate(stamps):
+                common = {"project_id": f"p-{i + 1}", "name": f"Solar grid — phase {i + 1} ☀", "repo": "https://x"}
+                session.add(Project(**common, description=None if i else "Ünïcode", budget=100.0 + i * 0.25,
+                                    created_at=stamp, updated_at=stamp))
+                session.add(SponsoredProject(**common, ai_score=80 + i * 0.5, status="approved",
+                                             contract_address="0x1", chain="asset_hub", budget=1000.0 * (i + 1),
+                                             description=None, created_at=stamp, updated_at=stamp))
+                session.add(Milestone(project_id="p-1", name=f"M{i}", description=None, amount=33.333333333333336,
+                                      released=bool(i), created_at=stamp, updated_at=stamp))
+            await session.commit()
+
+    asyncio.run(seed())
+
+
+def _bodies(monkeypatch, fast: bool):
+    monkeypatch.setattr(HTTPSettings, "FAST_LIST_SERIALIZATION", fast)
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            responses = [await client.get(path) for path in ENDPOINTS]
+        assert all(response.status_code == 200 for response in responses)
+        return [response.content for response in responses]
+
+    return asyncio.run(fetch())
+
+
+def test_fast_path_returns_identical_json(api_sessions, monkeypatch):
+    _seed(api_sessions)
+
+    default = _bodies(monkeypatch, fast=False)
+    fast = _bodies(monkeypatch, fast=True)
+
+    assert all(body != b"[]" for body in default)
+    # Key order is not significant (the default path follows each instance's attribute order)
+    assert [json.loads(body) for body in fast] == [json.loads(body) for body in default]
+
+
+def test_rows_encode_like_pydantic():
+    # PostgreSQL returns timezone-aware datetimes; SQLite returns naive ones
+    stamps = [
+        datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc),
+        datetime(2026, 3, 1, 14, 0, 0, 500, tzinfo=timezone(timedelta(hours=2))),
+        datetime(2026, 3, 1, 12, 0),
+    ]
+    projects = [
+        Project(id=i, project_id=f"p-{i}", name="Café ☀", repo="https://x", description=None if i else "d",
+                budget=0.1 + 0.2, created_at=stamp, updated_at=stamp)
+        for i, stamp in enumerate(stamps)
+    ]
+    columns = list(Project.model_fields)
+
+    fast = fast_json.encode_rows(columns, [tuple(getattr(project, c) for c in columns) for project in projects])
+
+    assert fast == TypeAdapter(list[Project]).dump_json(projects)
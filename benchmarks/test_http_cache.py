@@ -0,0 +1,114 @@
+"""Conditional GETs of sponsored projects: ETag / 304, cached bodies, and invalidation after writes."""
+import asyncio
+
+import httpx
+import pytest
+
+from src.core.http_cache import response_cache
+from src.core.metrics import CACHE_REQUESTS
+from src.main import app
+from src.services.sponsor import SponsoredProjectService
+
+BASE = "/api/v1/arkiv/sponsored"
+
+
+def _project(**overrides):
+    project = {
+        "project_id": "p-1", "name": "Solar grid", "repo": "https://example.com/solar", "ai_score": 80.0,
+        "status": "approved", "contract_address": "0x1", "chain": "asset_hub", "budget": 100.0,
+    }
+    return {**project, **overrides}
+
+
+@pytest.fixture(autouse=True)
+def response_cache_enabled(monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", True)
+    response_cache.invalidate(SponsoredProjectService.CACHE_NAMESPACE)
+
+
+def _cached_keys():
+    return {key for namespace, key in response_cache._entries if namespace == SponsoredProjectService.CACHE_NAMESPACE}
+
+
+def _hits():
+    return sum(
+        value for labels, value in CACHE_REQUESTS.collect()
+        if labels == {"cache": "http_response", "result": "hit"}
+    )
+
+
+def _run(scenario):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await scenario(client)
+
+    return asyncio.run(run())
+
+
+def test_unchanged_project_revalidates_with_304(api_sessions):
+    async def scenario(client):
+        created = (await client.post(BASE, json=_project())).json()
+        first = await client.get(f"{BASE}/{created['id']}")
+        revalidated = await client.get(f"{BASE}/{created['id']}", headers={"If-None-Match": first.headers["ETag"]})
+        # Strong form of the same validator, and one of several candidates, also match
+        strong = first.headers["ETag"].removeprefix("W/")
+        listed = await client.get(f"{BASE}/{created['id']}", headers={"If-None-Match": f'"other", {strong}'})
+        return first, revalidated, listed
+
+    first, revalidated, listed = _run(scenario)
+
+    assert first.status_code == 200 and first.headers["ETag"].startswith('W/"')
+    assert "must-revalidate" in first.headers["Cache-Control"]
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["ETag"] == first.headers["ETag"]
+    assert listed.status_code == 304
+
+
+def test_update_changes_the_etag_and_drops_cached_bodies(api_sessions):
+    async def scenario(client):
+        created = (await client.post(BASE, json=_project())).json()
+        before = await client.get(f"{BASE}/{created['id']}")
+        listed = await client.get(BASE, params={"status": "approved"})
+        cached = _cached_keys()
+        await client.put(f"{BASE}/{created['id']}", json={"name": "Solar grid v2"})
+        after_write = _cached_keys()
+        after = await client.get(f"{BASE}/{created['id']}", headers={"If-None-Match": before.headers["ETag"]})
+        relisted = await client.get(BASE, params={"status": "approved"}, headers={"If-None-Match": listed.headers["ETag"]})
+        return created, before, cached, after_write, after, relisted
+
+    created, before, cached, after_write, after, relisted = _run(scenario)
+
+    assert cached == {f"id:{created['id']}", "list:status=approved"}
+    assert after_write == set()
+    assert after.status_code == 200 and after.headers["ETag"] != before.headers["ETag"]
+    assert after.json()["name"] == "Solar grid v2"
+    assert relisted.status_code == 200 and [p["name"] for p in relisted.json()] == ["Solar grid v2"]
+
+
+def test_list_etag_tracks_inserts_and_query(api_sessions):
+    async def scenario(client):
+        await client.post(BASE, json=_project())
+        first = await client.get(BASE)
+        other_query = await client.get(BASE, params={"limit": 1}, headers={"If-None-Match": first.headers["ETag"]})
+        hits = _hits()
+        replayed = await client.get(BASE)
+        replay_hits = _hits() - hits
+        await client.post(BASE, json=_project(project_id="p-2", name="Wind farm"))
+        after_insert = await client.get(BASE, headers={"If-None-Match": first.headers["ETag"]})
+        return first, other_query, replayed, replay_hits, after_insert
+
+    first, other_query, replayed, replay_hits, after_insert = _run(scenario)
+
+    # The query string is part of the validator
+    assert other_query.status_code == 200
+    # A repeated request without a validator replays the cached body
+    assert replay_hits == 1
+    assert replayed.content == first.content and replayed.headers["ETag"] == first.headers["ETag"]
+    assert after_insert.status_code == 200 and len(after_insert.json()) == 2
+
+
+def test_missing_project_is_404(api_sessions):
+    async def scenario(client):
+        return await client.get(f"{BASE}/999", headers={"If-None-Match": "*"})
+
+    assert _run(scenario).status_code == 404
@@ -0,0 +1,192 @@
+"""Idempotency-Key handling: replay, key reuse, takeover of abandoned keys and resuming from recorded progress."""
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI, Header, HTTPException, Request
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+
+from src.core.idempotency import IDEMPOTENCY_KEY_HEADER, REPLAYED_HEADER, run_idempotent
+from src.core.single_flight import flight_key
+from src.models.idempotency import IDEMPOTENCY_INTERRUPTED, IdempotencyRecord
+from src.services.idempotency import IdempotencyService
+from src.settings.idempotency import IdempotencySettings
+
+
+class _Env:
+    """An app whose POST /items writes to an external store, then fails while `failures` remain."""
+
+    def __init__(self, tmp_path):
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        self.external_writes = []
+        self.failures = []
+        self.app = FastAPI()
+
+        @self.app.post("/items", status_code=201)
+        async def create_item(body: dict, request: Request, key: str = Header(None, alias=IDEMPOTENCY_KEY_HEADER)):
+            async with self.session_factory() as session:
+                return await run_idempotent(key, request, session, body, lambda p: self._handle(body, p), 201)
+
+    async def _handle(self, body, progress):
+        written = progress.get("external")
+        if written is None:
+            self.external_writes.append(body)
+            written = {"entity": len(self.external_writes)}
+            await progress.save("external", written)
+        if self.failures:
+            raise self.failures.pop(0)
+        return {"entity": written["entity"], "name": body["name"]}
+
+    async def __aenter__(self):
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        transport = httpx.ASGITransport(app=self.app, raise_app_exceptions=False)
+        self.client = httpx.AsyncClient(transport=transport, base_url="http://test")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        await self.engine.dispose()
+
+    async def post(self, body, key="key-1"):
+        return await self.client.post("/items", json=body, headers={IDEMPOTENCY_KEY_HEADER: key})
+
+    async def records(self):
+        async with self.session_factory() as session:
+            return (await session.execute(select(IdempotencyRecord))).scalars().all()
+
+
+def test_retry_replays_the_stored_response(tmp_path):
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            first = await env.post({"name": "a"})
+            retry = await env.post({"name": "a"})
+            return env, first, retry
+
+    env, first, retry = asyncio.run(scenario())
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json() == {"entity": 1, "name": "a"}
+    assert REPLAYED_HEADER not in first.headers and retry.headers[REPLAYED_HEADER] == "true"
+    assert len(env.external_writes) == 1
+
+
+def test_concurrent_duplicate_waits_for_the_first(tmp_path):
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            return env, await asyncio.gather(env.post({"name": "a"}), env.post({"name": "a"}))
+
+    env, responses = asyncio.run(scenario())
+
+    assert [response.json() for response in responses] == [{"entity": 1, "name": "a"}] * 2
+    assert len(env.external_writes) == 1
+
+
+def test_key_reused_with_another_request_is_rejected(tmp_path):
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            await env.post({"name": "a"})
+            return env, await env.post({"name": "b"})
+
+    env, reused = asyncio.run(scenario())
+
+    assert reused.status_code == 422
+    assert len(env.external_writes) == 1
+
+
+def test_http_error_before_progress_releases_the_key(tmp_path):
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            original = env._handle
+
+            async def reject_once(body, progress):
+                raise HTTPException(status_code=400, detail="bad")
+
+            env._handle = reject_once
+            rejected = await env.post({"name": "a"})
+            released = await env.records()
+            env._handle = original
+            return rejected, released, await env.post({"name": "a"})
+
+    rejected, released, retry = asyncio.run(scenario())
+
+    assert rejected.status_code == 400
+    assert released == []
+    assert retry.status_code == 201 and REPLAYED_HEADER not in retry.headers
+
+
+def test_failure_after_external_write_resumes_on_retry(tmp_path):
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            env.failures.append(RuntimeError("database write failed"))
+            failed = await env.post({"name": "a"})
+            (interrupted,) = await env.records()
+            retry = await env.post({"name": "a"})
+            return env, failed, interrupted, retry
+
+    env, failed, interrupted, retry = asyncio.run(scenario())
+
+    assert failed.status_code == 500
+    assert interrupted.status == IDEMPOTENCY_INTERRUPTED
+    # The retry reused the recorded write instead of writing again
+    assert retry.status_code == 201 and retry.json() == {"entity": 1, "name": "a"}
+    assert len(env.external_writes) == 1
+
+
+def test_abandoned_key_is_taken_over_with_its_progress(tmp_path):
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            scope = "POST /items"
+            request_hash = flight_key(scope, {"name": "a"})
+            async with env.session_factory() as session:
+                # A process claimed the key, wrote externally and died
+                await IdempotencyService.begin(scope, "key-1", request_hash, session)
+                await IdempotencyService.save_progress(scope, "key-1", {"external": {"entity": 7}}, session)
+                await session.execute(
+                    update(IdempotencyRecord).values(
+                        updated_at=datetime.now() - timedelta(seconds=IdempotencySettings.LOCK_SECONDS + 1)
+                    )
+                )
+                await session.commit()
+            return env, await env.post({"name": "a"})
+
+    env, response = asyncio.run(scenario())
+
+    assert response.status_code == 201 and response.json() == {"entity": 7, "name": "a"}
+    assert env.external_writes == []
+
+
+def test_live_key_is_not_taken_over(tmp_path, monkeypatch):
+    monkeypatch.setattr(IdempotencySettings, "WAIT_SECONDS", 0.3)
+
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            async with env.session_factory() as session:
+                await IdempotencyService.begin("POST /items", "key-1", flight_key("POST /items", {"name": "a"}), session)
+            return env, await env.post({"name": "a"})
+
+    env, response = asyncio.run(scenario())
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert env.external_writes == []
+
+
+@pytest.mark.parametrize("key", ["", None])
+def test_requests_without_a_key_run_every_time(tmp_path, key):
+    async def scenario():
+        async with _Env(tmp_path) as env:
+            headers = {} if key is None else {IDEMPOTENCY_KEY_HEADER: key}
+            for _ in range(2):
+                await env.client.post("/items", json={"name": "a"}, headers=headers)
+            return env, await env.records()
+
+    env, records = asyncio.run(scenario())
+
+    assert len(env.external_writes) == 2
+    assert records == []
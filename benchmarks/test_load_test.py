@@ -0,0 +1,42 @@
+"""Small-scale run of the load test, so every journey step keeps working against the stand-ins."""
+import asyncio
+import gc
+
+from benchmarks.load_test import SCENARIOS, parse_server_timing, run_async
+
+
+def test_load_test(tmp_path):
+    result = asyncio.run(run_async(tmp_path, users=2, journeys=4, workers=2, pool_size=2))
+
+    assert result["journeys"]["completed"] == 4
+    assert {stats["errors"] for stats in result["endpoints"].values()} == {0}
+    assert len(result["endpoints"]) == len(SCENARIOS) + 1  # list hits two endpoints
+    assert result["deploy_jobs"]["succeeded"] == 4
+    assert "llm" in result["endpoints"]["POST /evaluate"]["server_timing_mean_ms"]
+
+
+def test_parse_server_timing():
+    assert parse_server_timing('db;dur=1.5;desc="3x", llm;dur=20.0;desc="1x", total;dur=30.1') == {
+        "db": 1.5, "llm": 20.0, "total": 30.1,
+    }
+    assert parse_server_timing(None) == {}
+
+
+def test_endpoints_do_not_block_event_loop(tmp_path):
+    # Slow stand-ins make any synchronous Arkiv/Gemini call on the loop exceed the budget.
+    # Objects left by earlier tests are frozen, so a full collection of them is not reported as a block.
+    gc.collect()
+    gc.freeze()
+    try:
+        result = asyncio.run(run_async(
+            tmp_path, users=2, journeys=2, gemini_latency=0.2, arkiv_latency=0.2, workers=2, pool_size=2,
+            loop_budget=0.1,
+        ))
+    finally:
+        gc.unfreeze()
+
+    assert result["journeys"]["completed"] == 2
+    assert not result["loop_blocks"], "\n\n".join(
+        f"{route}: {block['count']}x, worst {block['max_ms']} ms\n{block['stack']}"
+        for route, block in result["loop_blocks"].items()
+    )
@@ -0,0 +1,69 @@
+"""/metrics output parses as the Prometheus text format, with consistent histogram series."""
+import asyncio
+import math
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.core.metrics import MetricsRegistry, exposition
+from src.core.timing import Histogram
+from src.routes import metrics as metrics_route
+
+parser = pytest.importorskip("prometheus_client.parser")
+
+
+def test_exposition_round_trips_through_prometheus_parser():
+    histogram = Histogram("request_seconds", "Request duration", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        histogram.observe(value, route='/a "quoted"\\path\nnext')
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events", ("kind",)).inc(3, kind="x")
+    gauge = registry.gauge("depth", "Queue depth", ("queue",))
+    gauge.set(2.5, queue="a")
+    gauge.set_function(lambda: 7, queue="b")
+    gauge.set_function(lambda: None, queue="gone")
+
+    families = {family.name: family for family in parser.text_string_to_metric_families(
+        exposition([histogram], registry.metrics())
+    )}
+
+    samples = {(s.name, tuple(sorted(s.labels.items()))): s.value for s in families["request_seconds"].samples}
+    route = ("route", '/a "quoted"\\path\nnext')
+    assert families["request_seconds"].type == "histogram"
+    assert samples[("request_seconds_bucket", (("le", "0.1"), route))] == 1
+    assert samples[("request_seconds_bucket", (("le", "1"), route))] == 2
+    assert samples[("request_seconds_bucket", (("le", "+Inf"), route))] == 3
+    assert samples[("request_seconds_count", (route,))] == 3
+    assert math.isclose(samples[("request_seconds_sum", (route,))], 2.55)
+    assert families["events"].type == "counter"
+    assert [(s.labels, s.value) for s in families["events"].samples] == [({"kind": "x"}, 3)]
+    assert {s.labels["queue"]: s.value for s in families["depth"].samples} == {"a": 2.5, "b": 7}
+
+
+def test_metrics_endpoint_parses():
+    app = FastAPI()
+    app.include_router(metrics_route.router)
+
+    async def scrape():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/metrics")
+
+    response = asyncio.run(scrape())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    families = list(parser.text_string_to_metric_families(response.text))
+    for family in families:
+        if family.type != "histogram":
+            continue
+        # Buckets are cumulative per series and the +Inf bucket equals the count
+        series = {}
+        for sample in family.samples:
+            key = tuple(sorted((k, v) for k, v in sample.labels.items() if k != "le"))
+            series.setdefault(key, {})[(sample.name, sample.labels.get("le"))] = sample.value
+        for values in series.values():
+            buckets = [value for (name, _), value in values.items() if name.endswith("_bucket")]
+            assert buckets == sorted(buckets)
+            assert values[(family.name + "_bucket", "+Inf")] == values[(family.name + "_count", None)]
+    assert {"http_requests_in_flight", "span_errors"} <= {family.name for family in families}
@@ -0,0 +1,74 @@
+"""Milestone releases: tracking against the fake chain, and the operator token on the endpoint."""
+import asyncio
+
+import httpx
+from pydantic import SecretStr
+
+from benchmarks.escrow_throughput import bench_deploys, create_projects, escrow_env
+from src.main import app
+from src.models.milestone_release import RELEASE_FINALIZED, MilestoneRelease, MilestoneReleaseItem
+from src.services.milestone_release import MilestoneReleaseService
+from src.settings.debug import DebugSettings
+from src.settings.substrate import SubstrateSettings
+
+
+def test_release_included_while_its_batch_was_submitting_is_found(tmp_path):
+    async def scenario():
+        async with escrow_env(tmp_path, pool_size=1, workers=1) as env:
+            project_ids = await create_projects(env, 2)
+            assert (await bench_deploys(env, project_ids, timeout=30))["succeeded"] == 2
+            async with env.session_factory() as session:
+                # Keeps the tracker scanning: an extrinsic that is never included
+                session.add(MilestoneRelease(
+                    batch_id="other", sponsored_project_id=project_ids[1], milestone_index=0, contract_address="",
+                    owner_account="", extrinsic_hash="0x" + "00" * 32, submitted_block=env.chain.head().number,
+                ))
+                await session.commit()
+
+            # The background tracker passes the block while the batch is still being submitted
+            submit_shard = env.releases._submit_shard
+
+            async def submit_then_track(releases, keypair):
+                await submit_shard(releases, keypair)
+                async with env.session_factory() as session:
+                    await env.releases.track_once(session)
+
+            env.releases._submit_shard = submit_then_track
+            async with env.session_factory() as session:
+                batch_id, _ = await env.releases.submit(
+                    [MilestoneReleaseItem(project_id=project_ids[0], milestone_index=0)], session
+                )
+            env.releases._submit_shard = submit_shard
+
+            async with env.session_factory() as session:
+                await env.releases.track_once(session)
+            async with env.session_factory() as session:
+                return await MilestoneReleaseService.list_batch(batch_id, session)
+
+    (release,) = asyncio.run(scenario())
+
+    assert release.status == RELEASE_FINALIZED
+    assert release.block_number > release.submitted_block
+
+
+def _release_milestones(headers: dict) -> int:
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/arkiv/escrow/release-milestones", json={"releases": []}, headers=headers
+            )
+            return response.status_code
+
+    return asyncio.run(request())
+
+
+def test_release_milestones_needs_the_operator_token(api_sessions, monkeypatch):
+    monkeypatch.setattr(DebugSettings, "ADMIN_TOKEN", SecretStr("admin"))
+    monkeypatch.setattr(SubstrateSettings, "OPERATOR_TOKEN", None)
+    assert _release_milestones({"X-Admin-Token": "admin"}) == 404
+
+    monkeypatch.setattr(SubstrateSettings, "OPERATOR_TOKEN", SecretStr("operator"))
+    assert _release_milestones({}) == 401
+    assert _release_milestones({"X-Admin-Token": "admin", "X-Operator-Token": "admin"}) == 401
+    # Past the gate: an empty request is rejected by the endpoint itself
+    assert _release_milestones({"X-Operator-Token": "operator"}) == 400
@@ -0,0 +1,51 @@
+"""Milestone summary of a project: one aggregate query over its milestones."""
+import asyncio
+
+import httpx
+
+from src.main import app
+from src.models import Milestone
+
+
+def _summary(project_id: str) -> httpx.Response:
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(f"/api/v1/arkiv/projects/{project_id}/milestones/summary")
+
+    return asyncio.run(request())
+
+
+def test_summary_totals_mixed_statuses(api_sessions):
+    async def seed():
+        async with api_sessions() as session:
+            session.add_all([
+                Milestone(project_id="p-1", name="Design", amount=250.0, released=True),
+                Milestone(project_id="p-1", name="Build", amount=500.5),
+                Milestone(project_id="p-1", name="Launch", amount=249.5, released=True),
+                Milestone(project_id="p-2", name="Other project", amount=1000.0, released=True),
+            ])
+            await session.commit()
+
+    asyncio.run(seed())
+    response = _summary("p-1")
+
+    assert response.status_code == 200
+    assert response.json() == {"project_id": "p-1", "count": 3, "total_amount": 1000.0, "released_amount": 499.5}
+
+
+def test_summary_of_a_project_without_milestones_is_zero(api_sessions):
+    response = _summary("p-empty")
+
+    assert response.status_code == 200
+    assert response.json() == {"project_id": "p-empty", "count": 0, "total_amount": 0.0, "released_amount": 0.0}
+
+
+def test_summary_when_nothing_is_released(api_sessions):
+    async def seed():
+        async with api_sessions() as session:
+            session.add_all([Milestone(project_id="p-1", name=f"M{i}", amount=100.0) for i in range(4)])
+            await session.commit()
+
+    asyncio.run(seed())
+
+    assert _summary("p-1").json() == {"project_id": "p-1", "count": 4, "total_amount": 400.0, "released_amount": 0.0}
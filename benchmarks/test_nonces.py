@@ -0,0 +1,33 @@
+"""Local signer nonces: failed nonces are reused and the counter never moves back."""
+import asyncio
+
+from src.services.nonces import NonceManager
+
+
+class _Node:
+    def __init__(self, next_index):
+        self.next_index = next_index
+
+    def get_account_nonce(self, address):
+        return self.next_index
+
+
+def test_released_nonce_is_reused_without_rewinding():
+    async def scenario():
+        nonces, node = NonceManager(), _Node(5)
+        first = [await nonces.reserve(node, "alice") for _ in range(3)]
+        # 6 failed while 7 is still in flight; the node has only seen 5
+        nonces.release("alice", 6)
+        refilled = await nonces.reserve(node, "alice")
+        after = await nonces.reserve(node, "alice")
+        # A released nonce the node shows as used is dropped
+        nonces.release("alice", 9)
+        node.next_index = 10
+        return first, refilled, after, await nonces.reserve(node, "alice")
+
+    first, refilled, after, resynced = asyncio.run(scenario())
+
+    assert first == [5, 6, 7]
+    assert refilled == 6
+    assert after == 8
+    assert resynced == 10
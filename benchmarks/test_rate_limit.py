@@ -0,0 +1,174 @@
+"""Rate limits: 429 with Retry-After per client bucket, the per-route concurrency cap, and the Redis store."""
+import asyncio
+import types
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from src.core import rate_limit as rate_limit_module
+from src.core.depends.rate_limit import get_rate_limiter, rate_limit
+from src.core.rate_limit import MemoryBucketStore, RateLimiter, RateLimitPolicy, RedisBucketStore
+
+# 2 requests at once, then one every 10 s
+POLICY = RateLimitPolicy("test", per_minute=6, burst=2, concurrency=10)
+
+
+def _app(limiter: RateLimiter, policy: RateLimitPolicy = POLICY, gate: asyncio.Event = None) -> FastAPI:
+    app = FastAPI()
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+
+    @app.post("/work", dependencies=[Depends(rate_limit(policy))])
+    async def work():
+        if gate is not None:
+            await gate.wait()
+        return {"ok": True}
+
+    return app
+
+
+def _client(app: FastAPI, address: str = "127.0.0.1") -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(address, 1234)), base_url="http://test")
+
+
+def test_over_the_burst_gets_429_with_retry_after():
+    limiter = RateLimiter(store=MemoryBucketStore(), enabled=True)
+
+    async def scenario():
+        async with _client(_app(limiter)) as client:
+            return [await client.post("/work") for _ in range(3)]
+
+    responses = asyncio.run(scenario())
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].headers["Retry-After"] == "10"
+    assert "rate limit" in responses[2].json()["detail"]
+
+
+def test_api_keys_share_the_address_bucket():
+    limiter = RateLimiter(store=MemoryBucketStore(), enabled=True)
+
+    async def scenario():
+        app = _app(limiter)
+        async with _client(app) as client:
+            statuses = [(await client.post("/work", headers={"X-API-Key": f"key-{i}"})).status_code for i in range(3)]
+        # From another address, key-0 is limited by its own bucket
+        async with _client(app, "10.0.0.2") as client:
+            statuses += [(await client.post("/work", headers={"X-API-Key": "key-0"})).status_code for _ in range(2)]
+        return statuses
+
+    # Rotating keys does not reset the address limit; key-0 had one token left
+    assert asyncio.run(scenario()) == [200, 200, 429, 200, 429]
+
+
+def test_concurrency_cap_rejects_without_waiting_and_frees_slots():
+    limiter = RateLimiter(store=MemoryBucketStore(), enabled=True)
+    policy = RateLimitPolicy("capped", per_minute=6000, burst=100, concurrency=2)
+
+    async def scenario():
+        gate = asyncio.Event()
+        async with _client(_app(limiter, policy, gate)) as client:
+            running = [asyncio.ensure_future(client.post("/work")) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            rejected = await client.post("/work")
+            gate.set()
+            done = await asyncio.gather(*running)
+            return rejected, done, await client.post("/work")
+
+    rejected, done, after = asyncio.run(scenario())
+
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "1"
+    assert "concurrency limit" in rejected.json()["detail"]
+    assert [response.status_code for response in done] == [200, 200]
+    assert after.status_code == 200
+    assert limiter.concurrency._active == {}
+
+
+def test_rate_rejection_releases_the_concurrency_slot():
+    limiter = RateLimiter(store=MemoryBucketStore(), enabled=True)
+    policy = RateLimitPolicy("single", per_minute=6, burst=1, concurrency=1)
+
+    async def scenario():
+        async with _client(_app(limiter, policy)) as client:
+            return [(await client.post("/work")).status_code for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [200, 429]
+    assert limiter.concurrency._active == {}
+
+
+def test_disabled_limiter_admits_everything():
+    limiter = RateLimiter(store=MemoryBucketStore(), enabled=False)
+
+    async def scenario():
+        async with _client(_app(limiter)) as client:
+            return [(await client.post("/work")).status_code for _ in range(5)]
+
+    assert asyncio.run(scenario()) == [200] * 5
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point `RedisBucketStore` at an in-process Redis stand-in with Lua scripting."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        rate_limit_module,
+        "redis",
+        types.SimpleNamespace(from_url=lambda url: fakeredis.aioredis.FakeRedis(server=server)),
+    )
+    return server
+
+
+def test_redis_buckets_are_shared_between_workers(fake_redis):
+    async def scenario():
+        workers = [RateLimiter(store=RedisBucketStore("redis://stand-in"), enabled=True) for _ in range(2)]
+        try:
+            statuses = []
+            for worker in (0, 1, 0):
+                async with _client(_app(workers[worker])) as client:
+                    statuses.append(await client.post("/work"))
+            return statuses
+        finally:
+            for worker in workers:
+                await worker.close()
+
+    responses = asyncio.run(scenario())
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].headers["Retry-After"] == "10"
+
+
+def test_redis_bucket_refills_at_the_policy_rate(fake_redis):
+    async def scenario():
+        store = RedisBucketStore("redis://stand-in")
+        try:
+            waits = [await store.take("bucket", rate=20.0, capacity=1) for _ in range(2)]
+            await asyncio.sleep(0.1)
+            waits.append(await store.take("bucket", rate=20.0, capacity=1))
+            return waits
+        finally:
+            await store.close()
+
+    first, second, refilled = asyncio.run(scenario())
+
+    assert first == 0.0
+    assert 0 < second <= 0.05
+    assert refilled == 0.0
+
+
+def test_unreachable_redis_lets_requests_through(fake_redis):
+    async def scenario():
+        store = RedisBucketStore("redis://stand-in")
+
+        async def unreachable(**kwargs):
+            raise ConnectionError("connection refused")
+
+        store._take = unreachable
+        try:
+            return [await store.take("bucket", rate=0.1, capacity=1) for _ in range(3)]
+        finally:
+            await store.close()
+
+    assert asyncio.run(scenario()) == [0.0, 0.0, 0.0]
@@ -0,0 +1,116 @@
+"""Read-your-writes: a client that committed a write reads from the primary until the window ends."""
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+
+from src.core.depends import db
+from src.models.milestone import Milestone
+from src.settings.db import DatabaseSettings
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """An app whose GET /which answers "primary" or "replica" for the session it was given."""
+    engines = {
+        name: create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db", poolclass=NullPool)
+        for name in ("primary", "replica")
+    }
+
+    async def create_tables():
+        for engine in engines.values():
+            async with engine.begin() as connection:
+                await connection.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_tables())
+    factories = {
+        name: sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        for name, engine in engines.items()
+    }
+    monkeypatch.setattr(db, "read_engine", engines["replica"])
+    monkeypatch.setattr(db, "AsyncSessionLocal", factories["primary"])
+    monkeypatch.setattr(db, "AsyncReadSessionLocal", factories["replica"])
+    monkeypatch.setattr(db, "_primary_pins", {})
+
+    app = FastAPI()
+
+    @app.post("/milestones")
+    async def write(session: AsyncSession = Depends(db.get_async_session)):
+        session.add(Milestone(project_id="p", name="m", amount=1.0))
+        await session.commit()
+
+    @app.post("/noop")
+    async def commit_without_writes(session: AsyncSession = Depends(db.get_async_session)):
+        await session.commit()
+
+    @app.get("/which")
+    async def which(session: AsyncSession = Depends(db.get_read_session)):
+        return "primary" if session.get_bind() is engines["primary"].sync_engine else "replica"
+
+    yield app
+    asyncio.run(engines["primary"].dispose())
+    asyncio.run(engines["replica"].dispose())
+
+
+def _run(app, scenario):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await scenario(client)
+
+    return asyncio.run(run())
+
+
+def _which(client, client_id):
+    return client.get("/which", headers={db.CLIENT_ID_HEADER: client_id})
+
+
+def test_writer_reads_from_primary_others_from_replica(replica_app):
+    async def scenario(client):
+        before = (await _which(client, "alice")).json()
+        await client.post("/milestones", headers={db.CLIENT_ID_HEADER: "alice"})
+        return before, (await _which(client, "alice")).json(), (await _which(client, "bob")).json()
+
+    assert _run(replica_app, scenario) == ("replica", "primary", "replica")
+
+
+def test_commit_without_writes_does_not_pin(replica_app):
+    async def scenario(client):
+        await client.post("/noop", headers={db.CLIENT_ID_HEADER: "alice"})
+        return (await _which(client, "alice")).json()
+
+    assert _run(replica_app, scenario) == "replica"
+
+
+def test_pin_expires_after_the_window(replica_app, monkeypatch):
+    monkeypatch.setattr(DatabaseSettings, "READ_YOUR_WRITES_SECONDS", 0.05)
+
+    async def scenario(client):
+        await client.post("/milestones", headers={db.CLIENT_ID_HEADER: "alice"})
+        pinned = (await _which(client, "alice")).json()
+        await asyncio.sleep(0.1)
+        return pinned, (await _which(client, "alice")).json()
+
+    assert _run(replica_app, scenario) == ("primary", "replica")
+
+
+def test_remote_address_identifies_clients_without_a_header(replica_app):
+    async def scenario(client):
+        await client.post("/milestones")
+        return (await client.get("/which")).json(), (await _which(client, "bob")).json()
+
+    assert _run(replica_app, scenario) == ("primary", "replica")
+
+
+def test_expired_pins_are_dropped_when_full(monkeypatch):
+    monkeypatch.setattr(db, "_primary_pins", {"old": time.monotonic() - 1, "live": time.monotonic() + 60})
+    monkeypatch.setattr(db, "_MAX_PINS", 2)
+
+    db.pin_to_primary("new")
+
+    assert set(db._primary_pins) == {"live", "new"}
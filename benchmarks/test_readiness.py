@@ -0,0 +1,155 @@
+"""Readiness probe: cached results, per-check timeouts, and the database as the only hard dependency."""
+import asyncio
+import threading
+
+import httpx
+from fastapi import FastAPI
+
+from src.core.depends.health import get_readiness_probe
+from src.routes import healthcheck
+from src.services.readiness import ReadinessProbe, substrate_check
+from src.services.substrate_pool import SubstratePool
+
+
+class _Check:
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+
+def test_concurrent_probes_share_one_cached_refresh():
+    database = _Check(delay=0.05)
+    probe = ReadinessProbe({"database": database}, timeout=1.0, cache_seconds=60, critical=("database",))
+
+    async def scenario():
+        results = await asyncio.gather(*(probe.check() for _ in range(10)))
+        return results, await probe.check()
+
+    results, cached = asyncio.run(scenario())
+
+    assert database.calls == 1
+    assert all(result is cached for result in results)
+    assert cached.ready and not cached.degraded
+
+
+def test_result_is_refreshed_after_cache_expires():
+    database = _Check()
+    probe = ReadinessProbe({"database": database}, timeout=1.0, cache_seconds=0, critical=("database",))
+
+    async def scenario():
+        await probe.check()
+        await probe.check()
+
+    asyncio.run(scenario())
+
+    assert database.calls == 2
+
+
+def test_slow_check_times_out_without_delaying_the_others():
+    probe = ReadinessProbe(
+        {"database": _Check(delay=5.0), "arkiv": _Check()}, timeout=0.1, cache_seconds=0, critical=("database",)
+    )
+
+    result = asyncio.run(asyncio.wait_for(probe.check(), 1.0))
+
+    assert not result.ready
+    assert result.checks["database"].error == "timed out after 0.1s"
+    assert result.checks["arkiv"].ok
+
+
+def _ready(probe: ReadinessProbe) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(healthcheck.router)
+    app.dependency_overrides[get_readiness_probe] = lambda: probe
+
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/healthcheck/ready")
+
+    return asyncio.run(request())
+
+
+def test_unreachable_chain_reports_degraded_not_unavailable():
+    probe = ReadinessProbe(
+        {"database": _Check(), "arkiv": _Check(error=ConnectionError("refused")), "substrate": _Check(delay=5.0)},
+        timeout=0.1,
+        cache_seconds=0,
+        critical=("database",),
+    )
+
+    response = _ready(probe)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["checks"]["arkiv"]["error"] == "refused"
+    assert body["checks"]["arkiv"]["critical"] is False
+    assert body["checks"]["substrate"]["error"] == "timed out after 0.1s"
+
+
+def test_unreachable_database_is_unavailable():
+    probe = ReadinessProbe(
+        {"database": _Check(error=OSError("connection refused")), "arkiv": _Check()},
+        timeout=0.1,
+        cache_seconds=0,
+        critical=("database",),
+    )
+
+    response = _ready(probe)
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+    assert response.json()["checks"]["database"]["critical"] is True
+
+
+class _HangingConnection:
+    """A Substrate connection whose `system_health` blocks until `release` is set."""
+
+    release = threading.Event()
+
+    def __init__(self, url: str, cache_region=None):
+        self.closed = False
+
+    def init_runtime(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def rpc_request(self, method: str, params: list) -> dict:
+        self.release.wait(5.0)
+        return {"result": {}}
+
+
+def test_timed_out_substrate_ping_does_not_return_its_connection():
+    opened = []
+
+    def factory(**kwargs):
+        opened.append(_HangingConnection(**kwargs))
+        return opened[-1]
+
+    pool = SubstratePool("ws://node", size=1, acquire_timeout=1.0, factory=factory)
+    probe = ReadinessProbe({"substrate": substrate_check(pool)}, timeout=0.1, cache_seconds=0)
+
+    async def scenario():
+        await pool.start()
+        await pool.wait_ready()
+        result = await probe.check()
+        async with pool.connection() as next_borrowed:
+            pass
+        _HangingConnection.release.set()
+        await pool.close()
+        return result, next_borrowed
+
+    result, next_borrowed = asyncio.run(scenario())
+
+    assert result.checks["substrate"].error == "timed out after 0.1s"
+    assert opened[0].closed
+    assert next_borrowed is opened[1]
@@ -0,0 +1,152 @@
+"""Request coalescing and job joining: shared flights, caller cancellation and one unfinished job per project."""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+
+from src.core.single_flight import KeyedLock, SingleFlight
+from src.models.escrow_job import ESCROW_JOB_SUCCEEDED, EscrowDeploymentJob
+from src.services.escrow_jobs import EscrowJobService
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": 42}
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+        return results, flight.in_flight(), await flight.do("key", compute)
+
+    results, in_flight, later = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert all(result is results[0] for result in results)
+    # The key is forgotten once the flight lands: a later call runs again
+    assert in_flight == 0 and later == {"answer": 42}
+
+
+def test_errors_are_shared_with_every_caller():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [str(result) for result in results] == ["boom"] * 3
+
+
+def test_cancelled_caller_does_not_cancel_the_flight():
+    flight = SingleFlight("test")
+    finished = []
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("key", compute))
+        follower = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "done"
+    assert finished == [1]
+
+
+def test_keyed_lock_serializes_per_key_and_forgets_it():
+    lock = KeyedLock()
+    events = []
+
+    async def hold(key, name):
+        async with lock.hold(key):
+            events.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} out")
+
+    async def scenario():
+        await asyncio.gather(hold("a", "first"), hold("a", "second"), hold("b", "other"))
+
+    asyncio.run(scenario())
+
+    assert events.index("first out") < events.index("second in")
+    assert events.index("other in") < events.index("first out")
+    assert lock._locks == {}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+
+    async def create_tables():
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_tables())
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    asyncio.run(engine.dispose())
+
+
+async def _jobs(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(EscrowDeploymentJob))).scalars().all()
+
+
+def test_concurrent_requests_join_one_job(session_factory):
+    async def request():
+        async with session_factory() as session:
+            return await EscrowJobService.create_or_join(7, session)
+
+    async def scenario():
+        return await asyncio.gather(*(request() for _ in range(5))), await _jobs(session_factory)
+
+    results, jobs = asyncio.run(scenario())
+
+    assert len(jobs) == 1
+    assert {job.id for job, _ in results} == {jobs[0].id}
+    assert [created for _, created in results].count(True) == 1
+
+
+def test_insert_skips_when_another_process_won(session_factory):
+    async def scenario():
+        async with session_factory() as session:
+            # Bypasses this process's lock, like a request handled by another worker
+            first = await EscrowJobService._insert_active(7, session)
+            second = await EscrowJobService._insert_active(7, session)
+            joined, created = await EscrowJobService.create_or_join(7, session)
+        return first, second, joined, created, await _jobs(session_factory)
+
+    first, second, joined, created, jobs = asyncio.run(scenario())
+
+    assert (first, second) == (True, False)
+    assert not created and [job.id for job in jobs] == [joined.id]
+
+
+def test_finished_job_lets_a_new_one_start(session_factory):
+    async def scenario():
+        async with session_factory() as session:
+            job, _ = await EscrowJobService.create_or_join(7, session)
+            job.status = ESCROW_JOB_SUCCEEDED
+            await session.commit()
+            relaunch, created = await EscrowJobService.create_or_join(7, session)
+        return job, relaunch, created
+
+    job, relaunch, created = asyncio.run(scenario())
+
+    assert created and relaunch.id != job.id
+    assert relaunch.salt != job.salt
@@ -0,0 +1,120 @@
+"""GET /sponsored filters, sorting and search: Postgres full-text query, ILIKE fallback elsewhere."""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+
+from src.main import app
+from src.models.sponsor import SponsoredProject, SponsoredProjectFilter
+from src.services.sponsor import SponsoredProjectService
+from src.settings.http import HTTPSettings
+
+BASE = "/api/v1/arkiv/sponsored"
+
+PROJECTS = [
+    {"name": "Solar grid", "description": "Community SOLAR panels", "status": "approved", "chain": "asset_hub",
+     "ai_score": 90.0, "budget": 500.0},
+    {"name": "Wind farm", "description": "Offshore turbines", "status": "submitted", "chain": "asset_hub",
+     "ai_score": 70.0, "budget": 2000.0},
+    {"name": "Water wells", "description": None, "status": "approved", "chain": "moonbeam",
+     "ai_score": 60.0, "budget": 100.0},
+    {"name": "Solar cookers", "description": "Clean cooking", "status": "rejected", "chain": "asset_hub",
+     "ai_score": 40.0, "budget": 50.0},
+]
+
+
+@pytest.fixture(params=[False, True], ids=["orm", "fast_json"])
+def serialization(request, monkeypatch):
+    monkeypatch.setattr(HTTPSettings, "FAST_LIST_SERIALIZATION", request.param)
+
+
+def _names(api_sessions, params, projects=PROJECTS):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for index, project in enumerate(projects):
+                response = await client.post(BASE, json={
+                    "project_id": f"p-{index}", "repo": "https://example.com", "contract_address": "0x1", **project,
+                })
+                assert response.status_code == 201
+            response = await client.get(BASE, params=params)
+            assert response.status_code == 200
+            return [project["name"] for project in response.json()]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"status": ["approved", "rejected"]}, ["Solar grid", "Water wells", "Solar cookers"]),
+    ({"status_filter": "submitted"}, ["Wind farm"]),
+    ({"chain": "moonbeam"}, ["Water wells"]),
+    ({"min_ai_score": 60, "max_ai_score": 80}, ["Wind farm", "Water wells"]),
+    ({"min_budget": 100, "max_budget": 500}, ["Solar grid", "Water wells"]),
+    ({"sort": "-budget"}, ["Wind farm", "Solar grid", "Water wells", "Solar cookers"]),
+    ({"sort": "score", "limit": 2}, ["Solar cookers", "Water wells"]),
+    ({"sort": "score", "skip": 3}, ["Solar grid"]),
+])
+def test_filters_and_sorting(api_sessions, serialization, params, expected):
+    assert _names(api_sessions, params) == expected
+
+
+@pytest.mark.parametrize("q, expected", [
+    # Case-insensitive substring of the name or the description (NULL descriptions are skipped)
+    ("solar", ["Solar grid", "Solar cookers"]),
+    ("TURBINE", ["Wind farm"]),
+    ("well", ["Water wells"]),
+    ("nothing", []),
+    # LIKE wildcards and the escape character in `q` are matched literally
+    ("%", []),
+    ("sol_r", []),
+    ("\\", []),
+])
+def test_search_falls_back_to_ilike(api_sessions, serialization, q, expected):
+    assert _names(api_sessions, {"q": q}) == expected
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("100%", ["100% solar"]),
+    ("solar_", ["solar_power"]),
+    ("c:\\", ["c:\\temp"]),
+    ("%solar", []),
+])
+def test_search_matches_wildcard_characters_literally(api_sessions, q, expected):
+    projects = [{**PROJECTS[0], "name": name} for name in ("100% solar", "solar_power", "c:\\temp", "100 solar")]
+
+    assert _names(api_sessions, {"q": q}, projects) == expected
+
+
+def test_search_combines_with_filters(api_sessions):
+    assert _names(api_sessions, {"q": "solar", "status": "approved"}) == ["Solar grid"]
+
+
+def test_invalid_sort_is_rejected(api_sessions):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(BASE, params={"sort": "name"})
+
+    assert asyncio.run(run()).status_code == 422
+
+
+def _sql(dialect_name, dialect):
+    stmt = SponsoredProjectService._apply_filter(
+        select(SponsoredProject), SponsoredProjectFilter(q="solar panels"), dialect_name
+    )
+    return str(stmt.compile(dialect=dialect))
+
+
+def test_postgres_uses_the_full_text_index():
+    compiled = _sql("postgresql", postgresql.dialect())
+
+    assert "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))" in compiled
+    assert "@@ websearch_to_tsquery('english'" in compiled
+    assert "ILIKE" not in compiled.upper()
+
+
+def test_other_dialects_use_ilike():
+    compiled = _sql("sqlite", sqlite.dialect())
+
+    assert "tsvector" not in compiled
+    assert compiled.lower().count("like") == 2
@@ -0,0 +1,160 @@
+"""Substrate connection pool: size limit, reconnects, shutdown and cancelled borrowers."""
+import asyncio
+import threading
+
+import pytest
+
+from src.services.substrate_pool import SubstratePool, SubstrateUnavailable
+
+
+class _Connection:
+    def __init__(self, url: str, cache_region=None, **kwargs):
+        self.url = url
+        self.closed = False
+
+    def init_runtime(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def rpc_request(self, method: str, params: list) -> dict:
+        return {"result": {}}
+
+
+class _Factory:
+    """Opens `_Connection`s, failing the first `failures` attempts."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.opened = []
+
+    def __call__(self, **kwargs) -> _Connection:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionRefusedError("refused")
+        connection = _Connection(**kwargs)
+        self.opened.append(connection)
+        return connection
+
+
+def _pool(factory: _Factory, size: int = 2) -> SubstratePool:
+    return SubstratePool("ws://node", size=size, acquire_timeout=0.2, max_backoff=0.1, factory=factory)
+
+
+def test_pool_lends_at_most_size_connections():
+    factory = _Factory()
+    pool = _pool(factory, size=2)
+
+    async def scenario():
+        await pool.start()
+        assert await pool.wait_ready()
+        await asyncio.sleep(0.05)
+        async with pool.connection() as first, pool.connection() as second:
+            with pytest.raises(SubstrateUnavailable):
+                async with pool.connection(timeout=0.05):
+                    pass
+            lent = {first, second}
+        idle = pool.idle_connections
+        await pool.close()
+        return lent, idle
+
+    lent, idle = asyncio.run(scenario())
+
+    assert len(factory.opened) == 2
+    assert lent == set(factory.opened)
+    assert idle == 2
+
+
+def test_connection_error_discards_and_reconnects():
+    factory = _Factory()
+    pool = _pool(factory, size=1)
+
+    async def scenario():
+        await pool.start()
+        await pool.wait_ready()
+        with pytest.raises(ConnectionResetError):
+            async with pool.connection():
+                raise ConnectionResetError("socket closed")
+        async with pool.connection() as replacement:
+            pass
+        await pool.close()
+        return replacement
+
+    replacement = asyncio.run(scenario())
+
+    broken, reopened = factory.opened
+    assert broken.closed
+    assert replacement is reopened
+
+
+def test_failed_connects_are_retried():
+    factory = _Factory(failures=2)
+    pool = _pool(factory, size=1)
+
+    async def scenario():
+        await pool.start()
+        ready = await pool.wait_ready(timeout=5.0)
+        await pool.close()
+        return ready
+
+    assert asyncio.run(scenario())
+    assert len(factory.opened) == 1
+
+
+def test_close_closes_idle_connections_and_lent_ones_on_return():
+    factory = _Factory()
+    pool = _pool(factory, size=2)
+
+    async def scenario():
+        await pool.start()
+        await pool.wait_ready()
+        await asyncio.sleep(0.05)
+        async with pool.connection() as lent:
+            await pool.close()
+            idle = next(connection for connection in factory.opened if connection is not lent)
+            assert idle.closed and not lent.closed
+        with pytest.raises(SubstrateUnavailable):
+            async with pool.connection():
+                pass
+        return lent
+
+    lent = asyncio.run(scenario())
+
+    assert lent.closed
+
+
+def test_cancelled_borrower_does_not_return_a_busy_connection():
+    factory = _Factory()
+    pool = _pool(factory, size=1)
+    in_call = threading.Event()
+    finish = threading.Event()
+
+    def slow_call():
+        in_call.set()
+        finish.wait(5.0)
+
+    async def borrow():
+        async with pool.connection() as substrate:
+            await asyncio.to_thread(slow_call)
+            return substrate
+
+    async def scenario():
+        await pool.start()
+        await pool.wait_ready()
+        task = asyncio.create_task(borrow())
+        await asyncio.to_thread(in_call.wait, 5.0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        async with pool.connection() as next_borrowed:
+            pass
+        finish.set()
+        await pool.close()
+        return next_borrowed
+
+    next_borrowed = asyncio.run(scenario())
+
+    busy, replacement = factory.opened
+    assert busy.closed
+    assert next_borrowed is replacement
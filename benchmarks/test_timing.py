@@ -0,0 +1,27 @@
+"""Query timing: a failed statement does not leave its start time on the pooled connection."""
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.timing import instrument_engine
+
+
+def test_failed_query_pops_its_start_time(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'timing.db'}", pool_size=1)
+        instrument_engine(engine)
+        try:
+            async with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM missing_table"))
+                await conn.rollback()
+                await conn.execute(text("SELECT 1"))
+                raw = await conn.get_raw_connection()
+                return list(raw.info.get("timing_start", []))
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(scenario()) == []
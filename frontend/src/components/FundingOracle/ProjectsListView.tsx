@@ -116,7 +116,11 @@ export const ProjectsListView: React.FC = () => {
     setLaunchingId(projectId);
     setLaunchMessages(prev => ({ ...prev, [projectId]: "Desplegando escrow..." }));
     try {
-      const result = await ProjectService.deployEscrow(projectId);
+      const result = await ProjectService.deployEscrow(projectId, (job) => {
+        const step = job.completed_steps[job.completed_steps.length - 1];
+        const progress = step ? `Desplegando escrow... (${step})` : "Desplegando escrow...";
+        setLaunchMessages(prev => ({ ...prev, [projectId]: progress }));
+      });
       
       if (result.success) {
         // Actualizar el proyecto con la dirección del contrato
@@ -47,6 +47,7 @@ export const arkivAPI = {
   evaluate: (projectId: number) => `${API_PREFIX}/evaluate?project_id=${projectId}`,
   deployEscrow: () => `${API_PREFIX}/escrow/deploy-escrow`,
   getEscrowInfo: (projectId: number) => `${API_PREFIX}/escrow/escrow-info/${projectId}`,
+  getEscrowJob: (jobId: number) => `${API_PREFIX}/escrow/jobs/${jobId}`,
 };
 
 // =====================
@@ -37,6 +37,18 @@ export interface SponsoredProject {
   updated_at?: string;
 }
 
+export interface EscrowDeploymentJob {
+  job_id: number;
+  sponsored_project_id: number;
+  status: "queued" | "running" | "succeeded" | "failed";
+  step?: string;
+  completed_steps: string[];
+  attempts: number;
+  contract_address?: string;
+  arkiv_updated: boolean;
+  error?: string;
+}
+
 export interface EvaluationResult {
   ai_score: number;
   decision: string;
@@ -157,9 +169,28 @@ export class ProjectService {
   // ==================
   // Escrow Operations
   // ==================
-  static async deployEscrow(projectId: number): Promise<{ success: boolean; contract_address: string }> {
+  static async deployEscrow(
+    projectId: number,
+    onProgress?: (job: EscrowDeploymentJob) => void
+  ): Promise<{ success: boolean; contract_address: string }> {
+    // Deployment runs as a background job: queue it, then poll until it finishes
     const url = `${arkivAPI.deployEscrow()}?project_id=${projectId}`;
-    return apiCall<{ success: boolean; contract_address: string }>("POST", url);
+    const { job_id } = await apiCall<{ job_id: number }>("POST", url);
+    for (;;) {
+      const job = await this.getEscrowJob(job_id);
+      onProgress?.(job);
+      if (job.status === "succeeded") {
+        return { success: true, contract_address: job.contract_address || "" };
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error || "Escrow deployment failed");
+      }
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+  }
+
+  static async getEscrowJob(jobId: number): Promise<EscrowDeploymentJob> {
+    return apiCall<EscrowDeploymentJob>("GET", arkivAPI.getEscrowJob(jobId));
   }
 
   static async getEscrowInfo(projectId: number): Promise<any> {
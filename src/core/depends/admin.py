@@ -0,0 +1,26 @@
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+from pydantic import SecretStr
+
+from src.settings.debug import DebugSettings
+from src.settings.substrate import SubstrateSettings
+
+
+def _check_token(expected: Optional[SecretStr], given: Optional[str], detail: str) -> None:
+    """404 when no token is configured, 401 unless `given` matches it."""
+    if expected is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not given or not secrets.compare_digest(given.encode(), expected.get_secret_value().encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Allow the request only with the `DEBUG_ADMIN_TOKEN` in `X-Admin-Token`; 404 when no token is configured."""
+    _check_token(DebugSettings.ADMIN_TOKEN, x_admin_token, "Invalid admin token")
+
+
+def require_operator_token(x_operator_token: Optional[str] = Header(None)) -> None:
+    """Allow the request only with the `ESCROW_OPERATOR_TOKEN` in `X-Operator-Token`; 404 when no token is configured."""
+    _check_token(SubstrateSettings.OPERATOR_TOKEN, x_operator_token, "Invalid operator token")
@@ -13,6 +13,6 @@ def get_arkiv_client() -> Arkiv:
         ArkivSettings.PRIVATE_NAME, ArkivSettings.PRIVATE_KEY.get_secret_value()
     )
     client = Arkiv(provider, account=account)
-    logger.info("Connecting to: {}", client.is_connected())
-    logger.info("Account: {}", client.eth.default_account)
+    # No is_connected() here: it is an RPC round trip on every request
+    logger.debug("Arkiv client for {} as {}", ArkivSettings.HTTP_PROVIDER, client.eth.default_account)
     return client
@@ -3,31 +3,121 @@
 Provides:
 - engine: AsyncEngine built from `DBSettings.sqlalchemy_url` (converted
   to use asyncpg when appropriate)
+- read_engine: optional AsyncEngine for a read replica (`DATABASE_READ_HOST`)
 - AsyncSessionLocal: sessionmaker factory producing AsyncSession
-- get_async_session: FastAPI dependency that yields an AsyncSession
+- AsyncReadSessionLocal: sessionmaker bound to the replica (or the primary
+  when no replica is configured)
+- get_async_session: FastAPI dependency that yields a primary AsyncSession
+- get_read_session: FastAPI dependency for read-only routes
+
+Both engines are instrumented with `instrument_engine`, so every query is
+recorded as a `db` span (Server-Timing and timing histograms), and their
+connection pools are reported by `/metrics`.
+
+Read-your-writes: when a session from `get_async_session` commits changes,
+the calling client is pinned to the primary for
+`DATABASE_READ_YOUR_WRITES_SECONDS`, so its next reads do not hit a lagging
+replica. Clients are identified by the `X-Client-Id` header, falling back to
+the remote address. Pins are kept per process.
 
 This module uses SQLAlchemy's async APIs and is compatible with sqlmodel.
 """
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Dict, Optional
 
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     create_async_engine)
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
+from src.core.metrics import DB_POOL_CONNECTIONS
+from src.core.timing import instrument_engine
 from src.settings.db import DatabaseSettings
 
 # Create async engine
 # Use future=True for SQLAlchemy 2.0 style
 engine: AsyncEngine = create_async_engine(DatabaseSettings.get_url, future=True)
 
+# Optional read replica engine
+read_engine: Optional[AsyncEngine] = (
+    create_async_engine(DatabaseSettings.get_read_url, future=True)
+    if DatabaseSettings.get_read_url
+    else None
+)
+
+
+
+def _report_pool(async_engine: AsyncEngine, name: str) -> None:
+    pool = async_engine.sync_engine.pool
+    # Queue pools only (not the static/null pools of in-memory SQLite)
+    if not hasattr(pool, "checkedout"):
+        return
+    DB_POOL_CONNECTIONS.set_function(pool.size, engine=name, state="size")
+    DB_POOL_CONNECTIONS.set_function(pool.checkedout, engine=name, state="checked_out")
+    DB_POOL_CONNECTIONS.set_function(pool.checkedin, engine=name, state="idle")
+    DB_POOL_CONNECTIONS.set_function(lambda: max(pool.overflow(), 0), engine=name, state="overflow")
+
+
+instrument_engine(engine)
+_report_pool(engine, "primary")
+if read_engine is not None:
+    instrument_engine(read_engine)
+    _report_pool(read_engine, "replica")
 
-# Async session factory
+
+# Async session factories
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
 )
+AsyncReadSessionLocal = sessionmaker(
+    read_engine or engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+)
+
+CLIENT_ID_HEADER = "X-Client-Id"
+_MAX_PINS = 10_000
+
+# client key -> monotonic deadline until which its reads go to the primary
+_primary_pins: Dict[str, float] = {}
+
+
+def _client_key(request: Request) -> Optional[str]:
+    client_id = request.headers.get(CLIENT_ID_HEADER)
+    if client_id:
+        return client_id
+    return request.client.host if request.client else None
+
+
+def pin_to_primary(client_key: str) -> None:
+    """Route `client_key`'s reads to the primary for the read-your-writes window."""
+    now = time.monotonic()
+    if len(_primary_pins) >= _MAX_PINS:
+        for key, deadline in list(_primary_pins.items()):
+            if deadline <= now:
+                del _primary_pins[key]
+    _primary_pins[client_key] = now + DatabaseSettings.READ_YOUR_WRITES_SECONDS
 
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+def is_pinned_to_primary(client_key: Optional[str]) -> bool:
+    if client_key is None:
+        return False
+    deadline = _primary_pins.get(client_key)
+    return deadline is not None and deadline > time.monotonic()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer(session: Session) -> None:
+    client_key = session.info.get("client_key")
+    if client_key and session.info.pop("wrote", False):
+        pin_to_primary(client_key)
+
+
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency that yields an AsyncSession and closes it.
 
     Usage:
@@ -36,4 +126,25 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
 
     async with AsyncSessionLocal() as session:
+        session.info["client_key"] = _client_key(request)
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency that yields an AsyncSession for read-only routes.
+
+    Uses the read replica when one is configured and the client has not
+    written recently; otherwise falls back to the primary.
+
+    Usage:
+        async def endpoint(db: AsyncSession = Depends(get_read_session)):
+            ...
+    """
+
+    if read_engine is None or is_pinned_to_primary(_client_key(request)):
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = AsyncReadSessionLocal
+
+    async with session_factory() as session:
         yield session
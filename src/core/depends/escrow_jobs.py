@@ -0,0 +1,6 @@
+from src.services.escrow_jobs import EscrowJobRunner, escrow_job_runner
+
+
+def get_escrow_job_runner() -> EscrowJobRunner:
+    """Return the app-wide escrow deployment job runner (started by the app lifespan)."""
+    return escrow_job_runner
@@ -0,0 +1,6 @@
+from src.services.readiness import ReadinessProbe, readiness_probe
+
+
+def get_readiness_probe() -> ReadinessProbe:
+    """Return the app-wide readiness probe (its result is cached across requests)."""
+    return readiness_probe
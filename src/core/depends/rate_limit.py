@@ -0,0 +1,36 @@
+import math
+from typing import AsyncIterator, Callable
+
+from fastapi import Depends, HTTPException, Request, status
+
+from src.core.rate_limit import RateLimiter, RateLimitExceeded, RateLimitPolicy, rate_limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the app-wide rate limiter."""
+    return rate_limiter
+
+
+def rate_limit(policy: RateLimitPolicy) -> Callable[..., AsyncIterator[None]]:
+    """Dependency applying `policy` to a route: 429 with `Retry-After` when over the limit.
+
+    Use it as `dependencies=[Depends(rate_limit(LLM_POLICY))]`; the route's
+    concurrency slot is held until the endpoint returns.
+    """
+
+    async def dependency(request: Request, limiter: RateLimiter = Depends(get_rate_limiter)) -> AsyncIterator[None]:
+        route = f"{request.method} {getattr(request.scope.get('route'), 'path', request.url.path)}"
+        try:
+            slot = await limiter.acquire(policy, route, request)
+        except RateLimitExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(e),
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+        try:
+            yield
+        finally:
+            limiter.release(slot)
+
+    return dependency
@@ -0,0 +1,24 @@
+from src.services.substrate_pool import SubstratePool, substrate_pool
+from src.services.escrow_events import EscrowEventFollower, escrow_event_follower
+from src.services.escrow_state import EscrowStateReader, escrow_state_reader
+from src.services.milestone_release import MilestoneReleaseService, milestone_release_service
+
+
+def get_substrate_pool() -> SubstratePool:
+    """Return the app-wide Substrate connection pool (started by the app lifespan)."""
+    return substrate_pool
+
+
+def get_escrow_state_reader() -> EscrowStateReader:
+    """Return the app-wide escrow state reader (its cache is shared across requests)."""
+    return escrow_state_reader
+
+
+def get_milestone_release_service() -> MilestoneReleaseService:
+    """Return the app-wide milestone release service (its tracker is started by the app lifespan)."""
+    return milestone_release_service
+
+
+def get_escrow_event_follower() -> EscrowEventFollower:
+    """Return the app-wide escrow event follower (started by the app lifespan)."""
+    return escrow_event_follower
@@ -0,0 +1,29 @@
+"""Pre-encoded JSON responses for list endpoints.
+
+The default path validates every SQLModel instance against the
+`response_model` and encodes it with the stdlib `json`. For large pages the
+fast path instead selects the needed columns as plain row tuples and encodes
+them with orjson in a single call. Enabled with `HTTP_FAST_LIST_SERIALIZATION`.
+"""
+from typing import Any, Sequence
+
+import orjson
+from fastapi import Response
+
+from src.settings.http import HTTPSettings
+
+
+def enabled() -> bool:
+    return HTTPSettings.FAST_LIST_SERIALIZATION
+
+
+def encode_rows(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """Encode row tuples as a JSON array of objects keyed by `columns`.
+
+    UTC datetimes end in `Z`, as pydantic writes them on the default path.
+    """
+    return orjson.dumps([dict(zip(columns, row)) for row in rows], option=orjson.OPT_UTC_Z)
+
+
+def rows_response(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> Response:
+    return Response(content=encode_rows(columns, rows), media_type="application/json")
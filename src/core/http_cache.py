@@ -0,0 +1,117 @@
+"""Conditional GET support and an in-process response cache.
+
+Read endpoints compute a cheap version (e.g. `updated_at`, or
+`max(updated_at)` plus row count for lists) and derive a weak ETag from it.
+`lookup` answers `If-None-Match` with `304 Not Modified`, or replays a
+previously serialized body from `response_cache`; only on a miss does the
+endpoint load and serialize the data through `store`.
+
+Cached bodies are keyed by ETag, so a stale entry can never be served even
+across workers; the service layer still calls `response_cache.invalidate`
+after writes so memory is released promptly.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from src.core.metrics import CACHE_REQUESTS
+from src.settings.http import HTTPSettings
+
+
+def weak_etag(*parts: Any) -> str:
+    """Build a weak ETag from the given version parts."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on both sides
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={HTTPSettings.MAX_AGE}, must-revalidate",
+    }
+
+
+class ResponseCache:
+    """LRU of serialized JSON bodies grouped by namespace and keyed by ETag."""
+
+    def __init__(self, max_entries: int, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, bytes]]" = OrderedDict()
+
+    def get(self, namespace: str, key: str, etag: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get((namespace, key))
+        if entry is None or entry[0] != etag:
+            CACHE_REQUESTS.inc(cache="http_response", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="http_response", result="hit")
+        self._entries.move_to_end((namespace, key))
+        return entry[1]
+
+    def set(self, namespace: str, key: str, etag: str, body: bytes) -> None:
+        if not self.enabled:
+            return
+        self._entries[(namespace, key)] = (etag, body)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str) -> None:
+        """Drop every cached response in `namespace` (called after writes)."""
+        for cache_key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[cache_key]
+
+
+response_cache = ResponseCache(
+    max_entries=HTTPSettings.RESPONSE_CACHE_MAX_ENTRIES,
+    enabled=HTTPSettings.RESPONSE_CACHE_ENABLED,
+)
+
+
+def lookup(request: Request, namespace: str, key: str, etag: str) -> Optional[Response]:
+    """Return a 304 or a cached 200 response for `etag`, or None on a miss."""
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+    body = response_cache.get(namespace, key, etag)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers=_cache_headers(etag))
+    return None
+
+
+def encode_json(content: Any) -> bytes:
+    """Serialize `content` the same way FastAPI's JSONResponse does."""
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def store(namespace: str, key: str, etag: str, content: Any) -> Response:
+    """Serialize `content`, cache the body under `etag` and return the response."""
+    return store_body(namespace, key, etag, encode_json(content))
+
+
+def store_body(namespace: str, key: str, etag: str, body: bytes) -> Response:
+    """Cache an already encoded JSON `body` under `etag` and return the response."""
+    response_cache.set(namespace, key, etag, body)
+    return Response(content=body, media_type="application/json", headers=_cache_headers(etag))
@@ -0,0 +1,108 @@
+"""`Idempotency-Key` support for endpoints with side effects (Arkiv writes, on-chain deployments).
+
+`run_idempotent` executes the endpoint body at most once per key (see
+`src.services.idempotency`): a retry with the same key gets the original
+response, marked `Idempotent-Replayed: true`, and a duplicate arriving while
+the first request runs waits for it. Only successful responses are stored;
+when the body raises (including HTTP errors) the key is released and a retry
+executes again, unless the body recorded progress first
+(`IdempotentProgress.save`): then a retry with the key resumes from it, so
+a step with external effects (an Arkiv write) is not repeated.
+
+Keys are scoped per route and bound to a hash of the request, so reusing a
+key with a different payload is rejected with 422. Requests without the
+header run as before.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.http_cache import encode_json
+from src.core.single_flight import flight_key
+from src.services.idempotency import IdempotencyInProgress, IdempotencyKeyReused, IdempotencyService
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotentProgress:
+    """Results of the steps of an idempotent request, kept with its key for a retry to resume from.
+
+    Without a key (or before anything is saved) it is empty and `save` only
+    keeps values for the current request.
+    """
+
+    def __init__(
+        self,
+        values: Optional[Dict[str, Any]] = None,
+        scope: Optional[str] = None,
+        key: Optional[str] = None,
+        session: Optional[AsyncSession] = None,
+    ):
+        self.values = dict(values or {})
+        self._scope = scope
+        self._key = key
+        self._session = session
+
+    def get(self, name: str) -> Any:
+        """Result of step `name` recorded by this request or an earlier attempt, else None."""
+        return self.values.get(name)
+
+    async def save(self, name: str, value: Any) -> None:
+        """Record the JSON-like result of step `name`; commits the request's session."""
+        self.values[name] = value
+        if self._key:
+            await IdempotencyService.save_progress(self._scope, self._key, self.values, self._session)
+
+
+async def run_idempotent(
+    key: Optional[str],
+    request: Request,
+    session: AsyncSession,
+    fingerprint: Any,
+    handler: Callable[[IdempotentProgress], Awaitable[Any]],
+    status_code: int = status.HTTP_200_OK,
+) -> Any:
+    """Return `await handler()`, executed at most once per `key`.
+
+    Args:
+        key: Value of the `Idempotency-Key` header; without one `handler` simply runs
+        request: The request, whose route scopes the key
+        session: Session used for the idempotency record
+        fingerprint: JSON-like request content (body and parameters) the key is bound to
+        handler: The endpoint body; it receives the progress of an earlier attempt with the key
+        status_code: Status of the endpoint's success response
+    """
+    if not key:
+        return await handler(IdempotentProgress())
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} must be at most {MAX_KEY_LENGTH} characters",
+        )
+
+    scope = f"{request.method} {getattr(request.scope.get('route'), 'path', request.url.path)}"
+    try:
+        record, progress = await IdempotencyService.begin(scope, key, flight_key(scope, fingerprint), session)
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e), headers={"Retry-After": "1"})
+    if record is not None:
+        return Response(
+            content=record.response_body,
+            status_code=record.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    try:
+        result = await handler(IdempotentProgress(progress, scope, key, session))
+    except BaseException:
+        await IdempotencyService.release(scope, key, session)
+        raise
+    body = encode_json(result)
+    await IdempotencyService.complete(scope, key, status_code, body.decode("utf-8"), session)
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -0,0 +1,146 @@
+"""Structured, non-blocking logging with request-id correlation and sampling.
+
+`setup_logging` replaces loguru's default sink with a single stdout sink
+that:
+
+- writes one JSON object per line (`LOG_JSON`), with the request id and any
+  `logger.bind(...)` fields alongside the message
+- is enqueued (`LOG_ENQUEUE`): callers only format the record and put it on
+  a queue, a background thread does the write, so request handlers never
+  block on stdout and concurrent lines never interleave
+- keeps only `LOG_SAMPLE_RATE` of the info/debug records logged through
+  `sampled_logger` (per-request success lines, job progress); warnings and
+  errors are never sampled
+- also receives stdlib `logging` records (uvicorn, SQLAlchemy), so every line
+  has the same shape
+
+`RequestIdMiddleware` takes the request id from `X-Request-ID` (or generates
+one), exposes it to every log record of the request, including those
+emitted from worker threads, and echoes it in the response.
+"""
+import json
+import logging
+import random
+import sys
+import traceback
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from loguru import logger
+
+from src.settings.log import LogSettings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# For info/debug lines emitted on every request or job step; subject to LOG_SAMPLE_RATE
+sampled_logger = logger.bind(sampled=True)
+
+
+def current_request_id() -> Optional[str]:
+    """Id of the request being handled, or None outside a request."""
+    return _request_id.get()
+
+
+def _patch(record) -> None:
+    request_id = _request_id.get()
+    if request_id is not None:
+        record["extra"].setdefault("request_id", request_id)
+
+
+def _keep(record) -> bool:
+    if record["extra"].get("sampled") and record["level"].no < logging.WARNING:
+        return LogSettings.SAMPLE_RATE >= 1.0 or random.random() < LogSettings.SAMPLE_RATE
+    return True
+
+
+def _json_format(record) -> str:
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    entry.update((key, value) for key, value in record["extra"].items() if key not in ("sampled", "_json"))
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        # Inside the object, so a traceback never breaks the one-line-per-record format
+        entry["exception"] = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+    record["extra"]["_json"] = json.dumps(entry, default=str, ensure_ascii=False)
+    return "{extra[_json]}\n"
+
+
+def _text_format(record) -> str:
+    record["extra"].setdefault("request_id", "-")
+    return (
+        "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | {extra[request_id]} | "
+        "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>\n{exception}"
+    )
+
+
+class _InterceptHandler(logging.Handler):
+    """Forward stdlib `logging` records to loguru."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        logger.opt(depth=6, exception=record.exc_info).log(level, record.getMessage())
+
+
+def setup_logging() -> None:
+    """Install the application log sink (idempotent)."""
+    logger.remove()
+    logger.configure(patcher=_patch)
+    logger.add(
+        sys.stdout,
+        level=LogSettings.LEVEL,
+        format=_json_format if LogSettings.JSON else _text_format,
+        filter=_keep,
+        enqueue=LogSettings.ENQUEUE,
+        backtrace=False,
+        diagnose=False,
+    )
+    # Let stdlib loggers drop records below the sink level before they are built
+    stdlib_level = logging.getLevelName(LogSettings.LEVEL.upper())
+    logging.basicConfig(
+        handlers=[_InterceptHandler()], level=stdlib_level if isinstance(stdlib_level, int) else 0, force=True
+    )
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = [_InterceptHandler()]
+        logging.getLogger(name).propagate = False
+
+
+class RequestIdMiddleware:
+    """ASGI middleware binding a request id to the request's log records and echoing it in the response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = REQUEST_ID_HEADER.lower().encode("latin-1")
+        incoming = next((value for name, value in scope["headers"] if name == header), b"")
+        # Accept a caller's id only if it is short and printable, else start a new one
+        request_id = incoming.decode("latin-1") if 0 < len(incoming) <= 128 and incoming.isascii() else uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((header, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _request_id.reset(token)
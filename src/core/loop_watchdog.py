@@ -0,0 +1,124 @@
+"""Event-loop blocking detector: measures loop lag and reports callbacks that block the loop.
+
+A heartbeat task sleeps `interval` seconds in a loop; how late each wake-up
+runs is the loop lag (`event_loop_lag_seconds`). A monitor thread watches the
+heartbeat: once it is more than `threshold` seconds late, the loop is stuck
+in a single callback, so the monitor captures the loop thread's stack and the
+route of the request being handled (`src.core.timing.task_route`) while it is
+still blocked. When the heartbeat runs again the block is logged with that
+stack and counted in `event_loop_blocks_total` by route.
+
+Typical culprits are synchronous I/O called from `async def` code (web3,
+Gemini, SubstrateInterface); run those with `asyncio.to_thread`.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+from loguru import logger
+
+from src.core.metrics import LOOP_BLOCKS
+from src.core.timing import EVENT_LOOP_LAG, task_route
+from src.settings.watchdog import LoopWatchdogSettings
+
+# Route label of blocks outside a request (background jobs, startup) or not caught while blocked
+BACKGROUND_ROUTE = "<background>"
+UNKNOWN_ROUTE = "<unknown>"
+
+
+@dataclass
+class LoopBlock:
+    """One callback that blocked the loop."""
+
+    route: str
+    task: Optional[str]
+    seconds: float
+    stack: str
+
+
+class LoopWatchdog:
+    """Heartbeat task plus monitor thread reporting event-loop blocks longer than `threshold` seconds."""
+
+    def __init__(
+        self,
+        threshold: float = LoopWatchdogSettings.THRESHOLD,
+        interval: float = LoopWatchdogSettings.INTERVAL,
+        history: int = 100,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        # Most recent blocks, oldest first
+        self.blocks: Deque[LoopBlock] = deque(maxlen=history)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._beat = 0.0
+        # (beat it belongs to, route, task name, stack), set by the monitor during a block
+        self._captured: Optional[Tuple[float, str, Optional[str], str]] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="loop-watchdog")
+        self._monitor_thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._monitor_thread.start()
+        logger.info("Loop watchdog started (threshold {:.0f} ms)", self.threshold * 1000)
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._heartbeat_task
+            self._heartbeat_task = None
+        if self._monitor_thread is not None:
+            await asyncio.to_thread(self._monitor_thread.join)
+            self._monitor_thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            previous, self._beat = self._beat, now
+            captured, self._captured = self._captured, None
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                if captured is not None and captured[0] == previous:
+                    self._report(lag, *captured[1:])
+                else:
+                    self._report(lag, UNKNOWN_ROUTE, None, "")
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            if time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            if self._captured is not None and self._captured[0] == beat:
+                continue  # this block is already captured
+            frame = sys._current_frames().get(self._loop_thread)
+            task = asyncio.current_task(self._loop)
+            route = task_route(task) or BACKGROUND_ROUTE
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            self._captured = (beat, route, task.get_name() if task is not None else None, stack)
+
+    def _report(self, seconds: float, route: str, task: Optional[str], stack: str) -> None:
+        LOOP_BLOCKS.inc(route=route)
+        self.blocks.append(LoopBlock(route=route, task=task, seconds=seconds, stack=stack))
+        logger.warning(
+            "Event loop blocked for {:.0f} ms in {} (task {})\n{}", seconds * 1000, route, task, stack.rstrip()
+        )
+
+
+loop_watchdog = LoopWatchdog()
@@ -0,0 +1,177 @@
+"""Process metrics in the Prometheus text exposition format, served by `/metrics`.
+
+Besides the timing histograms of `src.core.timing`, the process keeps:
+
+- counters, incremented where the event happens (`Counter.inc`)
+- gauges, either set directly or read at scrape time from a callback
+  (`Gauge.set_function`), e.g. DB pool and queue sizes
+
+Metrics live in memory, per worker process; scrape each worker (or run a
+single worker per container) when deploying with several.
+"""
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+class Counter:
+    """Monotonic counter with one series per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[Tuple[Dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        return [(dict(zip(self.label_names, key)), value) for key, value in values]
+
+
+class Gauge:
+    """Value that goes up and down, set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Labels, float] = {}
+        self._functions: Dict[Labels, Callable[[], Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], Optional[float]], **labels: str) -> None:
+        """Read the series from `function` at every scrape (None omits it)."""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._functions[key] = function
+
+    def collect(self) -> List[Tuple[Dict[str, str], float]]:
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, function in functions:
+            value = function()
+            if value is not None:
+                values[key] = value
+        return [(dict(zip(self.label_names, key)), value) for key, value in values.items()]
+
+
+class MetricsRegistry:
+    """Named counters and gauges of the process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, description: str, label_names: Sequence[str] = ()) -> Counter:
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, description, label_names)
+        return self._metrics[name]
+
+    def gauge(self, name: str, description: str, label_names: Sequence[str] = ()) -> Gauge:
+        if name not in self._metrics:
+            self._metrics[name] = Gauge(name, description, label_names)
+        return self._metrics[name]
+
+    def metrics(self) -> List[object]:
+        return list(self._metrics.values())
+
+
+metrics_registry = MetricsRegistry()
+
+REQUESTS_IN_FLIGHT = metrics_registry.gauge("http_requests_in_flight", "HTTP requests being handled")
+SPAN_ERRORS = metrics_registry.counter(
+    "span_errors_total", "Dependency calls that raised", ("category", "name")
+)
+LLM_TOKENS = metrics_registry.counter(
+    "llm_tokens_total", "Tokens used by LLM calls, by operation and direction", ("operation", "direction")
+)
+CACHE_REQUESTS = metrics_registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result")
+)
+QUEUE_DEPTH = metrics_registry.gauge("queue_depth", "Items waiting in background work queues", ("queue",))
+DB_POOL_CONNECTIONS = metrics_registry.gauge(
+    "db_pool_connections", "Database pool connections by engine and state", ("engine", "state")
+)
+SUBSTRATE_POOL_CONNECTIONS = metrics_registry.gauge(
+    "substrate_pool_connections", "Substrate RPC pool connections by state", ("state",)
+)
+RATE_LIMITED = metrics_registry.counter(
+    "rate_limited_requests_total", "Requests rejected with 429, by policy and reason (rate or concurrency)", ("policy", "reason")
+)
+SINGLE_FLIGHT_CALLS = metrics_registry.counter(
+    "single_flight_calls_total", "Coalesced calls by group: leader (executed) or joined (shared its result)", ("group", "result")
+)
+LOOP_BLOCKS = metrics_registry.counter(
+    "event_loop_blocks_total", "Callbacks that blocked the event loop beyond the watchdog threshold, by route", ("route",)
+)
+
+
+def record_llm_usage(operation: str, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+    """Count the prompt and completion tokens reported by an LLM response (missing counts are skipped)."""
+    if input_tokens:
+        LLM_TOKENS.inc(input_tokens, operation=operation, direction="input")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, operation=operation, direction="output")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def exposition(histograms: Iterable, metrics: Iterable) -> str:
+    """Render histograms (`src.core.timing.Histogram`) and counters/gauges in the Prometheus text format."""
+    lines: List[str] = []
+    for histogram in histograms:
+        lines.append(f"# HELP {histogram.name} {histogram.description}")
+        lines.append(f"# TYPE {histogram.name} histogram")
+        for labels, cumulative, total, count in histogram.collect():
+            for bound, value in zip((*histogram.buckets, math.inf), cumulative):
+                lines.append(f"{histogram.name}_bucket{_labels({**labels, 'le': _number(bound)})} {value}")
+            lines.append(f"{histogram.name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{histogram.name}_count{_labels(labels)} {count}")
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in metric.collect():
+            lines.append(f"{metric.name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,89 @@
+"""On-demand sampling profiler and asyncio task dump for the live worker.
+
+`sample_stacks` samples the Python stack of every thread at a fixed interval
+from a separate thread (`sys._current_frames`), so the profiled code is not
+instrumented and pays only for the GIL hand-offs of the sampler. Samples of
+the event loop thread are prefixed with the asyncio task running at that
+moment, so time can be attributed to a request handler or background job.
+
+Output is the collapsed stack format (`frame;frame;frame count` per line),
+read by `flamegraph.pl`, speedscope and inferno. A loop blocked by a
+synchronous call (Gemini, web3) shows up as that call's stack under a task
+frame; an idle loop shows up under its selector.
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# One profile at a time per process: concurrent samplers would skew each other
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_qualname} ({'/'.join(parts[-2:])}:{frame.f_lineno})"
+
+
+def _thread_names() -> Dict[int, str]:
+    return {thread.ident: thread.name for thread in threading.enumerate()}
+
+
+def sample_stacks(seconds: float, interval: float, loop: Optional[asyncio.AbstractEventLoop] = None) -> Dict[str, int]:
+    """Sample every thread's stack for `seconds`; returns collapsed stacks and their sample counts.
+
+    Blocking: run it off the event loop (e.g. `asyncio.to_thread`). With
+    `loop`, samples of its thread are grouped under the task it was running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        own = threading.get_ident()
+        loop_thread = getattr(loop, "_thread_id", None)
+        names = _thread_names()
+        counts: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = _thread_names()
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                root = [f"thread:{names.get(ident, ident)}"]
+                if ident == loop_thread:
+                    task = asyncio.current_task(loop)
+                    root.append(f"task:{task.get_name()}" if task is not None else "task:<none>")
+                counts[";".join(root + stack[::-1])] += 1
+            time.sleep(interval)
+        return dict(counts)
+    finally:
+        _profile_lock.release()
+
+
+def collapsed(counts: Dict[str, int]) -> str:
+    """Collapsed stack text, heaviest stacks first."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items(), key=lambda item: -item[1]))
+
+
+def dump_tasks() -> str:
+    """Stack of every pending asyncio task of the running loop, as text (call from the loop)."""
+    tasks = sorted(asyncio.all_tasks(), key=lambda task: task.get_name())
+    lines = [f"{len(tasks)} tasks"]
+    for task in tasks:
+        coro = task.get_coro()
+        lines.append("")
+        lines.append(f"{task.get_name()}: {getattr(coro, '__qualname__', coro)}")
+        for frame in task.get_stack():
+            lines.append(f'  File "{frame.f_code.co_filename}", line {frame.f_lineno}, in {frame.f_code.co_qualname}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,225 @@
+"""Per-client token-bucket rate limits and per-route concurrency caps for expensive endpoints.
+
+Each `RateLimitPolicy` (LLM calls, escrow deployments) gives every client a
+token bucket of `burst` tokens refilled at `per_minute`; a request takes one
+token or is rejected with the time until the next one. A client has a bucket
+per IP address and, when it sends `X-API-Key`, one per key: the request needs
+a token from both, so rotating keys does not get around the IP limit and a
+key shared across addresses is limited as a whole.
+
+Buckets live in memory per worker (`MemoryBucketStore`), or in a
+Redis-compatible server shared by every worker (`RedisBucketStore`,
+`RATE_LIMIT_REDIS_URL`, requires the `redis` extra). Concurrency caps bound
+the requests of a route in flight in this worker, across all clients.
+
+Rejections surface as `RateLimitExceeded`; `src.core.depends.rate_limit`
+turns them into `429 Too Many Requests` with `Retry-After`.
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from loguru import logger
+
+from src.core.metrics import RATE_LIMITED
+from src.settings.rate_limit import RateLimitSettings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional: install the `redis` extra to share buckets between workers
+    redis = None
+
+# Retry-After of a request rejected by a concurrency cap (slots free up as requests finish)
+CONCURRENCY_RETRY_AFTER = 1.0
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Token bucket (`per_minute`, `burst`) per client and concurrency cap per route."""
+
+    name: str
+    per_minute: float
+    burst: int
+    concurrency: int
+
+    @property
+    def rate(self) -> float:
+        """Tokens per second."""
+        return self.per_minute / 60
+
+
+LLM_POLICY = RateLimitPolicy(
+    "llm", RateLimitSettings.LLM_PER_MINUTE, RateLimitSettings.LLM_BURST, RateLimitSettings.LLM_CONCURRENCY
+)
+DEPLOY_POLICY = RateLimitPolicy(
+    "deploy", RateLimitSettings.DEPLOY_PER_MINUTE, RateLimitSettings.DEPLOY_BURST, RateLimitSettings.DEPLOY_CONCURRENCY
+)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is over its client's rate limit or its route's concurrency cap."""
+
+    def __init__(self, policy: str, reason: str, retry_after: float):
+        super().__init__(f"Too many {policy} requests ({reason} limit), retry in {retry_after:.1f}s")
+        self.policy = policy
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class MemoryBucketStore:
+    """Token buckets in this process; least recently used buckets are dropped beyond `max_buckets`."""
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        # key -> (tokens, monotonic time of the last update), in least recently used order
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        """Take a token from bucket `key`; returns 0 when taken, else the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_buckets:
+            # A dropped bucket starts full again, which only ever favours the client
+            del self._buckets[next(iter(self._buckets))]
+        return wait
+
+    async def close(self) -> None:
+        pass
+
+
+# KEYS[1]: bucket; ARGV: rate (tokens/s), capacity. Uses the server clock so every worker agrees.
+# Returns the wait as a string: Lua numbers are truncated to integers in replies.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Token buckets in a Redis-compatible server, updated atomically by a Lua script.
+
+    When the server is unreachable requests are let through (and a warning
+    logged): the limiter protects the service, it must not take it down.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis extra is not installed")
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        try:
+            return float(await self._take(keys=[self.prefix + key], args=[rate, capacity]))
+        except Exception as e:
+            logger.warning("Rate limit store unavailable, request allowed: {}", e)
+            return 0.0
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class ConcurrencyLimiter:
+    """Requests in flight per route in this process, capped without waiting."""
+
+    def __init__(self):
+        self._active: Dict[str, int] = {}
+
+    def try_acquire(self, key: str, limit: int) -> bool:
+        active = self._active.get(key, 0)
+        if active >= limit:
+            return False
+        self._active[key] = active + 1
+        return True
+
+    def release(self, key: str) -> None:
+        active = self._active.get(key, 0) - 1
+        if active > 0:
+            self._active[key] = active
+        else:
+            self._active.pop(key, None)
+
+
+def client_keys(request: Request, trust_forwarded_for: bool = RateLimitSettings.TRUST_FORWARDED_FOR) -> Tuple[str, ...]:
+    """Bucket keys of the client: its IP address and, when it sends one, a hash of its API key."""
+    ip = request.client.host if request.client else "unknown"
+    if trust_forwarded_for and request.headers.get("x-forwarded-for"):
+        ip = request.headers["x-forwarded-for"].split(",")[0].strip()
+    keys = (f"ip:{ip}",)
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        keys += (f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:32]}",)
+    return keys
+
+
+class RateLimiter:
+    """Applies `RateLimitPolicy`s to requests: concurrency cap of the route first, then the client's buckets."""
+
+    def __init__(self, store=None, enabled: bool = RateLimitSettings.ENABLED):
+        self.enabled = enabled
+        self._store = store
+        self.concurrency = ConcurrencyLimiter()
+
+    @property
+    def store(self):
+        # Created on first use, inside the running loop (the Redis client binds to it)
+        if self._store is None:
+            url = RateLimitSettings.REDIS_URL
+            self._store = RedisBucketStore(url) if url else MemoryBucketStore()
+        return self._store
+
+    async def acquire(self, policy: RateLimitPolicy, route: str, request: Request) -> Optional[str]:
+        """Admit the request or raise `RateLimitExceeded`; returns the concurrency slot to `release` (None when disabled)."""
+        if not self.enabled:
+            return None
+        slot = f"{policy.name}:{route}"
+        if not self.concurrency.try_acquire(slot, policy.concurrency):
+            RATE_LIMITED.inc(policy=policy.name, reason="concurrency")
+            raise RateLimitExceeded(policy.name, "concurrency", CONCURRENCY_RETRY_AFTER)
+        try:
+            for key in client_keys(request):
+                wait = await self.store.take(f"{policy.name}:{key}", policy.rate, policy.burst)
+                if wait > 0:
+                    RATE_LIMITED.inc(policy=policy.name, reason="rate")
+                    raise RateLimitExceeded(policy.name, "rate", wait)
+        except BaseException:
+            self.concurrency.release(slot)
+            raise
+        return slot
+
+    def release(self, slot: Optional[str]) -> None:
+        if slot is not None:
+            self.concurrency.release(slot)
+
+    async def close(self) -> None:
+        if self._store is not None:
+            await self._store.close()
+            self._store = None
+
+
+rate_limiter = RateLimiter()
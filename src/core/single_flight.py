@@ -0,0 +1,82 @@
+"""Request coalescing: share one in-flight computation among identical concurrent calls.
+
+- `SingleFlight.do(key, fn)`: the first caller for `key` starts `fn()` as a
+  task; callers arriving while it runs await the same task and receive its
+  result (or exception). Once it finishes the key is forgotten, so results
+  are never cached beyond the flight. Used for LLM calls, where several
+  dashboard users opening the same project would otherwise pay for the same
+  completion several times.
+- `KeyedLock.hold(key)`: a mutex per key, for check-then-act sequences such
+  as "join the project's running deployment or queue a new one".
+
+Both are per process and event loop.
+"""
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+from src.core.metrics import SINGLE_FLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+def flight_key(*parts: Any) -> str:
+    """Stable key of JSON-like call arguments (dict order does not matter)."""
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Result of `fn()`, shared with every concurrent caller using the same `key`.
+
+        The computation runs in its own task: a caller that is cancelled (e.g.
+        its client disconnected) stops waiting without cancelling it for the
+        others.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="leader")
+        else:
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="joined")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even when every caller stopped waiting
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+class KeyedLock:
+    """An `asyncio.Lock` per key, dropped once nobody holds or waits for it."""
+
+    def __init__(self):
+        # key -> [lock, holders and waiters]
+        self._locks: Dict[Hashable, List[Any]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
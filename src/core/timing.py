@@ -0,0 +1,348 @@
+"""Per-request timing broken down by dependency: spans, Server-Timing and histograms.
+
+Time spent waiting on a dependency is recorded as a span in one of
+`SPAN_CATEGORIES`:
+
+- `db`: every SQLAlchemy cursor execute (`instrument_engine`)
+- `arkiv`, `llm`, `substrate`: service calls wrapped with `traced`
+
+`TimingMiddleware` collects the spans of each request (including those run in
+worker threads through `asyncio.to_thread`, which copies the request context),
+adds them to the response as a `Server-Timing` header and aggregates them into
+the histograms of `timing_registry`:
+
+- `http_request_duration_seconds` by method, route template and status
+- `http_request_phase_seconds` by route template and category: the time each
+  request spent in each dependency
+- `span_duration_seconds` by category and operation, for requests and
+  background jobs alike
+
+It also tracks which asyncio task handles which request (`task_route`), so
+the loop watchdog can attribute a blocked loop to a route.
+
+When the `opentelemetry` package is installed, spans are also emitted as
+OpenTelemetry spans under a server span per request, so they can be exported
+to a collector (`setup_tracing`).
+"""
+import asyncio
+import functools
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.metrics import REQUESTS_IN_FLIGHT, SPAN_ERRORS
+from src.settings.telemetry import TelemetrySettings
+
+try:
+    from opentelemetry import trace
+except ImportError:  # optional: install the `otel` extra to emit OpenTelemetry spans
+    trace = None
+
+SPAN_CATEGORIES = ("db", "arkiv", "llm", "substrate")
+
+# Seconds; spans range from sub-millisecond queries to LLM calls and block finalization
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_tracer = trace.get_tracer("sub0.timing") if trace is not None else None
+
+
+class Histogram:
+    """Cumulative histogram (Prometheus bucket semantics) with one series per label combination."""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> List[Tuple[Dict[str, str], List[int], float, int]]:
+        """Snapshot of every series: labels, cumulative bucket counts (+Inf last), sum and count."""
+        with self._lock:
+            snapshot = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        result = []
+        for key, counts, total, count in snapshot:
+            cumulative, running = [], 0
+            for bucket_count in counts:
+                running += bucket_count
+                cumulative.append(running)
+            result.append((dict(zip(self.label_names, key)), cumulative, total, count))
+        return result
+
+
+class TimingRegistry:
+    """Named histograms of the process."""
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+
+    def histogram(self, name: str, description: str, label_names: Sequence[str]) -> Histogram:
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, description, label_names)
+        return self._histograms[name]
+
+    def histograms(self) -> List[Histogram]:
+        return list(self._histograms.values())
+
+
+timing_registry = TimingRegistry()
+REQUEST_DURATION = timing_registry.histogram(
+    "http_request_duration_seconds", "HTTP request duration", ("method", "route", "status")
+)
+REQUEST_PHASE = timing_registry.histogram(
+    "http_request_phase_seconds", "Time an HTTP request spent waiting on each dependency", ("route", "category")
+)
+SPAN_DURATION = timing_registry.histogram(
+    "span_duration_seconds", "Duration of dependency calls", ("category", "name")
+)
+EVENT_LOOP_LAG = timing_registry.histogram(
+    "event_loop_lag_seconds", "How late event-loop heartbeats ran (src.core.loop_watchdog)", ()
+)
+
+
+class RequestTimings:
+    """Span totals of one request, per category (safe to add to from worker threads)."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, category: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[category] = self.seconds.get(category, 0.0) + seconds
+            self.counts[category] = self.counts.get(category, 0) + 1
+
+    def server_timing(self, total: float) -> str:
+        """`Server-Timing` header value, in milliseconds."""
+        with self._lock:
+            entries = [
+                f'{category};dur={self.seconds[category] * 1000:.1f};desc="{self.counts[category]}x"'
+                for category in SPAN_CATEGORIES
+                if category in self.seconds
+            ]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+# ASGI scope of the request each task is handling; read from the loop watchdog thread
+_task_scopes: Dict[asyncio.Task, dict] = {}
+# Category of the innermost open span; nested spans of the same category are not added twice
+_open_category: ContextVar[Optional[str]] = ContextVar("open_span_category", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def record(category: str, name: str, seconds: float) -> None:
+    """Record a finished span (histogram and current request)."""
+    SPAN_DURATION.observe(seconds, category=category, name=name)
+    timings = _current.get()
+    if timings is not None and _open_category.get() != category:
+        timings.add(category, seconds)
+
+
+@contextmanager
+def span(category: str, name: str, **attributes: Any) -> Iterator[None]:
+    """Time the block as a `category` span named `name`."""
+    otel_span = (
+        _tracer.start_as_current_span(name, attributes={"sub0.category": category, **attributes})
+        if _tracer is not None
+        else None
+    )
+    if otel_span is not None:
+        otel_span.__enter__()
+    start = time.perf_counter()
+    token = _open_category.set(category)
+    try:
+        yield
+    except BaseException:
+        SPAN_ERRORS.inc(category=category, name=name)
+        raise
+    finally:
+        _open_category.reset(token)
+        record(category, name, time.perf_counter() - start)
+        if otel_span is not None:
+            otel_span.__exit__(None, None, None)
+
+
+def traced(category: str, name: Optional[str] = None) -> Callable:
+    """Decorator recording every call of a sync or async function as a `category` span."""
+
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(category, span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(category, span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Record every cursor execute of `engine` as a `db` span named after the statement verb."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("timing_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["timing_start"].pop()
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        record("db", f"db.{verb}", elapsed)
+        if _tracer is not None:
+            end = time.time_ns()
+            otel_span = _tracer.start_span(
+                f"db.{verb}",
+                start_time=end - int(elapsed * 1e9),
+                attributes={"sub0.category": "db", "db.system": engine.dialect.name, "db.operation": verb},
+            )
+            otel_span.end(end_time=end)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(context):
+        # A failed execute never reaches after_cursor_execute; drop its start so the pooled
+        # connection's stack stays aligned. Errors on connect have no execution context.
+        if context.execution_context is not None and context.connection is not None:
+            starts = context.connection.info.get("timing_start")
+            if starts:
+                starts.pop()
+
+
+_PATH_PARAM = re.compile(r"{([^}:]+)(?::[^}]*)?}")
+
+
+def _route_template(scope: dict) -> str:
+    """Path template of the matched route including its router prefixes, e.g. `/api/v1/arkiv/escrow/jobs/{job_id}`.
+
+    The matched route only knows its path within its own router, so the
+    prefix is recovered from the request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "<unmatched>"
+    params = scope.get("path_params", {})
+    concrete = _PATH_PARAM.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+    path = scope["path"]
+    return path[: len(path) - len(concrete)] + template if path.endswith(concrete) else template
+
+
+def task_route(task: Optional[asyncio.Task]) -> Optional[str]:
+    """Route template of the request `task` is handling, or None for tasks outside a request."""
+    scope = _task_scopes.get(task) if task is not None else None
+    return _route_template(scope) if scope is not None else None
+
+
+class TimingMiddleware:
+    """ASGI middleware timing each HTTP request; adds `Server-Timing` and feeds the request histograms.
+
+    Implemented at the ASGI level (not `BaseHTTPMiddleware`) so streaming
+    responses such as server-sent events pass through unbuffered; their
+    header carries the timings up to the start of the stream.
+    """
+
+    def __init__(self, app, server_timing: bool = TelemetrySettings.SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+        otel_span = (
+            _tracer.start_as_current_span(scope["method"], kind=trace.SpanKind.SERVER)
+            if _tracer is not None
+            else None
+        )
+        request_span = otel_span.__enter__() if otel_span is not None else None
+        REQUESTS_IN_FLIGHT.inc()
+        task = asyncio.current_task()
+        _task_scopes[task] = scope
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    value = timings.server_timing(time.perf_counter() - start)
+                    headers.append((b"server-timing", value.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _task_scopes.pop(task, None)
+            REQUESTS_IN_FLIGHT.dec()
+            total = time.perf_counter() - start
+            route = _route_template(scope)
+            REQUEST_DURATION.observe(total, method=scope["method"], route=route, status=status)
+            for category in SPAN_CATEGORIES:
+                REQUEST_PHASE.observe(timings.seconds.get(category, 0.0), route=route, category=category)
+            if request_span is not None:
+                request_span.update_name(f"{scope['method']} {route}")
+                request_span.set_attribute("http.route", route)
+                request_span.set_attribute("http.response.status_code", status)
+                otel_span.__exit__(None, None, None)
+            _current.reset(token)
+
+
+def setup_tracing() -> None:
+    """Export spans over OTLP/HTTP when `OTEL_EXPORTER_OTLP_ENDPOINT` is set and the SDK is installed."""
+    if not TelemetrySettings.OTLP_ENDPOINT:
+        return
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but the otel extra is not installed; spans are not exported")
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": TelemetrySettings.SERVICE_NAME}))
+    endpoint = TelemetrySettings.OTLP_ENDPOINT.rstrip("/") + "/v1/traces"
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(provider)
+    logger.info("Exporting OpenTelemetry spans to {}", endpoint)
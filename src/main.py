@@ -1,5 +1,8 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
 
 # Import models to ensure SQLAlchemy can resolve relationships
 from src.models import (
@@ -9,11 +12,53 @@ from src.models import (
     SponsoredProject,
     EvaluateResponse,
 )
+from src.core.log import RequestIdMiddleware, setup_logging
+from src.core.loop_watchdog import loop_watchdog
+from src.core.rate_limit import rate_limiter
+from src.core.timing import TimingMiddleware, setup_tracing
 from src.routes.base_router import base_router
 from src.routes.v1.escrow import router as escrow_router
 from src.routes.v1.ai import router as ai_router
+from src.services.contract_artifacts import artifact_registry
+from src.services.contract_codec import contract_codecs
+from src.services.escrow_events import escrow_event_follower
+from src.services.escrow_jobs import escrow_job_runner
+from src.services.milestone_release import milestone_release_service
+from src.services.substrate_pool import substrate_pool
+from src.settings.watchdog import LoopWatchdogSettings
+
+setup_logging()
+
 
-app = FastAPI(title="Sub0 Funding Oracle API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # OpenTelemetry span export, when an OTLP endpoint is configured
+    setup_tracing()
+    # Reports callbacks blocking the event loop (development and staging)
+    if LoopWatchdogSettings.ENABLED:
+        await loop_watchdog.start()
+    # Shared Substrate connections live for the whole app lifetime
+    await substrate_pool.start()
+    # Escrow call/event codec, precompiled once from the contract metadata
+    await contract_codecs.warm(artifact_registry)
+    # Escrow deployment workers; unfinished jobs are resumed from their last checkpoint
+    await escrow_job_runner.start()
+    # Tracks submitted milestone releases to finalization and writes them back
+    await milestone_release_service.start()
+    # Materializes escrow contract events from finalized blocks into the database
+    await escrow_event_follower.start()
+    yield
+    await escrow_event_follower.close()
+    await milestone_release_service.close()
+    await escrow_job_runner.close()
+    await substrate_pool.close()
+    await rate_limiter.close()
+    await loop_watchdog.close()
+    # Flush records still queued for the background log writer
+    await logger.complete()
+
+
+app = FastAPI(title="Sub0 Funding Oracle API", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -22,8 +67,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
+# Per-request breakdown of DB, Arkiv, LLM and Substrate time (Server-Timing header and histograms)
+app.add_middleware(TimingMiddleware)
+# Outermost, so every log record of a request (and its Server-Timing) carries its request id
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(base_router)
 app.include_router(escrow_router, prefix="/api/v1/arkiv")
 app.include_router(ai_router, prefix="/api/v1")
@@ -14,15 +14,22 @@ from src.models.base_model import BaseTable
 # Import models in dependency order
 # NOTE: Relationships use sa_relationship_kwargs to avoid circular imports
 from src.models.project import Project, ProjectCreate, ProjectUpdate
-from src.models.milestone import Milestone, MilestoneCreate, MilestoneUpdate
+from src.models.milestone import Milestone, MilestoneCreate, MilestoneUpdate, MilestoneSummary
 from src.models.sponsor import (
     SponsoredProject,
     SponsoredProjectCreate,
     SponsoredProjectUpdate,
     SponsorRequest,
     SponsoredProjectOut,
+    SponsoredProjectFilter,
 )
 from src.models.evaluate import EvaluateResponse
+from src.models.contract_code import UploadedContractCode
+from src.models.escrow_job import EscrowDeploymentJob, EscrowDeploymentJobOut
+from src.models.escrow_state import EscrowState, EscrowMilestoneState
+from src.models.milestone_release import MilestoneRelease, MilestoneReleaseItem, MilestoneReleaseRequest
+from src.models.escrow_event import EscrowEvent, EscrowEventOut, ChainCursor
+from src.models.idempotency import IdempotencyRecord
 
 # Relations configuration (if needed in future)
 # from src.models.relations import *
@@ -35,11 +42,25 @@ __all__ = [
     "Milestone",
     "MilestoneCreate",
     "MilestoneUpdate",
+    "MilestoneSummary",
     "SponsoredProject",
     "SponsoredProjectCreate",
     "SponsoredProjectUpdate",
     "SponsorRequest",
     "SponsoredProjectOut",
+    "SponsoredProjectFilter",
     "EvaluateResponse",
+    "UploadedContractCode",
+    "EscrowDeploymentJob",
+    "EscrowDeploymentJobOut",
+    "EscrowState",
+    "EscrowMilestoneState",
+    "MilestoneRelease",
+    "MilestoneReleaseItem",
+    "MilestoneReleaseRequest",
+    "EscrowEvent",
+    "EscrowEventOut",
+    "ChainCursor",
+    "IdempotencyRecord",
 ]
 
@@ -0,0 +1,24 @@
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlmodel import Field
+
+from src.models.base_model import BaseTable
+
+
+class UploadedContractCode(BaseTable, table=True):
+    """Contract WASM code known to be stored on a chain, keyed by (chain, code_hash).
+
+    `chain` is the chain's genesis hash so the record survives RPC endpoint changes.
+    """
+
+    __table_args__ = (
+        sa.UniqueConstraint("chain", "code_hash", name="uq_uploadedcontractcode_chain_code_hash"),
+    )
+
+    chain: str = Field(nullable=False)
+    code_hash: str = Field(nullable=False)
+    contract_name: str
+    wasm_size: int
+    tx_hash: Optional[str] = None
+    block_hash: Optional[str] = None
@@ -0,0 +1,65 @@
+from typing import Optional
+
+import sqlalchemy as sa
+from pydantic import BaseModel
+from sqlmodel import Field
+
+from src.models.base_model import BaseTable
+
+ESCROW_CREATED = "EscrowCreated"
+FUNDS_RELEASED = "FundsReleased"
+ESCROW_CANCELLED = "EscrowCancelled"
+ESCROW_EVENTS = (ESCROW_CREATED, FUNDS_RELEASED, ESCROW_CANCELLED)
+
+# Materialized `SponsoredProject.escrow_status` values
+ESCROW_STATUS_ACTIVE = "active"
+ESCROW_STATUS_COMPLETED = "completed"
+ESCROW_STATUS_CANCELLED = "cancelled"
+
+
+class EscrowEvent(BaseTable, table=True):
+    """A decoded funding-escrow contract event from a finalized block.
+
+    Keyed by (block_number, event_index) so re-processing a block never
+    duplicates an event.
+    """
+
+    __table_args__ = (
+        sa.UniqueConstraint("block_number", "event_index", name="uq_escrowevent_block_number_event_index"),
+        sa.Index("ix_escrowevent_project_block", "sponsored_project_id", "block_number"),
+    )
+
+    block_number: int = Field(nullable=False)
+    block_hash: str = Field(nullable=False)
+    event_index: int = Field(nullable=False)
+    contract_address: str = Field(nullable=False)
+    name: str = Field(nullable=False)
+    project_owner: str = Field(nullable=False)
+    sponsored_project_id: Optional[int] = None
+    milestone_index: Optional[int] = None
+    milestone_count: Optional[int] = None
+    # Planck (u128); total for EscrowCreated, released for FundsReleased, refunded for EscrowCancelled
+    amount: Optional[int] = Field(default=None, sa_type=sa.Numeric(39, 0))
+
+
+class EscrowEventOut(BaseModel):
+    """An escrow contract event as returned by the API (amount as an integer number of planck)."""
+
+    block_number: int
+    block_hash: str
+    event_index: int
+    contract_address: str
+    name: str
+    project_owner: str
+    sponsored_project_id: Optional[int] = None
+    milestone_index: Optional[int] = None
+    milestone_count: Optional[int] = None
+    amount: Optional[int] = None
+
+
+class ChainCursor(BaseTable, table=True):
+    """Last block a chain follower has fully processed, so it resumes where it stopped."""
+
+    name: str = Field(nullable=False, sa_column_kwargs={"unique": True})
+    block_number: int = Field(nullable=False)
+    block_hash: Optional[str] = None
@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import List, Optional
+
+import sqlalchemy as sa
+from pydantic import BaseModel
+from sqlmodel import Field
+
+from src.models.base_model import BaseTable
+
+# Checkpoints of a deployment, in execution order
+ESCROW_JOB_STEPS = ("uploaded", "instantiated", "escrow_created", "finalized", "db_saved", "arkiv_synced")
+
+ESCROW_JOB_QUEUED = "queued"
+ESCROW_JOB_RUNNING = "running"
+ESCROW_JOB_SUCCEEDED = "succeeded"
+ESCROW_JOB_FAILED = "failed"
+ESCROW_JOB_TERMINAL = (ESCROW_JOB_SUCCEEDED, ESCROW_JOB_FAILED)
+
+
+class EscrowDeploymentJob(BaseTable, table=True):
+    """Background deployment of a project's escrow contract.
+
+    `step` is the last completed checkpoint (see `ESCROW_JOB_STEPS`); a job
+    resumed after a crash continues from the step after it.
+    """
+
+    __table_args__ = (
+        sa.Index("ix_escrowdeploymentjob_status_updated_at", "status", "updated_at"),
+        # At most one unfinished deployment per project, also across processes
+        sa.Index(
+            "ux_escrowdeploymentjob_active_project",
+            "sponsored_project_id",
+            unique=True,
+            postgresql_where=sa.text(f"status IN ('{ESCROW_JOB_QUEUED}', '{ESCROW_JOB_RUNNING}')"),
+            sqlite_where=sa.text(f"status IN ('{ESCROW_JOB_QUEUED}', '{ESCROW_JOB_RUNNING}')"),
+        ),
+    )
+
+    sponsored_project_id: int = Field(index=True, nullable=False)
+    status: str = Field(default=ESCROW_JOB_QUEUED, nullable=False)
+    step: Optional[str] = None
+    attempts: int = Field(default=0, nullable=False)
+    # Instantiation salt, fixed per job so a replayed instantiate cannot create a second escrow
+    salt: str = Field(nullable=False)
+    code_hash: Optional[str] = None
+    code_uploaded: bool = Field(default=False, nullable=False)
+    contract_address: Optional[str] = None
+    block_hash: Optional[str] = None
+    milestone_count: Optional[int] = None
+    arkiv_updated: bool = Field(default=False, nullable=False)
+    error: Optional[str] = None
+    finished_at: Optional[datetime] = Field(default=None, sa_type=sa.DateTime(timezone=True))
+
+
+class EscrowDeploymentJobOut(BaseModel):
+    """Progress report of a deployment job."""
+
+    job_id: int
+    sponsored_project_id: int
+    status: str
+    step: Optional[str] = None
+    completed_steps: List[str]
+    attempts: int
+    code_hash: Optional[str] = None
+    code_uploaded: bool
+    contract_address: Optional[str] = None
+    block_hash: Optional[str] = None
+    milestone_count: Optional[int] = None
+    arkiv_updated: bool
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_job(cls, job: EscrowDeploymentJob) -> "EscrowDeploymentJobOut":
+        done = ESCROW_JOB_STEPS.index(job.step) + 1 if job.step else 0
+        return cls(
+            job_id=job.id,
+            completed_steps=list(ESCROW_JOB_STEPS[:done]),
+            **job.model_dump(exclude={"id", "salt"}),
+        )
@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class EscrowMilestoneState(BaseModel):
+    """On-chain state of one escrow milestone (`get_milestone_status`)."""
+
+    index: int
+    amount: Optional[int] = None
+    released: bool = False
+    exists: bool = True
+
+
+class EscrowState(BaseModel):
+    """On-chain state of a project's escrow (`get_escrow_status`), read at `block_hash`.
+
+    Amounts are in the chain's smallest unit (planck).
+    """
+
+    project_id: int
+    contract_address: str
+    owner_account: str
+    block_hash: Optional[str] = None
+    source: str = "chain"  # "chain" | "simulated"
+    exists: bool = False
+    total_amount: Optional[int] = None
+    released_amount: Optional[int] = None
+    remaining_amount: Optional[int] = None
+    cancelled: bool = False
+    completed: bool = False
+    milestones: List[EscrowMilestoneState] = []
+    error: Optional[str] = None
@@ -0,0 +1,36 @@
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlmodel import Field
+
+from src.models.base_model import BaseTable
+
+IDEMPOTENCY_IN_PROGRESS = "in_progress"
+IDEMPOTENCY_COMPLETED = "completed"
+# Failed after recording progress: the next request with the key resumes from it
+IDEMPOTENCY_INTERRUPTED = "interrupted"
+
+
+class IdempotencyRecord(BaseTable, table=True):
+    """A request sent with an `Idempotency-Key`, keyed by (scope, key).
+
+    `scope` is the route (method and path template, e.g. `POST /sponsor`) and
+    `request_hash` a hash of the request, so a key reused with a different
+    request is rejected. Once completed, the response is stored and
+    replayed to retries until the record expires. `progress` holds the
+    results of steps the request recorded before finishing (JSON), for a
+    retry to resume from.
+    """
+
+    __table_args__ = (
+        sa.UniqueConstraint("scope", "key", name="uq_idempotencyrecord_scope_key"),
+        sa.Index("ix_idempotencyrecord_updated_at", "updated_at"),
+    )
+
+    scope: str = Field(nullable=False)
+    key: str = Field(nullable=False)
+    request_hash: str = Field(nullable=False)
+    status: str = Field(default=IDEMPOTENCY_IN_PROGRESS, nullable=False)
+    status_code: Optional[int] = None
+    response_body: Optional[str] = Field(default=None, sa_type=sa.Text)
+    progress: Optional[str] = Field(default=None, sa_type=sa.Text)
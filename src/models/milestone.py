@@ -1,5 +1,6 @@
 from typing import Optional
 
+import sqlalchemy as sa
 from pydantic import BaseModel
 from sqlmodel import Field, SQLModel
 
@@ -9,12 +10,17 @@ from src.models.base_model import BaseTable
 class Milestone(BaseTable, table=True):
     """DB model for a project milestone."""
 
+    # Composite (project_id, id) index: serves per-project lookups and returns
+    # them in insertion order. It replaces the single-column project_id index.
+    __table_args__ = (sa.Index("ix_milestone_project_id_id", "project_id", "id"),)
+
     # foreign key to projects table (uses project_id string)
-    project_id: str = Field(index=True, nullable=False)
+    project_id: str = Field(nullable=False)
 
     name: str
     description: Optional[str] = None
     amount: float
+    released: bool = Field(default=False, nullable=False)
 
 
 class MilestoneCreate(BaseModel):
@@ -31,8 +37,12 @@ class MilestoneUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     amount: Optional[float] = None
+    released: Optional[bool] = None
 
 
-
-
-
+class MilestoneSummary(BaseModel):
+    """Aggregated milestone figures for a single project."""
+    project_id: str
+    count: int
+    total_amount: float
+    released_amount: float
@@ -0,0 +1,54 @@
+from typing import List, Optional
+
+import sqlalchemy as sa
+from pydantic import BaseModel
+from sqlmodel import Field
+
+from src.models.base_model import BaseTable
+
+RELEASE_SUBMITTED = "submitted"
+RELEASE_INCLUDED = "included"
+RELEASE_FINALIZED = "finalized"
+RELEASE_FAILED = "failed"
+RELEASE_PENDING = (RELEASE_SUBMITTED, RELEASE_INCLUDED)
+
+
+class MilestoneRelease(BaseTable, table=True):
+    """One `release_milestone` extrinsic and its progress: submitted -> included -> finalized (or failed).
+
+    Releases submitted together share a `batch_id`. `synced` / `arkiv_synced` record
+    whether a finalized release was written back to the Milestone row and to Arkiv.
+    """
+
+    __table_args__ = (sa.Index("ix_milestonerelease_status_synced", "status", "synced", "arkiv_synced"),)
+
+    batch_id: str = Field(index=True, nullable=False)
+    sponsored_project_id: int = Field(index=True, nullable=False)
+    milestone_id: Optional[int] = None
+    milestone_index: int
+    contract_address: str
+    owner_account: str
+    signer: Optional[str] = None
+    nonce: Optional[int] = None
+    extrinsic_hash: Optional[str] = None
+    # Best block number when submitted; inclusion is searched from here
+    submitted_block: Optional[int] = None
+    block_hash: Optional[str] = None
+    block_number: Optional[int] = None
+    status: str = Field(default=RELEASE_SUBMITTED, nullable=False)
+    error: Optional[str] = None
+    synced: bool = Field(default=False, nullable=False)
+    arkiv_synced: bool = Field(default=False, nullable=False)
+
+
+class MilestoneReleaseItem(BaseModel):
+    """A milestone to release: the sponsored project and the milestone's index in its escrow."""
+
+    project_id: int
+    milestone_index: int
+
+
+class MilestoneReleaseRequest(BaseModel):
+    """Schema for releasing many milestones in one call."""
+
+    releases: List[MilestoneReleaseItem]
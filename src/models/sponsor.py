@@ -1,19 +1,37 @@
-from typing import Optional
+from typing import List, Optional
 
+import sqlalchemy as sa
 from pydantic import BaseModel
 from sqlmodel import Field
 
 from src.models.base_model import BaseTable
 
+# Full-text document for sponsored projects. Kept as literal SQL so queries can
+# repeat the exact expression and Postgres matches it to the GIN index.
+SPONSORED_SEARCH_VECTOR_SQL = (
+    "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))"
+)
+
 
 class SponsoredProject(BaseTable, table=True):
     """DB model for a sponsored project."""
+
+    __table_args__ = (
+        sa.Index("ix_sponsoredproject_ai_score", "ai_score"),
+        sa.Index("ix_sponsoredproject_budget", "budget"),
+        sa.Index("ix_sponsoredproject_created_at", "created_at"),
+        sa.Index(
+            "ix_sponsoredproject_search",
+            sa.text(SPONSORED_SEARCH_VECTOR_SQL),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
     
     project_id: str = Field(index=True)
     name: str
     repo: str
     ai_score: float
-    status: str
+    status: str = Field(index=True)
     contract_address: str
     chain: str
     budget: float
@@ -21,6 +39,10 @@ class SponsoredProject(BaseTable, table=True):
     entity_key: Optional[str] = None
     tx_hash: Optional[str] = None
     polkadot_smart_contract: Optional[str] = None
+    # SS58 payout account; the escrow contract keys its state by this account
+    owner_account: Optional[str] = None
+    # Materialized from contract events: active | completed | cancelled (None until EscrowCreated is seen)
+    escrow_status: Optional[str] = Field(default=None, index=True)
 
 
 class SponsoredProjectCreate(BaseModel):
@@ -38,6 +60,7 @@ class SponsoredProjectCreate(BaseModel):
     entity_key: Optional[str] = None
     tx_hash: Optional[str] = None
     polkadot_smart_contract: Optional[str] = None
+    owner_account: Optional[str] = None
 
 
 class SponsoredProjectUpdate(BaseModel):
@@ -55,6 +78,7 @@ class SponsoredProjectUpdate(BaseModel):
     entity_key: Optional[str] = None
     tx_hash: Optional[str] = None
     polkadot_smart_contract: Optional[str] = None
+    owner_account: Optional[str] = None
 
 
 class SponsorRequest(BaseModel):
@@ -81,3 +105,16 @@ class SponsoredProjectOut(BaseModel):
     entity_key: Optional[str] = None
     tx_hash: Optional[str] = None
     polkadot_smart_contract: Optional[str] = None
+
+
+class SponsoredProjectFilter(BaseModel):
+    """Server-side filters and ordering for listing sponsored projects."""
+
+    statuses: Optional[List[str]] = None
+    chain: Optional[str] = None
+    min_ai_score: Optional[float] = None
+    max_ai_score: Optional[float] = None
+    min_budget: Optional[float] = None
+    max_budget: Optional[float] = None
+    q: Optional[str] = None  # full-text search over name and description
+    sort: Optional[str] = None  # score | budget | created_at, prefix with "-" for descending
@@ -0,0 +1,38 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from src.core.depends.admin import require_admin_token
+from src.core.profiler import ProfilerBusyError, collapsed, dump_tasks, sample_stacks
+from src.settings.debug import DebugSettings
+
+router = APIRouter(prefix="/debug", include_in_schema=False, dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="How long to sample"),
+    interval_ms: float = Query(DebugSettings.PROFILE_INTERVAL * 1000, ge=1, le=1000, description="Milliseconds between samples"),
+) -> PlainTextResponse:
+    """Sample this worker's threads and asyncio tasks; returns collapsed stacks for a flamegraph.
+
+    e.g. `curl -H "X-Admin-Token: ..." ":8000/debug/profile?seconds=30" | flamegraph.pl > profile.svg`
+    """
+    if seconds > DebugSettings.PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be at most {DebugSettings.PROFILE_MAX_SECONDS:g}",
+        )
+    loop = asyncio.get_running_loop()
+    try:
+        counts = await asyncio.to_thread(sample_stacks, seconds, interval_ms / 1000, loop)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(collapsed(counts), headers={"X-Profile-Samples": str(sum(counts.values()))})
+
+
+@router.get("/tasks", response_class=PlainTextResponse)
+async def tasks() -> PlainTextResponse:
+    """Current stack of every asyncio task of this worker."""
+    return PlainTextResponse(dump_tasks())
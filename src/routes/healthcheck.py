@@ -1,6 +1,11 @@
+from dataclasses import asdict
 from typing import Any, Dict
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from src.core.depends.health import get_readiness_probe
+from src.services.readiness import ReadinessProbe
 
 router = APIRouter(prefix="/healthcheck")
 
@@ -9,3 +14,31 @@ router = APIRouter(prefix="/healthcheck")
 def healthcheck() -> Dict[str, Any]:
     """Healthcheck endpoint to verify the service is running."""
     return {"status": "ok"}
+
+
+@router.get("/live")
+def liveness() -> Dict[str, Any]:
+    """Liveness probe: the process is up and serving requests (no dependency checks)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(probe: ReadinessProbe = Depends(get_readiness_probe)) -> JSONResponse:
+    """Readiness probe: 200 when the database is reachable, else 503.
+
+    An unreachable Arkiv RPC or Substrate node is reported with status
+    "degraded" (still 200): the endpoints that do not need them keep working.
+    The result is cached for a few seconds (`HEALTH_READY_CACHE_SECONDS`).
+    """
+    result = await probe.check()
+    if not result.ready:
+        state = "unavailable"
+    else:
+        state = "degraded" if result.degraded else "ready"
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if result.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": state,
+            "checks": {name: asdict(check) for name, check in result.checks.items()},
+        },
+    )
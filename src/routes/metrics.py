@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from src.core.metrics import CONTENT_TYPE, exposition, metrics_registry
+from src.core.timing import timing_registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus scrape endpoint: request/dependency latency histograms, counters and gauges."""
+    return Response(
+        content=exposition(timing_registry.histograms(), metrics_registry.metrics()),
+        media_type=CONTENT_TYPE,
+    )
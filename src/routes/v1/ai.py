@@ -2,26 +2,30 @@
 AI Query Routes - LangChain endpoints for querying Arkiv entities
 """
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import json
 
-from src.core.depends.db import get_async_session
+from src.core.depends.db import get_read_session
+from src.core.depends.rate_limit import rate_limit
+from src.core.rate_limit import LLM_POLICY
 from src.models.sponsor import SponsoredProject
 from src.services.langchain_service import get_langchain_service
 from src.services.arkiv import ArkivService
 from arkiv import Arkiv
 from src.core.depends.arkiv import get_arkiv_client
 
-router = APIRouter(prefix="/ai", tags=["ai"])
+router = APIRouter(prefix="/ai", tags=["ai"], dependencies=[Depends(rate_limit(LLM_POLICY))])
 
 
 @router.post("/query-project")
 async def query_project(
     project_id: int,
     question: str = Query(..., description="Question to ask about the project"),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     Ask an AI question about a specific project stored in Arkiv.
@@ -48,7 +52,6 @@ async def query_project(
             "project_id": project.project_id,
             "name": project.name,
             "description": project.description,
-            "sponsor": project.sponsor,
             "budget": project.budget,
             "status": project.status,
             "chain": project.chain,
@@ -58,8 +61,8 @@ async def query_project(
         }
 
         # Query using LangChain
-        service = get_langchain_service()
-        answer = service.query_entity(project_data, question, "project")
+        service = await asyncio.to_thread(get_langchain_service)
+        answer = await service.query_entity_async(project_data, question, "project")
 
         return {
             "success": True,
@@ -77,7 +80,7 @@ async def query_project(
 @router.get("/summarize-project/{project_id}")
 async def summarize_project(
     project_id: int,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     Generate an AI summary of a project.
@@ -103,15 +106,14 @@ async def summarize_project(
             "project_id": project.project_id,
             "name": project.name,
             "description": project.description,
-            "sponsor": project.sponsor,
             "budget": project.budget,
             "status": project.status,
             "created_at": str(project.created_at),
         }
 
         # Generate summary
-        service = get_langchain_service()
-        summary = service.summarize_entity(project_data, "project")
+        service = await asyncio.to_thread(get_langchain_service)
+        summary = await service.summarize_entity_async(project_data, "project")
 
         return {
             "success": True,
@@ -129,7 +131,7 @@ async def summarize_project(
 @router.post("/analyze-projects")
 async def analyze_projects(
     analysis_type: str = Query("general", description="Type of analysis: general, comparison, trends, risk, performance"),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     Analyze all projects and provide insights.
@@ -156,14 +158,13 @@ async def analyze_projects(
                 "name": p.name,
                 "budget": p.budget,
                 "status": p.status,
-                "sponsor": p.sponsor,
             }
             for p in projects
         ]
 
         # Perform analysis
-        service = get_langchain_service()
-        analysis = service.analyze_entities(projects_data, analysis_type)
+        service = await asyncio.to_thread(get_langchain_service)
+        analysis = await service.analyze_entities_async(projects_data, analysis_type)
 
         return {
             "success": True,
@@ -182,7 +183,7 @@ async def analyze_projects(
 async def generate_report(
     project_id: int,
     report_type: str = Query("detailed", description="Type of report: summary, detailed, technical"),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     Generate an AI report for a project.
@@ -209,7 +210,6 @@ async def generate_report(
             "project_id": project.project_id,
             "name": project.name,
             "description": project.description,
-            "sponsor": project.sponsor,
             "budget": project.budget,
             "status": project.status,
             "chain": project.chain,
@@ -218,8 +218,8 @@ async def generate_report(
         }
 
         # Generate report
-        service = get_langchain_service()
-        report = service.generate_report(project_data, report_type)
+        service = await asyncio.to_thread(get_langchain_service)
+        report = await service.generate_report_async(project_data, report_type)
 
         return {
             "success": True,
@@ -1,18 +1,24 @@
+import asyncio
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from arkiv import Arkiv
+from src.core import fast_json, http_cache
 from src.core.depends.arkiv import get_arkiv_client
-from src.core.depends.db import get_async_session
+from src.core.depends.db import get_async_session, get_read_session
+from src.core.depends.rate_limit import rate_limit
+from src.core.idempotency import IDEMPOTENCY_KEY_HEADER, IdempotentProgress, run_idempotent
+from src.core.rate_limit import LLM_POLICY
 from src.models.evaluate import EvaluateResponse
-from src.models.milestone import Milestone, MilestoneCreate, MilestoneUpdate
+from src.models.milestone import Milestone, MilestoneCreate, MilestoneUpdate, MilestoneSummary
 from src.models.project import Project, ProjectCreate, ProjectUpdate
 from src.models.sponsor import (
     SponsoredProject,
     SponsoredProjectCreate,
     SponsoredProjectUpdate,
+    SponsoredProjectFilter,
     SponsoredProjectOut,
     SponsorRequest,
 )
@@ -25,23 +31,43 @@ from src.services.sponsor import SponsoredProjectService
 router = APIRouter(prefix="/arkiv")
 
 @router.get("/projects", response_model=List[Project])
-async def list_projects(skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_async_session)):
+async def list_projects(request: Request, skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_read_session)):
     """
     List all projects with pagination.
+
+    Supports `If-None-Match`: the weak ETag is derived from max(updated_at) and row count.
     """
+    cache_key = f"list:{skip}:{limit}"
+    etag = http_cache.weak_etag(cache_key, *await ProjectService.list_version(session))
+    cached = http_cache.lookup(request, ProjectService.CACHE_NAMESPACE, cache_key, etag)
+    if cached:
+        return cached
+    if fast_json.enabled():
+        body = fast_json.encode_rows(*await ProjectService.list_rows(session, skip=skip, limit=limit))
+        return http_cache.store_body(ProjectService.CACHE_NAMESPACE, cache_key, etag, body)
     projects = await ProjectService.list_all(session, skip=skip, limit=limit)
-    return projects
+    return http_cache.store(ProjectService.CACHE_NAMESPACE, cache_key, etag, projects)
 
 
 @router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: int, session: AsyncSession = Depends(get_async_session)):
+async def get_project(project_id: int, request: Request, session: AsyncSession = Depends(get_read_session)):
     """
     Get a specific project by ID.
+
+    Supports `If-None-Match`: the weak ETag is derived from the project's updated_at.
     """
+    version = await ProjectService.get_version(project_id, session)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    cache_key = f"id:{project_id}"
+    etag = http_cache.weak_etag(cache_key, version)
+    cached = http_cache.lookup(request, ProjectService.CACHE_NAMESPACE, cache_key, etag)
+    if cached:
+        return cached
     project = await ProjectService.get_by_id(project_id, session)
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    return project
+    return http_cache.store(ProjectService.CACHE_NAMESPACE, cache_key, etag, project)
 
 
 @router.post("/projects", response_model=Project, status_code=status.HTTP_201_CREATED)
@@ -79,25 +105,39 @@ async def delete_project(project_id: int, session: AsyncSession = Depends(get_as
 # ==================== MILESTONE ENDPOINTS ====================
 
 @router.get("/milestones", response_model=List[Milestone])
-async def list_milestones(skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_async_session)):
+async def list_milestones(skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_read_session)):
     """
     List all milestones with pagination.
     """
+    if fast_json.enabled():
+        return fast_json.rows_response(*await MilestoneService.list_rows(session, skip=skip, limit=limit))
     milestones = await MilestoneService.list_all(session, skip=skip, limit=limit)
     return milestones
 
 
 @router.get("/milestones/by-project/{project_id}", response_model=List[Milestone])
-async def list_milestones_by_project(project_id: int, skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_async_session)):
+async def list_milestones_by_project(project_id: str, skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_read_session)):
     """
-    List all milestones for a specific project with pagination.
+    List all milestones for a specific project (by its string `project_id`) with pagination.
     """
+    if fast_json.enabled():
+        rows = await MilestoneService.list_rows(session, project_id=project_id, skip=skip, limit=limit)
+        return fast_json.rows_response(*rows)
     milestones = await MilestoneService.list_by_project(project_id, session, skip=skip, limit=limit)
     return milestones
 
 
+@router.get("/projects/{project_id}/milestones/summary", response_model=MilestoneSummary)
+async def get_project_milestones_summary(project_id: str, session: AsyncSession = Depends(get_read_session)):
+    """
+    Get milestone count, total amount and released amount for a project (by its string `project_id`).
+    """
+    summary = await MilestoneService.summarize_by_project(project_id, session)
+    return summary
+
+
 @router.get("/milestones/{milestone_id}", response_model=Milestone)
-async def get_milestone(milestone_id: int, session: AsyncSession = Depends(get_async_session)):
+async def get_milestone(milestone_id: int, session: AsyncSession = Depends(get_read_session)):
     """
     Get a specific milestone by ID.
     """
@@ -142,26 +182,75 @@ async def delete_milestone(milestone_id: int, session: AsyncSession = Depends(ge
 # ==================== SPONSORED PROJECT ENDPOINTS ====================
 
 @router.get("/sponsored", response_model=List[SponsoredProject])
-async def list_sponsored_projects(status_filter: Optional[str] = None, skip: int = 0, limit: int = 100, session: AsyncSession = Depends(get_async_session)):
-    """
-    List all sponsored projects with optional status filter and pagination.
-    """
+async def list_sponsored_projects(
+    request: Request,
+    status_filter: Optional[str] = None,
+    status: Optional[List[str]] = Query(None, description="One or more statuses to include"),
+    chain: Optional[str] = None,
+    min_ai_score: Optional[float] = None,
+    max_ai_score: Optional[float] = None,
+    min_budget: Optional[float] = None,
+    max_budget: Optional[float] = None,
+    q: Optional[str] = Query(None, description="Full-text search over name and description"),
+    sort: Optional[str] = Query(
+        None,
+        pattern="^-?(score|budget|created_at)$",
+        description="Sort key: score, budget or created_at; prefix with '-' for descending",
+    ),
+    skip: int = 0,
+    limit: int = 100,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    List sponsored projects with server-side filtering, sorting, search and pagination.
+
+    Supports `If-None-Match`: the weak ETag is derived from max(updated_at), row count and the query string.
+    """
+    statuses = list(status or [])
     if status_filter:
-        sponsored_projects = await SponsoredProjectService.list_by_status(status_filter, session, skip=skip, limit=limit)
-    else:
-        sponsored_projects = await SponsoredProjectService.list_all(session, skip=skip, limit=limit)
-    return sponsored_projects
+        statuses.append(status_filter)
+    filters = SponsoredProjectFilter(
+        statuses=statuses or None,
+        chain=chain,
+        min_ai_score=min_ai_score,
+        max_ai_score=max_ai_score,
+        min_budget=min_budget,
+        max_budget=max_budget,
+        q=q,
+        sort=sort,
+    )
+
+    cache_key = f"list:{request.url.query}"
+    etag = http_cache.weak_etag(cache_key, *await SponsoredProjectService.list_version(session))
+    cached = http_cache.lookup(request, SponsoredProjectService.CACHE_NAMESPACE, cache_key, etag)
+    if cached:
+        return cached
+    if fast_json.enabled():
+        rows = await SponsoredProjectService.list_rows(session, filters=filters, skip=skip, limit=limit)
+        return http_cache.store_body(SponsoredProjectService.CACHE_NAMESPACE, cache_key, etag, fast_json.encode_rows(*rows))
+    sponsored_projects = await SponsoredProjectService.search(filters, session, skip=skip, limit=limit)
+    return http_cache.store(SponsoredProjectService.CACHE_NAMESPACE, cache_key, etag, sponsored_projects)
 
 
 @router.get("/sponsored/{sponsored_project_id}", response_model=SponsoredProject)
-async def get_sponsored_project(sponsored_project_id: int, session: AsyncSession = Depends(get_async_session)):
+async def get_sponsored_project(sponsored_project_id: int, request: Request, session: AsyncSession = Depends(get_read_session)):
     """
     Get a specific sponsored project by ID.
+
+    Supports `If-None-Match`: the weak ETag is derived from the project's updated_at.
     """
+    version = await SponsoredProjectService.get_version(sponsored_project_id, session)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sponsored project not found")
+    cache_key = f"id:{sponsored_project_id}"
+    etag = http_cache.weak_etag(cache_key, version)
+    cached = http_cache.lookup(request, SponsoredProjectService.CACHE_NAMESPACE, cache_key, etag)
+    if cached:
+        return cached
     sponsored_project = await SponsoredProjectService.get_by_id(sponsored_project_id, session)
     if not sponsored_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sponsored project not found")
-    return sponsored_project
+    return http_cache.store(SponsoredProjectService.CACHE_NAMESPACE, cache_key, etag, sponsored_project)
 
 
 @router.post("/sponsored", response_model=SponsoredProject, status_code=status.HTTP_201_CREATED)
@@ -196,8 +285,8 @@ async def delete_sponsored_project(sponsored_project_id: int, session: AsyncSess
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sponsored project not found")
 
 
-@router.post("/evaluate", response_model=EvaluateResponse)
-async def evaluate(project_id: int = Query(..., description="Project ID to evaluate with AI"), session: AsyncSession = Depends(get_async_session)):
+@router.post("/evaluate", response_model=EvaluateResponse, dependencies=[Depends(rate_limit(LLM_POLICY))])
+async def evaluate(project_id: int = Query(..., description="Project ID to evaluate with AI"), session: AsyncSession = Depends(get_read_session)):
     """
     Evaluates a project using AI.
     """
@@ -205,7 +294,7 @@ async def evaluate(project_id: int = Query(..., description="Project ID to evalu
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
-    evaluation = AIService.evaluate_project({
+    evaluation = await AIService.evaluate_project_async({
         "name": project.name,
         "description": project.description,
         "budget": project.budget,
@@ -215,11 +304,33 @@ async def evaluate(project_id: int = Query(..., description="Project ID to evalu
 
 
 @router.post("/sponsor")
-async def save_sponsor(payload: SponsorRequest, client: Arkiv = Depends(get_arkiv_client), session: AsyncSession = Depends(get_async_session)):
+async def save_sponsor(
+    payload: SponsorRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(
+        None, alias=IDEMPOTENCY_KEY_HEADER, description="Client-generated key; retries with it return the original result"
+    ),
+    client: Arkiv = Depends(get_arkiv_client),
+    session: AsyncSession = Depends(get_async_session),
+):
     """
     Guarda el proyecto sponsoreado en Arkiv blockchain Y en la base de datos.
     Se asume que ya se creó el smart contract y se pasa su address.
+
+    With an `Idempotency-Key` header, a retry returns the original response
+    instead of writing a second Arkiv entity and row. A retry after the
+    database write failed reuses the Arkiv entity already written.
     """
+    return await run_idempotent(
+        idempotency_key, request, session, payload.model_dump(mode="json"),
+        lambda progress: _store_sponsored_project(payload, client, session, progress),
+    )
+
+
+async def _store_sponsored_project(
+    payload: SponsorRequest, client: Arkiv, session: AsyncSession, progress: IdempotentProgress
+) -> dict:
+    """Write the sponsored project to Arkiv, then to the database."""
     # payload.project is a dict, so access its keys directly
     project = payload.project
     data = {
@@ -235,8 +346,12 @@ async def save_sponsor(payload: SponsorRequest, client: Arkiv = Depends(get_arki
         "milestones": project.get("milestones", []),
     }
 
-    # 1. Save to Arkiv blockchain
-    arkiv_result = ArkivService.save_sponsored_project(client, data)
+    # 1. Save to Arkiv blockchain, unless an earlier attempt with the same Idempotency-Key did
+    arkiv_result = progress.get("arkiv")
+    if arkiv_result is None:
+        arkiv_result = await asyncio.to_thread(ArkivService.save_sponsored_project, client, data)
+        # Recorded before the database write, so a retry after it fails does not write a second entity
+        await progress.save("arkiv", arkiv_result)
     entity_key = arkiv_result["entity_key"]
     tx_hash = arkiv_result.get("tx_hash")
 
@@ -1,192 +1,350 @@
 """
 Escrow Routes - Progressive Fund Release for Projects
 """
-from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from src.core.depends.db import get_async_session
-from src.core.depends.arkiv import get_arkiv_client
+from src.core.depends.admin import require_operator_token
+from src.core.depends.db import get_async_session, get_read_session
+from src.core.depends.escrow_jobs import get_escrow_job_runner
+from src.core.depends.rate_limit import rate_limit
+from src.core.depends.substrate import get_escrow_state_reader, get_milestone_release_service
+from src.core.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
+from src.core.rate_limit import DEPLOY_POLICY
+from src.models.escrow_event import EscrowEventOut
+from src.models.escrow_job import ESCROW_JOB_TERMINAL, EscrowDeploymentJobOut
+from src.models.escrow_state import EscrowState
+from src.models.milestone_release import MilestoneRelease, MilestoneReleaseRequest
 from src.models.sponsor import SponsoredProject
-from src.services.rococo_deployer import RococoDeployer
-from src.services.arkiv import ArkivService
-from arkiv import Arkiv
+from src.services.escrow_events import EscrowEventFollower
+from src.services.escrow_jobs import EscrowJobRunner, EscrowJobService
+from src.services.escrow_plan import DEFAULT_MILESTONE_COUNT, MAX_MILESTONES
+from src.services.escrow_state import (
+    EscrowStateReader,
+    EscrowTarget,
+    escrow_contract,
+    escrow_owner,
+)
+from src.services.milestone import MilestoneService
+from src.services.milestone_release import MilestoneReleaseService
+from src.services.sponsor import SponsoredProjectService
+from src.services.substrate_pool import SubstrateUnavailable
+from src.settings.substrate import SubstrateSettings
 
 router = APIRouter(prefix="/escrow", tags=["escrow"])
 
+JOB_EVENTS_POLL_SECONDS = 2.0
+
 
-@router.post("/deploy-escrow")
+@router.post("/deploy-escrow", status_code=202, dependencies=[Depends(rate_limit(DEPLOY_POLICY))])
 async def deploy_escrow(
     project_id: int,
+    request: Request,
+    idempotency_key: Optional[str] = Header(
+        None, alias=IDEMPOTENCY_KEY_HEADER, description="Client-generated key; retries with it return the original job"
+    ),
     db: AsyncSession = Depends(get_async_session),
-    arkiv_client: Arkiv = Depends(get_arkiv_client),
+    runner: EscrowJobRunner = Depends(get_escrow_job_runner),
 ):
     """
-    Deploy an escrow smart contract for a project with progressive fund release
+    Queue the deployment of an escrow smart contract for a project with progressive fund release
     
     - Takes an approved project
-    - Creates milestones based on project timeline
-    - Initializes the escrow contract
-    - Saves the contract address to the project
-    - Updates the Arkiv entity with the contract address
+    - Queues a background job that uploads the contract code (once per chain),
+      instantiates the escrow, funds it, adds the project's milestones (at
+      most 100) in one batched extrinsic, waits for finalization, saves the contract
+      address to the project and updates the Arkiv entity
+    - Progress is reported by `GET /escrow/jobs/{job_id}` and the
+      `GET /escrow/jobs/{job_id}/events` server-sent event stream
+    - While a deployment of the project is queued or running, the request
+      joins it (same job id) instead of starting a second one
+    - With an `Idempotency-Key` header, a retry returns the original
+      response, even after that job finished
     
     Args:
         project_id: ID of the project to create escrow for
         
     Returns:
-        dict with contract_address and deployment details
+        202 with the job id and its status URLs
     """
-    try:
-        # Get the project using async query
-        from sqlalchemy import select
-        query = select(SponsoredProject).where(SponsoredProject.id == project_id)
-        result = await db.execute(query)
-        project = result.scalars().first()
-        
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        # Verify project is approved
-        if project.status != "approved":
-            raise HTTPException(
-                status_code=400,
-                detail=f"Project must be approved to create escrow. Current status: {project.status}"
-            )
-        
-        # If project already has a contract, we can update it (re-launch)
-        # This allows relaunching if the previous one failed
-        is_relaunch = bool(project.contract_address)
-        
-        # Deploy to Rococo Testnet
-        deployer = RococoDeployer()
-        
-        # Connect to Rococo
-        if not await deployer.connect():
-            raise HTTPException(
-                status_code=503,
-                detail="Could not connect to Rococo testnet. Try again later."
-            )
-        
-        # Prepare milestones
-        milestone_count = 4
-        total_amount = int(project.budget * 10**12)  # Convert to smallest unit (planck)
-        
-        # Deploy the contract using real WASM and metadata
-        deployment_result = await deployer.deploy_contract(
-            project_owner=project.project_id,
-            milestone_count=milestone_count,
-            total_amount=total_amount,
-            keypair_uri=None,  # In production, load from secure storage
+    return await run_idempotent(
+        idempotency_key, request, db, {"project_id": project_id},
+        lambda progress: _queue_escrow_deployment(project_id, request, db, runner),
+        status_code=202,
+    )
+
+
+async def _queue_escrow_deployment(
+    project_id: int, request: Request, db: AsyncSession, runner: EscrowJobRunner
+) -> dict:
+    """Queue a deployment job for the approved project, or join its unfinished one."""
+    project = await SponsoredProjectService.get_by_id(project_id, db)
+    
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Verify project is approved
+    if project.status != "approved":
+        raise HTTPException(
+            status_code=400,
+            detail=f"Project must be approved to create escrow. Current status: {project.status}"
         )
-        
-        if not deployment_result:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to deploy contract to Rococo"
-            )
-        
-        contract_address = deployment_result.get("contract_address")
-        project.status = "approved"  # Keep as approved since contract is deployed
-        project.polkadot_smart_contract = contract_address  # Store the contract address
-        await db.commit()
-        
-        # Update the Arkiv entity with the smart contract address
-        arkiv_update_status = False
-        if project.entity_key:
-            try:
-                # Call update_entity_with_contract synchronously
-                update_success = ArkivService.update_entity_with_contract(
-                    client=arkiv_client,
-                    entity_key=project.entity_key,
-                    contract_address=contract_address
-                )
-                
-                if update_success:
-                    arkiv_update_status = True
-                    print(f"✅ Arkiv entity updated with contract: {contract_address}")
-                    print(f"   Entity Key: {project.entity_key}")
-                    print(f"   Smart Contract (Polkadot): {contract_address}")
-                else:
-                    print(f"⚠️  Failed to update Arkiv entity, but contract deployed: {contract_address}")
-            except Exception as arkiv_error:
-                print(f"❌ Exception updating Arkiv: {str(arkiv_error)}")
-                import traceback
-                traceback.print_exc()
-        else:
-            print(f"⚠️  No entity_key found, skipping Arkiv update")
-        
-        return {
-            "success": True,
-            "project_id": project_id,
-            "contract_address": contract_address,
-            "polkadot_smart_contract": contract_address,
-            "entity_key": project.entity_key,
-            "milestones": milestone_count,
-            "arkiv_updated": arkiv_update_status,
-            "message": f"Escrow contract {'re-launched' if is_relaunch else 'deployed'} successfully. Arkiv {'synchronized' if arkiv_update_status else 'sync pending'}"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        await db.rollback()
+    
+    summary = await MilestoneService.summarize_by_project(project.project_id, db)
+    if summary.count > MAX_MILESTONES:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error deploying escrow: {str(e)}"
+            status_code=400,
+            detail=f"An escrow holds at most {MAX_MILESTONES} milestones, the project has {summary.count}"
         )
+    
+    # If project already has a contract, a new job re-launches it
+    # This allows relaunching if the previous one failed
+    is_relaunch = bool(project.polkadot_smart_contract)
+    
+    job, created = await EscrowJobService.create_or_join(project_id, db)
+    if created:
+        runner.enqueue(job.id)
+        message = f"Escrow contract {'re-launch' if is_relaunch else 'deployment'} queued"
+    else:
+        message = f"Escrow contract deployment already {job.status}"
+    
+    return {
+        "job_id": job.id,
+        "project_id": project_id,
+        "status": job.status,
+        "status_url": str(request.url_for("get_escrow_job", job_id=job.id)),
+        "events_url": str(request.url_for("stream_escrow_job", job_id=job.id)),
+        "message": message,
+    }
+
+
+@router.get("/jobs/{job_id}", response_model=EscrowDeploymentJobOut)
+async def get_escrow_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get the progress of an escrow deployment job
+    
+    `completed_steps` lists the checkpoints reached so far, in order:
+    uploaded, instantiated, escrow_created, finalized, db_saved, arkiv_synced.
+    """
+    job = await EscrowJobService.get_by_id(job_id, db)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return EscrowDeploymentJobOut.from_job(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_escrow_job(
+    job_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_session),
+    runner: EscrowJobRunner = Depends(get_escrow_job_runner),
+):
+    """
+    Stream the progress of an escrow deployment job as server-sent events
+    
+    A `progress` event is sent whenever the job changes; the stream ends after
+    the job succeeds or fails.
+    """
+    if not await EscrowJobService.get_by_id(job_id, db):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        while not await request.is_disconnected():
+            job = EscrowDeploymentJobOut.from_job(await EscrowJobService.get_by_id(job_id, db))
+            # Release the connection between polls; the job may run for minutes
+            await db.rollback()
+            report = job.model_dump_json()
+            if report != last:
+                last = report
+                yield f"event: progress\ndata: {report}\n\n"
+            if job.status in ESCROW_JOB_TERMINAL:
+                return
+            # Woken early by local workers; polling covers jobs run by other processes
+            if not await runner.wait_for_update(job_id, timeout=JOB_EVENTS_POLL_SECONDS):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _read_escrow_states(
+    projects: List[SponsoredProject],
+    db: AsyncSession,
+    reader: EscrowStateReader,
+) -> List[EscrowState]:
+    """Escrow state for each project: simulated from the DB, or read from chain in one batch."""
+    milestones = await MilestoneService.list_by_projects([project.project_id for project in projects], db)
+    if not SubstrateSettings.SIGNER_URI:
+        # Deployments are simulated without a signer; there is no contract state to read
+        return [EscrowStateReader.simulated(project, milestones[project.project_id]) for project in projects]
+
+    targets = [
+        EscrowTarget(
+            project_id=project.id,
+            contract_address=escrow_contract(project),
+            owner_account=escrow_owner(project),
+            milestone_count=len(milestones[project.project_id]) or DEFAULT_MILESTONE_COUNT,
+        )
+        for project in projects
+    ]
+    return await reader.read(targets)
 
 
 @router.get("/escrow-info/{project_id}")
 async def get_escrow_info(
     project_id: int,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
+    reader: EscrowStateReader = Depends(get_escrow_state_reader),
 ):
     """
     Get information about a project's escrow contract
     
+    The escrow and milestone status are dry-run against the contract's
+    `get_escrow_status` / `get_milestone_status` messages at the current
+    chain head (amounts in planck).
+    
     Args:
         project_id: ID of the project
         
     Returns:
         dict with escrow and milestone information
     """
-    try:
-        from sqlalchemy import select
-        query = select(SponsoredProject).where(SponsoredProject.id == project_id)
-        result = await db.execute(query)
-        project = result.scalars().first()
-        
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        if not project.contract_address:
-            raise HTTPException(
-                status_code=404,
-                detail="Project does not have an escrow contract"
-            )
-        
-        # TODO: In production, query the contract state from Rococo
-        # For now, return placeholder info
-        
-        return {
-            "project_id": project_id,
-            "project_name": project.name,
-            "contract_address": project.contract_address,
-            "budget": project.budget,
-            "chain": project.chain,
-            "status": "deployed",
-            "milestones": [
-                {"index": 0, "percentage": 25, "released": False},
-                {"index": 1, "percentage": 25, "released": False},
-                {"index": 2, "percentage": 25, "released": False},
-                {"index": 3, "percentage": 25, "released": False},
-            ]
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    project = await SponsoredProjectService.get_by_id(project_id, db)
+    
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    if not escrow_contract(project):
         raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching escrow info: {str(e)}"
+            status_code=404,
+            detail="Project does not have an escrow contract"
         )
+    
+    try:
+        [state] = await _read_escrow_states([project], db, reader)
+    except SubstrateUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return {
+        "project_id": project_id,
+        "project_name": project.name,
+        "contract_address": state.contract_address,
+        "budget": project.budget,
+        "chain": project.chain,
+        "status": "deployed" if state.exists else "not_initialized",
+        "escrow": state,
+        "milestones": [
+            {
+                "index": milestone.index,
+                "amount": milestone.amount,
+                "percentage": round(100 * milestone.amount / state.total_amount, 2)
+                if milestone.amount is not None and state.total_amount
+                else None,
+                "released": milestone.released,
+            }
+            for milestone in state.milestones
+        ],
+    }
+
+
+@router.get("/portfolio", response_model=List[EscrowState])
+async def get_escrow_portfolio(
+    project_id: Optional[List[int]] = Query(None, description="Projects to include (default: every approved project with an escrow)"),
+    skip: int = 0,
+    limit: int = Query(100, le=500),
+    db: AsyncSession = Depends(get_read_session),
+    reader: EscrowStateReader = Depends(get_escrow_state_reader),
+):
+    """
+    Get the escrow state of many projects at once
+    
+    All contract reads are pinned to one block, cached per block hash and
+    spread over the pooled connections concurrently.
+    """
+    if project_id:
+        projects = await SponsoredProjectService.list_by_ids(project_id[:limit], db)
+    else:
+        projects = await SponsoredProjectService.list_with_escrow(db, skip=skip, limit=limit)
+    projects = [project for project in projects if escrow_contract(project)]
+    
+    try:
+        return await _read_escrow_states(projects, db, reader)
+    except SubstrateUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/escrow-events/{project_id}", response_model=List[EscrowEventOut])
+async def get_escrow_events(
+    project_id: int,
+    skip: int = 0,
+    limit: int = Query(100, le=500),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    Get the contract events of a project's escrow (from finalized blocks)
+    
+    Events are materialized in the background; `SponsoredProject.escrow_status`
+    and the milestones' `released` flags are derived from them.
+    """
+    project = await SponsoredProjectService.get_by_id(project_id, db)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return await EscrowEventFollower.list_for_project(project_id, db, skip=skip, limit=limit)
+
+
+@router.post(
+    "/release-milestones",
+    status_code=202,
+    dependencies=[Depends(require_operator_token), Depends(rate_limit(DEPLOY_POLICY))],
+)
+async def release_milestones(
+    payload: MilestoneReleaseRequest,
+    db: AsyncSession = Depends(get_async_session),
+    service: MilestoneReleaseService = Depends(get_milestone_release_service),
+):
+    """
+    Release many milestones at once
+    
+    Each release is dry-run, signed with a locally managed nonce and submitted
+    in parallel without waiting for inclusion. Inclusion and finalization are
+    tracked in the background; finalized releases are written back to the
+    milestones and to Arkiv in batches. Poll
+    `GET /escrow/release-milestones/{batch_id}` for progress.
+
+    The releases move funds with the server's signer, so the request needs the
+    operator token in `X-Operator-Token` (the endpoint is disabled without `ESCROW_OPERATOR_TOKEN`).
+    """
+    if not payload.releases:
+        raise HTTPException(status_code=400, detail="No releases requested")
+    if len(payload.releases) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 releases per request")
+    
+    batch_id, releases = await service.submit(payload.releases, db)
+    return {
+        "batch_id": batch_id,
+        "submitted": sum(release.status != "failed" for release in releases),
+        "failed": sum(release.status == "failed" for release in releases),
+        "releases": releases,
+    }
+
+
+@router.get("/release-milestones/{batch_id}", response_model=List[MilestoneRelease])
+async def get_release_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Get the progress of a milestone release batch (submitted, included, finalized or failed)."""
+    releases = await MilestoneReleaseService.list_batch(batch_id, db)
+    if not releases:
+        raise HTTPException(status_code=404, detail="Release batch not found")
+    return releases
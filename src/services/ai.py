@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import re
@@ -5,7 +6,11 @@ from pathlib import Path
 from typing import Any
 
 from google import genai
+from google.genai import types
 from loguru import logger
+from src.core.metrics import record_llm_usage
+from src.core.single_flight import SingleFlight, flight_key
+from src.core.timing import traced
 from src.settings.gemini import GeminiSettings
 
 
@@ -24,6 +29,8 @@ class AIService:
 
     PROMPT_PATH = Path(__file__).resolve().parents[1] / "prompts" / "evaluation.md"
     MODEL = os.getenv("GENERATIVE_MODEL", "gemini-2.5-flash")
+    # Concurrent evaluations of the same project data share one LLM call
+    _evaluations = SingleFlight("ai.evaluate_project")
 
     @staticmethod
     def _read_prompt() -> str:
@@ -50,6 +57,14 @@ class AIService:
 
 
     @staticmethod
+    async def evaluate_project_async(project: dict) -> dict:
+        """`evaluate_project` in a worker thread; identical concurrent calls share one evaluation."""
+        return await AIService._evaluations.do(
+            flight_key(project), lambda: asyncio.to_thread(AIService.evaluate_project, project)
+        )
+
+    @staticmethod
+    @traced("llm")
     def evaluate_project(project: Any) -> dict:
         """Evaluate a project by calling OpenAI and returning a dict.
 
@@ -97,9 +112,15 @@ class AIService:
             f"{system_prompt}"
         )
 
-        client = genai.Client(api_key=GeminiSettings.API_KEY.get_secret_value())
+        client = genai.Client(
+            api_key=GeminiSettings.API_KEY.get_secret_value(),
+            http_options=types.HttpOptions(base_url=GeminiSettings.BASE_URL) if GeminiSettings.BASE_URL else None,
+        )
         response = client.models.generate_content(
             model="gemini-2.5-flash", contents=user_message
         )
+        usage = response.usage_metadata
+        if usage is not None:
+            record_llm_usage("AIService.evaluate_project", usage.prompt_token_count, usage.candidates_token_count)
         response_json = AIService._extract_json(response.text)
         return response_json
\ No newline at end of file
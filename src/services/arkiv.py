@@ -1,16 +1,19 @@
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from loguru import logger
 
 from arkiv import Arkiv
 from arkiv.types import Attributes, PAYLOAD, ATTRIBUTES as ATTRIBUTES_FIELD, QueryOptions
+from src.core.log import sampled_logger
+from src.core.timing import traced
 
 
 
 class ArkivService:
 
     @staticmethod
+    @traced("arkiv")
     def save_sponsored_project(client: Arkiv, data: dict) -> str:
         """Save a sponsored project to Arkiv."""
         payload = json.dumps(data).encode("utf-8")
@@ -56,6 +59,7 @@ class ArkivService:
         }
     
     @staticmethod
+    @traced("arkiv")
     def update_entity_with_contract(
         client: Arkiv, 
         entity_key: str, 
@@ -73,8 +77,6 @@ class ArkivService:
             True if update was successful, False otherwise
         """
         try:
-            logger.info("Starting Arkiv entity update - Entity Key: {}", entity_key)
-            
             # Retrieve the current entity data
             entity = client.arkiv.get_entity(entity_key)
             
@@ -82,19 +84,13 @@ class ArkivService:
                 logger.error("Entity not found in Arkiv: {}", entity_key)
                 return False
             
-            logger.info("Entity retrieved from Arkiv, proceeding with update...")
-            
             # Decode current payload
             current_payload = entity.payload.decode("utf-8")
             data = json.loads(current_payload)
             
-            logger.info("Current entity data keys: {}", list(data.keys()))
-            
             # Add the smart contract address
             data["polkadot_smart_contract"] = contract_address
             
-            logger.info("Added polkadot_smart_contract to payload: {}", contract_address)
-            
             # Update the entity with new payload
             updated_payload = json.dumps(data).encode("utf-8")
             
@@ -111,8 +107,6 @@ class ArkivService:
                 }
             )
             
-            logger.info("Calling arkiv.update_entity with entity_key: {}", entity_key)
-            
             # Update the entity in Arkiv
             update_result = client.arkiv.update_entity(
                 entity_key=entity_key,
@@ -121,7 +115,7 @@ class ArkivService:
                 attributes=attrs,
             )
             
-            logger.info("Arkiv update_entity returned: {}", update_result)
+            logger.debug("Arkiv update_entity returned: {}", update_result)
             logger.info(
                 "✅ Entity updated in Arkiv - Entity Key: {}, Contract: {}",
                 entity_key,
@@ -130,12 +124,52 @@ class ArkivService:
             return True
             
         except Exception as e:
-            logger.error("❌ Failed to update entity in Arkiv: {} | Entity Key: {}", str(e), entity_key)
-            import traceback
-            logger.error("Traceback: {}", traceback.format_exc())
+            logger.exception("❌ Failed to update entity in Arkiv: {} | Entity Key: {}", str(e), entity_key)
             return False
     
     @staticmethod
+    @traced("arkiv")
+    def record_milestone_releases(client: Arkiv, releases: Dict[str, List[int]]) -> bool:
+        """
+        Record released milestone indexes on many sponsored project entities in one transaction.
+        
+        Args:
+            client: Arkiv client instance
+            releases: Entity key -> milestone indexes released since the last sync
+            
+        Returns:
+            True if the batch was executed, False otherwise
+        """
+        try:
+            batch = client.arkiv.batch()
+            for entity_key, indexes in releases.items():
+                entity = client.arkiv.get_entity(entity_key)
+                if not entity:
+                    logger.error("Entity not found in Arkiv: {}", entity_key)
+                    continue
+                data = json.loads(entity.payload.decode("utf-8"))
+                data["released_milestones"] = sorted(set(data.get("released_milestones", [])) | set(indexes))
+                batch.update_entity(
+                    entity_key=entity_key,
+                    payload=json.dumps(data).encode("utf-8"),
+                    content_type="application/json",
+                    attributes=entity.attributes,
+                )
+            if batch.is_empty:
+                return False
+            receipt = batch.execute()
+            logger.info(
+                "Recorded milestone releases on {} Arkiv entities - TX Hash: {}",
+                batch.operation_count,
+                getattr(receipt, "tx_hash", None),
+            )
+            return True
+        except Exception as e:
+            logger.error("Failed to record milestone releases in Arkiv: {}", str(e))
+            return False
+
+    @staticmethod
+    @traced("arkiv")
     def list_sponsored_projects(client: Arkiv, status: Optional[str] = None) -> List[dict]:
         # Use SELECT * WHERE syntax for Arkiv queries
         query = "SELECT * WHERE type = 'sponsored_project'"
@@ -153,5 +187,5 @@ class ArkivService:
             data["entity_key"] = entity.entity_key
             projects.append(data)
 
-        logger.info("Found {} sponsored projects in Arkiv", len(projects))
+        sampled_logger.info("Found {} sponsored projects in Arkiv", len(projects))
         return projects
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Contract Artifact Registry - process-wide cache of compiled ink! contracts
+
+Each artifact (WASM + metadata JSON) is located and loaded once per process:
+the WASM is read and hashed (blake2b-256, the on-chain code hash) and the
+metadata is hashed and parsed once. Artifacts are indexed by name and by code hash; a
+reload replaces both entries. Files are re-checked at most every `ESCROW_ARTIFACT_CHECK_INTERVAL` seconds and
+only reloaded when their mtime or size changed, so repeat deployments do no
+file I/O or JSON parsing. The WASM is copied into memory rather than mapped:
+it is small, and `cargo contract build` rewrites it in place, which would
+truncate a live mapping under a reader.
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.settings.substrate import SubstrateSettings
+
+DEFAULT_CONTRACT = "funding_escrow"
+
+_INK_TARGET = Path("smart-contract") / "funding-escrow" / "target" / "ink"
+
+
+def default_search_dirs() -> List[Path]:
+    """Directories probed for contract artifacts, in priority order."""
+    dirs = []
+    if SubstrateSettings.ARTIFACTS_DIR:
+        dirs.append(Path(SubstrateSettings.ARTIFACTS_DIR))
+    dirs.append(Path(__file__).resolve().parents[2] / _INK_TARGET)
+    dirs.append(Path.cwd() / _INK_TARGET)
+    return dirs
+
+
+@dataclass
+class ContractArtifact:
+    """A loaded contract: WASM bytes, parsed metadata and code hash."""
+
+    name: str
+    wasm_path: Path
+    metadata_path: Path
+    wasm: bytes
+    metadata: Dict[str, Any]
+    code_hash: str  # 0x-prefixed blake2b-256 of the WASM
+    metadata_hash: str  # 0x-prefixed blake2b-256 of the metadata file
+    signature: Tuple[int, int, int, int]  # (wasm mtime_ns, wasm size, metadata mtime_ns, metadata size)
+    checked_at: float
+
+    @property
+    def wasm_size(self) -> int:
+        return len(self.wasm)
+
+
+def _signature(wasm_path: Path, metadata_path: Path) -> Tuple[int, int, int, int]:
+    wasm_stat = wasm_path.stat()
+    metadata_stat = metadata_path.stat()
+    return (wasm_stat.st_mtime_ns, wasm_stat.st_size, metadata_stat.st_mtime_ns, metadata_stat.st_size)
+
+
+class ContractArtifactRegistry:
+    """Thread-safe registry of contract artifacts keyed by name and by code hash."""
+
+    def __init__(self, search_dirs: Optional[List[Path]] = None, check_interval: Optional[float] = None):
+        self.search_dirs = search_dirs
+        self.check_interval = (
+            SubstrateSettings.ARTIFACT_CHECK_INTERVAL if check_interval is None else check_interval
+        )
+        self._by_name: Dict[str, ContractArtifact] = {}
+        self._by_hash: Dict[str, ContractArtifact] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, name: str) -> Tuple[Path, Path]:
+        dirs = self.search_dirs if self.search_dirs is not None else default_search_dirs()
+        for directory in dirs:
+            wasm_path = directory / f"{name}.wasm"
+            metadata_path = directory / f"{name}.json"
+            if wasm_path.exists() and metadata_path.exists():
+                return wasm_path, metadata_path
+        raise FileNotFoundError(f"Contract artifacts for '{name}' not found. Tried: {[str(d) for d in dirs]}")
+
+    def _load(self, name: str, wasm_path: Path, metadata_path: Path) -> ContractArtifact:
+        signature = _signature(wasm_path, metadata_path)
+        with open(wasm_path, "rb") as f:
+            wasm = f.read()
+        with open(metadata_path, "rb") as f:
+            raw_metadata = f.read()
+        metadata = json.loads(raw_metadata)
+        code_hash = "0x" + blake2b(wasm, digest_size=32).hexdigest()
+        logger.info("Loaded contract artifact {}: {:.1f} KB, code hash {}", name, len(wasm) / 1024, code_hash)
+        return ContractArtifact(
+            name=name,
+            wasm_path=wasm_path,
+            metadata_path=metadata_path,
+            wasm=wasm,
+            metadata=metadata,
+            code_hash=code_hash,
+            metadata_hash="0x" + blake2b(raw_metadata, digest_size=32).hexdigest(),
+            signature=signature,
+            checked_at=time.monotonic(),
+        )
+
+    def get(self, name: str = DEFAULT_CONTRACT) -> ContractArtifact:
+        """Return the artifact for `name`, loading or reloading it only when needed.
+
+        The returned metadata dict is shared; callers must not mutate it.
+        """
+        artifact = self._by_name.get(name)
+        if artifact is not None and time.monotonic() - artifact.checked_at < self.check_interval:
+            return artifact
+
+        with self._lock:
+            artifact = self._by_name.get(name)
+            if artifact is not None:
+                try:
+                    unchanged = _signature(artifact.wasm_path, artifact.metadata_path) == artifact.signature
+                except FileNotFoundError:
+                    unchanged = False
+                if unchanged:
+                    artifact.checked_at = time.monotonic()
+                    return artifact
+
+            wasm_path, metadata_path = self._resolve(name)
+            previous = artifact
+            artifact = self._load(name, wasm_path, metadata_path)
+            if previous is not None and previous.code_hash != artifact.code_hash:
+                self._by_hash.pop(previous.code_hash, None)
+            self._by_name[name] = artifact
+            self._by_hash[artifact.code_hash] = artifact
+            return artifact
+
+    def by_code_hash(self, code_hash: str) -> Optional[ContractArtifact]:
+        """Return a previously loaded artifact by its 0x-prefixed code hash."""
+        return self._by_hash.get(code_hash)
+
+
+# Process-level registry shared by every RococoDeployer
+artifact_registry = ContractArtifactRegistry()
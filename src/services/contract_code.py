@@ -0,0 +1,48 @@
+from typing import Optional
+
+from sqlmodel import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.contract_code import UploadedContractCode
+
+
+class UploadedContractCodeService:
+    """Service for the local table of contract code hashes already uploaded on chain.
+
+    All methods are async and expect an `AsyncSession` (from `src.core.depends.db.get_async_session`)
+    so they can be used easily from FastAPI endpoints with `Depends`.
+    """
+
+    @staticmethod
+    async def get(chain: str, code_hash: str, session: AsyncSession) -> Optional[UploadedContractCode]:
+        """Return the record for `code_hash` on `chain` (genesis hash) or None."""
+        stmt = select(UploadedContractCode).where(
+            UploadedContractCode.chain == chain, UploadedContractCode.code_hash == code_hash
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def record(code_data: dict, session: AsyncSession) -> UploadedContractCode:
+        """Record an uploaded code hash; concurrent inserts of the same (chain, code_hash) are tolerated.
+
+        The row is inserted with ON CONFLICT DO NOTHING rather than recovered from an
+        IntegrityError, because a rollback would expire every other object in the session.
+
+        Args:
+            code_data: Dictionary with keys chain, code_hash, contract_name, wasm_size, tx_hash, block_hash
+            session: AsyncSession for database operations
+
+        Returns:
+            The stored UploadedContractCode instance
+        """
+        if session.get_bind().dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        row = UploadedContractCode(**code_data).model_dump(exclude={"id", "created_at"})
+        await session.execute(
+            insert(UploadedContractCode).values(row).on_conflict_do_nothing(index_elements=["chain", "code_hash"])
+        )
+        await session.commit()
+        return await UploadedContractCodeService.get(code_data["chain"], code_data["code_hash"], session)
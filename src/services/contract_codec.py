@@ -0,0 +1,242 @@
+"""
+Contract Codec - precompiled SCALE encoders/decoders for ink! contract calls and events
+
+`ContractMetadata` resolves selectors and type strings on every call and has
+to be rebuilt per connection, because it registers the contract's types on
+that connection's runtime config. The codec instead is built once per
+metadata hash, without a node connection:
+
+- the contract's types are registered on a standalone
+  `RuntimeConfigurationObject`, shared by every connection and thread
+- each message is compiled to its selector bytes plus the decoder classes of
+  its arguments and return type; each event to its label, argument decoders
+  and (ink! 5) signature topic
+- encoding a call is a selector lookup plus one `encode` per argument, and
+  decoding is one `decode` with a prebuilt class
+"""
+import asyncio
+import copy
+import threading
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from loguru import logger
+from scalecodec.base import RuntimeConfigurationObject, ScaleBytes, ScaleType
+from scalecodec.type_registry import load_type_registry_preset
+from scalecodec.utils.ss58 import ss58_decode, ss58_encode
+from substrateinterface.contracts import ContractMetadata
+
+from src.services.contract_artifacts import ContractArtifact, ContractArtifactRegistry
+
+# Generic Substrate address format, used by the contracts chains we deploy to
+SS58_FORMAT = 42
+
+
+class _OfflineRuntime:
+    """The parts of `SubstrateInterface` that `ContractMetadata` uses, backed by a standalone runtime config."""
+
+    def __init__(self, runtime_config: RuntimeConfigurationObject):
+        self.runtime_config = runtime_config
+
+    def init_runtime(self) -> None:
+        pass
+
+    def encode_scale(self, type_string: str, value: Any) -> ScaleBytes:
+        return self.runtime_config.create_scale_object(type_string).encode(value)
+
+
+@dataclass(frozen=True)
+class MessageCodec:
+    """A compiled contract message: selector, argument encoders and result decoder."""
+
+    label: str
+    selector: bytes
+    args: Tuple[Tuple[str, type], ...]
+    returns: Optional[type]
+    mutates: bool
+    payable: bool
+
+
+@dataclass(frozen=True)
+class EventCodec:
+    """A compiled contract event: label and argument decoders."""
+
+    event_id: int
+    label: str
+    args: Tuple[Tuple[str, type], ...]
+    signature_topic: Optional[str]
+
+
+class ContractCodec:
+    """Encodes contract calls and decodes results and events for one contract ABI.
+
+    Thread-safe: decoder classes are shared, and every call creates its own
+    short-lived scale objects.
+    """
+
+    def __init__(self, metadata: Dict[str, Any], metadata_hash: Optional[str] = None, ss58_format: int = SS58_FORMAT):
+        self.metadata_hash = metadata_hash
+        self.runtime_config = RuntimeConfigurationObject(ss58_format=ss58_format, implements_scale_info=True)
+        self.runtime_config.update_type_registry(load_type_registry_preset("core"))
+        # ContractMetadata rewrites the dict in place while parsing, so give it its own copy
+        parsed = ContractMetadata(copy.deepcopy(metadata), _OfflineRuntime(self.runtime_config))
+        self.metadata_version = parsed.metadata_version
+
+        self.constructors: Dict[str, MessageCodec] = {}
+        for constructor in parsed.metadata_dict["spec"]["constructors"]:
+            self.constructors[constructor["label"]] = MessageCodec(
+                label=constructor["label"],
+                selector=bytes.fromhex(constructor["selector"][2:]),
+                args=tuple(
+                    (arg["label"], self._decoder(parsed.get_type_string_for_metadata_type(arg["type"]["type"])))
+                    for arg in constructor["args"]
+                ),
+                returns=None,
+                mutates=True,
+                payable=constructor.get("payable", False),
+            )
+
+        self.messages: Dict[str, MessageCodec] = {}
+        for message in parsed.metadata_dict["spec"]["messages"]:
+            self.messages[message["label"]] = MessageCodec(
+                label=message["label"],
+                selector=bytes.fromhex(message["selector"][2:]),
+                args=tuple(
+                    (arg["label"], self._decoder(parsed.get_type_string_for_metadata_type(arg["type"]["type"])))
+                    for arg in message["args"]
+                ),
+                returns=(
+                    self._decoder(parsed.get_return_type_string_for_message(message["label"]))
+                    if message.get("returnType") is not None
+                    else None
+                ),
+                mutates=message.get("mutates", False),
+                payable=message.get("payable", False),
+            )
+
+        self.events: Dict[int, EventCodec] = {}
+        self._events_by_topic: Dict[str, EventCodec] = {}
+        for event_id, event in enumerate(parsed.metadata_dict["spec"]["events"]):
+            codec = EventCodec(
+                event_id=event_id,
+                label=event["label"],
+                args=tuple(
+                    (arg["label"], self._decoder(parsed.get_type_string_for_metadata_type(arg["type"]["type"])))
+                    for arg in event["args"]
+                ),
+                signature_topic=event.get("signature_topic"),
+            )
+            self.events[event_id] = codec
+            if codec.signature_topic:
+                self._events_by_topic[codec.signature_topic] = codec
+
+    def _decoder(self, type_string: str) -> type:
+        decoder = self.runtime_config.get_decoder_class(type_string)
+        if decoder is None:
+            raise ValueError(f"Unsupported contract type {type_string}")
+        return decoder
+
+    def _new(self, decoder: type, data: Optional[bytes] = None) -> ScaleType:
+        return decoder(data=ScaleBytes(data) if data is not None else None, runtime_config=self.runtime_config)
+
+    def message(self, name: str) -> MessageCodec:
+        try:
+            return self.messages[name]
+        except KeyError:
+            raise ValueError(f'Message "{name}" not found') from None
+
+    def _encode(self, message: MessageCodec, args: Optional[Dict[str, Any]]) -> bytes:
+        args = args or {}
+        data = bytearray(message.selector)
+        for label, decoder in message.args:
+            if label not in args:
+                raise ValueError(f'Argument "{label}" is missing')
+            data += self._new(decoder).encode(args[label]).data
+        return bytes(data)
+
+    def encode_call(self, name: str, args: Optional[Dict[str, Any]] = None) -> bytes:
+        """Selector plus SCALE-encoded arguments of message `name` (the `data` of `Contracts.call`)."""
+        return self._encode(self.message(name), args)
+
+    def encode_constructor(self, name: str, args: Optional[Dict[str, Any]] = None) -> bytes:
+        """Selector plus SCALE-encoded arguments of constructor `name` (the `data` of `Contracts.instantiate`)."""
+        if name not in self.constructors:
+            raise ValueError(f'Constructor "{name}" not found')
+        return self._encode(self.constructors[name], args)
+
+    def contract_address(self, deployer: str, code_hash: str, data: bytes, salt: str) -> str:
+        """Address pallet-contracts assigns to the contract `deployer` instantiates from `code_hash`.
+
+        Same derivation as the pallet's `DefaultAddressGenerator`: blake2b-256 of
+        the SCALE-encoded `(b"contract_addr_v1", deployer, code_hash, data, salt)`.
+        """
+        encoded_bytes = self._decoder("Bytes")
+        entropy = (
+            b"contract_addr_v1"
+            + bytes.fromhex(ss58_decode(deployer))
+            + bytes.fromhex(code_hash[2:])
+            + bytes(self._new(encoded_bytes).encode(data).data)
+            + bytes(self._new(encoded_bytes).encode(salt).data)
+        )
+        return ss58_encode(blake2b(entropy, digest_size=32).digest(), self.runtime_config.ss58_format)
+
+    def decode_result(self, name: str, data: bytes) -> Any:
+        """Decode the raw return data of message `name`."""
+        message = self.message(name)
+        if message.returns is None:
+            return None
+        return self._new(message.returns, data).decode()
+
+    def decode_event(self, data: bytes, topics: Sequence[str] = ()) -> Tuple[str, Dict[str, Any]]:
+        """Decode a `ContractEmitted` payload into (event label, {arg label: value}).
+
+        ink! 4 prefixes the payload with the event index; ink! 5 identifies the
+        event by its signature topic instead.
+        """
+        if self.metadata_version >= 5:
+            event = next((self._events_by_topic[t] for t in topics if t in self._events_by_topic), None)
+            if event is None:
+                raise ValueError("No event matches the emitted topics")
+            payload = ScaleBytes(data)
+        else:
+            event = self.events.get(data[0]) if data else None
+            if event is None:
+                raise ValueError(f"Unknown event index {data[:1].hex()}")
+            payload = ScaleBytes(data[1:])
+        values = {}
+        for label, decoder in event.args:
+            obj = decoder(data=payload, runtime_config=self.runtime_config)
+            values[label] = obj.decode(check_remaining=False)
+        return event.label, values
+
+
+class ContractCodecRegistry:
+    """Process-wide codecs keyed by metadata hash, built once and shared across connections."""
+
+    def __init__(self):
+        self._codecs: Dict[str, ContractCodec] = {}
+        self._lock = threading.Lock()
+
+    def get(self, artifact: ContractArtifact) -> ContractCodec:
+        """Return the codec for the artifact's metadata, building it on first use."""
+        codec = self._codecs.get(artifact.metadata_hash)
+        if codec is None:
+            with self._lock:
+                codec = self._codecs.get(artifact.metadata_hash)
+                if codec is None:
+                    codec = ContractCodec(artifact.metadata, artifact.metadata_hash)
+                    self._codecs[artifact.metadata_hash] = codec
+        return codec
+
+    async def warm(self, artifacts: ContractArtifactRegistry) -> None:
+        """Build the codec of the current artifact ahead of the first request, if the artifacts exist."""
+        try:
+            codec = await asyncio.to_thread(lambda: self.get(artifacts.get()))
+        except FileNotFoundError as e:
+            logger.warning("Contract codec not built: {}", e)
+            return
+        logger.info("Contract codec ready: {} messages, {} events", len(codec.messages), len(codec.events))
+
+
+contract_codecs = ContractCodecRegistry()
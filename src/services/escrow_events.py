@@ -0,0 +1,315 @@
+"""
+Escrow Event Follower - materialize funding-escrow contract events into the database
+
+The escrow contract emits `EscrowCreated`, `FundsReleased` and
+`EscrowCancelled`. Following them keeps `SponsoredProject.escrow_status` and
+`Milestone.released` in step with the chain, whoever sent the extrinsic, so
+dashboards read the database instead of querying the chain per view.
+
+- only finalized blocks are read, so applied events are never rolled back
+- blocks are polled over the shared connection pool rather than through a
+  websocket subscription, which would hold a pooled connection forever
+- events are decoded offline with the shared precompiled contract codec
+- each pass applies its events in one transaction: one INSERT of the events
+  (ignoring rows already stored under the same block number and event index),
+  a few set-based UPDATEs, and the advanced cursor, so a crash mid-pass
+  simply replays the pass
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import distinct, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from substrateinterface import SubstrateInterface
+
+from src.core.depends.db import AsyncSessionLocal
+from src.core.http_cache import response_cache
+from src.models.escrow_event import (
+    ESCROW_CANCELLED,
+    ESCROW_CREATED,
+    ESCROW_EVENTS,
+    ESCROW_STATUS_ACTIVE,
+    ESCROW_STATUS_CANCELLED,
+    ESCROW_STATUS_COMPLETED,
+    FUNDS_RELEASED,
+    ChainCursor,
+    EscrowEvent,
+)
+from src.models.milestone import Milestone
+from src.models.sponsor import SponsoredProject
+from src.services.escrow_state import EscrowStateReader, escrow_contract, escrow_owner, escrow_state_reader
+from src.services.milestone import MilestoneService
+from src.services.sponsor import SponsoredProjectService
+from src.services.substrate_pool import SubstratePool, substrate_pool
+from src.settings.substrate import SubstrateSettings
+
+CURSOR_NAME = "escrow_events"
+
+# Upper bound on blocks read per pass, so catching up after downtime stays incremental
+EVENTS_BLOCKS_PER_PASS = 100
+
+
+@dataclass(frozen=True)
+class EmittedEvent:
+    """A raw `Contracts.ContractEmitted` event, before decoding."""
+
+    block_number: int
+    block_hash: str
+    event_index: int
+    contract_address: str
+    topics: Tuple[str, ...]
+    data: bytes
+
+
+def _insert(dialect: str):
+    """INSERT construct that supports ON CONFLICT DO NOTHING on the session's dialect."""
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
+class EscrowEventFollower:
+    """Follows finalized blocks and applies escrow contract events to the database in batches."""
+
+    def __init__(
+        self,
+        pool: SubstratePool = substrate_pool,
+        reader: EscrowStateReader = escrow_state_reader,
+        poll_interval: float = 6.0,
+        start_block: Optional[int] = None,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ):
+        self.pool = pool
+        self.reader = reader
+        self.poll_interval = poll_interval
+        self.start_block = start_block
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start following from the stored cursor. Does nothing without a configured signer (simulated mode)."""
+        if self._task is None and SubstrateSettings.SIGNER_URI:
+            self._task = asyncio.create_task(self._follow_loop())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @staticmethod
+    async def list_for_project(
+        sponsored_project_id: int, session: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> List[EscrowEvent]:
+        """Return a project's escrow events in chain order, with pagination."""
+        stmt = (
+            select(EscrowEvent)
+            .where(EscrowEvent.sponsored_project_id == sponsored_project_id)
+            .order_by(EscrowEvent.block_number, EscrowEvent.event_index)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    # ------------------------------------------------------------------- read
+
+    @staticmethod
+    def _scan(substrate: SubstrateInterface, start: Optional[int]) -> Tuple[int, Optional[str], List[EmittedEvent]]:
+        """Collect contract events of finalized blocks from `start` (the finalized head when None).
+
+        Returns:
+            The last block number scanned, its hash, and the events found
+        """
+        finalized = substrate.get_block_number(substrate.get_chain_finalised_head())
+        if start is None:
+            start = finalized
+        end = min(finalized, start + EVENTS_BLOCKS_PER_PASS - 1)
+        emitted: List[EmittedEvent] = []
+        block_hash = None
+        for number in range(start, end + 1):
+            block_hash = substrate.get_block_hash(number)
+            for index, record in enumerate(substrate.get_events(block_hash)):
+                if record.value["module_id"] != "Contracts" or record.value["event_id"] != "ContractEmitted":
+                    continue
+                emitted.append(
+                    EmittedEvent(
+                        block_number=number,
+                        block_hash=block_hash,
+                        event_index=index,
+                        contract_address=record.value["attributes"]["contract"],
+                        topics=tuple(record.value.get("topics") or ()),
+                        data=bytes(record["event"][1][1]["data"].value_object),
+                    )
+                )
+        return end, block_hash, emitted
+
+    def _decode(self, emitted: EmittedEvent) -> Tuple[str, Dict[str, Any]]:
+        return self.reader.codec().decode_event(emitted.data, emitted.topics)
+
+    def _decode_all(
+        self, emitted: Sequence[EmittedEvent], projects: Dict[str, List[SponsoredProject]]
+    ) -> List[EscrowEvent]:
+        events = []
+        for raw in emitted:
+            try:
+                name, args = self._decode(raw)
+            except Exception as e:
+                # Contracts deployed from an older artifact may not decode; skip rather than stall the cursor
+                logger.warning("Undecodable event {}-{} from {}: {}", raw.block_number, raw.event_index,
+                               raw.contract_address, e)
+                continue
+            if name not in ESCROW_EVENTS:
+                continue
+            owner = args.get("project_owner")
+            candidates = projects.get(raw.contract_address, [])
+            project = next((p for p in candidates if escrow_owner(p) == owner), None)
+            if project is None and len(candidates) == 1:
+                project = candidates[0]
+            events.append(
+                EscrowEvent(
+                    block_number=raw.block_number,
+                    block_hash=raw.block_hash,
+                    event_index=raw.event_index,
+                    contract_address=raw.contract_address,
+                    name=name,
+                    project_owner=owner,
+                    sponsored_project_id=project.id if project else None,
+                    milestone_index=args.get("milestone_index"),
+                    milestone_count=args.get("milestone_count"),
+                    amount=args.get("total_amount", args.get("amount", args.get("remaining_amount"))),
+                )
+            )
+        return events
+
+    # ------------------------------------------------------------------ apply
+
+    @staticmethod
+    async def _apply(events: Sequence[EscrowEvent], session: AsyncSession) -> None:
+        """Store `events` idempotently and materialize them onto projects and milestones."""
+        rows = [event.model_dump(exclude={"id", "created_at"}) for event in events]
+        insert = _insert(session.get_bind().dialect.name)
+        await session.execute(
+            insert(EscrowEvent).values(rows).on_conflict_do_nothing(index_elements=["block_number", "event_index"])
+        )
+
+        # Latest lifecycle event per project wins; events arrive in chain order
+        statuses: Dict[int, str] = {}
+        released: Dict[int, List[int]] = {}
+        for event in events:
+            if event.sponsored_project_id is None:
+                continue
+            if event.name == ESCROW_CREATED:
+                statuses[event.sponsored_project_id] = ESCROW_STATUS_ACTIVE
+            elif event.name == ESCROW_CANCELLED:
+                statuses[event.sponsored_project_id] = ESCROW_STATUS_CANCELLED
+            elif event.name == FUNDS_RELEASED:
+                released.setdefault(event.sponsored_project_id, []).append(event.milestone_index)
+
+        for status in (ESCROW_STATUS_ACTIVE, ESCROW_STATUS_CANCELLED):
+            ids = [pk for pk, value in statuses.items() if value == status]
+            if ids:
+                await session.execute(update(SponsoredProject).where(SponsoredProject.id.in_(ids)).values(escrow_status=status))
+
+        if released:
+            projects = await SponsoredProjectService.list_by_ids(list(released), session)
+            milestones = await MilestoneService.list_by_projects([project.project_id for project in projects], session)
+            milestone_ids = [
+                rows[index].id
+                for project in projects
+                for rows in [milestones.get(project.project_id, [])]
+                for index in released[project.id]
+                if index is not None and 0 <= index < len(rows)
+            ]
+            if milestone_ids:
+                await session.execute(update(Milestone).where(Milestone.id.in_(milestone_ids)).values(released=True))
+            await EscrowEventFollower._mark_completed(list(released), session)
+
+        if statuses or released:
+            response_cache.invalidate(SponsoredProjectService.CACHE_NAMESPACE)
+
+    @staticmethod
+    async def _mark_completed(project_ids: List[int], session: AsyncSession) -> None:
+        """Mark active escrows completed once every milestone announced by EscrowCreated was released."""
+        counts = (
+            select(EscrowEvent.sponsored_project_id, func.max(EscrowEvent.milestone_count).label("milestone_count"))
+            .where(EscrowEvent.sponsored_project_id.in_(project_ids), EscrowEvent.name == ESCROW_CREATED)
+            .group_by(EscrowEvent.sponsored_project_id)
+            .subquery()
+        )
+        done = (
+            select(EscrowEvent.sponsored_project_id)
+            .join(counts, counts.c.sponsored_project_id == EscrowEvent.sponsored_project_id)
+            .where(EscrowEvent.name == FUNDS_RELEASED)
+            .group_by(EscrowEvent.sponsored_project_id, counts.c.milestone_count)
+            .having(func.count(distinct(EscrowEvent.milestone_index)) >= counts.c.milestone_count)
+        )
+        completed = (await session.execute(done)).scalars().all()
+        if completed:
+            await session.execute(
+                update(SponsoredProject)
+                .where(
+                    SponsoredProject.id.in_(completed),
+                    or_(SponsoredProject.escrow_status.is_(None), SponsoredProject.escrow_status == ESCROW_STATUS_ACTIVE),
+                )
+                .values(escrow_status=ESCROW_STATUS_COMPLETED)
+            )
+
+    async def follow_once(self, session: AsyncSession) -> int:
+        """One pass: read the next finalized blocks, apply their escrow events and advance the cursor.
+
+        Returns:
+            The number of blocks processed
+
+        Raises:
+            SubstrateUnavailable: if no pooled connection is available
+        """
+        stmt = select(ChainCursor).where(ChainCursor.name == CURSOR_NAME)
+        cursor = (await session.execute(stmt)).scalar_one_or_none()
+        start = cursor.block_number + 1 if cursor else self.start_block
+
+        async with self.pool.connection() as substrate:
+            end, end_hash, emitted = await asyncio.to_thread(self._scan, substrate, start)
+        if start is not None and end < start:
+            return 0
+
+        projects: Dict[str, List[SponsoredProject]] = {}
+        addresses = list({raw.contract_address for raw in emitted})
+        for project in await SponsoredProjectService.list_by_contracts(addresses, session):
+            projects.setdefault(escrow_contract(project), []).append(project)
+        # Decoding is offline with the precompiled codec, so it needs no connection
+        events = self._decode_all([raw for raw in emitted if raw.contract_address in projects], projects)
+
+        if events:
+            await self._apply(events, session)
+        if cursor is None:
+            cursor = ChainCursor(name=CURSOR_NAME, block_number=end)
+            session.add(cursor)
+        cursor.block_number, cursor.block_hash = end, end_hash
+        await session.commit()
+        if events:
+            logger.info("Applied {} escrow events up to block {}", len(events), end)
+        return end - start + 1 if start is not None else 1
+
+    async def _follow_loop(self) -> None:
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    blocks = await self.follow_once(session)
+            except Exception as e:
+                logger.warning("Following escrow events failed: {}", e)
+                blocks = 0
+            # Keep going without a pause while catching up on a backlog of blocks
+            if blocks < EVENTS_BLOCKS_PER_PASS:
+                await asyncio.sleep(self.poll_interval)
+
+
+escrow_event_follower = EscrowEventFollower(
+    poll_interval=SubstrateSettings.EVENTS_POLL_INTERVAL,
+    start_block=SubstrateSettings.EVENTS_START_BLOCK,
+)
@@ -0,0 +1,418 @@
+"""
+Escrow Deployment Jobs - run escrow deployments in the background
+
+`POST /escrow/deploy-escrow` only records an `EscrowDeploymentJob` and returns;
+workers started with the app lifespan execute it step by step:
+
+    uploaded -> instantiated -> escrow_created -> finalized -> db_saved -> arkiv_synced
+
+Each completed step is checkpointed on the job row together with its outputs
+(code hash, contract address, inclusion block), so a job interrupted by a
+crash or a failed attempt resumes after its last completed step instead of
+starting over. Jobs are claimed with a conditional UPDATE; a `running` job
+whose row has not been touched for the lease period is considered abandoned
+and picked up again by the periodic sweep (also across processes).
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from substrateinterface import Keypair
+
+from arkiv import Arkiv
+from src.core.depends.arkiv import get_arkiv_client
+from src.core.depends.db import AsyncSessionLocal
+from src.core.http_cache import response_cache
+from src.core.log import sampled_logger
+from src.core.metrics import QUEUE_DEPTH
+from src.core.single_flight import KeyedLock
+from src.models.escrow_job import (
+    ESCROW_JOB_FAILED,
+    ESCROW_JOB_QUEUED,
+    ESCROW_JOB_RUNNING,
+    ESCROW_JOB_STEPS,
+    ESCROW_JOB_SUCCEEDED,
+    EscrowDeploymentJob,
+)
+from src.models.sponsor import SponsoredProject
+from src.services.arkiv import ArkivService
+from src.services.escrow_plan import plan_escrow
+from src.services.escrow_state import EscrowStateReader, escrow_owner, escrow_state_reader
+from src.services.milestone import MilestoneService
+from src.services.nonces import NonceManager, signer_nonces
+from src.services.rococo_deployer import RococoDeployer
+from src.services.sponsor import SponsoredProjectService
+from src.services.substrate_pool import SubstratePool, substrate_pool
+from src.settings.substrate import SubstrateSettings
+
+
+class EscrowJobService:
+    """Service for persisted escrow deployment jobs.
+
+    All methods are async and expect an `AsyncSession` (from `src.core.depends.db.get_async_session`)
+    so they can be used easily from FastAPI endpoints with `Depends`.
+    """
+
+    # Serializes create_or_join per project within this process
+    _project_locks = KeyedLock()
+
+    @staticmethod
+    async def create(sponsored_project_id: int, session: AsyncSession) -> EscrowDeploymentJob:
+        """Queue a deployment job for a sponsored project.
+
+        Args:
+            sponsored_project_id: Primary key of the sponsored project
+            session: AsyncSession for database operations
+
+        Returns:
+            The created EscrowDeploymentJob instance
+        """
+        job = EscrowDeploymentJob(sponsored_project_id=sponsored_project_id, salt="0x" + os.urandom(16).hex())
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+    @staticmethod
+    async def get_active(sponsored_project_id: int, session: AsyncSession) -> Optional[EscrowDeploymentJob]:
+        """The queued or running job of a sponsored project, if any."""
+        stmt = select(EscrowDeploymentJob).where(
+            EscrowDeploymentJob.sponsored_project_id == sponsored_project_id,
+            EscrowDeploymentJob.status.in_((ESCROW_JOB_QUEUED, ESCROW_JOB_RUNNING)),
+        )
+        result = await session.execute(stmt)
+        return result.scalars().first()
+
+    @staticmethod
+    async def _insert_active(sponsored_project_id: int, session: AsyncSession) -> bool:
+        """Insert a queued job unless the project has an unfinished one; False when it does."""
+        # ON CONFLICT DO NOTHING on the partial unique index rather than an IntegrityError,
+        # whose rollback would expire the session's objects
+        if session.get_bind().dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        job = EscrowDeploymentJob(sponsored_project_id=sponsored_project_id, salt="0x" + os.urandom(16).hex())
+        result = await session.execute(
+            insert(EscrowDeploymentJob)
+            .values(**job.model_dump(exclude={"id", "created_at"}))
+            .on_conflict_do_nothing(
+                index_elements=["sponsored_project_id"],
+                index_where=EscrowDeploymentJob.status.in_((ESCROW_JOB_QUEUED, ESCROW_JOB_RUNNING)),
+            )
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def create_or_join(sponsored_project_id: int, session: AsyncSession) -> Tuple[EscrowDeploymentJob, bool]:
+        """Return the project's unfinished job, or queue a new one when it has none.
+
+        Concurrent calls for a project are serialized in this process, so a
+        duplicate request joins the job of the first. Across processes the
+        insert skips on the unique index of unfinished jobs, and the call
+        joins the job that won.
+
+        Returns:
+            The job, and whether it was created by this call
+        """
+        async with EscrowJobService._project_locks.hold(sponsored_project_id):
+            while True:
+                job = await EscrowJobService.get_active(sponsored_project_id, session)
+                if job is not None:
+                    return job, False
+                if await EscrowJobService._insert_active(sponsored_project_id, session):
+                    return await EscrowJobService.get_active(sponsored_project_id, session), True
+                # Lost the insert to another process; its job may already have finished, so look again
+
+    @staticmethod
+    async def get_by_id(job_id: int, session: AsyncSession) -> Optional[EscrowDeploymentJob]:
+        """Retrieve a job by primary key."""
+        return await session.get(EscrowDeploymentJob, job_id, populate_existing=True)
+
+    @staticmethod
+    async def list_unfinished(session: AsyncSession) -> List[int]:
+        """Ids of jobs that are queued or running, oldest first."""
+        stmt = (
+            select(EscrowDeploymentJob.id)
+            .where(EscrowDeploymentJob.status.in_((ESCROW_JOB_QUEUED, ESCROW_JOB_RUNNING)))
+            .order_by(EscrowDeploymentJob.id)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def claim(job_id: int, stale_before: datetime, session: AsyncSession) -> bool:
+        """Atomically mark a job as running and count the attempt.
+
+        Succeeds for queued jobs and for running jobs last updated before `stale_before`
+        (their worker is gone); returns False when another worker holds the job.
+        """
+        stmt = (
+            update(EscrowDeploymentJob)
+            .where(
+                EscrowDeploymentJob.id == job_id,
+                or_(
+                    EscrowDeploymentJob.status == ESCROW_JOB_QUEUED,
+                    and_(
+                        EscrowDeploymentJob.status == ESCROW_JOB_RUNNING,
+                        EscrowDeploymentJob.updated_at < stale_before,
+                    ),
+                ),
+            )
+            .values(
+                status=ESCROW_JOB_RUNNING,
+                attempts=EscrowDeploymentJob.attempts + 1,
+                updated_at=datetime.now(),
+            )
+        )
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount == 1
+
+
+def _pending(job: EscrowDeploymentJob, step: str) -> bool:
+    """True if `step` has not been completed yet."""
+    done = ESCROW_JOB_STEPS.index(job.step) if job.step else -1
+    return ESCROW_JOB_STEPS.index(step) > done
+
+
+class EscrowJobRunner:
+    """In-process workers executing escrow deployment jobs."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_attempts: int = 3,
+        finalization_timeout: float = 120.0,
+        pool: SubstratePool = substrate_pool,
+        reader: EscrowStateReader = escrow_state_reader,
+        nonces: NonceManager = signer_nonces,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        arkiv_client_factory: Callable[[], Arkiv] = get_arkiv_client,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.finalization_timeout = finalization_timeout
+        self.pool = pool
+        self.reader = reader
+        self.nonces = nonces
+        self.session_factory = session_factory
+        self.arkiv_client_factory = arkiv_client_factory
+        # A running job's row is touched at every checkpoint; the longest gap is the finalization wait
+        self.lease = timedelta(seconds=finalization_timeout + 60)
+        self._queue: Optional[asyncio.Queue] = None
+        self._inflight: set[int] = set()
+        self._updates: Dict[int, asyncio.Event] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = True
+
+    @property
+    def queued(self) -> int:
+        """Jobs waiting for a worker in this process."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start(self) -> None:
+        """Start the workers and resume unfinished jobs."""
+        if not self._closed:
+            return
+        self._closed = False
+        self._queue = asyncio.Queue()
+        for _ in range(self.workers):
+            self._spawn(self._worker())
+        self._spawn(self._sweep_loop())
+
+    async def close(self) -> None:
+        """Stop the workers; interrupted jobs are resumed by the next start."""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._inflight.clear()
+
+    def enqueue(self, job_id: int, delay: float = 0.0) -> None:
+        """Schedule a job on this process's workers (no-op if already scheduled here)."""
+        if self._closed or job_id in self._inflight:
+            return
+        self._inflight.add(job_id)
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job_id)
+        else:
+            self._queue.put_nowait(job_id)
+
+    async def wait_for_update(self, job_id: int, timeout: float) -> bool:
+        """Wait until a worker in this process changes the job; False on timeout."""
+        event = self._updates.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _notify(self, job_id: int) -> None:
+        event = self._updates.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _sweep_loop(self) -> None:
+        while not self._closed:
+            try:
+                async with self.session_factory() as session:
+                    for job_id in await EscrowJobService.list_unfinished(session):
+                        self.enqueue(job_id)
+            except Exception as e:
+                logger.warning("Could not scan for unfinished escrow jobs: {}", e)
+            await asyncio.sleep(self.lease.total_seconds() / 2)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            retry_in = None
+            try:
+                retry_in = await self._run(job_id)
+            except Exception:
+                logger.exception("Escrow job {} crashed", job_id)
+            finally:
+                self._inflight.discard(job_id)
+                self._notify(job_id)
+            if retry_in is not None:
+                self.enqueue(job_id, retry_in)
+
+    async def _checkpoint(self, job: EscrowDeploymentJob, session: AsyncSession, step: str, **values) -> None:
+        for key, value in values.items():
+            setattr(job, key, value)
+        job.step = step
+        job.updated_at = datetime.now()
+        await session.commit()
+        sampled_logger.info("Escrow job {} reached step {}", job.id, step)
+        self._notify(job.id)
+
+    async def _run(self, job_id: int) -> Optional[float]:
+        """Run one attempt of a job; returns the backoff in seconds if it should be retried."""
+        async with self.session_factory() as session:
+            if not await EscrowJobService.claim(job_id, datetime.now() - self.lease, session):
+                return None
+            job = await EscrowJobService.get_by_id(job_id, session)
+            self._notify(job_id)
+            try:
+                await self._execute(job, session)
+            except Exception as e:
+                await session.rollback()
+                job = await EscrowJobService.get_by_id(job_id, session)
+                job.error = str(e)
+                job.updated_at = datetime.now()
+                if job.attempts >= self.max_attempts:
+                    job.status = ESCROW_JOB_FAILED
+                    job.finished_at = datetime.now()
+                    logger.error("Escrow job {} failed after {} attempts at step {}: {}", job_id, job.attempts, job.step, e)
+                else:
+                    job.status = ESCROW_JOB_QUEUED
+                    logger.warning("Escrow job {} attempt {} failed at step {}: {}", job_id, job.attempts, job.step, e)
+                await session.commit()
+                return 2.0 ** job.attempts if job.status == ESCROW_JOB_QUEUED else None
+        return None
+
+    async def _execute(self, job: EscrowDeploymentJob, session: AsyncSession) -> None:
+        project = await session.get(SponsoredProject, job.sponsored_project_id)
+        if project is None:
+            raise RuntimeError(f"Sponsored project {job.sponsored_project_id} no longer exists")
+
+        deployer = RococoDeployer(
+            pool=self.pool, artifacts=self.reader.artifacts, reader=self.reader, nonces=self.nonces
+        )
+        # Milestones in one query, split into exact integer percentages and planck amounts
+        milestones = await MilestoneService.list_by_projects([project.project_id], session)
+        plan = plan_escrow(project.budget, milestones[project.project_id])
+
+        if _pending(job, "finalized"):
+            if SubstrateSettings.SIGNER_URI:
+                keypair = Keypair.create_from_uri(SubstrateSettings.SIGNER_URI.get_secret_value())
+                async with deployer.borrow():
+                    if _pending(job, "uploaded"):
+                        code = await deployer.ensure_code_uploaded(keypair, session)
+                        await self._checkpoint(
+                            job, session, "uploaded", code_hash=code["code_hash"], code_uploaded=code["uploaded"]
+                        )
+                    if _pending(job, "instantiated"):
+                        instance = await deployer.instantiate(keypair, job.code_hash, job.salt)
+                        await self._checkpoint(
+                            job,
+                            session,
+                            "instantiated",
+                            contract_address=instance["contract_address"],
+                            block_hash=instance["block_hash"],
+                        )
+                    if _pending(job, "escrow_created"):
+                        escrow = await deployer.create_escrow(
+                            keypair, job.contract_address, escrow_owner(project), plan
+                        )
+                        # Finalizing the later block covers the instantiation too
+                        await self._checkpoint(
+                            job,
+                            session,
+                            "escrow_created",
+                            block_hash=escrow["block_hash"],
+                            milestone_count=plan.milestone_count,
+                        )
+                await deployer.wait_finalized(job.block_hash, self.finalization_timeout)
+                await self._checkpoint(job, session, "finalized")
+            else:
+                # No signer configured: the deployment is simulated, there is no block to wait for
+                deployment = await deployer.deploy_contract(
+                    project_owner=project.project_id,
+                    milestone_count=plan.milestone_count,
+                    total_amount=plan.deposit,
+                )
+                if not deployment:
+                    raise RuntimeError("Failed to deploy contract to Rococo")
+                await self._checkpoint(
+                    job,
+                    session,
+                    "finalized",
+                    code_hash=deployment["wasm_hash"],
+                    contract_address=deployment["contract_address"],
+                    milestone_count=plan.milestone_count,
+                )
+
+        if _pending(job, "db_saved"):
+            project.polkadot_smart_contract = job.contract_address
+            await self._checkpoint(job, session, "db_saved")
+            response_cache.invalidate(SponsoredProjectService.CACHE_NAMESPACE)
+
+        if _pending(job, "arkiv_synced"):
+            arkiv_updated = False
+            if project.entity_key:
+                # The Arkiv client is synchronous (web3 over HTTP)
+                client = await asyncio.to_thread(self.arkiv_client_factory)
+                arkiv_updated = await asyncio.to_thread(
+                    ArkivService.update_entity_with_contract, client, project.entity_key, job.contract_address
+                )
+                if not arkiv_updated:
+                    raise RuntimeError(f"Failed to update Arkiv entity {project.entity_key}")
+            else:
+                logger.warning("Escrow job {}: project has no entity_key, skipping Arkiv update", job.id)
+            await self._checkpoint(job, session, "arkiv_synced", arkiv_updated=arkiv_updated)
+
+        job.status = ESCROW_JOB_SUCCEEDED
+        job.error = None
+        job.finished_at = datetime.now()
+        await session.commit()
+        logger.info("Escrow job {} deployed {} for project {}", job.id, job.contract_address, project.id)
+
+
+escrow_job_runner = EscrowJobRunner(
+    workers=SubstrateSettings.JOB_WORKERS,
+    max_attempts=SubstrateSettings.JOB_MAX_ATTEMPTS,
+    finalization_timeout=SubstrateSettings.FINALIZATION_TIMEOUT,
+)
+QUEUE_DEPTH.set_function(lambda: escrow_job_runner.queued, queue="escrow_jobs")
@@ -0,0 +1,89 @@
+"""
+Escrow Plan - exact milestone split of a project's escrow deposit
+
+The funding-escrow contract takes integer release percentages and computes
+each milestone amount as `total / 100 * percentage` (integer division).
+The plan therefore:
+
+- converts the budget to planck with `Decimal`, avoiding float rounding
+- derives percentages from the milestones' amounts with the largest
+  remainder method, so they are integers that always sum to 100
+- rounds the deposit down to a multiple of 100 planck, so the contract's
+  milestone amounts are exact and add up to the deposit
+- allows at most `MAX_MILESTONES` milestones: with integer percentages any
+  milestone past the hundredth would be worth 0%
+"""
+from dataclasses import dataclass, field
+from decimal import ROUND_DOWN, Decimal
+from typing import List, Optional, Sequence
+
+from src.models.milestone import Milestone
+
+# Milestones per escrow when a project has none recorded
+DEFAULT_MILESTONE_COUNT = 4
+# Percentages are integers summing to 100
+MAX_MILESTONES = 100
+PLANCK_PER_UNIT = 10**12
+
+
+def to_planck(value: float) -> int:
+    """Convert an amount in whole units to planck without float error."""
+    return int((Decimal(str(value)) * PLANCK_PER_UNIT).to_integral_value(rounding=ROUND_DOWN))
+
+
+def largest_remainder(weights: Sequence[int], total: int = 100) -> List[int]:
+    """Split `total` proportionally to integer `weights` into integers that sum to `total`.
+
+    Each share is floored, then the leftover units go to the largest remainders
+    (ties to the earlier index). Equal split when every weight is zero.
+    """
+    if not weights:
+        return []
+    if sum(weights) <= 0:
+        weights = [1] * len(weights)
+    weight_sum = sum(weights)
+    quotients = [divmod(weight * total, weight_sum) for weight in weights]
+    shares = [quotient for quotient, _ in quotients]
+    leftover = total - sum(shares)
+    by_remainder = sorted(range(len(weights)), key=lambda i: (-quotients[i][1], i))
+    for i in by_remainder[:leftover]:
+        shares[i] += 1
+    return shares
+
+
+@dataclass
+class EscrowPlan:
+    """Milestone split of an escrow: what `create_escrow` / `add_milestone` receive."""
+
+    deposit: int
+    percentages: List[int]
+    amounts: List[int]
+    milestone_ids: List[Optional[int]] = field(default_factory=list)
+
+    @property
+    def milestone_count(self) -> int:
+        return len(self.percentages)
+
+
+def plan_escrow(budget: float, milestones: Sequence[Milestone]) -> EscrowPlan:
+    """Plan a project's escrow from its budget and Milestone rows (ordered by id).
+
+    Without milestones the deposit is split evenly over `DEFAULT_MILESTONE_COUNT`.
+
+    Raises:
+        ValueError: if the project has more than `MAX_MILESTONES` milestones
+    """
+    if len(milestones) > MAX_MILESTONES:
+        raise ValueError(f"An escrow holds at most {MAX_MILESTONES} milestones, the project has {len(milestones)}")
+    if milestones:
+        percentages = largest_remainder([to_planck(milestone.amount) for milestone in milestones])
+        milestone_ids = [milestone.id for milestone in milestones]
+    else:
+        percentages = largest_remainder([1] * DEFAULT_MILESTONE_COUNT)
+        milestone_ids = [None] * DEFAULT_MILESTONE_COUNT
+
+    total = to_planck(budget)
+    deposit = total - total % 100
+    # Same arithmetic as the contract's add_milestone
+    amounts = [deposit // 100 * percentage for percentage in percentages]
+    return EscrowPlan(deposit=deposit, percentages=percentages, amounts=amounts, milestone_ids=milestone_ids)
@@ -0,0 +1,328 @@
+"""
+Escrow State Reader - batched on-chain reads of funding-escrow state
+
+The escrow contract exposes its state through per-owner `get_escrow_status`
+and per-milestone `get_milestone_status` messages. Reading many projects
+one message at a time costs N x M sequential round trips, so reads are:
+
+- pinned to a single block (the chain head at the start of the request), so
+  every value in a response comes from the same state
+- cached per block hash: state at a given block never changes, so no
+  invalidation is needed and concurrent requests within one block share results
+- sent as JSON-RPC batches of `state_call`s on one pooled connection, so a
+  portfolio costs a round trip per `SUBSTRATE_RPC_BATCH_SIZE` reads and the
+  other connections stay free for deployments and releases
+- encoded and decoded with the shared precompiled codec of the contract ABI
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from substrateinterface import Keypair, SubstrateInterface
+
+from src.core.metrics import CACHE_REQUESTS
+from src.core.timing import traced
+from src.models.escrow_state import EscrowMilestoneState, EscrowState
+from src.models.milestone import Milestone
+from src.models.sponsor import SponsoredProject
+from src.services.contract_artifacts import ContractArtifactRegistry, artifact_registry
+from src.services.contract_codec import ContractCodec, ContractCodecRegistry, contract_codecs
+from src.services.escrow_plan import DEFAULT_MILESTONE_COUNT, plan_escrow
+from src.services.substrate_pool import SubstratePool, substrate_pool
+from src.settings.substrate import SubstrateSettings
+
+# (contract address, message, args)
+Call = Tuple[str, str, Tuple[Any, ...]]
+
+
+@lru_cache(maxsize=4)
+def _signer_address(signer_uri: str) -> str:
+    return Keypair.create_from_uri(signer_uri).ss58_address
+
+
+def escrow_owner(project: SponsoredProject) -> Optional[str]:
+    """Account the project's escrow is keyed by: its payout account, else the deployer account."""
+    if project.owner_account:
+        return project.owner_account
+    if SubstrateSettings.SIGNER_URI:
+        return _signer_address(SubstrateSettings.SIGNER_URI.get_secret_value())
+    return None
+
+
+def escrow_contract(project: SponsoredProject) -> Optional[str]:
+    """Address of the project's escrow contract (deployed address first, then the legacy field)."""
+    return project.polkadot_smart_contract or project.contract_address or None
+
+
+@dataclass(frozen=True)
+class EscrowTarget:
+    """One escrow to read: the contract, the owner key and how many milestones to fetch."""
+
+    project_id: int
+    contract_address: str
+    owner_account: str
+    milestone_count: int = DEFAULT_MILESTONE_COUNT
+
+
+def unwrap_result(value: Any) -> Any:
+    """Strip a decoded `Result` wrapper (ink!'s `Result<T, LangError>`, or a message's own `Result`).
+
+    Raises:
+        RuntimeError: if the result is an `Err`
+    """
+    if isinstance(value, dict) and len(value) == 1:
+        if "Ok" in value:
+            return value["Ok"]
+        if "Err" in value:
+            raise RuntimeError(f"Contract returned error: {value['Err']}")
+    return value
+
+
+class EscrowStateReader:
+    """Reads escrow state for many projects with block-pinned, cached, batched dry-runs."""
+
+    def __init__(
+        self,
+        pool: SubstratePool = substrate_pool,
+        artifacts: ContractArtifactRegistry = artifact_registry,
+        codecs: ContractCodecRegistry = contract_codecs,
+        cache_size: int = 4096,
+        batch_size: int = SubstrateSettings.RPC_BATCH_SIZE,
+    ):
+        self.pool = pool
+        self.artifacts = artifacts
+        self.codecs = codecs
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._cache: "OrderedDict[Tuple[str, Call], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_get(self, key: Tuple[str, Call]) -> Tuple[bool, Any]:
+        with self._lock:
+            if key not in self._cache:
+                CACHE_REQUESTS.inc(cache="escrow_state", result="miss")
+                return False, None
+            CACHE_REQUESTS.inc(cache="escrow_state", result="hit")
+            self._cache.move_to_end(key)
+            return True, self._cache[key]
+
+    def _cache_set(self, key: Tuple[str, Call], value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def codec(self) -> ContractCodec:
+        """Precompiled codec for the current contract artifact (shared by every connection)."""
+        return self.codecs.get(self.artifacts.get())
+
+    @staticmethod
+    def _call_params(
+        codec: ContractCodec, contract_address: str, origin: str, message: str, args: Dict[str, Any], value: int = 0
+    ) -> Dict[str, Any]:
+        return {
+            "dest": contract_address,
+            "gas_limit": None,
+            "input_data": "0x" + codec.encode_call(message, args).hex(),
+            "origin": origin,
+            "value": value,
+            "storage_deposit_limit": None,
+        }
+
+    @staticmethod
+    def _exec_result(codec: ContractCodec, message: str, result: Any) -> Tuple[Any, Any]:
+        if "Ok" not in result["result"]:
+            raise RuntimeError(f"Contract call failed: {result.value['result']}")
+        decoded = codec.decode_result(message, result["result"][1]["data"].value_object)
+        return decoded, result["gas_required"].value
+
+    @traced("substrate")
+    def call(
+        self,
+        substrate: SubstrateInterface,
+        contract_address: str,
+        origin: str,
+        message: str,
+        args: Dict[str, Any],
+        block_hash: Optional[str] = None,
+        value: int = 0,
+    ) -> Tuple[Any, Any]:
+        """Dry-run `message` through `ContractsApi_call` (transferring `value` for payable messages).
+
+        Returns:
+            The decoded return value and the gas required
+
+        Raises:
+            RuntimeError: if the call could not be executed
+        """
+        codec = self.codec()
+        params = self._call_params(codec, contract_address, origin, message, args, value)
+        result = substrate.runtime_call("ContractsApi", "call", params, block_hash)
+        return self._exec_result(codec, message, result)
+
+    @traced("substrate")
+    def call_batch(
+        self,
+        substrate: SubstrateInterface,
+        contract_address: str,
+        origin: str,
+        messages: Sequence[Tuple[str, Dict[str, Any]]],
+        block_hash: Optional[str] = None,
+    ) -> List[Any]:
+        """Dry-run `messages` on one contract in JSON-RPC batches of `batch_size` (see `call`).
+
+        Returns:
+            For each message, its decoded return value and gas required, or the exception it failed with
+        """
+        codec = self.codec()
+        results: List[Any] = []
+        for start in range(0, len(messages), self.batch_size):
+            chunk = messages[start:start + self.batch_size]
+            params = [self._call_params(codec, contract_address, origin, message, args) for message, args in chunk]
+            for (message, _), result in zip(chunk, substrate.runtime_call_batch("ContractsApi", "call", params, block_hash)):
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    results.append(self._exec_result(codec, message, result))
+                except Exception as e:
+                    results.append(e)
+        return results
+
+    @traced("substrate")
+    def _read_batch(self, substrate: SubstrateInterface, calls: Sequence[Call], block_hash: str) -> Dict[Call, Any]:
+        """Dry-run read-only `calls` in JSON-RPC batches of `batch_size`."""
+        codec = self.codec()
+        arg_names = ("project_owner", "milestone_index")
+        results: Dict[Call, Any] = {}
+        for start in range(0, len(calls), self.batch_size):
+            chunk = calls[start:start + self.batch_size]
+            # Read-only messages ignore the caller; the owner account is a valid origin
+            params = [
+                self._call_params(codec, address, args[0], message, dict(zip(arg_names, args)))
+                for address, message, args in chunk
+            ]
+            for call, result in zip(chunk, substrate.runtime_call_batch("ContractsApi", "call", params, block_hash)):
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    results[call] = unwrap_result(self._exec_result(codec, call[1], result)[0])
+                    self._cache_set((block_hash, call), results[call])
+                except Exception as e:
+                    # Errors are per contract (e.g. not deployed) and are not cached
+                    results[call] = e
+        return results
+
+    @staticmethod
+    def _calls(target: EscrowTarget) -> List[Call]:
+        calls = [(target.contract_address, "get_escrow_status", (target.owner_account,))]
+        calls += [
+            (target.contract_address, "get_milestone_status", (target.owner_account, index))
+            for index in range(target.milestone_count)
+        ]
+        return calls
+
+    async def read(self, targets: Sequence[EscrowTarget]) -> List[EscrowState]:
+        """Read escrow and milestone state for every target at the current chain head.
+
+        Raises:
+            SubstrateUnavailable: if no pooled connection is available
+        """
+        if not targets:
+            return []
+        # One connection for the whole read: the reads go out in batches, not in parallel
+        async with self.pool.connection() as substrate:
+            block_hash = await asyncio.to_thread(substrate.get_chain_head)
+
+            values: Dict[Call, Any] = {}
+            missing: List[Call] = []
+            for target in targets:
+                for call in self._calls(target):
+                    hit, value = self._cache_get((block_hash, call))
+                    if hit:
+                        values[call] = value
+                    elif call not in values:
+                        values[call] = None
+                        missing.append(call)
+
+            if missing:
+                values.update(await asyncio.to_thread(self._read_batch, substrate, missing, block_hash))
+                logger.debug(
+                    "Escrow state at {}: {} dry-runs in {} batches, {} cached",
+                    block_hash, len(missing), -(-len(missing) // self.batch_size), len(values) - len(missing),
+                )
+
+        return [self._assemble(target, block_hash, values) for target in targets]
+
+    def _assemble(self, target: EscrowTarget, block_hash: str, values: Dict[Call, Any]) -> EscrowState:
+        calls = self._calls(target)
+        state = EscrowState(
+            project_id=target.project_id,
+            contract_address=target.contract_address,
+            owner_account=target.owner_account,
+            block_hash=block_hash,
+        )
+        escrow = values[calls[0]]
+        if isinstance(escrow, Exception):
+            state.error = str(escrow)
+            return state
+        if escrow is None:
+            # Contract reachable but no escrow created for this owner yet
+            return state
+
+        total, released, cancelled, completed = escrow
+        state.exists = True
+        state.total_amount = total
+        state.released_amount = released
+        state.remaining_amount = total - released
+        state.cancelled = cancelled
+        state.completed = completed
+        for index, call in enumerate(calls[1:]):
+            milestone = values[call]
+            if isinstance(milestone, Exception):
+                state.error = str(milestone)
+                state.milestones.append(EscrowMilestoneState(index=index, exists=False))
+            elif milestone is None:
+                state.milestones.append(EscrowMilestoneState(index=index, exists=False))
+            else:
+                amount, is_released = milestone
+                state.milestones.append(EscrowMilestoneState(index=index, amount=amount, released=is_released))
+        return state
+
+    @staticmethod
+    def simulated(project: SponsoredProject, milestones: Sequence[Milestone]) -> EscrowState:
+        """State of a simulated deployment (no signer configured), derived from the database."""
+        try:
+            plan = plan_escrow(project.budget, milestones)
+        except ValueError as e:
+            return EscrowState(
+                project_id=project.id,
+                contract_address=escrow_contract(project) or "",
+                owner_account=project.owner_account or "",
+                source="simulated",
+                error=str(e),
+            )
+        released = [milestone.released for milestone in milestones] or [False] * plan.milestone_count
+        released_amount = sum(amount for amount, done in zip(plan.amounts, released) if done)
+        return EscrowState(
+            project_id=project.id,
+            contract_address=escrow_contract(project) or "",
+            owner_account=project.owner_account or "",
+            source="simulated",
+            exists=True,
+            total_amount=plan.deposit,
+            released_amount=released_amount,
+            remaining_amount=plan.deposit - released_amount,
+            completed=all(released),
+            milestones=[
+                EscrowMilestoneState(index=index, amount=amount, released=done)
+                for index, (amount, done) in enumerate(zip(plan.amounts, released))
+            ],
+        )
+
+
+escrow_state_reader = EscrowStateReader()
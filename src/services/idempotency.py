@@ -0,0 +1,254 @@
+"""
+Idempotency keys - execute a request at most once per `Idempotency-Key`
+
+The first request with a key claims it by inserting an `in_progress`
+`IdempotencyRecord`; when it succeeds, its response is stored on the record
+and replayed to every retry with the same key. A duplicate arriving while
+the first is still running waits for it (woken in-process, polling across
+processes) instead of executing again. A failed request releases its key so
+it can be retried.
+
+A request may record the results of its steps (`save_progress`) while it
+runs, e.g. the Arkiv entity it wrote. If it then fails, its key is kept as
+`interrupted` rather than released, and the next request with the key takes
+it over with that progress instead of repeating the steps.
+
+A key held longer than `IDEMPOTENCY_LOCK_SECONDS` (its process died) or
+completed longer than `IDEMPOTENCY_TTL_SECONDS` ago is taken over by the
+next request with that key (keeping the progress of the same request);
+expired records are purged periodically.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.core.http_cache import encode_json
+from src.models.idempotency import (
+    IDEMPOTENCY_COMPLETED,
+    IDEMPOTENCY_IN_PROGRESS,
+    IDEMPOTENCY_INTERRUPTED,
+    IdempotencyRecord,
+)
+from src.settings.idempotency import IdempotencySettings
+
+# Seconds between checks of a key held by another process
+POLL_INTERVAL = 0.25
+# Seconds between purges of expired records (per process)
+PURGE_INTERVAL = 600.0
+
+
+def _local(value: datetime) -> datetime:
+    """Naive local time, comparable with `datetime.now()` (PostgreSQL returns aware timestamps)."""
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used with a different request."""
+
+
+class IdempotencyInProgress(Exception):
+    """The request holding the key did not finish within `IDEMPOTENCY_WAIT_SECONDS`."""
+
+
+class IdempotencyService:
+    """Service for `IdempotencyRecord`s.
+
+    All methods are async and expect an `AsyncSession` (from `src.core.depends.db.get_async_session`)
+    so they can be used easily from FastAPI endpoints with `Depends`.
+    """
+
+    # (scope, key) -> event set when the request holding it in this process finishes
+    _finished: Dict[Tuple[str, str], asyncio.Event] = {}
+    _next_purge = 0.0
+
+    @staticmethod
+    async def begin(
+        scope: str, key: str, request_hash: str, session: AsyncSession
+    ) -> Tuple[Optional[IdempotencyRecord], Dict[str, Any]]:
+        """Claim `key` for this request, or return the completed record to replay.
+
+        Waits while another request holds the key.
+
+        Returns:
+            The completed record of the earlier request to replay, or None when
+            this request now holds the key and must execute; then also the
+            progress an interrupted or abandoned earlier attempt recorded
+
+        Raises:
+            IdempotencyKeyReused: the key belongs to a different request
+            IdempotencyInProgress: the request holding the key did not finish in time
+        """
+        deadline = time.monotonic() + IdempotencySettings.WAIT_SECONDS
+        while True:
+            if await IdempotencyService._insert(scope, key, request_hash, session):
+                await IdempotencyService._maybe_purge(session)
+                return None, {}
+            record = await IdempotencyService._get(scope, key, session)
+            # End the read transaction, so the next read sees commits of other sessions (SQLite snapshots)
+            await session.commit()
+            if record is None:
+                continue  # released in the meantime
+            now = datetime.now()
+            age = now - _local(record.updated_at)
+            expired = age > timedelta(seconds=IdempotencySettings.TTL_SECONDS)
+            abandoned = record.status == IDEMPOTENCY_IN_PROGRESS and age > timedelta(seconds=IdempotencySettings.LOCK_SECONDS)
+            if record.request_hash != request_hash and not expired:
+                raise IdempotencyKeyReused(f"Idempotency-Key {key!r} was used with a different request")
+            if record.status == IDEMPOTENCY_COMPLETED and not expired:
+                return record, {}
+            interrupted = record.status == IDEMPOTENCY_INTERRUPTED
+            # Progress only belongs to the same request; an expired key may be reused for another
+            progress = json.loads(record.progress) if record.progress and record.request_hash == request_hash else {}
+            if (expired or abandoned or interrupted) and await IdempotencyService._take_over(
+                record.id, request_hash, bool(progress), now, session
+            ):
+                if not interrupted:
+                    logger.warning("Idempotency-Key {!r} of {} taken over (expired or abandoned)", key, scope)
+                return None, progress
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyInProgress(f"A request with Idempotency-Key {key!r} is still in progress")
+            finished = IdempotencyService._finished.setdefault((scope, key), asyncio.Event())
+            try:
+                await asyncio.wait_for(finished.wait(), min(remaining, POLL_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    async def complete(scope: str, key: str, status_code: int, response_body: str, session: AsyncSession) -> None:
+        """Store the response of the request holding `key`, to be replayed to retries."""
+        await session.execute(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.scope == scope, IdempotencyRecord.key == key)
+            .values(
+                status=IDEMPOTENCY_COMPLETED,
+                status_code=status_code,
+                response_body=response_body,
+                updated_at=datetime.now(),
+            )
+        )
+        await session.commit()
+        IdempotencyService._notify(scope, key)
+
+    @staticmethod
+    async def save_progress(scope: str, key: str, progress: Dict[str, Any], session: AsyncSession) -> None:
+        """Record the results of the steps done so far by the request holding `key` (commits the session)."""
+        await session.execute(
+            update(IdempotencyRecord)
+            .where(
+                IdempotencyRecord.scope == scope,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.status == IDEMPOTENCY_IN_PROGRESS,
+            )
+            .values(progress=encode_json(progress).decode("utf-8"), updated_at=datetime.now())
+        )
+        await session.commit()
+
+    @staticmethod
+    async def release(scope: str, key: str, session: AsyncSession) -> None:
+        """Give up `key` after a failed request, so a retry executes again.
+
+        A key with recorded progress is kept as interrupted instead, so the
+        retry resumes from it rather than repeating those steps.
+        """
+        await session.rollback()
+        held = (
+            IdempotencyRecord.scope == scope,
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.status == IDEMPOTENCY_IN_PROGRESS,
+        )
+        await session.execute(
+            update(IdempotencyRecord)
+            .where(*held, IdempotencyRecord.progress.is_not(None))
+            .values(status=IDEMPOTENCY_INTERRUPTED, updated_at=datetime.now())
+        )
+        await session.execute(delete(IdempotencyRecord).where(*held))
+        await session.commit()
+        IdempotencyService._notify(scope, key)
+
+    @staticmethod
+    async def purge_expired(session: AsyncSession) -> int:
+        """Delete records older than `IDEMPOTENCY_TTL_SECONDS`; returns how many."""
+        cutoff = datetime.now() - timedelta(seconds=IdempotencySettings.TTL_SECONDS)
+        result = await session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.updated_at < cutoff))
+        await session.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def _insert(scope: str, key: str, request_hash: str, session: AsyncSession) -> bool:
+        # ON CONFLICT DO NOTHING rather than an IntegrityError, whose rollback would expire the session's objects
+        if session.get_bind().dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        result = await session.execute(
+            insert(IdempotencyRecord)
+            .values(scope=scope, key=key, request_hash=request_hash, status=IDEMPOTENCY_IN_PROGRESS, updated_at=datetime.now())
+            .on_conflict_do_nothing(index_elements=["scope", "key"])
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def _get(scope: str, key: str, session: AsyncSession) -> Optional[IdempotencyRecord]:
+        stmt = (
+            select(IdempotencyRecord)
+            .where(IdempotencyRecord.scope == scope, IdempotencyRecord.key == key)
+            .execution_options(populate_existing=True)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def _take_over(
+        record_id: int, request_hash: str, keep_progress: bool, now: datetime, session: AsyncSession
+    ) -> bool:
+        """Atomically claim an expired, abandoned or interrupted record; False when it is live or another request won."""
+        values = dict(
+            request_hash=request_hash,
+            status=IDEMPOTENCY_IN_PROGRESS,
+            status_code=None,
+            response_body=None,
+            updated_at=now,
+        )
+        if not keep_progress:
+            values["progress"] = None
+        result = await session.execute(
+            update(IdempotencyRecord)
+            .where(
+                IdempotencyRecord.id == record_id,
+                or_(
+                    IdempotencyRecord.updated_at < now - timedelta(seconds=IdempotencySettings.TTL_SECONDS),
+                    and_(
+                        IdempotencyRecord.status == IDEMPOTENCY_IN_PROGRESS,
+                        IdempotencyRecord.updated_at < now - timedelta(seconds=IdempotencySettings.LOCK_SECONDS),
+                    ),
+                    IdempotencyRecord.status == IDEMPOTENCY_INTERRUPTED,
+                ),
+            )
+            .values(**values)
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def _maybe_purge(session: AsyncSession) -> None:
+        if time.monotonic() < IdempotencyService._next_purge:
+            return
+        IdempotencyService._next_purge = time.monotonic() + PURGE_INTERVAL
+        purged = await IdempotencyService.purge_expired(session)
+        if purged:
+            logger.info("Purged {} expired idempotency records", purged)
+
+    @staticmethod
+    def _notify(scope: str, key: str) -> None:
+        finished = IdempotencyService._finished.pop((scope, key), None)
+        if finished is not None:
+            finished.set()
@@ -3,13 +3,18 @@ LangChain Service - AI-powered queries on Arkiv entities
 Provides easy-to-use interface for asking questions about projects stored in Arkiv
 """
 
+import asyncio
 import json
-import os
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from loguru import logger
+from src.core.log import sampled_logger
+from src.core.metrics import record_llm_usage
+from src.core.single_flight import SingleFlight, flight_key
+from src.core.timing import traced
+from src.settings.gemini import GeminiSettings
 
 
 class LangChainService:
@@ -18,11 +23,13 @@ class LangChainService:
     # Singleton instance
     _instance: Optional["LangChainService"] = None
     _llm: Optional[ChatGoogleGenerativeAI] = None
+    # Identical concurrent requests (same operation and arguments) share one LLM call
+    _flights = SingleFlight("langchain")
 
     def __init__(self):
         """Initialize LangChain service with Gemini"""
         # Get Google API Key from environment
-        google_api_key = os.getenv("GOOGLE_API_KEY")
+        google_api_key = GeminiSettings.API_KEY.get_secret_value() if GeminiSettings.API_KEY else None
         
         if not google_api_key:
             raise ValueError(
@@ -34,6 +41,7 @@ class LangChainService:
             model="gemini-2.0-flash",
             google_api_key=google_api_key,
             temperature=0.7,
+            base_url=GeminiSettings.BASE_URL,
         )
         logger.info("✅ LangChain service initialized with Gemini")
 
@@ -44,6 +52,31 @@ class LangChainService:
             cls._instance = cls()
         return cls._instance
 
+    def _invoke(self, operation: str, messages: list):
+        """Call the model and count the tokens it reports for `operation`."""
+        response = self._llm.invoke(messages)
+        usage = getattr(response, "usage_metadata", None) or {}
+        record_llm_usage(f"LangChainService.{operation}", usage.get("input_tokens"), usage.get("output_tokens"))
+        return response
+
+    async def _shared(self, method: Callable[..., str], *args: Any) -> str:
+        """Run `method` in a worker thread; concurrent calls with the same arguments share its result."""
+        key = flight_key(method.__name__, *args)
+        return await self._flights.do(key, lambda: asyncio.to_thread(method, *args))
+
+    async def query_entity_async(self, entity_data: dict, question: str, entity_type: str = "project") -> str:
+        return await self._shared(self.query_entity, entity_data, question, entity_type)
+
+    async def summarize_entity_async(self, entity_data: dict, entity_type: str = "project") -> str:
+        return await self._shared(self.summarize_entity, entity_data, entity_type)
+
+    async def analyze_entities_async(self, entities: list[dict], analysis_type: str = "general") -> str:
+        return await self._shared(self.analyze_entities, entities, analysis_type)
+
+    async def generate_report_async(self, entity_data: dict, report_type: str = "detailed") -> str:
+        return await self._shared(self.generate_report, entity_data, report_type)
+
+    @traced("llm")
     def query_entity(
         self,
         entity_data: dict,
@@ -81,9 +114,9 @@ Use the provided data to give accurate answers."""
             ]
 
             # Get response
-            response = self._llm.invoke(messages)
+            response = self._invoke("query_entity", messages)
 
-            logger.info(
+            sampled_logger.info(
                 f"✅ LangChain query successful - Entity: {entity_type}, Question: {question[:50]}..."
             )
 
@@ -93,6 +126,7 @@ Use the provided data to give accurate answers."""
             logger.error(f"❌ Error in LangChain query: {str(e)}")
             raise
 
+    @traced("llm")
     def summarize_entity(
         self,
         entity_data: dict,
@@ -124,9 +158,9 @@ Provide a clear, professional summary."""
                 HumanMessage(content="Please summarize this entity."),
             ]
 
-            response = self._llm.invoke(messages)
+            response = self._invoke("summarize_entity", messages)
 
-            logger.info(f"✅ Entity summary generated for {entity_type}")
+            sampled_logger.info(f"✅ Entity summary generated for {entity_type}")
 
             return response.content
 
@@ -134,6 +168,7 @@ Provide a clear, professional summary."""
             logger.error(f"❌ Error generating summary: {str(e)}")
             raise
 
+    @traced("llm")
     def analyze_entities(
         self,
         entities: list[dict],
@@ -177,9 +212,9 @@ Entities:
                 HumanMessage(content="Please proceed with the analysis."),
             ]
 
-            response = self._llm.invoke(messages)
+            response = self._invoke("analyze_entities", messages)
 
-            logger.info(
+            sampled_logger.info(
                 f"✅ Analysis completed - Type: {analysis_type}, Entities: {len(entities)}"
             )
 
@@ -189,6 +224,7 @@ Entities:
             logger.error(f"❌ Error in entity analysis: {str(e)}")
             raise
 
+    @traced("llm")
     def generate_report(
         self,
         entity_data: dict,
@@ -230,9 +266,9 @@ Format the report professionally with clear sections and bullet points."""
                 HumanMessage(content=f"Generate a {report_type} report for this entity."),
             ]
 
-            response = self._llm.invoke(messages)
+            response = self._invoke("generate_report", messages)
 
-            logger.info(f"✅ Report generated - Type: {report_type}")
+            sampled_logger.info(f"✅ Report generated - Type: {report_type}")
 
             return response.content
 
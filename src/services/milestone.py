@@ -1,9 +1,10 @@
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from sqlmodel import select
+from sqlalchemy import case, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.milestone import Milestone
+from src.models.milestone import Milestone, MilestoneSummary
 
 
 class MilestoneService:
@@ -21,12 +22,50 @@ class MilestoneService:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def list_by_project(project_id: int, session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Milestone]:
-        """Return all milestones for a specific project with pagination."""
-        stmt = select(Milestone).where(Milestone.project_id == project_id).offset(skip).limit(limit)
+    async def list_by_project(project_id: str, session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Milestone]:
+        """Return all milestones for a specific project (string `project_id`) with pagination.
+
+        Ordered by `id` so the `(project_id, id)` index serves both filter and sort.
+        """
+        stmt = (
+            select(Milestone)
+            .where(Milestone.project_id == project_id)
+            .order_by(Milestone.id)
+            .offset(skip)
+            .limit(limit)
+        )
         result = await session.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    async def summarize_by_project(project_id: str, session: AsyncSession) -> MilestoneSummary:
+        """Return count, total amount and released amount for a project's milestones in one query."""
+        stmt = select(
+            func.count(Milestone.id),
+            func.coalesce(func.sum(Milestone.amount), 0.0),
+            func.coalesce(func.sum(case((Milestone.released, Milestone.amount), else_=0.0)), 0.0),
+        ).where(Milestone.project_id == project_id)
+        result = await session.execute(stmt)
+        count, total_amount, released_amount = result.one()
+        return MilestoneSummary(
+            project_id=project_id,
+            count=count,
+            total_amount=float(total_amount),
+            released_amount=float(released_amount),
+        )
+
+    @staticmethod
+    async def list_by_projects(project_ids: List[str], session: AsyncSession) -> Dict[str, List[Milestone]]:
+        """Return the milestones of each of `project_ids` (ordered by id) in one query."""
+        if not project_ids:
+            return {}
+        stmt = select(Milestone).where(Milestone.project_id.in_(project_ids)).order_by(Milestone.id)
+        result = await session.execute(stmt)
+        milestones: Dict[str, List[Milestone]] = {project_id: [] for project_id in project_ids}
+        for milestone in result.scalars().all():
+            milestones[milestone.project_id].append(milestone)
+        return milestones
+
     @staticmethod
     async def list_all(session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Milestone]:
         """Return a paginated list of all milestones."""
@@ -34,6 +73,18 @@ class MilestoneService:
         result = await session.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    async def list_rows(
+        session: AsyncSession, project_id: Optional[str] = None, skip: int = 0, limit: int = 100
+    ) -> Tuple[List[str], List[tuple]]:
+        """Return column names and plain row tuples for a page of milestones (no ORM objects)."""
+        columns = list(Milestone.__table__.columns)
+        stmt = select(*columns)
+        if project_id is not None:
+            stmt = stmt.where(Milestone.project_id == project_id).order_by(Milestone.id)
+        result = await session.execute(stmt.offset(skip).limit(limit))
+        return [c.name for c in columns], result.all()
+
     @staticmethod
     async def create(milestone_data: dict, session: AsyncSession) -> Milestone:
         """Create a new milestone.
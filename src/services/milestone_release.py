@@ -0,0 +1,333 @@
+"""
+Milestone Release Pipeline - sign, submit and track many `release_milestone` calls
+
+Releasing milestones one extrinsic at a time means one round trip plus a
+wait for inclusion per milestone. The pipeline instead:
+
+- hands out nonces locally per signer (the `NonceManager` shared with the
+  deployer), so many extrinsics from one account can be signed and in flight
+  at once without colliding
+- dry-runs each release first through the shared contract codec (gas estimate, and contract errors such as
+  `MilestoneAlreadyReleased` are reported without spending fees)
+- submits in parallel over the pooled connections without waiting for inclusion
+- records every release as a `MilestoneRelease` row; a background tracker
+  scans new blocks for the submitted extrinsic hashes, marks them
+  included and then finalized, and fails those never included
+- writes finalized releases back in batches: one UPDATE of `Milestone.released`
+  and one Arkiv transaction per tracker pass
+"""
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from substrateinterface import Keypair, SubstrateInterface
+from substrateinterface.base import ExtrinsicReceipt
+
+from arkiv import Arkiv
+from src.core.depends.arkiv import get_arkiv_client
+from src.core.depends.db import AsyncSessionLocal
+from src.models.milestone import Milestone
+from src.models.milestone_release import (
+    RELEASE_FAILED,
+    RELEASE_FINALIZED,
+    RELEASE_INCLUDED,
+    RELEASE_PENDING,
+    RELEASE_SUBMITTED,
+    MilestoneRelease,
+    MilestoneReleaseItem,
+)
+from src.models.sponsor import SponsoredProject
+from src.services.arkiv import ArkivService
+from src.services.escrow_state import EscrowStateReader, escrow_contract, escrow_owner, escrow_state_reader
+from src.services.milestone import MilestoneService
+from src.services.nonces import NonceManager, signer_nonces
+from src.services.sponsor import SponsoredProjectService
+from src.services.substrate_pool import SubstratePool, SubstrateUnavailable, substrate_pool
+from src.settings.substrate import SubstrateSettings
+
+# Upper bound on blocks fetched per tracker pass, so catching up after downtime stays incremental
+SCAN_BLOCKS_PER_PASS = 100
+
+
+class MilestoneReleaseService:
+    """Submits milestone releases in parallel and tracks them to finalization in the background."""
+
+    def __init__(
+        self,
+        pool: SubstratePool = substrate_pool,
+        reader: EscrowStateReader = escrow_state_reader,
+        track_interval: float = 3.0,
+        drop_after_blocks: int = 64,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        arkiv_client_factory: Callable[[], Arkiv] = get_arkiv_client,
+        nonces: NonceManager = signer_nonces,
+    ):
+        self.pool = pool
+        self.reader = reader
+        self.track_interval = track_interval
+        self.drop_after_blocks = drop_after_blocks
+        self.session_factory = session_factory
+        self.arkiv_client_factory = arkiv_client_factory
+        self.nonces = nonces
+        # Release id -> last block already scanned for its extrinsic
+        self._scanned_to: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background tracker (resumes pending releases from the database)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._track_loop())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ----------------------------------------------------------------- submit
+
+    async def _resolve(
+        self, items: Sequence[MilestoneReleaseItem], batch_id: str, signer: Optional[str], session: AsyncSession
+    ) -> List[MilestoneRelease]:
+        """Build release rows for `items`, loading projects and milestones in two queries."""
+        projects = {
+            project.id: project
+            for project in await SponsoredProjectService.list_by_ids(list({item.project_id for item in items}), session)
+        }
+        milestones = await MilestoneService.list_by_projects([project.project_id for project in projects.values()], session)
+        releases = []
+        for item in items:
+            project: Optional[SponsoredProject] = projects.get(item.project_id)
+            release = MilestoneRelease(
+                batch_id=batch_id,
+                sponsored_project_id=item.project_id,
+                milestone_index=item.milestone_index,
+                contract_address=(escrow_contract(project) or "") if project else "",
+                owner_account=(escrow_owner(project) or "") if project else "",
+                signer=signer,
+            )
+            rows = milestones.get(project.project_id, []) if project else []
+            if 0 <= item.milestone_index < len(rows):
+                release.milestone_id = rows[item.milestone_index].id
+            if project is None:
+                release.status, release.error = RELEASE_FAILED, "Project not found"
+            elif not release.contract_address:
+                release.status, release.error = RELEASE_FAILED, "Project does not have an escrow contract"
+            releases.append(release)
+        return releases
+
+    def _prepare(self, substrate: SubstrateInterface, release: MilestoneRelease, keypair: Keypair):
+        """Dry-run the release and compose its call; raises with the contract error if it would fail."""
+        args = {"project_owner": release.owner_account, "milestone_index": release.milestone_index}
+        outcome, gas_required = self.reader.call(
+            substrate, release.contract_address, keypair.ss58_address, "release_milestone", args
+        )
+        # Result<Result<(), EscrowError>, LangError>
+        if isinstance(outcome, dict) and "Ok" in outcome:
+            outcome = outcome["Ok"]
+        if isinstance(outcome, dict) and "Err" in outcome:
+            raise RuntimeError(f"release_milestone would fail: {outcome['Err']}")
+        return substrate.compose_call(
+            call_module="Contracts",
+            call_function="call",
+            call_params={
+                "dest": release.contract_address,
+                "value": 0,
+                "gas_limit": gas_required,
+                "storage_deposit_limit": None,
+                "data": "0x" + self.reader.codec().encode_call("release_milestone", args).hex(),
+            },
+        )
+
+    @staticmethod
+    def _sign_and_submit(substrate: SubstrateInterface, call, keypair: Keypair, nonce: int) -> Tuple[str, int]:
+        # Inclusion can only happen after the current best block
+        submitted_block = substrate.get_block_number(substrate.get_chain_head())
+        extrinsic = substrate.create_signed_extrinsic(call=call, keypair=keypair, nonce=nonce)
+        receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=False)
+        return receipt.extrinsic_hash, submitted_block
+
+    async def _submit_shard(self, releases: Sequence[MilestoneRelease], keypair: Keypair) -> None:
+        try:
+            async with self.pool.connection() as substrate:
+                for release in releases:
+                    try:
+                        call = await asyncio.to_thread(self._prepare, substrate, release, keypair)
+                        release.nonce = await self.nonces.reserve(substrate, keypair.ss58_address)
+                        release.extrinsic_hash, release.submitted_block = await asyncio.to_thread(
+                            self._sign_and_submit, substrate, call, keypair, release.nonce
+                        )
+                    except Exception as e:
+                        if release.nonce is not None:
+                            # The reserved nonce may not have been used; hand it out again
+                            self.nonces.release(keypair.ss58_address, release.nonce)
+                        release.status, release.error = RELEASE_FAILED, str(e)
+        except SubstrateUnavailable as e:
+            # Other shards may have submitted already, so record this one as failed rather than raising
+            for release in releases:
+                if release.extrinsic_hash is None:
+                    release.status, release.error = RELEASE_FAILED, str(e)
+
+    async def submit(self, items: Sequence[MilestoneReleaseItem], session: AsyncSession) -> Tuple[str, List[MilestoneRelease]]:
+        """Sign and submit releases for `items` in parallel and record them.
+
+        Without a configured signer the releases are simulated and finalize immediately.
+
+        Returns:
+            The batch id and the recorded MilestoneRelease rows
+
+        Raises:
+            SubstrateUnavailable: if no pooled connection is available
+        """
+        batch_id = uuid.uuid4().hex
+        keypair = (
+            Keypair.create_from_uri(SubstrateSettings.SIGNER_URI.get_secret_value())
+            if SubstrateSettings.SIGNER_URI
+            else None
+        )
+        releases = await self._resolve(items, batch_id, keypair.ss58_address if keypair else None, session)
+        ready = [release for release in releases if release.status != RELEASE_FAILED]
+
+        if keypair is None:
+            for release in ready:
+                release.status = RELEASE_FINALIZED
+        elif ready:
+            shard_count = max(1, min(self.pool.size, len(ready)))
+            await asyncio.gather(*(self._submit_shard(ready[i::shard_count], keypair) for i in range(shard_count)))
+
+        session.add_all(releases)
+        await session.commit()
+        submitted = sum(release.status == RELEASE_SUBMITTED for release in releases)
+        logger.info("Release batch {}: {} submitted, {} failed", batch_id, submitted,
+                    sum(release.status == RELEASE_FAILED for release in releases))
+        if keypair is None:
+            await self._write_back(session)
+        return batch_id, releases
+
+    @staticmethod
+    async def list_batch(batch_id: str, session: AsyncSession) -> List[MilestoneRelease]:
+        """Return the releases of a batch (ordered by id)."""
+        stmt = select(MilestoneRelease).where(MilestoneRelease.batch_id == batch_id).order_by(MilestoneRelease.id)
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    # ------------------------------------------------------------------ track
+
+    @staticmethod
+    def _scan(substrate: SubstrateInterface, pending: Dict[str, MilestoneRelease], start: int) -> int:
+        """Look for pending extrinsic hashes in blocks from `start` towards the best head.
+
+        Returns:
+            The last block number scanned
+        """
+        best = substrate.get_block_number(substrate.get_chain_head())
+        finalized = substrate.get_block_number(substrate.get_chain_finalised_head())
+        end = min(best, start + SCAN_BLOCKS_PER_PASS - 1)
+        for number in range(start, end + 1):
+            block = substrate.get_block(block_number=number)
+            block_hash = block["header"]["hash"]
+            for extrinsic in block["extrinsics"]:
+                if not extrinsic.extrinsic_hash:
+                    continue
+                release = pending.get(f"0x{extrinsic.extrinsic_hash.hex()}")
+                if release is None or release.status != RELEASE_SUBMITTED:
+                    continue
+                receipt = ExtrinsicReceipt(substrate, extrinsic_hash=release.extrinsic_hash, block_hash=block_hash)
+                release.block_hash, release.block_number = block_hash, number
+                if receipt.is_success:
+                    release.status = RELEASE_INCLUDED
+                else:
+                    release.status, release.error = RELEASE_FAILED, str(receipt.error_message)
+        # Included releases become final once their block is on the finalized chain
+        for release in pending.values():
+            if release.status == RELEASE_INCLUDED and release.block_number <= finalized:
+                if substrate.get_block_hash(release.block_number) == release.block_hash:
+                    release.status = RELEASE_FINALIZED
+                else:
+                    release.status, release.error = RELEASE_FAILED, "Block was re-organised out of the chain"
+        return end
+
+    async def track_once(self, session: AsyncSession) -> None:
+        """One tracker pass: update pending releases from new blocks, then write back finalized ones."""
+        stmt = select(MilestoneRelease).where(MilestoneRelease.status.in_(RELEASE_PENDING))
+        pending = {release.extrinsic_hash: release for release in (await session.execute(stmt)).scalars().all()}
+        if pending:
+            # A release committed after the tracker passed its block (its batch was still
+            # submitting) is scanned from its own submitted block, not from the shared cursor
+            start = min(
+                self._scanned_to.get(release.id, release.submitted_block - 1) + 1 for release in pending.values()
+            )
+            async with self.pool.connection() as substrate:
+                scanned = await asyncio.to_thread(self._scan, substrate, pending, start)
+            self._scanned_to = {
+                release.id: max(scanned, self._scanned_to.get(release.id, scanned)) for release in pending.values()
+            }
+            for release in pending.values():
+                scanned_to = self._scanned_to[release.id]
+                if release.status == RELEASE_SUBMITTED and scanned_to - release.submitted_block > self.drop_after_blocks:
+                    release.status, release.error = RELEASE_FAILED, f"Not included after {self.drop_after_blocks} blocks"
+                    if release.signer and release.nonce is not None:
+                        self.nonces.release(release.signer, release.nonce)
+                release.updated_at = datetime.now()
+            await session.commit()
+        await self._write_back(session)
+
+    async def _write_back(self, session: AsyncSession) -> None:
+        """Batch-write finalized releases to `Milestone.released` and to Arkiv."""
+        stmt = select(MilestoneRelease).where(
+            MilestoneRelease.status == RELEASE_FINALIZED,
+            (MilestoneRelease.synced.is_(False)) | (MilestoneRelease.arkiv_synced.is_(False)),
+        )
+        releases = (await session.execute(stmt)).scalars().all()
+        if not releases:
+            return
+
+        unsynced = [release for release in releases if not release.synced]
+        milestone_ids = [release.milestone_id for release in unsynced if release.milestone_id is not None]
+        if milestone_ids:
+            await session.execute(update(Milestone).where(Milestone.id.in_(milestone_ids)).values(released=True))
+        for release in unsynced:
+            release.synced = True
+        await session.commit()
+
+        pending_arkiv = [release for release in releases if not release.arkiv_synced]
+        projects = {
+            project.id: project
+            for project in await SponsoredProjectService.list_by_ids(
+                list({release.sponsored_project_id for release in pending_arkiv}), session
+            )
+        }
+        by_entity: Dict[str, List[int]] = {}
+        for release in pending_arkiv:
+            project = projects.get(release.sponsored_project_id)
+            if project is None or not project.entity_key:
+                release.arkiv_synced = True
+                continue
+            by_entity.setdefault(project.entity_key, []).append(release.milestone_index)
+        if by_entity:
+            client = await asyncio.to_thread(self.arkiv_client_factory)
+            if await asyncio.to_thread(ArkivService.record_milestone_releases, client, by_entity):
+                for release in pending_arkiv:
+                    release.arkiv_synced = True
+        await session.commit()
+        logger.info("Wrote back {} finalized milestone releases ({} Arkiv entities)", len(releases), len(by_entity))
+
+    async def _track_loop(self) -> None:
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    await self.track_once(session)
+            except Exception as e:
+                logger.warning("Milestone release tracking failed: {}", e)
+            await asyncio.sleep(self.track_interval)
+
+
+milestone_release_service = MilestoneReleaseService(
+    track_interval=SubstrateSettings.RELEASE_TRACK_INTERVAL,
+    drop_after_blocks=SubstrateSettings.RELEASE_DROP_AFTER_BLOCKS,
+)
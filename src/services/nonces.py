@@ -0,0 +1,54 @@
+"""
+Signer Nonces - local nonce counters shared by everything that signs extrinsics
+
+The deployment jobs and the milestone release pipeline sign with the same
+account. Asking the node for the next nonce per extrinsic races as soon as two
+of them are signed at once (the second is rejected as outdated), so nonces are
+handed out locally from one counter per signer.
+"""
+import asyncio
+from typing import Dict, Set
+
+from substrateinterface import SubstrateInterface
+
+
+class NonceManager:
+    """Per-signer local nonce counter, seeded from `system_accountNextIndex`.
+
+    The counter never moves back while nonces after it may still be in flight:
+    the node's next index does not count transactions waiting behind a gap, so
+    re-reading it would hand out nonces that are already in use. A nonce whose
+    submission failed is `release`d instead and handed out again first, filling
+    the gap it left, unless the node shows it was used after all.
+    """
+
+    def __init__(self):
+        self._next: Dict[str, int] = {}
+        self._released: Dict[str, Set[int]] = {}
+        self._lock = asyncio.Lock()
+
+    async def reserve(self, substrate: SubstrateInterface, address: str) -> int:
+        async with self._lock:
+            released = self._released.get(address)
+            if released or address not in self._next:
+                node_next = await asyncio.to_thread(substrate.get_account_nonce, address)
+                # Below the node's next index a released nonce was used after all
+                if released:
+                    released.difference_update([nonce for nonce in released if nonce < node_next])
+                # Another client signing with this account moves the node ahead of us
+                self._next[address] = max(self._next.get(address, 0), node_next)
+            if released:
+                nonce = min(released)
+                released.remove(nonce)
+                return nonce
+            nonce = self._next[address]
+            self._next[address] = nonce + 1
+            return nonce
+
+    def release(self, address: str, nonce: int) -> None:
+        """Return a reserved nonce whose extrinsic failed or was dropped, so it is reused."""
+        self._released.setdefault(address, set()).add(nonce)
+
+
+# Shared by the escrow deployer and the milestone release pipeline
+signer_nonces = NonceManager()
@@ -1,9 +1,12 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Tuple
 
 from sqlmodel import select
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as SQLAlchemySession
 
+from src.core.http_cache import response_cache
 from src.models.project import Project
 
 
@@ -14,6 +17,22 @@ class ProjectService:
     so they can be used easily from FastAPI endpoints with `Depends`.
     """
 
+    CACHE_NAMESPACE = "projects"
+
+    @staticmethod
+    async def get_version(pk: int, session: AsyncSession) -> Optional[datetime]:
+        """Return only the `updated_at` of a Project (primary key lookup) or None if missing."""
+        stmt = select(Project.updated_at).where(Project.id == pk)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def list_version(session: AsyncSession) -> Tuple[Optional[datetime], int]:
+        """Return `(max(updated_at), count)` over all rows, used as a list validator."""
+        stmt = select(func.max(Project.updated_at), func.count(Project.id))
+        result = await session.execute(stmt)
+        return tuple(result.one())
+
     @staticmethod
     async def get_by_project_id(project_id: str, session: AsyncSession) -> Optional[Project]:
         """Return a Project matching the given `project_id` (string) or None."""
@@ -35,6 +54,14 @@ class ProjectService:
         result = await session.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    async def list_rows(session: AsyncSession, skip: int = 0, limit: int = 100) -> Tuple[List[str], List[tuple]]:
+        """Return column names and plain row tuples for a page of projects (no ORM objects)."""
+        columns = list(Project.__table__.columns)
+        stmt = select(*columns).offset(skip).limit(limit)
+        result = await session.execute(stmt)
+        return [c.name for c in columns], result.all()
+
     @staticmethod
     async def create(project_data: dict, session: AsyncSession) -> Project:
         """Create a new project.
@@ -49,6 +76,7 @@ class ProjectService:
         new_project = Project(**project_data)
         session.add(new_project)
         await session.commit()
+        response_cache.invalidate(ProjectService.CACHE_NAMESPACE)
         await session.refresh(new_project)
         return new_project
 
@@ -73,6 +101,7 @@ class ProjectService:
                 setattr(project, key, value)
         
         await session.commit()
+        response_cache.invalidate(ProjectService.CACHE_NAMESPACE)
         await session.refresh(project)
         return project
 
@@ -93,5 +122,6 @@ class ProjectService:
         
         await session.delete(project)
         await session.commit()
+        response_cache.invalidate(ProjectService.CACHE_NAMESPACE)
         return True
 
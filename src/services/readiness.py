@@ -0,0 +1,148 @@
+"""
+Readiness Probe - concurrent, time-bounded dependency checks with a cached result
+
+`/healthcheck/ready` must tell the load balancer whether this process can
+serve traffic, without turning every probe into load on the dependencies:
+
+- the database (primary and read replica), the Arkiv RPC and the Substrate
+  pool are checked concurrently, each bounded by `HEALTH_CHECK_TIMEOUT`
+- the result is reused for `HEALTH_READY_CACHE_SECONDS`; concurrent probes
+  during a refresh wait for that one refresh instead of starting their own
+- the Substrate check reuses the pool: a connection that is lent out is in
+  use and proves itself, so only an idle one is pinged; a ping cut off by
+  the timeout discards that connection, since its worker thread may still be
+  reading from the socket
+- only the database checks are critical: without the Arkiv RPC or the
+  Substrate node most endpoints still serve from the database, so their
+  failure reports the process as degraded instead of taking it out of the
+  load balancer (which would also hide it when every replica shares the outage)
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from web3 import HTTPProvider
+
+from src.core.depends.db import engine, read_engine
+from src.services.substrate_pool import SubstratePool, SubstrateUnavailable, substrate_pool
+from src.settings.arkiv import ArkivSettings
+from src.settings.health import HealthSettings
+
+Check = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class CheckResult:
+    ok: bool
+    latency_ms: float
+    error: Optional[str] = None
+    critical: bool = True
+
+
+@dataclass
+class Readiness:
+    ready: bool
+    checks: Dict[str, CheckResult] = field(default_factory=dict)
+    checked_at: float = 0.0
+
+    @property
+    def degraded(self) -> bool:
+        """A non-critical check failed: the process serves traffic with reduced functionality."""
+        return any(not result.ok and not result.critical for result in self.checks.values())
+
+
+def database_check(db_engine: AsyncEngine) -> Check:
+    async def check() -> None:
+        async with db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    return check
+
+
+def arkiv_check(url: str) -> Check:
+    provider = HTTPProvider(url, request_kwargs={"timeout": HealthSettings.CHECK_TIMEOUT})
+
+    def block_number() -> None:
+        response = provider.make_request("eth_blockNumber", [])
+        if "error" in response:
+            raise RuntimeError(f"Arkiv RPC error: {response['error']}")
+
+    async def check() -> None:
+        await asyncio.to_thread(block_number)
+
+    return check
+
+
+def substrate_check(pool: SubstratePool) -> Check:
+    async def check() -> None:
+        if not pool.started or pool.open_connections == 0:
+            raise SubstrateUnavailable(f"No open Substrate connection to {pool.url}")
+        if pool.idle_connections == 0:
+            return
+        async with pool.connection(timeout=HealthSettings.CHECK_TIMEOUT) as substrate:
+            await asyncio.to_thread(substrate.rpc_request, "system_health", [])
+
+    return check
+
+
+class ReadinessProbe:
+    """Runs the registered checks concurrently and caches the combined result.
+
+    The process is ready when every check in `critical` passes; the other
+    checks are reported but only mark it as degraded.
+    """
+
+    def __init__(self, checks: Dict[str, Check], timeout: float, cache_seconds: float, critical: Iterable[str] = ()):
+        self.checks = checks
+        self.critical = set(critical)
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._last: Optional[Readiness] = None
+        self._lock = asyncio.Lock()
+
+    async def _run(self, name: str, check: Check) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        if error is not None:
+            logger.warning("Readiness check {} failed: {}", name, error)
+        return CheckResult(ok=error is None, latency_ms=latency_ms, error=error, critical=name in self.critical)
+
+    async def check(self) -> Readiness:
+        """Return the cached readiness, refreshing it once it is older than `cache_seconds`."""
+        async with self._lock:
+            now = time.monotonic()
+            if self._last is None or now - self._last.checked_at >= self.cache_seconds:
+                names = list(self.checks)
+                results = await asyncio.gather(*(self._run(name, self.checks[name]) for name in names))
+                checks = dict(zip(names, results))
+                self._last = Readiness(
+                    ready=all(result.ok for result in results if result.critical),
+                    checks=checks,
+                    checked_at=time.monotonic(),
+                )
+            return self._last
+
+
+_checks: Dict[str, Check] = {"database": database_check(engine)}
+if read_engine is not None:
+    _checks["database_replica"] = database_check(read_engine)
+_checks["arkiv"] = arkiv_check(ArkivSettings.HTTP_PROVIDER)
+_checks["substrate"] = substrate_check(substrate_pool)
+
+readiness_probe = ReadinessProbe(
+    _checks,
+    timeout=HealthSettings.CHECK_TIMEOUT,
+    cache_seconds=HealthSettings.READY_CACHE_SECONDS,
+    critical=("database", "database_replica"),
+)
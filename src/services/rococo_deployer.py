@@ -1,95 +1,417 @@
 """
 Rococo Deployment Service - Deploy smart contracts to Rococo Testnet
 """
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, Dict, Any, List, Tuple
 import asyncio
-import json
 import os
-from pathlib import Path
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 from substrateinterface import SubstrateInterface, Keypair
-from substrateinterface.exceptions import SubstrateRequestException
+from substrateinterface.base import ExtrinsicReceipt
+from substrateinterface.exceptions import StorageFunctionNotFound
+
+from src.core.log import sampled_logger
+from src.core.single_flight import KeyedLock
+from src.core.timing import traced
+from src.services.contract_artifacts import ContractArtifactRegistry, artifact_registry
+from src.services.contract_code import UploadedContractCodeService
+from src.services.contract_codec import ContractCodec, contract_codecs
+from src.services.escrow_plan import EscrowPlan
+from src.services.escrow_state import EscrowStateReader, escrow_state_reader, unwrap_result
+from src.services.nonces import NonceManager, signer_nonces
+from src.services.substrate_pool import SubstratePool, SubstrateUnavailable, substrate_pool
 
 class RococoDeployer:
     """Helper class to deploy contracts to Rococo Testnet"""
+
+    # Serializes the code upload per (chain, code hash) within this process
+    _upload_locks = KeyedLock()
     
-    def __init__(self, rpc_url: str = "wss://rococo-contracts-rpc.polkadot.io"):
-        self.rpc_url = rpc_url
-        self.substrate = None
-        self.wasm_path = self._get_wasm_path()
-        self.metadata_path = self._get_metadata_path()
-        
-    def _get_wasm_path(self) -> str:
-        """Get path to compiled WASM file"""
-        # Try multiple possible locations
-        paths_to_try = [
-            Path(__file__).parent.parent.parent / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.wasm",
-            Path.cwd() / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.wasm",
-            Path("/Users/facundo/Proyectos-VSC/Sub0_data/smart-contract/funding-escrow/target/ink/funding_escrow.wasm"),
-        ]
-        
-        for path in paths_to_try:
-            if path.exists():
-                return str(path)
-        
-        raise FileNotFoundError(f"WASM file not found. Tried: {paths_to_try}")
-    
-    def _get_metadata_path(self) -> str:
-        """Get path to contract metadata file"""
-        paths_to_try = [
-            Path(__file__).parent.parent.parent / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.json",
-            Path.cwd() / "smart-contract" / "funding-escrow" / "target" / "ink" / "funding_escrow.json",
-            Path("/Users/facundo/Proyectos-VSC/Sub0_data/smart-contract/funding-escrow/target/ink/funding_escrow.json"),
-        ]
-        
-        for path in paths_to_try:
-            if path.exists():
-                return str(path)
-        
-        raise FileNotFoundError(f"Metadata file not found. Tried: {paths_to_try}")
+    def __init__(
+        self,
+        pool: SubstratePool = substrate_pool,
+        artifacts: ContractArtifactRegistry = artifact_registry,
+        substrate: Optional[SubstrateInterface] = None,
+        reader: EscrowStateReader = escrow_state_reader,
+        nonces: NonceManager = signer_nonces,
+    ):
+        # Connections are borrowed from the app-wide pool instead of opened per request
+        self.pool = pool
+        self.rpc_url = pool.url
+        # An already connected (or mocked) SubstrateInterface may be injected
+        self.substrate = substrate
+        # Artifacts are resolved and loaded lazily, once per process
+        self.artifacts = artifacts
+        # Dry-runs (gas estimates) go through the reader's ContractsApi call
+        self.reader = reader
+        # Nonces are reserved locally: concurrent jobs sign with the same account
+        self.nonces = nonces
+
+    @property
+    def wasm_path(self) -> str:
+        """Path of the compiled WASM file"""
+        return str(self.artifacts.get().wasm_path)
+
+    @property
+    def metadata_path(self) -> str:
+        """Path of the contract metadata file"""
+        return str(self.artifacts.get().metadata_path)
     
     def load_wasm(self) -> bytes:
-        """Load compiled WASM from file"""
-        try:
-            with open(self.wasm_path, 'rb') as f:
-                wasm_data = f.read()
-            print(f"✅ Loaded WASM: {len(wasm_data)} bytes ({len(wasm_data)/1024:.1f} KB)")
-            return wasm_data
-        except Exception as e:
-            print(f"❌ Failed to load WASM: {e}")
-            raise
+        """Return the WASM bytes (loaded once per process)"""
+        return self.artifacts.get().wasm
     
     def load_metadata(self) -> Dict[str, Any]:
-        """Load contract metadata from JSON"""
-        try:
-            with open(self.metadata_path, 'r') as f:
-                metadata = json.load(f)
-            print(f"✅ Loaded metadata from {self.metadata_path}")
-            return metadata
-        except Exception as e:
-            print(f"❌ Failed to load metadata: {e}")
-            raise
+        """Return the parsed contract metadata (shared; do not mutate)"""
+        return self.artifacts.get().metadata
         
     async def connect(self) -> bool:
-        """Connect to Rococo testnet"""
-        try:
-            self.substrate = SubstrateInterface(url=self.rpc_url)
-            chain = self.substrate.get_chain()
-            print(f"✅ Connected to Rococo. Chain: {chain}")
+        """Check that a healthy pooled Rococo connection is available"""
+        if self.substrate is not None:
             return True
-        except SubstrateRequestException as e:
-            print(f"❌ Connection error: {e}")
+        ready = await self.pool.wait_ready()
+        if not ready:
+            logger.warning("No Substrate connection available to {}", self.rpc_url)
+        return ready
+
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator[SubstrateInterface]:
+        """Use the injected connection, or borrow one from the pool for the duration of the block"""
+        if self.substrate is not None:
+            yield self.substrate
+            return
+        async with self.pool.connection() as substrate:
+            self.substrate = substrate
+            try:
+                yield substrate
+            finally:
+                self.substrate = None
+
+    @traced("substrate")
+    def chain_key(self) -> str:
+        """Genesis hash of the connected chain, used to key uploaded code hashes"""
+        return self.substrate.get_block_hash(0)
+
+    def codec(self) -> ContractCodec:
+        """Precompiled codec for the current artifact (shared process-wide, independent of the connection)"""
+        return contract_codecs.get(self.artifacts.get())
+
+    @traced("substrate")
+    def _code_on_chain(self, code_hash: str) -> bool:
+        """Check the Contracts pallet storage for an uploaded code hash"""
+        for storage_function in ("PristineCode", "CodeInfoOf"):
+            try:
+                return self.substrate.query("Contracts", storage_function, [code_hash]).value is not None
+            except StorageFunctionNotFound:
+                continue
+        return False
+
+    async def _signed(self, step: Callable[..., Any], keypair: Keypair, *args) -> Any:
+        """Run a signing step in a thread with a locally reserved nonce"""
+        nonce = await self.nonces.reserve(self.substrate, keypair.ss58_address)
+        try:
+            return await asyncio.to_thread(step, keypair, nonce, *args)
+        except Exception:
+            # The nonce may not have been used; hand it out again rather than leave a gap
+            self.nonces.release(keypair.ss58_address, nonce)
+            raise
+
+    @traced("substrate")
+    def _upload_code(self, keypair: Keypair, nonce: int) -> Dict[str, Any]:
+        artifact = self.artifacts.get()
+        call = self.substrate.compose_call(
+            call_module="Contracts",
+            call_function="upload_code",
+            call_params={"code": "0x" + artifact.wasm.hex(), "storage_deposit_limit": None},
+        )
+        extrinsic = self.substrate.create_signed_extrinsic(call=call, keypair=keypair, nonce=nonce)
+        receipt = self.substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+        if not receipt.is_success:
+            raise RuntimeError(f"upload_code failed: {receipt.error_message}")
+        return {"tx_hash": receipt.extrinsic_hash, "block_hash": receipt.block_hash}
+
+    async def ensure_code_uploaded(self, keypair: Keypair, session: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        """
+        Make sure the escrow WASM is stored on chain, uploading it at most once per chain
+
+        The local `UploadedContractCode` table (keyed by chain genesis hash and code hash)
+        is checked first, then chain storage; only when both miss is `upload_code` submitted.
+        Concurrent deployments of the same code wait for the first one's upload.
+
+        Returns:
+            Dict with code_hash and uploaded (True when an upload extrinsic was sent)
+        """
+        artifact = self.artifacts.get()
+        chain = await asyncio.to_thread(self.chain_key)
+
+        if session is not None and await UploadedContractCodeService.get(chain, artifact.code_hash, session):
+            return {"code_hash": artifact.code_hash, "uploaded": False}
+
+        async with self._upload_locks.hold((chain, artifact.code_hash)):
+            upload = {"tx_hash": None, "block_hash": None}
+            uploaded = False
+            if not await asyncio.to_thread(self._code_on_chain, artifact.code_hash):
+                logger.info("Uploading contract code {} ({:.1f} KB)", artifact.code_hash, artifact.wasm_size / 1024)
+                upload = await self._signed(self._upload_code, keypair)
+                uploaded = True
+
+            if session is not None:
+                await UploadedContractCodeService.record(
+                    {
+                        "chain": chain,
+                        "code_hash": artifact.code_hash,
+                        "contract_name": artifact.name,
+                        "wasm_size": artifact.wasm_size,
+                        **upload,
+                    },
+                    session,
+                )
+        return {"code_hash": artifact.code_hash, "uploaded": uploaded}
+
+    @traced("substrate")
+    def _instantiate_gas(self, origin: str, code_hash: str, data: bytes, salt: str) -> Any:
+        """Dry-run the constructor through `ContractsApi_instantiate`; returns the gas it requires"""
+        result = self.substrate.runtime_call("ContractsApi", "instantiate", {
+            "origin": origin,
+            "value": 0,
+            "gas_limit": None,
+            "storage_deposit_limit": None,
+            "code": {"Existing": code_hash},
+            "data": "0x" + data.hex(),
+            "salt": salt,
+        })
+        if "Ok" not in result["result"]:
+            raise RuntimeError(f"instantiate dry-run failed: {result.value['result']}")
+        if result.value["result"]["Ok"]["result"]["flags"] & 1:
+            raise RuntimeError("instantiate dry-run failed: the constructor reverted")
+        return result["gas_required"].value
+
+    @traced("substrate")
+    def _instantiate(self, keypair: Keypair, nonce: int, code_hash: str, data: bytes, salt: str) -> Dict[str, Any]:
+        """Instantiate the escrow from an uploaded code hash
+
+        Returns:
+            Dict with contract_address, tx_hash and block_hash (the inclusion block)
+        """
+        call = self.substrate.compose_call(
+            call_module="Contracts",
+            call_function="instantiate",
+            call_params={
+                "value": 0,
+                "gas_limit": self._instantiate_gas(keypair.ss58_address, code_hash, data, salt),
+                "storage_deposit_limit": None,
+                "code_hash": code_hash,
+                "data": "0x" + data.hex(),
+                "salt": salt,
+            },
+        )
+        extrinsic = self.substrate.create_signed_extrinsic(call=call, keypair=keypair, nonce=nonce)
+        receipt = self.substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+        if not receipt.is_success:
+            raise RuntimeError(f"instantiate failed: {receipt.error_message}")
+        for event in receipt.triggered_events:
+            if event.value["event"]["event_id"] == "Instantiated":
+                return {
+                    "contract_address": event.value["event"]["attributes"]["contract"],
+                    "tx_hash": receipt.extrinsic_hash,
+                    "block_hash": receipt.block_hash,
+                }
+        raise RuntimeError("instantiate succeeded without an Instantiated event")
+
+    @traced("substrate")
+    def _existing_contract(self, deployer: str, code_hash: str, data: bytes, salt: str) -> Optional[Dict[str, Any]]:
+        """The contract at the address this instantiation would get, if one is already there"""
+        address = self.codec().contract_address(deployer, code_hash, data, salt)
+        block_hash = self.substrate.get_chain_head()
+        if self.substrate.query("Contracts", "ContractInfoOf", [address], block_hash=block_hash).value is None:
+            return None
+        return {"contract_address": address, "tx_hash": None, "block_hash": block_hash}
+
+    async def instantiate(self, keypair: Keypair, code_hash: str, salt: Optional[str] = None) -> Dict[str, Any]:
+        """Instantiate the escrow on the borrowed connection (see `_instantiate`)
+
+        The address is derived from the deployer, code hash, constructor data
+        and salt. With a given `salt` (deployment jobs reuse theirs across
+        attempts), a contract already at that address was created by an earlier
+        attempt whose result was lost, and is adopted instead of failing with
+        `DuplicateContract`. The returned block_hash is then the chain head it
+        was found at.
+        """
+        data = self.codec().encode_constructor("new")
+        if salt is None:
+            # Random salt: the same code, constructor data and deployer would otherwise collide
+            salt = "0x" + os.urandom(16).hex()
+        else:
+            existing = await asyncio.to_thread(self._existing_contract, keypair.ss58_address, code_hash, data, salt)
+            if existing is not None:
+                logger.warning(
+                    "Contract {} was already instantiated with salt {}; adopting it", existing["contract_address"], salt
+                )
+                return existing
+        return await self._signed(self._instantiate, keypair, code_hash, data, salt)
+
+    def _contract_call(
+        self, contract_address: str, message: str, args: Dict[str, Any], gas_limit: Any, value: int = 0
+    ) -> Any:
+        return self.substrate.compose_call(
+            call_module="Contracts",
+            call_function="call",
+            call_params={
+                "dest": contract_address,
+                "value": value,
+                "gas_limit": gas_limit,
+                "storage_deposit_limit": None,
+                "data": "0x" + self.codec().encode_call(message, args).hex(),
+            },
+        )
+
+    @traced("substrate")
+    def _create_escrow(
+        self, keypair: Keypair, nonce: int, contract_address: str, project_owner: str, plan: EscrowPlan
+    ) -> Dict[str, Any]:
+        """Fund the escrow of `project_owner` with `plan.deposit`"""
+        create_args = {"project_owner": project_owner, "milestone_count": plan.milestone_count}
+        result, gas_limit = self.reader.call(
+            self.substrate, contract_address, keypair.ss58_address, "create_escrow", create_args, value=plan.deposit
+        )
+        # An Err (escrow exists, bad arguments) would revert on chain after paying the fees
+        unwrap_result(unwrap_result(result))
+        call = self._contract_call(contract_address, "create_escrow", create_args, gas_limit, value=plan.deposit)
+        extrinsic = self.substrate.create_signed_extrinsic(call=call, keypair=keypair, nonce=nonce)
+        receipt = self.substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+        if not receipt.is_success:
+            raise RuntimeError(f"create_escrow failed: {receipt.error_message}")
+        return {"tx_hash": receipt.extrinsic_hash, "block_hash": receipt.block_hash}
+
+    @traced("substrate")
+    def _milestone_calls(
+        self, origin: str, contract_address: str, project_owner: str, plan: EscrowPlan, block_hash: str
+    ) -> List[Tuple[Dict[str, Any], Any]]:
+        """Dry-run every `add_milestone` of `plan` at `block_hash` in one JSON-RPC batch
+
+        Returns:
+            The arguments and gas required of each milestone not added yet
+        """
+        messages = [
+            (
+                "add_milestone",
+                {"project_owner": project_owner, "milestone_index": index, "release_percentage": percentage},
+            )
+            for index, percentage in enumerate(plan.percentages)
+        ]
+        results = self.reader.call_batch(self.substrate, contract_address, origin, messages, block_hash)
+        pending = []
+        for (_, args), result in zip(messages, results):
+            if isinstance(result, Exception):
+                raise result
+            value, gas_limit = result
+            value = unwrap_result(value)
+            # Added by an earlier attempt whose result was lost
+            if isinstance(value, dict) and value.get("Err") == "MilestoneAlreadyExists":
+                continue
+            unwrap_result(value)
+            pending.append((args, gas_limit))
+        return pending
+
+    @traced("substrate")
+    def _add_milestones(
+        self, keypair: Keypair, nonce: int, contract_address: str, milestones: List[Tuple[Dict[str, Any], Any]]
+    ) -> Dict[str, Any]:
+        """Add `milestones` (from `_milestone_calls`) in one `Utility.batch_all` extrinsic"""
+        calls = [
+            self._contract_call(contract_address, "add_milestone", args, gas_limit) for args, gas_limit in milestones
+        ]
+        batch = self.substrate.compose_call(call_module="Utility", call_function="batch_all", call_params={"calls": calls})
+        extrinsic = self.substrate.create_signed_extrinsic(call=batch, keypair=keypair, nonce=nonce)
+        receipt = self.substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+        if not receipt.is_success:
+            raise RuntimeError(f"add_milestone batch failed: {receipt.error_message}")
+        return {"tx_hash": receipt.extrinsic_hash, "block_hash": receipt.block_hash}
+
+    @traced("substrate")
+    def _existing_escrow(
+        self, origin: str, contract_address: str, project_owner: str, plan: EscrowPlan
+    ) -> Optional[Dict[str, Any]]:
+        """The escrow of `project_owner` if the contract already holds one, checked against `plan`"""
+        block_hash = self.substrate.get_chain_head()
+        status, _ = self.reader.call(
+            self.substrate, contract_address, origin, "get_escrow_status", {"project_owner": project_owner}, block_hash
+        )
+        status = unwrap_result(status)
+        if status is None:
+            return None
+        if status[0] != plan.deposit:
+            raise RuntimeError(
+                f"An escrow for {project_owner} already exists on {contract_address} "
+                f"with {status[0]} planck instead of {plan.deposit}"
+            )
+        return {"tx_hash": None, "block_hash": block_hash}
+
+    async def create_escrow(
+        self, keypair: Keypair, contract_address: str, project_owner: str, plan: EscrowPlan
+    ) -> Dict[str, Any]:
+        """
+        Deposit `plan.deposit`, then register every milestone of `plan` in a single batch
+
+        `add_milestone` can only be dry-run once the escrow exists, so the escrow
+        is created first and each milestone's gas is then estimated against the
+        block that includes it. An escrow (or milestones) already on chain with
+        the planned deposit were created by an earlier attempt whose result was
+        lost; they are adopted and only the missing milestones are added.
+
+        Returns:
+            Dict with tx_hash and block_hash of the last extrinsic (its inclusion
+            block, or the chain head the escrow was found complete at)
+        """
+        escrow = await asyncio.to_thread(
+            self._existing_escrow, keypair.ss58_address, contract_address, project_owner, plan
+        )
+        if escrow is None:
+            escrow = await self._signed(self._create_escrow, keypair, contract_address, project_owner, plan)
+        else:
+            logger.warning("Escrow for {} already exists on {}; adopting it", project_owner, contract_address)
+        milestones = await asyncio.to_thread(
+            self._milestone_calls, keypair.ss58_address, contract_address, project_owner, plan, escrow["block_hash"]
+        )
+        if not milestones:
+            return escrow
+        return await self._signed(self._add_milestones, keypair, contract_address, milestones)
+
+    @traced("substrate")
+    def _is_finalized(self, block_hash: str) -> bool:
+        block_number = self.substrate.get_block_number(block_hash)
+        finalized_number = self.substrate.get_block_number(self.substrate.get_chain_finalised_head())
+        if finalized_number < block_number:
             return False
-        except Exception as e:
-            print(f"⚠️  Connection warning: {str(e)[:100]}")
-            # Aún así considera como "conectado" si la librería está disponible
-            return True
-    
+        # A finalized chain that skipped our block means the extrinsic was dropped in a re-org
+        if self.substrate.get_block_hash(block_number) != block_hash:
+            raise RuntimeError(f"Block {block_hash} was not finalized (re-org)")
+        return True
+
+    async def wait_finalized(self, block_hash: str, timeout: float, poll_interval: float = 2.0) -> None:
+        """Wait until `block_hash` is part of the finalized chain
+
+        Raises:
+            TimeoutError: if the block is not finalized within `timeout` seconds
+        """
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            # Borrow per poll so waiting does not keep a pooled connection busy
+            async with self.borrow():
+                if await asyncio.to_thread(self._is_finalized, block_hash):
+                    return
+            if asyncio.get_running_loop().time() >= deadline:
+                raise TimeoutError(f"Block {block_hash} not finalized after {timeout:.0f}s")
+            await asyncio.sleep(poll_interval)
+
     async def deploy_contract(
         self,
         project_owner: str,
         milestone_count: int,
         total_amount: int,
         keypair_uri: Optional[str] = None,
+        session: Optional[AsyncSession] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Deploy a smart contract to Rococo
@@ -98,82 +420,120 @@ class RococoDeployer:
             project_owner: Account ID of project owner
             milestone_count: Number of milestones
             total_amount: Total amount to deposit (in smallest unit)
-            keypair_uri: Optional keypair URI for signing (default: test account)
+            keypair_uri: Optional keypair URI for signing; the deployment is simulated when omitted
+            session: Optional AsyncSession used to look up and record uploaded code hashes
             
         Returns:
             Dict with contract_address and metadata if successful
         """
         try:
-            # Load WASM and metadata
-            wasm_data = self.load_wasm()
-            metadata = self.load_metadata()
+            # WASM and metadata come from the process-level artifact registry
+            artifact = self.artifacts.get()
+            wasm_data = artifact.wasm
+            metadata = artifact.metadata
             
-            print(f"\n📦 Deploying contract to Rococo...")
-            print(f"   Project Owner: {project_owner}")
-            print(f"   Milestones: {milestone_count}")
-            print(f"   Amount: {total_amount}")
-            print(f"   WASM: {len(wasm_data) / 1024:.1f} KB")
-            print(f"   RPC: {self.rpc_url}")
+            logger.bind(
+                project_owner=project_owner,
+                milestones=milestone_count,
+                amount=total_amount,
+                wasm_kb=round(len(wasm_data) / 1024, 1),
+                rpc_url=self.rpc_url,
+            ).info("📦 Deploying escrow contract for {}", project_owner)
             
-            # In production, would:
-            # 1. Parse keypair from keypair_uri
-            # 2. Connect to Rococo
-            # 3. Upload code via contracts::upload_code extrinsic
-            # 4. Instantiate via contracts::instantiate extrinsic
-            # 5. Wait for block finalization
-            # 6. Return contract address from events
-            
-            # For now, simulate successful deployment with metadata
-            contract_address = "5HpG9w8EBLe5XCrbczpwq5TSXvedjrBGo81mwA7ujVMCSDaJ"
+            code_uploaded = False
+            if keypair_uri:
+                # Upload the code once per chain, then instantiate from its hash:
+                # each project escrow is a single small `instantiate` extrinsic
+                keypair = Keypair.create_from_uri(keypair_uri)
+                async with self.borrow():
+                    code = await self.ensure_code_uploaded(keypair, session)
+                    code_uploaded = code["uploaded"]
+                    contract_address = (await self.instantiate(keypair, code["code_hash"]))["contract_address"]
+            else:
+                # No signer configured: simulate successful deployment with metadata
+                contract_address = "5HpG9w8EBLe5XCrbczpwq5TSXvedjrBGo81mwA7ujVMCSDaJ"
             
             deployment_info = {
                 "contract_address": contract_address,
-                "wasm_hash": metadata.get("source", {}).get("hash", "unknown"),
+                "wasm_hash": artifact.code_hash,
+                "code_uploaded": code_uploaded,
                 "contract_name": metadata.get("contract", {}).get("name", "funding-escrow"),
                 "version": metadata.get("contract", {}).get("version", "0.1.0"),
                 "ink_version": metadata.get("source", {}).get("language", "unknown"),
                 "status": "deployed",
             }
             
-            print(f"✅ Contract deployed at: {contract_address}")
-            print(f"   Metadata: {deployment_info['contract_name']} v{deployment_info['version']}")
+            logger.info(
+                "✅ Contract deployed at {} ({} v{})",
+                contract_address, deployment_info["contract_name"], deployment_info["version"],
+            )
             
             return deployment_info
             
+        except SubstrateUnavailable:
+            raise
         except FileNotFoundError as e:
-            print(f"❌ File not found: {e}")
-            print(f"   Please ensure WASM files are compiled. Run:")
-            print(f"   cd smart-contract/funding-escrow && cargo contract build --release")
+            logger.error(
+                "❌ Contract artifact not found: {}. Build it with: "
+                "cd smart-contract/funding-escrow && cargo contract build --release", e,
+            )
             return None
         except Exception as e:
-            print(f"❌ Deployment error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Deployment error: {}", e)
             return None
     
+    @traced("substrate")
+    def _release_milestone(
+        self, keypair: Keypair, nonce: int, contract_address: str, args: Dict[str, Any]
+    ) -> ExtrinsicReceipt:
+        _, gas_limit = self.reader.call(self.substrate, contract_address, keypair.ss58_address, "release_milestone", args)
+        call = self._contract_call(contract_address, "release_milestone", args, gas_limit)
+        extrinsic = self.substrate.create_signed_extrinsic(call=call, keypair=keypair, nonce=nonce)
+        return self.substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+
     async def release_milestone(
         self,
         contract_address: str,
         milestone_index: int,
         keypair: Keypair,
+        project_owner: Optional[str] = None,
     ) -> bool:
-        """Release funds for a milestone"""
+        """
+        Release funds for a single milestone and wait for inclusion
+
+        For releasing many milestones, use `MilestoneReleaseService`, which
+        submits in parallel and tracks finalization in the background.
+
+        Args:
+            contract_address: Address of the project's escrow contract
+            milestone_index: Index of the milestone in the escrow
+            keypair: Signer of the release extrinsic
+            project_owner: Account the escrow is keyed by (defaults to the signer)
+        """
         try:
-            print(f"💰 Releasing milestone {milestone_index} on {contract_address}...")
-            # Implementation would call release_milestone message
-            return True
+            sampled_logger.info("Releasing milestone {} on {}", milestone_index, contract_address)
+            args = {"project_owner": project_owner or keypair.ss58_address, "milestone_index": milestone_index}
+            async with self.borrow():
+                receipt = await self._signed(self._release_milestone, keypair, contract_address, args)
+                if not receipt.is_success:
+                    logger.error("release_milestone failed: {}", receipt.error_message)
+                return receipt.is_success
+        except SubstrateUnavailable:
+            raise
         except Exception as e:
-            print(f"❌ Release error: {e}")
+            logger.exception("❌ Release error: {}", e)
             return False
 
 
 # Example usage
 async def example_deployment():
     """Example of how to use the deployer"""
+    await substrate_pool.start()
     deployer = RococoDeployer()
     
     # Connect
     if not await deployer.connect():
+        await substrate_pool.close()
         return
     
     # In real usage:
@@ -181,7 +541,8 @@ async def example_deployment():
     # - Read keypair from secure storage
     # - Call deploy_contract()
     
-    print("✅ Deployer ready for production use")
+    logger.info("✅ Deployer ready for production use")
+    await substrate_pool.close()
 
 
 if __name__ == "__main__":
@@ -1,9 +1,20 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Tuple
 
 from sqlmodel import select
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.sql import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.sponsor import SponsoredProject
+from src.core.http_cache import response_cache
+from src.models.sponsor import SPONSORED_SEARCH_VECTOR_SQL, SponsoredProject, SponsoredProjectFilter
+
+# Public sort keys -> indexed columns
+SORT_COLUMNS = {
+    "score": SponsoredProject.ai_score,
+    "budget": SponsoredProject.budget,
+    "created_at": SponsoredProject.created_at,
+}
 
 
 class SponsoredProjectService:
@@ -13,6 +24,22 @@ class SponsoredProjectService:
     so they can be used easily from FastAPI endpoints with `Depends`.
     """
 
+    CACHE_NAMESPACE = "sponsored"
+
+    @staticmethod
+    async def get_version(pk: int, session: AsyncSession) -> Optional[datetime]:
+        """Return only the `updated_at` of a SponsoredProject (primary key lookup) or None if missing."""
+        stmt = select(SponsoredProject.updated_at).where(SponsoredProject.id == pk)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def list_version(session: AsyncSession) -> Tuple[Optional[datetime], int]:
+        """Return `(max(updated_at), count)` over all rows, used as a list validator."""
+        stmt = select(func.max(SponsoredProject.updated_at), func.count(SponsoredProject.id))
+        result = await session.execute(stmt)
+        return tuple(result.one())
+
     @staticmethod
     async def get_by_id(sponsored_project_id: int, session: AsyncSession) -> Optional[SponsoredProject]:
         """Return a SponsoredProject by its numeric primary key `id` or None."""
@@ -34,6 +61,51 @@ class SponsoredProjectService:
         result = await session.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    async def list_by_ids(sponsored_project_ids: List[int], session: AsyncSession) -> List[SponsoredProject]:
+        """Return the sponsored projects with the given primary keys (ordered by id)."""
+        stmt = (
+            select(SponsoredProject)
+            .where(SponsoredProject.id.in_(sponsored_project_ids))
+            .order_by(SponsoredProject.id)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    async def list_with_escrow(session: AsyncSession, skip: int = 0, limit: int = 100) -> List[SponsoredProject]:
+        """Return approved sponsored projects that have an escrow contract, with pagination."""
+        stmt = (
+            select(SponsoredProject)
+            .where(
+                SponsoredProject.status == "approved",
+                SponsoredProject.polkadot_smart_contract.is_not(None),
+            )
+            .order_by(SponsoredProject.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    async def list_by_contracts(addresses: List[str], session: AsyncSession) -> List[SponsoredProject]:
+        """Return the sponsored projects whose escrow is one of the contract `addresses` (ordered by id)."""
+        if not addresses:
+            return []
+        stmt = (
+            select(SponsoredProject)
+            .where(
+                or_(
+                    SponsoredProject.polkadot_smart_contract.in_(addresses),
+                    SponsoredProject.contract_address.in_(addresses),
+                )
+            )
+            .order_by(SponsoredProject.id)
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
     @staticmethod
     async def list_by_status(status: str, session: AsyncSession, skip: int = 0, limit: int = 100) -> List[SponsoredProject]:
         """Return all sponsored projects with a specific status with pagination."""
@@ -41,6 +113,65 @@ class SponsoredProjectService:
         result = await session.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    def _apply_filter(stmt: Select, filters: SponsoredProjectFilter, dialect: str) -> Select:
+        """Add WHERE and ORDER BY clauses for `filters` to `stmt`."""
+        if filters.statuses:
+            stmt = stmt.where(SponsoredProject.status.in_(filters.statuses))
+        if filters.chain:
+            stmt = stmt.where(SponsoredProject.chain == filters.chain)
+        if filters.min_ai_score is not None:
+            stmt = stmt.where(SponsoredProject.ai_score >= filters.min_ai_score)
+        if filters.max_ai_score is not None:
+            stmt = stmt.where(SponsoredProject.ai_score <= filters.max_ai_score)
+        if filters.min_budget is not None:
+            stmt = stmt.where(SponsoredProject.budget >= filters.min_budget)
+        if filters.max_budget is not None:
+            stmt = stmt.where(SponsoredProject.budget <= filters.max_budget)
+        if filters.q:
+            if dialect == "postgresql":
+                query = func.websearch_to_tsquery(literal_column("'english'"), filters.q)
+                stmt = stmt.where(literal_column(SPONSORED_SEARCH_VECTOR_SQL).op("@@")(query))
+            else:
+                # Match `q` literally: its `%` and `_` are not wildcards
+                escaped = filters.q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                pattern = f"%{escaped}%"
+                stmt = stmt.where(or_(
+                    SponsoredProject.name.ilike(pattern, escape="\\"),
+                    SponsoredProject.description.ilike(pattern, escape="\\"),
+                ))
+        if filters.sort:
+            column = SORT_COLUMNS[filters.sort.lstrip("-")]
+            stmt = stmt.order_by(column.desc() if filters.sort.startswith("-") else column.asc())
+        return stmt.order_by(SponsoredProject.id)
+
+    @staticmethod
+    async def search(
+        filters: SponsoredProjectFilter, session: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> List[SponsoredProject]:
+        """Return a filtered, sorted page of sponsored projects.
+
+        Uses the GIN full-text index for `q` on Postgres and falls back to
+        ILIKE on other dialects.
+        """
+        stmt = SponsoredProjectService._apply_filter(
+            select(SponsoredProject), filters, session.get_bind().dialect.name
+        )
+        result = await session.execute(stmt.offset(skip).limit(limit))
+        return result.scalars().all()
+
+    @staticmethod
+    async def list_rows(
+        session: AsyncSession, filters: Optional[SponsoredProjectFilter] = None, skip: int = 0, limit: int = 100
+    ) -> Tuple[List[str], List[tuple]]:
+        """Return column names and plain row tuples for a page of sponsored projects (no ORM objects)."""
+        columns = list(SponsoredProject.__table__.columns)
+        stmt = select(*columns)
+        if filters is not None:
+            stmt = SponsoredProjectService._apply_filter(stmt, filters, session.get_bind().dialect.name)
+        result = await session.execute(stmt.offset(skip).limit(limit))
+        return [c.name for c in columns], result.all()
+
     @staticmethod
     async def create(sponsored_project_data: dict, session: AsyncSession) -> SponsoredProject:
         """Create a new sponsored project.
@@ -55,6 +186,7 @@ class SponsoredProjectService:
         new_sponsored_project = SponsoredProject(**sponsored_project_data)
         session.add(new_sponsored_project)
         await session.commit()
+        response_cache.invalidate(SponsoredProjectService.CACHE_NAMESPACE)
         await session.refresh(new_sponsored_project)
         return new_sponsored_project
 
@@ -79,6 +211,7 @@ class SponsoredProjectService:
                 setattr(sponsored_project, key, value)
         
         await session.commit()
+        response_cache.invalidate(SponsoredProjectService.CACHE_NAMESPACE)
         await session.refresh(sponsored_project)
         return sponsored_project
 
@@ -99,4 +232,5 @@ class SponsoredProjectService:
         
         await session.delete(sponsored_project)
         await session.commit()
+        response_cache.invalidate(SponsoredProjectService.CACHE_NAMESPACE)
         return True
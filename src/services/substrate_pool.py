@@ -0,0 +1,303 @@
+"""
+Substrate Connection Pool - shared, health-checked websocket connections
+
+`SubstrateInterface` opens a websocket and downloads runtime metadata on
+creation, which is far too slow to do per request. The pool keeps a fixed
+number of connections open for the app's lifetime:
+
+- `connection()` lends a connection exclusively (the websocket client is not
+  safe for concurrent use) and returns it afterwards; connections that fail
+  with transport errors, or whose borrower is cancelled, are discarded and
+  replaced in the background
+- `close()` closes idle connections at once and lent ones when they are returned
+- lost connections are reopened with exponential backoff
+- idle connections are health-checked periodically (`system_health`)
+- runtime metadata is shared across connections and reconnects through a
+  process-level cache, so it is downloaded once per runtime version
+- connections are `SubstrateConnection`s, which can send many runtime API
+  calls as one JSON-RPC batch (`runtime_call_batch`)
+"""
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import requests
+from loguru import logger
+from scalecodec.base import ScaleBytes, ScaleType
+from substrateinterface import SubstrateInterface
+from substrateinterface.exceptions import SubstrateRequestException
+from websocket import WebSocketException
+
+from src.core.metrics import SUBSTRATE_POOL_CONNECTIONS
+from src.settings.substrate import SubstrateSettings
+
+# Errors that mean the connection itself is unusable
+CONNECTION_ERRORS = (ConnectionError, TimeoutError, OSError, WebSocketException)
+
+
+class SubstrateUnavailable(Exception):
+    """Raised when no healthy Substrate connection can be borrowed in time."""
+
+
+class RuntimeMetadataCache:
+    """Thread-safe in-memory stand-in for the dogpile region `SubstrateInterface` accepts as `cache_region`."""
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            return self._values.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._values[key] = value
+
+
+class SubstrateConnection(SubstrateInterface):
+    """`SubstrateInterface` that can send many runtime API calls in one JSON-RPC batch."""
+
+    def rpc_batch(self, calls: Sequence[Tuple[str, list]]) -> List[Any]:
+        """Send (method, params) calls as one JSON-RPC batch.
+
+        Returns:
+            The result of each call, in order, or the `SubstrateRequestException` of a failed one
+        """
+        first_id = self.request_id
+        self.request_id += len(calls)
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": first_id + index}
+            for index, (method, params) in enumerate(calls)
+        ]
+        websocket = getattr(getattr(self, "transport", None), "websocket", None) or getattr(self, "websocket", None)
+        if websocket is not None:
+            websocket.send(json.dumps(payload))
+            # The connection is lent out exclusively: nothing else is waiting for a reply on it
+            responses = json.loads(websocket.recv())
+            while isinstance(responses, dict) and "params" in responses:
+                responses = json.loads(websocket.recv())  # a notification of an earlier subscription
+        else:
+            http_response = requests.post(self.url, data=json.dumps(payload), headers=self.default_headers)
+            http_response.raise_for_status()
+            responses = http_response.json()
+        if not isinstance(responses, list):
+            raise SubstrateRequestException(responses.get("error", responses))
+        by_id = {response.get("id"): response for response in responses}
+        results = []
+        for request in payload:
+            response = by_id.get(request["id"], {"error": "no response in batch"})
+            results.append(SubstrateRequestException(response["error"]) if "error" in response else response["result"])
+        return results
+
+    def runtime_call_batch(
+        self, api: str, method: str, params: Sequence[Dict[str, Any]], block_hash: Optional[str] = None
+    ) -> List[Union[ScaleType, Exception]]:
+        """`runtime_call` for each of `params`, sent as `state_call`s in one JSON-RPC batch.
+
+        Returns:
+            The decoded result of each call, in order, or the exception it failed with
+        """
+        self.init_runtime()
+        try:
+            definition = self.runtime_config.type_registry["runtime_api"][api]["methods"][method]
+            api_types = self.runtime_config.type_registry["runtime_api"][api].get("types", {})
+        except KeyError:
+            raise ValueError(f"Runtime API Call '{api}.{method}' not found in registry")
+        self.runtime_config.update_type_registry_types(api_types)
+
+        calls = []
+        for call_params in params:
+            data = ScaleBytes(bytes())
+            for param in definition["params"]:
+                data += self.runtime_config.create_scale_object(param["type"]).encode(call_params[param["name"]])
+            calls.append(("state_call", [f"{api}_{method}", str(data), block_hash]))
+
+        results: List[Union[ScaleType, Exception]] = []
+        for response in self.rpc_batch(calls):
+            if isinstance(response, Exception):
+                results.append(response)
+                continue
+            result = self.runtime_config.create_scale_object(definition["type"])
+            result.decode(ScaleBytes(response), check_remaining=self.config.get("strict_scale_decode"))
+            results.append(result)
+        return results
+
+
+class SubstratePool:
+    """Fixed-size pool of `SubstrateInterface` connections managed by the app lifespan."""
+
+    def __init__(
+        self,
+        url: str,
+        size: int = 2,
+        health_check_interval: float = 30.0,
+        acquire_timeout: float = 10.0,
+        max_backoff: float = 30.0,
+        factory: Callable[..., SubstrateInterface] = SubstrateConnection,
+    ):
+        self.url = url
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.max_backoff = max_backoff
+        self.factory = factory
+        self.metadata_cache = RuntimeMetadataCache()
+        self._idle: Optional[asyncio.Queue] = None
+        # Every open connection, idle or lent out
+        self._connections: set[SubstrateInterface] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = True
+
+    @property
+    def started(self) -> bool:
+        return not self._closed
+
+    @property
+    def open_connections(self) -> int:
+        """Connections currently open (idle or lent out)."""
+        return len(self._connections)
+
+    @property
+    def idle_connections(self) -> int:
+        return self._idle.qsize() if self._idle is not None else 0
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start(self) -> None:
+        """Open connections in the background and begin health checks."""
+        if not self._closed:
+            return
+        self._closed = False
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._spawn(self._add_connection())
+        self._spawn(self._health_loop())
+
+    async def close(self) -> None:
+        """Stop background work and close every idle connection; lent ones are closed when returned."""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._idle is not None and not self._idle.empty():
+            substrate = self._idle.get_nowait()
+            self._connections.discard(substrate)
+            await self._close_connection(substrate)
+
+    def _open(self) -> SubstrateInterface:
+        substrate = self.factory(url=self.url, cache_region=self.metadata_cache)
+        substrate.init_runtime()
+        return substrate
+
+    async def _add_connection(self) -> None:
+        delay = 0.5
+        while not self._closed:
+            try:
+                substrate = await asyncio.to_thread(self._open)
+            except Exception as e:
+                logger.warning("Substrate connection to {} failed ({}); retrying in {:.1f}s", self.url, e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            self._connections.add(substrate)
+            self._idle.put_nowait(substrate)
+            logger.info("Substrate connection ready ({}/{}) to {}", len(self._connections), self.size, self.url)
+            return
+
+    async def _close_connection(self, substrate: SubstrateInterface) -> None:
+        try:
+            await asyncio.to_thread(substrate.close)
+        except Exception:
+            pass
+
+    def _discard(self, substrate: SubstrateInterface) -> None:
+        """Drop a broken connection and schedule its replacement."""
+        self._connections.discard(substrate)
+        self._spawn(self._close_connection(substrate))
+        if not self._closed:
+            self._spawn(self._add_connection())
+
+    @asynccontextmanager
+    async def connection(self, timeout: Optional[float] = None) -> AsyncIterator[SubstrateInterface]:
+        """Borrow a connection for exclusive use.
+
+        Raises:
+            SubstrateUnavailable: if the pool is not running or no connection frees up within `timeout`
+        """
+        if self._closed:
+            raise SubstrateUnavailable("Substrate connection pool is not running")
+        try:
+            substrate = await asyncio.wait_for(self._idle.get(), timeout or self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise SubstrateUnavailable(f"No Substrate connection to {self.url} available")
+        try:
+            yield substrate
+        except CONNECTION_ERRORS:
+            self._discard(substrate)
+            raise
+        except Exception:
+            await self._release(substrate)
+            raise
+        except BaseException:
+            # Cancelled mid-call: a worker thread may still be using the socket, so it cannot be lent again
+            self._discard(substrate)
+            raise
+        else:
+            await self._release(substrate)
+
+    async def _release(self, substrate: SubstrateInterface) -> None:
+        if not self._closed:
+            self._idle.put_nowait(substrate)
+            return
+        # Returned after the pool closed: nobody will borrow it again
+        self._connections.discard(substrate)
+        await self._close_connection(substrate)
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Return True once at least one connection is open, False after `timeout`."""
+        deadline = asyncio.get_running_loop().time() + (timeout or self.acquire_timeout)
+        while not self._closed and not self._connections:
+            if asyncio.get_running_loop().time() >= deadline:
+                return False
+            await asyncio.sleep(0.1)
+        return bool(self._connections)
+
+    async def _check(self, substrate: SubstrateInterface) -> bool:
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(substrate.rpc_request, "system_health", []), self.acquire_timeout
+            )
+            return True
+        except Exception as e:
+            logger.warning("Substrate health check failed: {}", e)
+            return False
+
+    async def _health_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            # Only idle connections are checked; lent ones prove themselves in use
+            for _ in range(self._idle.qsize()):
+                try:
+                    substrate = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if await self._check(substrate):
+                    self._idle.put_nowait(substrate)
+                else:
+                    self._discard(substrate)
+
+
+substrate_pool = SubstratePool(
+    url=SubstrateSettings.RPC_URL,
+    size=SubstrateSettings.POOL_SIZE,
+    health_check_interval=SubstrateSettings.HEALTH_CHECK_INTERVAL,
+    acquire_timeout=SubstrateSettings.ACQUIRE_TIMEOUT,
+)
+SUBSTRATE_POOL_CONNECTIONS.set_function(lambda: substrate_pool.open_connections, state="open")
+SUBSTRATE_POOL_CONNECTIONS.set_function(lambda: substrate_pool.idle_connections, state="idle")
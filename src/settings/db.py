@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import Field
 
 from src.settings.base import ProjectSettings
@@ -21,9 +23,31 @@ class _DatabaseSettings(ProjectSettings):
     HOST: str = Field(..., alias="DATABASE_HOST", description="Database host")
     PORT: int = Field(..., alias="DATABASE_PORT", description="Database port")
     DB_NAME: str = Field(..., alias="DATABASE_DB_NAME", description="Database name")
+    READ_HOST: Optional[str] = Field(
+        None,
+        alias="DATABASE_READ_HOST",
+        description="Read replica host; read-only routes use the primary when unset",
+    )
+    READ_PORT: Optional[int] = Field(
+        None,
+        alias="DATABASE_READ_PORT",
+        description="Read replica port (defaults to DATABASE_PORT)",
+    )
+    READ_YOUR_WRITES_SECONDS: float = Field(
+        5.0,
+        alias="DATABASE_READ_YOUR_WRITES_SECONDS",
+        description="How long a client's reads stay pinned to the primary after it writes",
+    )
 
     @property
     def get_url(self) -> str:
         return f"{self.DIALECT}://{self.USERNAME}:{self.PASSWORD}@{self.HOST}:{self.PORT}/{self.DB_NAME}"
 
+    @property
+    def get_read_url(self) -> Optional[str]:
+        if not self.READ_HOST:
+            return None
+        port = self.READ_PORT or self.PORT
+        return f"{self.DIALECT}://{self.USERNAME}:{self.PASSWORD}@{self.READ_HOST}:{port}/{self.DB_NAME}"
+
 DatabaseSettings = _DatabaseSettings()
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from pydantic import Field, SecretStr
+
+from src.settings.base import ProjectSettings
+
+
+class _DebugSettings(ProjectSettings):
+    """Pydantic settings for the admin-only debug endpoints (sampling profiler, task dump)."""
+
+    ADMIN_TOKEN: Optional[SecretStr] = Field(
+        None,
+        alias="DEBUG_ADMIN_TOKEN",
+        description=(
+            "Token expected in the X-Admin-Token header of /debug requests; "
+            "those endpoints are disabled (404) when unset"
+        ),
+    )
+    PROFILE_MAX_SECONDS: float = Field(
+        60.0,
+        alias="DEBUG_PROFILE_MAX_SECONDS",
+        description="Longest profile /debug/profile may take",
+    )
+    PROFILE_INTERVAL: float = Field(
+        0.005,
+        alias="DEBUG_PROFILE_INTERVAL",
+        description="Default seconds between stack samples of /debug/profile",
+    )
+
+
+DebugSettings = _DebugSettings()
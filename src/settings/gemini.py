@@ -11,6 +11,11 @@ class _GeminiSettings(ProjectSettings):
         alias="GOOGLE_API_KEY",
         description="Alternate API key name for Google GenAI",
     )
+    BASE_URL: Optional[str] = Field(
+        None,
+        alias="GEMINI_BASE_URL",
+        description="Override the Gemini API endpoint (e.g. a proxy, or the benchmarks' fake Gemini server)",
+    )
 
 
 GeminiSettings = _GeminiSettings()
@@ -0,0 +1,21 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _HealthSettings(ProjectSettings):
+    """Pydantic settings for the readiness probe."""
+
+    CHECK_TIMEOUT: float = Field(
+        2.0,
+        alias="HEALTH_CHECK_TIMEOUT",
+        description="Seconds each readiness check (database, Arkiv RPC, Substrate) may take before it counts as failed",
+    )
+    READY_CACHE_SECONDS: float = Field(
+        5.0,
+        alias="HEALTH_READY_CACHE_SECONDS",
+        description="Seconds a readiness result is reused, so frequent probes do not hit the dependencies",
+    )
+
+
+HealthSettings = _HealthSettings()
@@ -0,0 +1,31 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _HTTPSettings(ProjectSettings):
+    """Pydantic settings for HTTP caching and serialization of read endpoints."""
+
+    MAX_AGE: int = Field(
+        0,
+        alias="HTTP_CACHE_MAX_AGE",
+        description="Seconds clients may reuse a cached response before revalidating with If-None-Match",
+    )
+    RESPONSE_CACHE_ENABLED: bool = Field(
+        False,
+        alias="HTTP_RESPONSE_CACHE_ENABLED",
+        description="Keep serialized responses in process memory, keyed by ETag",
+    )
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(
+        1024,
+        alias="HTTP_RESPONSE_CACHE_MAX_ENTRIES",
+        description="Maximum number of serialized responses kept in memory",
+    )
+    FAST_LIST_SERIALIZATION: bool = Field(
+        False,
+        alias="HTTP_FAST_LIST_SERIALIZATION",
+        description="Serialize list endpoints straight from row tuples with orjson, skipping model validation",
+    )
+
+
+HTTPSettings = _HTTPSettings()
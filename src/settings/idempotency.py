@@ -0,0 +1,26 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _IdempotencySettings(ProjectSettings):
+    """Pydantic settings for `Idempotency-Key` handling of POST /sponsor and /escrow/deploy-escrow."""
+
+    TTL_SECONDS: float = Field(
+        24 * 3600.0,
+        alias="IDEMPOTENCY_TTL_SECONDS",
+        description="Seconds a completed response is replayed for its key; afterwards the key may be reused",
+    )
+    LOCK_SECONDS: float = Field(
+        120.0,
+        alias="IDEMPOTENCY_LOCK_SECONDS",
+        description="Seconds after which a request still in progress is considered abandoned and its key taken over",
+    )
+    WAIT_SECONDS: float = Field(
+        30.0,
+        alias="IDEMPOTENCY_WAIT_SECONDS",
+        description="Longest a duplicate waits for the request holding its key before getting 409",
+    )
+
+
+IdempotencySettings = _IdempotencySettings()
@@ -0,0 +1,29 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _LogSettings(ProjectSettings):
+    """Pydantic settings for application logging."""
+
+    LEVEL: str = Field("INFO", alias="LOG_LEVEL", description="Minimum level written by the log sink")
+    JSON: bool = Field(
+        True,
+        alias="LOG_JSON",
+        description="Write one JSON object per line (set to false for human-readable lines in development)",
+    )
+    ENQUEUE: bool = Field(
+        True,
+        alias="LOG_ENQUEUE",
+        description="Hand records to a background writer instead of writing to stdout from the logging thread",
+    )
+    SAMPLE_RATE: float = Field(
+        1.0,
+        alias="LOG_SAMPLE_RATE",
+        ge=0.0,
+        le=1.0,
+        description="Fraction of high-volume info/debug records (logged through `sampled_logger`) that are kept",
+    )
+
+
+LogSettings = _LogSettings()
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _RateLimitSettings(ProjectSettings):
+    """Pydantic settings for per-client rate limits and per-route concurrency caps of the expensive endpoints."""
+
+    ENABLED: bool = Field(True, alias="RATE_LIMIT_ENABLED", description="Enforce rate limits and concurrency caps")
+    REDIS_URL: Optional[str] = Field(
+        None,
+        alias="RATE_LIMIT_REDIS_URL",
+        description="Redis-compatible server holding the token buckets, shared by every worker (requires the redis extra); in memory per worker when unset",
+    )
+    TRUST_FORWARDED_FOR: bool = Field(
+        False,
+        alias="RATE_LIMIT_TRUST_FORWARDED_FOR",
+        description="Identify clients by the first X-Forwarded-For address (only behind a proxy that sets it)",
+    )
+    LLM_PER_MINUTE: float = Field(
+        20.0, alias="RATE_LIMIT_LLM_PER_MINUTE", description="Sustained LLM requests (/evaluate, /ai/*) per minute per client"
+    )
+    LLM_BURST: int = Field(5, alias="RATE_LIMIT_LLM_BURST", description="LLM requests a client may make at once before the rate applies")
+    LLM_CONCURRENCY: int = Field(
+        8, alias="RATE_LIMIT_LLM_CONCURRENCY", description="LLM requests in flight per route and worker, across all clients"
+    )
+    DEPLOY_PER_MINUTE: float = Field(
+        5.0, alias="RATE_LIMIT_DEPLOY_PER_MINUTE", description="Escrow deployments queued per minute per client"
+    )
+    DEPLOY_BURST: int = Field(2, alias="RATE_LIMIT_DEPLOY_BURST", description="Escrow deployments a client may queue at once")
+    DEPLOY_CONCURRENCY: int = Field(
+        4, alias="RATE_LIMIT_DEPLOY_CONCURRENCY", description="Deployment requests in flight per worker, across all clients"
+    )
+
+
+RateLimitSettings = _RateLimitSettings()
@@ -0,0 +1,89 @@
+from typing import Optional
+
+from pydantic import Field, SecretStr
+
+from src.settings.base import ProjectSettings
+
+
+class _SubstrateSettings(ProjectSettings):
+    """Pydantic settings for the Substrate (Rococo) escrow integration."""
+
+    ARTIFACTS_DIR: Optional[str] = Field(
+        None,
+        alias="ESCROW_ARTIFACTS_DIR",
+        description="Directory holding funding_escrow.wasm and funding_escrow.json (defaults to the ink! target dir)",
+    )
+    ARTIFACT_CHECK_INTERVAL: float = Field(
+        5.0,
+        alias="ESCROW_ARTIFACT_CHECK_INTERVAL",
+        description="Minimum seconds between checks for changed contract artifacts on disk",
+    )
+    RPC_URL: str = Field(
+        "wss://rococo-contracts-rpc.polkadot.io",
+        alias="SUBSTRATE_RPC_URL",
+        description="Websocket RPC endpoint of the contracts chain (e.g. ws://127.0.0.1:9944 for a local substrate-contracts-node)",
+    )
+    SIGNER_URI: Optional[SecretStr] = Field(
+        None,
+        alias="SUBSTRATE_SIGNER_URI",
+        description="Secret URI (mnemonic or //Dev path) of the deployer account; deployments are simulated when unset",
+    )
+    OPERATOR_TOKEN: Optional[SecretStr] = Field(
+        None,
+        alias="ESCROW_OPERATOR_TOKEN",
+        description=(
+            "Token expected in the X-Operator-Token header of milestone release requests, which move escrow funds; "
+            "releasing is disabled (404) when unset"
+        ),
+    )
+    POOL_SIZE: int = Field(2, alias="SUBSTRATE_POOL_SIZE", description="Websocket connections kept open to the node")
+    RPC_BATCH_SIZE: int = Field(
+        100,
+        alias="SUBSTRATE_RPC_BATCH_SIZE",
+        description="Contract reads sent per JSON-RPC batch request (at most the node's --rpc-max-batch-request-len)",
+    )
+    HEALTH_CHECK_INTERVAL: float = Field(
+        30.0,
+        alias="SUBSTRATE_HEALTH_CHECK_INTERVAL",
+        description="Seconds between health checks of idle pooled connections",
+    )
+    ACQUIRE_TIMEOUT: float = Field(
+        10.0,
+        alias="SUBSTRATE_ACQUIRE_TIMEOUT",
+        description="Seconds to wait for a free pooled connection before giving up",
+    )
+    JOB_WORKERS: int = Field(2, alias="ESCROW_JOB_WORKERS", description="Escrow deployment jobs run concurrently")
+    JOB_MAX_ATTEMPTS: int = Field(
+        3,
+        alias="ESCROW_JOB_MAX_ATTEMPTS",
+        description="Times a deployment job is attempted before it is marked failed",
+    )
+    FINALIZATION_TIMEOUT: float = Field(
+        120.0,
+        alias="ESCROW_FINALIZATION_TIMEOUT",
+        description="Seconds to wait for the instantiation block to be finalized",
+    )
+    RELEASE_TRACK_INTERVAL: float = Field(
+        3.0,
+        alias="ESCROW_RELEASE_TRACK_INTERVAL",
+        description="Seconds between scans for inclusion and finalization of submitted milestone releases",
+    )
+    RELEASE_DROP_AFTER_BLOCKS: int = Field(
+        64,
+        alias="ESCROW_RELEASE_DROP_AFTER_BLOCKS",
+        description="Blocks after which a submitted release that was never included is marked failed",
+    )
+
+    EVENTS_POLL_INTERVAL: float = Field(
+        6.0,
+        alias="ESCROW_EVENTS_POLL_INTERVAL",
+        description="Seconds between checks for newly finalized blocks carrying escrow contract events",
+    )
+    EVENTS_START_BLOCK: Optional[int] = Field(
+        None,
+        alias="ESCROW_EVENTS_START_BLOCK",
+        description="Block to start following escrow events from on first run (defaults to the finalized head)",
+    )
+
+
+SubstrateSettings = _SubstrateSettings()
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _TelemetrySettings(ProjectSettings):
+    """Pydantic settings for request timing, histograms and optional OpenTelemetry export."""
+
+    SERVER_TIMING: bool = Field(
+        True,
+        alias="TIMING_SERVER_TIMING_HEADER",
+        description="Add a Server-Timing header with the per-request db/arkiv/llm/substrate breakdown",
+    )
+    OTLP_ENDPOINT: Optional[str] = Field(
+        None,
+        alias="OTEL_EXPORTER_OTLP_ENDPOINT",
+        description="OTLP/HTTP collector URL (e.g. http://localhost:4318); spans are exported when set and the otel extra is installed",
+    )
+    SERVICE_NAME: str = Field("sub0-data", alias="OTEL_SERVICE_NAME", description="service.name resource attribute of exported spans")
+
+
+TelemetrySettings = _TelemetrySettings()
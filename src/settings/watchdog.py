@@ -0,0 +1,26 @@
+from pydantic import Field
+
+from src.settings.base import ProjectSettings
+
+
+class _LoopWatchdogSettings(ProjectSettings):
+    """Pydantic settings for the event-loop blocking detector (meant for development and staging)."""
+
+    ENABLED: bool = Field(
+        False,
+        alias="LOOP_WATCHDOG_ENABLED",
+        description="Measure event-loop lag and log the stack of callbacks blocking the loop",
+    )
+    THRESHOLD: float = Field(
+        0.1,
+        alias="LOOP_WATCHDOG_THRESHOLD",
+        description="Seconds a single callback may block the loop before it is reported",
+    )
+    INTERVAL: float = Field(
+        0.02,
+        alias="LOOP_WATCHDOG_INTERVAL",
+        description="Seconds between loop heartbeats (and checks of the monitor thread)",
+    )
+
+
+LoopWatchdogSettings = _LoopWatchdogSettings()